@@ -1,7 +1,10 @@
 import streamlit as st
+import time
 from utils.layout import render_header, render_navigation, render_footer
 from utils.styles import apply_apple_style_css
 from utils.seo_manager import setup_seo_routing, inject_seo_meta
+from utils.job_ui import render_queue_metrics
+from utils import release_feeds
 
 # Page Config
 st.set_page_config(
@@ -11,15 +14,24 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+
+@st.cache_resource(show_spinner=False)
+def start_release_feeds():
+    """One background refresher per server process; page renders only read its cache."""
+    return release_feeds.FeedRefresher().start()
+
+
 # Style & Routing
 apply_apple_style_css()
 nav_options = ["Home", "Playwright", "WebdriverIO", "Karate", "Comparisons"]
-setup_seo_routing(nav_options, "Home")
+url_nav = setup_seo_routing(nav_options, "Home")
 
 # Layout
 render_header()
-selected_nav = render_navigation()
+selected_nav = render_navigation(url_nav)
 inject_seo_meta(selected_nav)
+with st.sidebar:
+    render_queue_metrics()
 
 # Routing Logic
 if selected_nav == "Home":
@@ -44,13 +56,43 @@ if selected_nav == "Home":
     Select a module from the navigation bar above to start mastering these tools.
     """)
     
+    # Release notes come from the cache the background refresher fills; this render never fetches
+    if release_feeds.ENABLED:
+        start_release_feeds()
+    feeds = release_feeds.read_feeds()
+    latest = {name: release_feeds.latest_release(state) for name, state in feeds.items()}
+
+    def latest_line(name, fallback):
+        return f"Latest v{latest[name]['version']}" if latest[name] else fallback
+
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.info("**Playwright**\n\nLatest v1.40+\nPython & Node.js Support")
+        st.info(f"**Playwright**\n\n{latest_line('Playwright', 'Latest v1.40+')}\nPython & Node.js Support")
     with col2:
-        st.success("**WebdriverIO**\n\nAsync/Sync Mode\nAppium Mobile Support")
+        st.success(f"**WebdriverIO**\n\n{latest_line('WebdriverIO', 'Async/Sync Mode')}\nAppium Mobile Support")
     with col3:
-        st.warning("**Karate**\n\nAPI + UI + Perf\nZero Coding Required")
+        st.warning(f"**Karate**\n\n{latest_line('Karate', 'API + UI + Perf')}\nZero Coding Required")
+
+    st.markdown("### 🆕 What's New")
+    for col, (name, state) in zip(st.columns(len(feeds)), feeds.items()):
+        with col:
+            st.markdown(f"**{name}**")
+            if not state or not state["entries"]:
+                if not release_feeds.ENABLED:
+                    st.caption("Release feeds are switched off (ACADEMY_RELEASE_FEEDS=off).")
+                elif state and state["error"]:
+                    st.caption("The release feed could not be fetched yet; it is retried in the background.")
+                else:
+                    st.caption("Fetching the release notes in the background...")
+                continue
+            for entry in state["entries"][:3]:
+                day = time.strftime("%d %b %Y", time.gmtime(entry["published"])) if entry["published"] else ""
+                tag = " · pre-release" if entry["prerelease"] else ""
+                st.markdown(f"[v{entry['version']}]({entry['link']}) · {day}{tag}")
+                if entry["summary"]:
+                    st.caption(entry["summary"])
+            checked = max(0, int(time.time() - state["checked_at"]) // 60)
+            st.caption(f"Checked {checked} min ago" + (" (last check failed)" if state["error"] else ""))
 
 elif selected_nav == "Playwright":
     # Dynamic import to keep app.py clean, assumes we will create this file
@@ -0,0 +1,87 @@
+"""
+Benchmark for utils.flakiness on a synthetic CI history.
+
+    python benchmarks/bench_flakiness.py --tests 10000 --runs 1000
+    python benchmarks/bench_flakiness.py --tests 10000 --runs 1000 --score-only
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import cache  # noqa: E402
+from utils.flakiness import FAILED, PASSED, History, load_history, score_history  # noqa: E402
+
+
+def synthetic_outcomes(tests, runs, flaky_share, seed):
+    """Mostly stable tests, a share of flaky ones and a few infrastructure-wide bad runs."""
+    rng = np.random.default_rng(seed)
+    fail_p = np.where(rng.random(tests) < flaky_share, rng.uniform(0.02, 0.3, tests), 0.0005)
+    failed = rng.random((tests, runs)) < fail_p[:, None]
+    failed[:, rng.random(runs) < 0.01] |= rng.random((tests, 1)) < 0.5
+    outcome = np.where(failed, FAILED, PASSED).astype(np.uint8)
+    duration = rng.lognormal(4, 0.5, (tests, runs)).astype(np.float32)
+    return outcome, duration
+
+
+def write_history(directory, outcome, duration):
+    tests = [f'classname="com.acme.module{i % 40}.Spec{i // 40 % 25}" name="case {i}"' for i in range(outcome.shape[0])]
+    for run in range(outcome.shape[1]):
+        run_dir = os.path.join(directory, f"run-{run}")
+        os.makedirs(run_dir)
+        parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<testsuite name="suite">\n']
+        for attrs, state, ms in zip(tests, outcome[:, run].tolist(), duration[:, run].tolist()):
+            if state == FAILED:
+                parts.append(f'  <testcase {attrs} time="{ms / 1000:.3f}"><failure message="boom">trace</failure></testcase>\n')
+            else:
+                parts.append(f'  <testcase {attrs} time="{ms / 1000:.3f}"/>\n')
+        parts.append("</testsuite>\n")
+        with open(os.path.join(run_dir, "TEST-suite.xml"), "w") as f:
+            f.write("".join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tests", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=1_000)
+    parser.add_argument("--flaky-share", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--score-only", action="store_true", help="skip XML generation and parsing")
+    args = parser.parse_args()
+
+    outcome, duration = synthetic_outcomes(args.tests, args.runs, args.flaky_share, args.seed)
+    if args.score_only:
+        history = History([f"case {i}" for i in range(args.tests)], [f"run-{r}" for r in range(args.runs)], outcome, duration)
+    else:
+        workdir = tempfile.mkdtemp(prefix="bench-flakiness-")
+        cache.CACHE_DIR = os.path.join(workdir, "cache")
+        try:
+            reports = os.path.join(workdir, "reports")
+            started = time.perf_counter()
+            write_history(reports, outcome, duration)
+            size = sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(reports) for f in fs)
+            print(f"generated {size / 1e6:.0f} MB of JUnit XML in {time.perf_counter() - started:.1f}s")
+
+            started = time.perf_counter()
+            history, _ = load_history(reports)
+            print(f"parse + matrix      {time.perf_counter() - started:7.2f}s")
+            started = time.perf_counter()
+            load_history(reports)
+            print(f"cached load         {time.perf_counter() - started:7.2f}s")
+        finally:
+            shutil.rmtree(workdir)
+
+    started = time.perf_counter()
+    ranking, runs = score_history(history)
+    print(f"score {args.tests:,} x {args.runs:,}  {time.perf_counter() - started:7.2f}s")
+    print(ranking.head(5).round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Micro-benchmark for utils.fuzzy_match.
+
+    python benchmarks/bench_fuzzy_match.py --users 50000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fuzzy_match import compile_schema_text, match, match_each  # noqa: E402
+
+SCHEMA = """
+{
+    users: '#[] #object',
+    total: '#number? _ >= 0',
+}
+"""
+
+USER_SCHEMA = """
+{
+    id: '#number',
+    uuid: '#uuid',
+    email: '#regex ^[a-z]+@.*',
+    tags: '#[] #string',
+    address: { city: '#string', zip: '#? _ > 0' },
+    metadata: '#ignore'
+}
+"""
+
+
+def build_payload(users):
+    return {
+        "total": users,
+        "users": [{
+            "id": i,
+            "uuid": str(uuid.UUID(int=i)),
+            "email": f"user{chr(97 + i % 26)}@example.com",
+            "tags": ["alpha", "beta", "gamma"],
+            "address": {"city": "Springfield", "zip": 10000 + i},
+            "metadata": {"seen": i},
+        } for i in range(users)],
+    }
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    raw = json.dumps(build_payload(args.users))
+    print(f"payload: {len(raw) / 1e6:.1f} MB, {args.users} users")
+
+    parse_ms, payload = timed(lambda: json.loads(raw), args.repeat)
+    print(f"json.loads:               {parse_ms:8.1f} ms")
+
+    compile_schema_text.cache_clear()
+    cold_ms, _ = timed(lambda: compile_schema_text(USER_SCHEMA), 1)
+    warm_ms, matcher = timed(lambda: compile_schema_text(USER_SCHEMA), args.repeat)
+    print(f"compile (cold / cached):  {cold_ms:8.3f} ms / {warm_ms * 1000:.1f} us")
+
+    envelope_ms, errors = timed(lambda: match(payload, SCHEMA), args.repeat)
+    print(f"match envelope:           {envelope_ms:8.1f} ms ({len(errors)} mismatches)")
+
+    each_ms, errors = timed(lambda: match_each(payload["users"], matcher), args.repeat)
+    print(f"match each user:          {each_ms:8.1f} ms ({len(errors)} mismatches, "
+          f"{each_ms * 1000 / args.users:.2f} us/user)")
+
+    for i in range(0, args.users, 20):
+        payload["users"][i]["address"]["zip"] = -1
+    report_ms, errors = timed(lambda: match_each(payload["users"], matcher, max_errors=args.users), args.repeat)
+    print(f"report with 5% failures:  {report_ms:8.1f} ms ({len(errors)} mismatches)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark for utils.har_replay on synthetic HAR files.
+
+    python benchmarks/bench_har_replay.py --entries 1000 10000 100000
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.har_replay import HarIndex  # noqa: E402
+
+
+def write_har(path, entries, seed):
+    """A HAR with REST-style GETs (with cache-busting params) and JSON POSTs, written entry by entry."""
+    rng = random.Random(seed)
+    requests = []
+    with open(path, "w") as f:
+        f.write('{"log": {"version": "1.2", "creator": {"name": "bench", "version": "1"}, "pages": [], "entries": [\n')
+        for i in range(entries):
+            if i % 4 == 3:
+                body = json.dumps({"order": i, "items": [rng.randrange(1000) for _ in range(3)]})
+                request = {"method": "POST", "url": f"https://shop.test/api/orders?v={i % 7}", "headers": [],
+                           "postData": {"mimeType": "application/json", "text": body}}
+            else:
+                request = {"method": "GET", "url": f"https://shop.test/api/products/{i}?page={i % 50}&_={rng.random()}",
+                           "headers": []}
+            response = {"status": 200, "headers": [{"name": "Content-Type", "value": "application/json"}],
+                        "content": {"mimeType": "application/json", "text": json.dumps({"id": i, "name": f"item {i}"})}}
+            f.write(("," if i else "") + json.dumps({"request": request, "response": response}) + "\n")
+            requests.append(request)
+        f.write("]}}\n")
+    return requests
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'entries':>9} {'HAR MB':>7} {'load s':>7} {'exact µs':>9} {'fallback µs':>12} {'peak RSS MB':>12}")
+    for entries in args.entries:
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, "bench.har")
+            requests = write_har(path, entries, args.seed)
+            started = time.perf_counter()
+            index = HarIndex.load(path)
+            load_s = time.perf_counter() - started
+
+            rng = random.Random(args.seed)
+            sample = [requests[rng.randrange(entries)] for _ in range(args.lookups)]
+            started = time.perf_counter()
+            for request in sample:
+                post = request.get("postData", {})
+                assert index.lookup(request["method"], request["url"], post.get("text"), post.get("mimeType", ""))
+            exact_us = (time.perf_counter() - started) / args.lookups * 1e6
+
+            # Same endpoints with a changed body and query: answered by the fallback levels
+            started = time.perf_counter()
+            for request in sample:
+                index.lookup(request["method"], request["url"].split("?")[0] + "?changed=1", "{}", "application/json")
+            fallback_us = (time.perf_counter() - started) / args.lookups * 1e6
+            peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(f"{entries:>9,} {os.path.getsize(path) / 1e6:>7.1f} {load_s:>7.2f} {exact_us:>9.2f} "
+                  f"{fallback_us:>12.2f} {peak_mb:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark for utils.jobs: how long a light page rerun takes while other sessions validate
+big JSON responses, with the validation done on session threads against a JobPool.
+
+    python benchmarks/bench_jobs.py --heavy 4 --users 100000
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fuzzy_match import validate_text  # noqa: E402
+from utils.jobs import JobPool  # noqa: E402
+
+SCHEMA = "{ users: '#[] #object', total: '#number' }"
+EACH_SCHEMA = "{ id: '#number', uuid: '#uuid', email: '#regex ^[a-z]+@.*', tags: '#[] #string' }"
+
+
+def build_response(users):
+    return json.dumps({
+        "total": users,
+        "users": [{"id": i, "uuid": str(uuid.uuid4()), "email": f"user{i}@academy.dev", "tags": ["a", "b"]}
+                  for i in range(users)],
+    })
+
+
+def rerun():
+    """Stand-in for a light page rerun: a few ms of pure-Python work."""
+    return sum(len(str(i)) for i in range(20000))
+
+
+def probe(stop, samples):
+    """Reruns every 10 ms; the latency counts from when the rerun was due, so time spent waiting for the GIL shows."""
+    while not stop.is_set():
+        due = time.perf_counter() + 0.01
+        time.sleep(0.01)
+        rerun()
+        samples.append((time.perf_counter() - due) * 1000)
+
+
+def measure(run_heavy, heavy, rounds):
+    """Rerun latencies (ms) sampled while `heavy` sessions each call run_heavy() `rounds` times."""
+    samples = []
+    stop = threading.Event()
+    prober = threading.Thread(target=probe, args=(stop, samples))
+    prober.start()
+    sessions = [threading.Thread(target=lambda: [run_heavy() for _ in range(rounds)]) for _ in range(heavy)]
+    started = time.perf_counter()
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+    wall = time.perf_counter() - started
+    stop.set()
+    prober.join()
+    return samples, wall
+
+
+def report(name, samples, wall):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1] if samples else 0
+    print(f"{name:<14} {len(samples):>7} {statistics.median(samples):>9.2f} {p95:>9.2f} {samples[-1]:>9.2f} "
+          f"{wall:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--heavy", type=int, default=4, help="sessions running heavy validations at once")
+    parser.add_argument("--users", type=int, default=100000, help="users in each response")
+    parser.add_argument("--rounds", type=int, default=2, help="validations per heavy session")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    response = build_response(args.users)
+    users = json.dumps(json.loads(response)["users"])
+    pool = JobPool(workers=args.workers or min(os.cpu_count() or 1, 4), per_session=args.rounds)
+    pool.submit("utils.fuzzy_match:validate_text", ("[]", "'#[]'")).wait()  # spawn the workers up front
+
+    def inline():
+        validate_text(response, SCHEMA)
+        validate_text(users, EACH_SCHEMA, each=True)
+
+    def pooled():
+        pool.submit("utils.fuzzy_match:validate_text", (response, SCHEMA)).result()
+        pool.submit("utils.fuzzy_match:validate_text", (users, EACH_SCHEMA), {"each": True}).result()
+
+    print(f"{os.cpu_count()} CPUs, {pool.stats()['workers']} workers, {args.heavy} heavy sessions, "
+          f"{len(response) / 1e6:.1f} MB responses")
+    print(f"{'heavy work':<14} {'reruns':>7} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'wall s':>8}")
+    report("idle", *measure(lambda: time.sleep(1), 1, 1))
+    report("session thread", *measure(inline, args.heavy, args.rounds))
+    report("JobPool", *measure(pooled, args.heavy, args.rounds))
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
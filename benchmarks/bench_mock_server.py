@@ -0,0 +1,109 @@
+"""
+Throughput benchmark for utils.mock_server.
+
+Starts the bundled payment mock in its own process (one core) and drives it with
+keep-alive connections from separate client processes.
+
+    python benchmarks/bench_mock_server.py --connections 64 --seconds 5
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.mock_server import MockServer, MockService  # noqa: E402
+
+FEATURE = os.path.join(ROOT, "fixtures", "mocks", "payment-mock.feature")
+REQUESTS = {
+    "static": b"GET /health HTTP/1.1\r\nHost: mock\r\n\r\n",
+    "template": b"GET /payments/42 HTTP/1.1\r\nHost: mock\r\n\r\n",
+    "body-predicate": (b"POST /pay HTTP/1.1\r\nHost: mock\r\nContent-Type: application/json\r\n"
+                       b"Content-Length: 15\r\n\r\n{\"amount\": -10}"),
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(port):
+    server = MockServer(MockService.from_file(FEATURE))
+
+    async def run():
+        srv = await server.start("127.0.0.1", port)
+        async with srv:
+            await srv.serve_forever()
+
+    asyncio.run(run())
+
+
+async def _connection(port, payload, deadline, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    count = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        writer.write(payload)
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = int(head.split(b"Content-Length: ", 1)[1].split(b"\r\n", 1)[0])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+        count += 1
+    writer.close()
+    return count
+
+
+def client(port, payload, connections, seconds, out):
+    latencies = []
+
+    async def run():
+        deadline = time.perf_counter() + seconds
+        counts = await asyncio.gather(*(_connection(port, payload, deadline, latencies) for _ in range(connections)))
+        return sum(counts)
+
+    out.put((asyncio.run(run()), latencies[::10]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--clients", type=int, default=2, help="client processes")
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    port = free_port()
+    server = ctx.Process(target=serve, args=(port,), daemon=True)
+    server.start()
+    time.sleep(1.0)
+
+    try:
+        for name, payload in REQUESTS.items():
+            out = ctx.Queue()
+            per_client = max(args.connections // args.clients, 1)
+            procs = [ctx.Process(target=client, args=(port, payload, per_client, args.seconds, out))
+                     for _ in range(args.clients)]
+            for p in procs:
+                p.start()
+            results = [out.get() for _ in procs]
+            for p in procs:
+                p.join()
+            total = sum(r[0] for r in results)
+            latencies = sorted(x for r in results for x in r[1])
+            p99 = latencies[int(len(latencies) * 0.99)] * 1000
+            print(f"{name:15s} {total / args.seconds:10,.0f} req/s   "
+                  f"p50 {statistics.median(latencies) * 1000:6.2f} ms   p99 {p99:6.2f} ms")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
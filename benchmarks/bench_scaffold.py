@@ -0,0 +1,75 @@
+"""
+Benchmark for utils.scaffold: a classroom clicking "Download starter" at the same moment,
+with the archive LRU against zipping the project for every click.
+
+    python benchmarks/bench_scaffold.py --clicks 200 --variants 1 3 12
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import scaffold  # noqa: E402
+
+
+def variant(i):
+    framework = scaffold.FRAMEWORKS[i % len(scaffold.FRAMEWORKS)]
+    return framework, {"project": f"starter-{i}"}
+
+
+def uncached(framework, **params):
+    return b"".join(scaffold.iter_zip(scaffold.project_files(framework, **params)))
+
+
+def burst(download, clicks, variants):
+    """Fires `clicks` downloads from as many threads at once; returns (wall s, peak traced MB)."""
+    start = threading.Barrier(clicks + 1)
+    results = [None] * clicks
+
+    def click(i):
+        framework, params = variant(i % variants)
+        start.wait()
+        results[i] = download(framework, **params)
+
+    threads = [threading.Thread(target=click, args=(i,)) for i in range(clicks)]
+    for thread in threads:
+        thread.start()
+    tracemalloc.start()
+    started = time.perf_counter()
+    start.wait()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert all(results)
+    return wall, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clicks", type=int, default=200)
+    parser.add_argument("--variants", type=int, nargs="+", default=[1, 3, 12],
+                        help="distinct parameter sets among the clicks")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.clicks} simultaneous clicks")
+    print(f"{'method':<18} {'variants':>8} {'builds':>7} {'wall ms':>9} {'peak MB':>8}")
+    for variants in args.variants:
+        scaffold.clear_cache()
+        wall, peak = burst(uncached, args.clicks, variants)
+        print(f"{'zip per click':<18} {variants:>8} {args.clicks:>7} {wall * 1000:>9.1f} {peak:>8.2f}")
+        wall, peak = burst(scaffold.build, args.clicks, variants)
+        builds = scaffold.cache_info()["builds"]
+        print(f"{'LRU, cold':<18} {variants:>8} {builds:>7} {wall * 1000:>9.1f} {peak:>8.2f}")
+        wall, peak = burst(scaffold.build, args.clicks, variants)
+        builds = scaffold.cache_info()["builds"] - builds
+        print(f"{'LRU, warm':<18} {variants:>8} {builds:>7} {wall * 1000:>9.1f} {peak:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
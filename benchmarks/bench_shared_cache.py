@@ -0,0 +1,77 @@
+"""
+Benchmark for the shared on-disk cache: N replica processes asking for the academy's image
+variants at the same moment on a cold cache, with the cache lock against every replica encoding.
+
+    python benchmarks/bench_shared_cache.py --replicas 1 2 4 8
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils import cache, images  # noqa: E402
+
+SOURCES = sorted(glob.glob(os.path.join(ROOT, "assets", "*.png")))
+
+
+def replica(shared, start):
+    start.wait()
+    for source in SOURCES:
+        if shared:
+            images.variant(source)
+        else:
+            images.encode_variant(source)
+
+
+def run(replicas, shared):
+    """Wall seconds and encodes for `replicas` processes fetching every variant once."""
+    cache.CACHE_DIR = tempfile.mkdtemp(prefix="academy-cache-")
+    builds = multiprocessing.Value("i", 0)
+    encode = images.encode_variant
+
+    def counting(*args, **kwargs):
+        with builds.get_lock():
+            builds.value += 1
+        return encode(*args, **kwargs)
+
+    images.encode_variant = counting
+    start = multiprocessing.Barrier(replicas + 1)
+    processes = [multiprocessing.Process(target=replica, args=(shared, start)) for _ in range(replicas)]
+    try:
+        for process in processes:
+            process.start()
+        start.wait()
+        started = time.perf_counter()
+        for process in processes:
+            process.join()
+        wall = time.perf_counter() - started
+    finally:
+        images.encode_variant = encode
+        shutil.rmtree(cache.CACHE_DIR)
+    return wall, builds.value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--replicas", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    multiprocessing.set_start_method("fork")
+    print(f"{os.cpu_count()} CPUs, {len(SOURCES)} images per replica")
+    print(f"{'method':<18} {'replicas':>8} {'encodes':>8} {'wall ms':>9}")
+    for replicas in args.replicas:
+        wall, builds = run(replicas, shared=False)
+        print(f"{'encode per replica':<18} {replicas:>8} {builds:>8} {wall * 1000:>9.1f}")
+        wall, builds = run(replicas, shared=True)
+        print(f"{'shared cache':<18} {replicas:>8} {builds:>8} {wall * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
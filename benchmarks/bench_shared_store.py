@@ -0,0 +1,95 @@
+"""
+Benchmark for utils.shared_store against naive file locking, with N concurrent reader processes.
+
+    python benchmarks/bench_shared_store.py --workers 1 8 32
+"""
+import argparse
+import fcntl
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.shared_store import SharedStore, StoreClient  # noqa: E402
+
+TOKEN = {"access_token": "x" * 512, "expires_in": 3600, "scope": "read write"}
+
+
+def read_socket(address, authkey, reads, start):
+    client = StoreClient(address, authkey)
+    start.wait()
+    started = time.perf_counter()
+    for _ in range(reads):
+        client.get("token")
+    return time.perf_counter() - started
+
+
+def read_memo(address, authkey, reads, start):
+    client = StoreClient(address, authkey)
+    start.wait()
+    started = time.perf_counter()
+    for _ in range(reads):
+        client.compute_once("token", dict)
+    return time.perf_counter() - started
+
+
+def read_file(path, reads, start):
+    """What suites do without a store: lock the token file, read it, parse it."""
+    start.wait()
+    started = time.perf_counter()
+    for _ in range(reads):
+        with open(path) as f:
+            fcntl.flock(f, fcntl.LOCK_SH)
+            json.load(f)
+            fcntl.flock(f, fcntl.LOCK_UN)
+    return time.perf_counter() - started
+
+
+def run(target, args, workers):
+    start = multiprocessing.Manager().Event()
+    with multiprocessing.Pool(workers) as pool:
+        pending = [pool.apply_async(target, args + (start,)) for _ in range(workers)]
+        time.sleep(0.2)
+        started = time.perf_counter()
+        start.set()
+        per_worker = [result.get() for result in pending]
+        wall = time.perf_counter() - started
+    return per_worker, wall
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--reads", type=int, default=5_000, help="reads per worker")
+    args = parser.parse_args()
+
+    store = SharedStore().start()
+    StoreClient(store.address, store.authkey).compute_once("token", lambda: TOKEN)
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, "token.json")
+    with open(path, "w") as f:
+        json.dump(TOKEN, f)
+
+    cases = [("store get (socket)", read_socket, (store.address, store.authkey)),
+             ("compute_once (memo)", read_memo, (store.address, store.authkey)),
+             ("flock + JSON file", read_file, (path,))]
+    print(f"{os.cpu_count()} CPUs, {args.reads:,} reads per worker")
+    print(f"{'method':<22} {'workers':>7} {'µs/read':>9} {'reads/s':>12}")
+    try:
+        for name, target, target_args in cases:
+            for workers in args.workers:
+                per_worker, wall = run(target, target_args + (args.reads,), workers)
+                us_per_read = sum(per_worker) / (workers * args.reads) * 1e6
+                print(f"{name:<22} {workers:>7} {us_per_read:>9.2f} {workers * args.reads / wall:>12,.0f}")
+    finally:
+        store.stop()
+        os.remove(path)
+        os.rmdir(workdir)
+
+
+if __name__ == "__main__":
+    main()
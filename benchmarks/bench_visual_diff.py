@@ -0,0 +1,111 @@
+"""
+Benchmark for utils.visual_diff on synthetic UI screenshots.
+
+    python benchmarks/bench_visual_diff.py --screens 1000 --size 1280x800
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import cache  # noqa: E402
+from utils.visual_diff import BaselineStore, load_pixels, status_bar  # noqa: E402
+
+STATUS_BAR = 24
+
+
+def screenshot(rng, width, height):
+    """A flat UI: status bar, header, a grid of cards with text-like stripes."""
+    pixels = np.full((height, width, 3), 248, dtype=np.uint8)
+    pixels[:STATUS_BAR] = 30
+    pixels[STATUS_BAR:STATUS_BAR + 56] = rng.integers(40, 200, 3)
+    for top in range(120, height - 160, 180):
+        for left in range(40, width - 300, 300):
+            pixels[top:top + 150, left:left + 260] = 255
+            pixels[top:top + 150, left] = pixels[top:top + 150, left + 259] = 220
+            for line in range(top + 20, top + 130, 18):
+                length = int(rng.integers(80, 230))
+                pixels[line:line + 8, left + 16:left + 16 + length] = rng.integers(60, 120)
+    return pixels
+
+
+def write_dataset(workdir, screens, width, height, seed):
+    """Baselines plus candidates: 80% identical, 10% a changed button, 10% only a new status-bar clock."""
+    rng = np.random.default_rng(seed)
+    for directory in ("baseline", "actual"):
+        os.makedirs(os.path.join(workdir, directory))
+    kinds = {"identical": 0, "changed": 0, "status bar only": 0}
+    for i in range(screens):
+        base = screenshot(rng, width, height)
+        actual = base.copy()
+        roll = rng.random()
+        if roll < 0.1:
+            top, left = int(rng.integers(100, height - 60)), int(rng.integers(0, width - 140))
+            actual[top:top + 40, left:left + 120] = (20, 110, 230)
+            kinds["changed"] += 1
+        elif roll < 0.2:
+            actual[4:18, width - 80:width - 20] = 255
+            kinds["status bar only"] += 1
+        else:
+            kinds["identical"] += 1
+        name = f"screen-{i:05d}.png"
+        Image.fromarray(base).save(os.path.join(workdir, "baseline", name))
+        Image.fromarray(actual).save(os.path.join(workdir, "actual", name))
+    return kinds
+
+
+def naive(workdir, names, masks_height):
+    """Decode both images and diff every pixel."""
+    failed = 0
+    for name in names:
+        a = load_pixels(os.path.join(workdir, "baseline", name)).astype(np.int16)
+        b = load_pixels(os.path.join(workdir, "actual", name)).astype(np.int16)
+        diff = np.abs(a - b).max(axis=-1) > 16
+        diff[:masks_height] = False
+        failed += diff.sum() > 0.001 * diff.size
+    return failed
+
+
+def engine(store, workdir, names):
+    failed = 0
+    for name in names:
+        failed += store.compare(name, os.path.join(workdir, "actual", name)).status == "changed"
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--screens", type=int, default=1000)
+    parser.add_argument("--size", default="1280x800")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.split("x"))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cache.CACHE_DIR = os.path.join(workdir, "cache")
+        kinds = write_dataset(workdir, args.screens, width, height, args.seed)
+        names = sorted(os.listdir(os.path.join(workdir, "baseline")))
+        print(f"{args.screens} screenshots at {width}x{height}: {kinds}")
+
+        started = time.perf_counter()
+        failed = naive(workdir, names, STATUS_BAR)
+        elapsed = time.perf_counter() - started
+        print(f"{'full pixel diff':<32} {args.screens / elapsed:8.0f}/s  {failed} changed")
+
+        for label in ("signatures cold (first run)", "signatures in disk cache", "signatures in memory"):
+            if label == "signatures in disk cache" or label.endswith("(first run)"):
+                store = BaselineStore(os.path.join(workdir, "baseline"), [status_bar(STATUS_BAR)])
+            started = time.perf_counter()
+            failed = engine(store, workdir, names)
+            elapsed = time.perf_counter() - started
+            print(f"{label:<32} {args.screens / elapsed:8.0f}/s  {failed} changed")
+
+
+if __name__ == "__main__":
+    main()
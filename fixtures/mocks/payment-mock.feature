@@ -0,0 +1,27 @@
+Feature: Payment Service Mock
+
+    # The first scenario whose predicate matches wins, so specific checks go first.
+
+    Background:
+        * def paymentId = 0
+
+    Scenario: pathMatches('/pay') && methodIs('post') && bodyPath('$.amount') < 0
+        * def response = { error: 'Invalid Amount' }
+        * def responseStatus = 400
+
+    Scenario: pathMatches('/pay') && methodIs('post')
+        * def req = request
+        * def paymentId = paymentId + 1
+        * def response = { success: true, txnId: '#(paymentId)', amount: '#(req.amount)' }
+        * def responseDelay = 500 // Simulate 500ms network lag
+        * def responseStatus = 200
+
+    Scenario: pathMatches('/payments/{id}') && methodIs('get')
+        * def response = { txnId: '#(pathParams.id)', status: 'SETTLED' }
+
+    Scenario: pathMatches('/health')
+        * def response = { status: 'UP' }
+
+    Scenario:
+        * def response = { error: 'Not Found' }
+        * def responseStatus = 404
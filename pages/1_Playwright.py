@@ -1,5 +1,17 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import os
+import importlib.util
+import time
+import plotly.graph_objects as go
+from utils.playground import BrowserPool, EXAMPLES, DEFAULT_RUN_TIMEOUT, ENABLED as PLAYGROUND_ENABLED
+from utils.trace_viewer import TraceArchive, TraceError
+from utils.fixtures import FIXTURE_DIR
+from utils import data_factory, images, job_ui, scaffold, snippets, visual_diff
+from utils.cache import digest_bytes, spill
+from utils.har_replay import HarError, HarIndex
+from utils.storage_states import StatePool, fixture_roles
+from utils.locator_scorer import LocatorIndexError
 
 st.set_page_config(layout="wide", page_title="Playwright Masterclass")
 
@@ -26,17 +38,43 @@ with c1:
     - 🛡️ **Flakiness resistance** (It "knows" when the browser is busy)
     """)
 with c2:
-    st.image("assets/playwright_architecture_1765634867859.png", caption="Playwright's Direct-Communication Architecture", use_column_width=True)
+    st.image(images.variant("assets/playwright_architecture_1765634867859.png"), caption="Playwright's Direct-Communication Architecture", use_column_width=True)
 
 
+with st.expander("📦 Download a starter project"):
+    st.write("A ready-to-run pytest-playwright project built from the snippets on this page: `pytest.ini`, "
+             "a smoke test, and the auth, mocking and API-shortcut patterns as real test files.")
+    sc1, sc2, sc3 = st.columns(3)
+    starter_name = sc1.text_input("Project name", "playwright-starter", key="pw_starter_name")
+    starter_url = sc2.text_input("Base URL", "http://localhost:3000", key="pw_starter_url")
+    starter_browser = sc3.selectbox("Browser", scaffold.PLAYWRIGHT_BROWSERS, key="pw_starter_browser")
+    so1, so2, so3 = st.columns(3)
+    starter_auth = so1.checkbox("Log in once (tab 4)", True, key="pw_starter_auth")
+    starter_mocking = so2.checkbox("Server-crash mock (tab 5)", True, key="pw_starter_mocking")
+    starter_shortcut = so3.checkbox("API shortcut (tab 3)", True, key="pw_starter_shortcut")
+    try:
+        starter = scaffold.normalize("playwright", project=starter_name, base_url=starter_url,
+                                     browser=starter_browser, auth=starter_auth, mocking=starter_mocking,
+                                     api_shortcut=starter_shortcut)
+    except scaffold.ScaffoldError as e:
+        st.error(f"❌ {e}")
+    else:
+        # The zip is built when the button is clicked, and identical choices come from a shared cache
+        st.download_button("⬇️ Download .zip", lambda: scaffold.build("playwright", **starter),
+                           file_name=f"{starter['project']}.zip", mime="application/zip",
+                           on_click="ignore", key="pw_starter_download")
+
+
+# The open tab is part of the URL (?tab=<label>), like the page itself, so links and reconnects land on it
 tabs = st.tabs([
     "🧠 1. Smart Locators", 
     "⏳ 2. Auto-Waiting", 
     "🔄 3. End-to-End Workflow", 
     "🔐 4. Auth & State", 
     "🕸️ 5. Network Mocking", 
-    "🏭 6. Industry Patterns"
-])
+    "🏭 6. Industry Patterns",
+    "🧪 7. Playground"
+], key="tab", bind="query-params")
 
 # ----------------------------------------------------------------------------
 # TAB 1: SMART LOCATORS
@@ -69,7 +107,7 @@ with tabs[0]:
             **Why it works**: Even if the library is renovated, it's still the "Library".
             """)
         with c2:
-            st.image("assets/locator_comparison_1765634890442.png", caption="Fragile vs. Resilient Locators", use_column_width=True)
+            st.image(images.variant("assets/locator_comparison_1765634890442.png"), caption="Fragile vs. Resilient Locators", use_column_width=True)
 
     st.markdown("### 🏆 Best Practices Code Comparison")
     c1, c2 = st.columns(2)
@@ -92,6 +130,58 @@ page.get_by_role("button", name="Submit").click()
 page.get_by_label("User Email").fill("test@example.com")
         """, language="python")
 
+    st.markdown("### 🧪 Try It: Score Locators on Your Own Page")
+    st.caption("Paste or upload HTML (a saved page, or `page.content()` from a test). The document is indexed once "
+               "(roles, accessible names, labels, ids, classes, positions) and cached by content hash.")
+    source = st.radio("HTML source", ["Sample login page", "Paste HTML", "Upload file"], horizontal=True,
+                      key="loc_source", bind="query-params")
+    if source == "Upload file":
+        upload = st.file_uploader("HTML file", type=["html", "htm", "xhtml"], key="loc_upload")
+        html = upload.getvalue() if upload is not None else None
+    elif source == "Paste HTML":
+        html = st.text_area("HTML", height=200, key="loc_html", placeholder="<html>...</html>") or None
+    else:
+        with open(os.path.join(FIXTURE_DIR, "login.html"), "rb") as f:
+            html = f.read()
+
+    index_job = None
+    if html:
+        # Big documents are indexed in the job pool, so other learners' reruns stay fast meanwhile
+        html_bytes = html.encode("utf-8") if isinstance(html, str) else html
+        index_job = job_ui.run_job("locator_index", digest_bytes(html_bytes), "utils.locator_scorer:build_index",
+                                   (html_bytes,), label="Indexing the page",
+                                   inline=len(html_bytes) < job_ui.INLINE_BYTES)
+    if index_job is not None:
+        try:
+            index, cache_hit = index_job.result()
+            elapsed_ms = index_job.run_ms
+        except LocatorIndexError as e:
+            st.error(f"❌ {e}")
+        else:
+            targets = index.targets()
+            st.caption(f"{len(index):,} elements · {len(targets):,} locatable · "
+                       f"{'cached' if cache_hit else 'indexed'} in {elapsed_ms:.0f} ms")
+            query = st.text_input("Filter elements", key="loc_filter", placeholder="e.g. button, Sign in, #email").lower()
+            options = []
+            for i in targets:
+                label = index.describe(i)
+                if query in label.lower():
+                    options.append((i, label))
+                    if len(options) >= 500:
+                        break
+            if not options:
+                st.info("No locatable element matches the filter.")
+            else:
+                target, _ = st.selectbox("Element", options, format_func=lambda o: o[1], key="loc_target")
+                candidates = index.suggest(target)
+                st.success("Best locator:")
+                st.code(candidates[0].code, language="python")
+                st.dataframe(
+                    [{"Locator": c.code, "Matches": c.matches, "Brittleness": c.brittleness, "Score": c.score, "Why": c.note}
+                     for c in candidates],
+                    hide_index=True, use_container_width=True,
+                )
+
 
 # ----------------------------------------------------------------------------
 # TAB 2: AUTO-WAITING
@@ -108,7 +198,7 @@ with tabs[1]:
         *   **Playwright**: Like a polite conversation partner. It asks a question and **waits patiently** (Auto-Wait) for you to finish thinking (Loading) and look at them (Visibility) before expecting a response.
         """)
     with c2:
-        st.image("assets/auto_wait_mechanism_1765634911762.png", caption="Playwright's Actionability Checks", use_column_width=True)
+        st.image(images.variant("assets/auto_wait_mechanism_1765634911762.png"), caption="Playwright's Actionability Checks", use_column_width=True)
     
     st.markdown("### 📝 What does it check?")
     st.info("Before performing a `click()`, Playwright ensures ALL these are true:")
@@ -130,20 +220,10 @@ with tabs[2]:
     
     c1, c2, c3 = st.columns([1, 3, 1])
     with c2:
-        st.image("assets/api_ui_workflow_1765634942790.png", caption="Hybrid Testing Workflow")
+        st.image(images.variant("assets/api_ui_workflow_1765634942790.png"), caption="Hybrid Testing Workflow")
     
     st.markdown("#### ⚡ The 'Shortcut' Pattern Example")
-    st.code("""
-def test_new_user_dashboard(page):
-    # 🚀 FAST: Create data via API (Milliseconds)
-    user_data = page.request.post("/api/v1/users/create", data={"name": "Alice"}).json()
-    
-    # 🐢 UI: Login and Check Visuals (Seconds)
-    page.goto(f"/dashboard/{user_data['id']}")
-    
-    # Assert
-    expect(page.get_by_role("heading", name="Alice")).to_be_visible()
-    """, language="python")
+    st.code(snippets.PLAYWRIGHT_API_SHORTCUT_TEST, language="python")
 
 
 # ----------------------------------------------------------------------------
@@ -163,29 +243,69 @@ with tabs[3]:
     
     c1, c2, c3 = st.columns([1, 3, 1])
     with c2:
-        st.image("assets/global_auth_pattern_1765634968972.png", caption="Global Setup Architecture")
+        st.image(images.variant("assets/global_auth_pattern_1765634968972.png"), caption="Global Setup Architecture")
     
+    st.code(snippets.PLAYWRIGHT_AUTH_CONFTEST + "\n" + snippets.PLAYWRIGHT_AUTH_TEST, language="python")
+
+    st.markdown("### 👥 Many Roles, Many Tenants: A Storage-State Pool")
+    st.markdown("""
+    One `auth.json` works until the suite needs *admin*, *auditor*, *support* and *viewer* in three tenants.
+    Logging twelve users in one after another costs minutes at every suite start. Instead:
+
+    *   **Parallel logins**: one headless Chromium, one context per role, all logging in at once.
+    *   **Disk cache with expiry**: each state is reused until its session cookie is about to expire.
+    *   **Validity probe**: a cached state is opened once in a while to check it still gets past the login page.
+    *   **Safe for `pytest -n auto`**: a file lock makes parallel workers wait for one refresh instead of each logging in.
+    *   **Background refresher**: long runs renew states before they expire, so no test gets a stale session.
+    """)
     st.code("""
-# 1. DEFINE GLOBAL SETUP (The "Season Pass Office")
-# global_setup.py
-def global_setup():
-    page.goto("https://app.com/login")
-    page.fill("#user", "admin")
-    page.fill("#pass", "1234")
-    page.click("#login")
-    page.context.storage_state(path="auth.json") # 💾 SAVE THE PASS
-
-# 2. CONFIGURE PROJECT
-# pytest.ini
-[pytest]
-addopts = --storage-state=auth.json
-
-# 3. ENJOY FAST TESTS
-# test_admin.py - Already logged in!
-def test_admin_panel(page):
-    page.goto("/admin") # ⚡ Instant access
+# conftest.py
+import pytest
+from utils.storage_states import Role, StatePool
+
+ROLES = [Role("admin", "admin@acme.test", "1234", "acme"),
+         Role("auditor", "auditor@globex.test", "1234", "globex")]
+POOL = StatePool(ROLES, concurrency=8)
+
+@pytest.fixture(scope="session", autouse=True)
+def storage_states():
+    POOL.ensure(probe=True)      # parallel login for anything stale or broken
+    POOL.start_refresher()       # renew before expiry during long runs
+    yield POOL
+    POOL.stop_refresher()
+
+@pytest.fixture
+def admin_page(browser):
+    context = browser.new_context(storage_state=POOL.get("admin"))
+    yield context.new_page()
+    context.close()
     """, language="python")
 
+    with st.expander("⚡ Generate storage states for the fixture shop"):
+        sp1, sp2, sp3 = st.columns(3)
+        pool_roles = sp1.slider("Roles", 1, 20, 20, key="pool_roles")
+        pool_concurrency = sp2.slider("Concurrent logins", 1, 16, 8, key="pool_concurrency")
+        pool_force = sp3.checkbox("Ignore cached states", key="pool_force")
+        pool = StatePool(fixture_roles(pool_roles), concurrency=pool_concurrency)
+        if st.button("Generate", key="pool_generate"):
+            try:
+                with st.spinner(f"Logging {pool_roles} roles in..."):
+                    report = pool.ensure(force=pool_force)
+            except Exception as e:
+                st.error(f"❌ Generation failed: {str(e).splitlines()[0]}")
+            else:
+                wall = report.pop("_wall_ms")
+                timed = [r["ms"] for r in report.values() if r["ms"] is not None]
+                failed = [name for name, r in report.items() if r["action"] == "failed"]
+                m = st.columns(3)
+                m[0].metric("Logged in", len(timed), f"{len(report) - len(timed) - len(failed)} from cache",
+                            delta_color="off")
+                m[1].metric("Wall time", f"{wall / 1000:.1f}s")
+                m[2].metric("Sum of login times", f"{sum(timed) / 1000:.1f}s" if timed else "—")
+                if failed:
+                    st.error(f"Login failed for {', '.join(failed)}: {report[failed[0]]['error']}")
+        st.dataframe(pool.status(), hide_index=True, use_container_width=True)
+
 
 # ----------------------------------------------------------------------------
 # TAB 5: NETWORK MOCKING
@@ -204,26 +324,76 @@ with tabs[4]:
     
     c1, c2, c3 = st.columns([1, 3, 1])
     with c2:
-        st.image("assets/network_interception_1765634991293.png", caption="Intercepting & Mocking API Calls")
+        st.image(images.variant("assets/network_interception_1765634991293.png"), caption="Intercepting & Mocking API Calls")
     
     st.markdown("### 🧪 Scenario: Testing a Server Crash")
     st.markdown("How do you test your UI handles a 500 Error without actually breaking the server? **Mock it.**")
     
+    st.code(snippets.PLAYWRIGHT_SERVER_CRASH_TEST, language="python")
+
+    st.markdown("### 📼 Record Once, Replay Everywhere (HAR)")
+    st.markdown("""
+    Hand-written `route.fulfill` lambdas don't scale to a page that makes 200 API calls. Record the real traffic
+    once into a **HAR** file, then replay it: every request is answered from the recording, matched by method,
+    URL and body. When nothing matches exactly, the matcher falls back step by step (ignore the body, then the
+    query string), and each level is a single hash lookup even for 100k-entry HARs.
+    """)
     st.code("""
-def test_handling_server_crash(page):
-    # 🎭 ACTING: Pretend the server is on fire
-    page.route("**/api/payments", lambda route: route.fulfill(
-        status=500,
-        body="Internal Server Error"
-    ))
-    
-    page.goto("/checkout")
-    page.get_by_role("button", name="Pay Now").click()
-    
-    # 🕵️ CHECK: Does the UI show a nice error message?
-    expect(page.get_by_text("Something went wrong. Please try again.")).to_be_visible()
+from utils.har_replay import HarIndex, record_har, serve_har
+
+# 1. Record (or: python -m utils.har_replay record shop.har --url http://localhost:3000)
+record_har("http://localhost:3000", "shop.har", actions=lambda page: page.goto("/checkout"))
+
+# 2. Replay inside Playwright: unmatched requests are aborted, so nothing reaches a real server
+replay = HarIndex.load("shop.har", fallbacks=("body", "query"))
+replay.install(context)
+
+# 3. ...or as a local HTTP stand-in for non-browser clients
+server = serve_har(HarIndex.load("shop.har", match_host=False))
+print(server.url)
     """, language="python")
 
+    with st.expander("🔎 Inspect a HAR and try the matcher"):
+        har_file = st.file_uploader("HAR file (.har, or a Playwright .zip HAR)", type=["har", "zip"], key="har_file")
+        har_fallbacks = st.multiselect("Fallbacks, in order", ["body", "query", "host"], ["body", "query"],
+                                       key="har_fallbacks")
+
+        @st.cache_resource(max_entries=2, show_spinner="Indexing HAR...")
+        def load_har(file_id, fallbacks, _upload):
+            return HarIndex.from_upload(_upload, fallbacks=fallbacks)
+
+        if har_file is not None:
+            try:
+                har = load_har(har_file.file_id, tuple(har_fallbacks), har_file)
+            except HarError as e:
+                st.error(f"❌ {e}")
+            else:
+                har_stats = har.stats()
+                m = st.columns(3)
+                m[0].metric("Entries", f"{har_stats['entries']:,}")
+                m[1].metric("Distinct requests", f"{har_stats['unique_requests']:,}")
+                m[2].metric("Hosts", len(har_stats["hosts"]))
+                st.caption(" · ".join(f"{method} {count:,}" for method, count in har_stats["methods"].items()))
+
+                h1, h2 = st.columns([1, 3])
+                probe_method = h1.selectbox("Method", ["GET", "POST", "PUT", "PATCH", "DELETE"], key="har_method")
+                probe_url = h2.text_input("URL", har.urls[0][1] if har.urls else "", key="har_url")
+                probe_body = st.text_area("Request body (JSON bodies match regardless of key order)", "",
+                                          height=80, key="har_body")
+                if st.button("Look up", key="har_lookup"):
+                    started = time.perf_counter()
+                    # The loaded index is shared by every session; a view keeps this lookup's cursor to itself
+                    match = har.view().lookup(probe_method, probe_url, probe_body or None,
+                                       "application/json" if probe_body.strip().startswith(("{", "[")) else "")
+                    took = (time.perf_counter() - started) * 1e6
+                    if match is None:
+                        st.warning(f"No recorded response at any level ({took:.0f} µs). "
+                                   "In Playwright this request would be aborted.")
+                    else:
+                        st.success(f"Matched at level **{match.level}** (entry #{match.entry}) in {took:.0f} µs "
+                                   f"→ HTTP {match.response.status}")
+                        st.code(match.response.body[:2000].decode("utf-8", "replace") or "(empty body)")
+
 
 # ----------------------------------------------------------------------------
 # TAB 6: INDUSTRY PATTERNS
@@ -234,7 +404,7 @@ with tabs[5]:
     st.markdown("### 🛍️ Modern E-Commerce Testing Flow")
     c1, c2, c3 = st.columns([1, 3, 1])
     with c2:
-        st.image("assets/ecommerce_workflow_1765635016791.png", caption="Complex E-Commerce Verification Flow")
+        st.image(images.variant("assets/ecommerce_workflow_1765635016791.png"), caption="Complex E-Commerce Verification Flow")
     
     st.markdown("#### 🔑 Key Industry Considerations")
     
@@ -252,6 +422,141 @@ with tabs[5]:
         st.caption("Legal compliance")
         st.code('axe.run(page)')
 
+    with st.expander("🔎 Open a trace.zip from CI"):
+        st.caption("The archive is memory-mapped and its event log streamed once into a timeline; "
+                   "screenshots and DOM snapshots are only decoded for the step you select.")
+        trace_file = st.file_uploader("Playwright trace (.zip)", type=["zip"], key="trace_zip")
+
+        @st.cache_resource(max_entries=2, show_spinner=False)
+        def load_trace(path, digest):
+            return TraceArchive(path, digest)
+
+        trace_job = None
+        if trace_file is not None:
+            # The event log is streamed into an on-disk index in the job pool; the page then opens that index
+            trace_job = job_ui.run_job("trace_index", trace_file.file_id, "utils.trace_viewer:index_trace",
+                                       lambda: (spill(trace_file, "traces", ".zip"),), label="Indexing the trace",
+                                       inline=trace_file.size < job_ui.INLINE_BYTES)
+        if trace_job is not None:
+            try:
+                trace = load_trace(*trace_job.result())
+            except TraceError as e:
+                st.error(f"❌ {e}")
+            else:
+                timeline = trace.timeline()
+                failed = timeline["error"] != ""
+                m = st.columns(4)
+                m[0].metric("Actions", len(timeline))
+                m[1].metric("Failed", int(failed.sum()))
+                m[2].metric("Wall time", f"{(timeline['start_ms'] + timeline['duration_ms'].fillna(0)).max() / 1000:.1f}s" if len(timeline) else "-")
+                m[3].metric("Browser", trace.context.get("browserName") or "?")
+
+                if len(timeline):
+                    labels = [f"{step}. {action}" for step, action in zip(timeline["step"], timeline["action"])]
+                    fig = go.Figure(go.Bar(
+                        y=labels, x=timeline["duration_ms"].fillna(0), base=timeline["start_ms"], orientation="h",
+                        marker_color=["#ef4444" if f else "#2563eb" for f in failed],
+                        hovertext=timeline["detail"],
+                    ))
+                    fig.update_layout(title="Action timeline (ms)", height=min(60 + 22 * len(timeline), 900),
+                                      margin=dict(t=40, b=20), yaxis=dict(autorange="reversed"))
+                    st.plotly_chart(fig, use_container_width=True)
+
+                    st.markdown("**🐢 Slowest steps**")
+                    st.dataframe(trace.slowest(10).round(1), hide_index=True, use_container_width=True)
+
+                    step = st.selectbox("Inspect step", timeline["step"],
+                                        format_func=lambda i: f"{labels[i - 1]} {timeline['detail'][i - 1]}")
+                    action = trace.actions[step - 1]
+                    if action.error:
+                        st.error(action.error)
+                    sc1, sc2 = st.columns([2, 3])
+                    with sc1:
+                        shot = trace.screenshot(action)
+                        if shot:
+                            st.image(shot, caption="Screencast frame at the end of the step")
+                        else:
+                            st.info("No screencast frame recorded for this page.")
+                    with sc2:
+                        which = st.radio("DOM snapshot", ["after", "before"], horizontal=True, key="trace_snapshot")
+                        html = trace.snapshot_html(action.after_snapshot if which == "after" else action.before_snapshot)
+                        if html:
+                            components.html(html, height=420, scrolling=True)
+                        else:
+                            st.info(f"No {which} snapshot for this step.")
+
+    with st.expander("🖼️ Visual diff: compare a screenshot with its baseline"):
+        st.caption("`utils/visual_diff.py` splits screenshots into 32px tiles and fingerprints each one. "
+                   "Byte-identical files skip decoding, identical tiles are skipped, and only changed tiles "
+                   "are diffed pixel by pixel. Baseline signatures are cached, so "
+                   "`python -m utils.visual_diff baselines/ actual/` checks a few hundred screenshots a second.")
+        vc1, vc2 = st.columns(2)
+        baseline_file = vc1.file_uploader("Baseline", type=["png", "jpg", "jpeg"], key="visual_baseline")
+        actual_file = vc2.file_uploader("Actual", type=["png", "jpg", "jpeg"], key="visual_actual")
+        # Off by default: three 1024px PNGs would otherwise ship with every load of this page
+        use_sample = st.toggle("Use a sample pair (a new badge, and a clock change in the top 40px)")
+
+        oc = st.columns(4)
+        status_px = oc[0].number_input("Block out status bar (px)", 0, 400, 0, step=4,
+                                       help="Like WDIO's blockOutStatusBar")
+        tool_px = oc[1].number_input("Block out tool bar (px)", 0, 400, 0, step=4,
+                                     help="Like WDIO's blockOutToolBar")
+        tolerance = oc[2].slider("Pixel tolerance", 0, 128, visual_diff.DEFAULT_TOLERANCE,
+                                 help="Per-channel difference still treated as equal (anti-aliasing, font hinting)")
+        max_diff = oc[3].number_input("Max differing pixels (%)", 0.0, 100.0,
+                                      visual_diff.DEFAULT_MAX_DIFF_RATIO * 100, step=0.05, format="%.2f")
+
+        @st.cache_data(show_spinner=False)
+        def sample_pair():
+            base = visual_diff.load_pixels("assets/ecommerce_workflow_1765635016791.png")
+            actual = base.copy()
+            actual[620:668, 700:860] = (220, 38, 38)
+            actual[8:28, 900:1000] = 255 - actual[8:28, 900:1000]
+            return visual_diff.encode_png(base), visual_diff.encode_png(actual)
+
+        if use_sample:
+            baseline_bytes, actual_bytes = sample_pair()
+        elif baseline_file is not None and actual_file is not None:
+            baseline_bytes, actual_bytes = baseline_file.getvalue(), actual_file.getvalue()
+        else:
+            baseline_bytes = actual_bytes = None
+
+        if baseline_bytes is not None:
+            masks = []
+            if status_px:
+                masks.append(visual_diff.status_bar(status_px))
+            if tool_px:
+                masks.append(visual_diff.tool_bar(tool_px))
+            # Decoding and diffing run in the job pool; a change of file or option starts a new job
+            diff_inputs = (digest_bytes(baseline_bytes), digest_bytes(actual_bytes), tuple(masks), tolerance, max_diff)
+            diff_job = job_ui.run_job("visual_diff", diff_inputs, "utils.visual_diff:diff_report",
+                                      (baseline_bytes, actual_bytes, masks),
+                                      {"tolerance": tolerance, "max_diff_ratio": max_diff / 100},
+                                      label="Comparing screenshots", progress=True)
+            if diff_job is not None:
+                try:
+                    result, diff_png = diff_job.result()
+                except visual_diff.VisualDiffError as e:
+                    st.error(f"❌ {e}")
+                else:
+                    vm = st.columns(4)
+                    vm[0].metric("Result", {"identical": "✅ Identical", "within tolerance": "✅ Within tolerance",
+                                            "changed": "❌ Changed", "size changed": "❌ Size changed"}[result.status])
+                    vm[1].metric("Differing pixels", f"{result.diff_pixels:,}", f"{result.diff_ratio:.3%}",
+                                 delta_color="off")
+                    vm[2].metric("Changed tiles", len(result.changed_tiles))
+                    vm[3].metric("pHash distance",
+                                 "-" if result.phash_distance is None else f"{result.phash_distance}/64",
+                                 f"{diff_job.run_ms:.0f} ms", delta_color="off")
+                    if diff_png is None:
+                        st.warning("The screenshots have different sizes; check the viewport and full_page settings.")
+                    else:
+                        ic = st.columns(3)
+                        ic[0].image(baseline_bytes, caption="Baseline")
+                        ic[1].image(actual_bytes, caption="Actual")
+                        ic[2].image(diff_png,
+                                    caption="Diff: red pixels differ, orange boxes are changed tiles, blue is masked")
+
     st.markdown("### 🩺 Healthcare/Fintech: Handling Sensitivity")
     st.warning("**PII/PHI Data Rules**: Never use real patient/customer data in automation. Use **Synthetic Data Factories**.")
     
@@ -270,3 +575,114 @@ def test_patient_registration(page):
     
     expect(page.get_by_text(f"Welcome, {fake_name}")).to_be_visible()
     """, language="python")
+
+    st.markdown("#### 🏭 Seeding Millions of Records: A Vectorized Factory")
+    st.markdown("""
+    Faker is perfect for one record per test, but a Python call per field per row is far too slow for seeding a
+    database with millions of patients. `utils/data_factory.py` declares the schema once and generates whole
+    columns with NumPy, batch by batch, so 1M rows stream out in seconds with constant memory.
+    """)
+    st.code("""
+from utils.data_factory import (date_between, days_after, email, first_name, last_name,
+                                lognormal, choice, pattern, sequence, write)
+
+PATIENTS = [
+    sequence("patient_id", "PAT-", width=8),
+    pattern("mrn", "MRN-@@######"),                 # @ letter, # digit
+    first_name(), last_name(),
+    email("email"),                                 # first.last42@example.org (reserved domains only)
+    choice("plan", ["basic", "standard", "premium"], [0.5, 0.35, 0.15]),
+    date_between("admitted_on", "2024-01-01", "2025-12-31"),
+    days_after("discharged_on", "admitted_on", 0, 21),             # correlated dates
+    lognormal("claim_amount", {"basic": 800, "premium": 3200, "standard": 1500}, 0.8, by="plan"),
+]
+
+with open("patients.parquet", "wb") as f:
+    write(PATIENTS, 1_000_000, f, fmt="parquet", seed=42)   # same seed, same data
+    """, language="python")
+
+    df1, df2, df3, df4 = st.columns(4)
+    factory_schema = df1.selectbox("Schema", list(data_factory.SCHEMAS), key="factory_schema")
+    factory_rows = df2.number_input("Rows", 1_000, 1_000_000, 100_000, step=50_000, key="factory_rows")
+    factory_seed = df3.number_input("Seed", 0, 2**31 - 1, 42, key="factory_seed")
+    factory_format = df4.selectbox("Format", list(data_factory.FORMATS), key="factory_format")
+
+    schema = data_factory.SCHEMAS[factory_schema]
+
+    @st.cache_data(max_entries=16, show_spinner=False)
+    def factory_preview(schema_name, rows, seed):
+        # The first batch of the download is generated whole (up to 100,000 rows) and sliced
+        started = time.perf_counter()
+        sample = data_factory.preview(data_factory.SCHEMAS[schema_name], 1000, seed, total_rows=rows)
+        return sample, (time.perf_counter() - started) * 1000
+
+    sample, preview_ms = factory_preview(factory_schema, min(factory_rows, data_factory.BATCH_SIZE), factory_seed)
+    st.caption(f"First 1,000 of {factory_rows:,} rows, generated in {preview_ms:.0f} ms "
+               f"(seed {factory_seed}, so every download of these settings is identical)")
+    st.dataframe(sample, hide_index=True, use_container_width=True, height=260)
+
+    def factory_download():
+        with open(data_factory.export(schema, factory_rows, factory_format, factory_seed), "rb") as f:
+            return f.read()
+
+    st.download_button(f"⬇️ Generate and download {factory_rows:,} rows as {factory_format.upper()}", factory_download,
+                       file_name=f"{factory_schema}-{factory_rows}-seed{factory_seed}.{factory_format}",
+                       mime=data_factory.FORMATS[factory_format], key="factory_download")
+
+
+# ----------------------------------------------------------------------------
+# TAB 7: PLAYGROUND
+# ----------------------------------------------------------------------------
+with tabs[6]:
+    st.subheader("🧪 Live Playground: Run It Yourself")
+    st.markdown("""
+    Every snippet on this page runs here against a bundled **fake shop** (`/login.html`, `/checkout.html`, `/dashboard.html`).
+    Your code gets a fresh, isolated `context` and `page` on a browser that is **already warm**, so there is no launch cost per click.
+    Use `admin` / `1234` to log in. `expect` is pre-imported; of the standard library only small modules such as `re`, `json` and `datetime` can be imported.
+    """)
+
+    @st.cache_resource(show_spinner="Warming up the browser pool...")
+    def get_playground_pool():
+        return BrowserPool()
+
+    if not PLAYGROUND_ENABLED:
+        st.info("The playground is turned off on this server. Run the academy locally to try it.")
+    elif importlib.util.find_spec("playwright") is None:
+        st.warning("Playwright is not installed on this server. Run `pip install -r requirements.txt && playwright install chromium`.")
+    else:
+        st.caption("⚠️ Your code runs as real Python on this server. The playground is meant for trusted learners: "
+                   "hosts open to the public should set `PLAYGROUND_ENABLED=off`.")
+        pool = get_playground_pool()
+
+        example = st.selectbox("Start from an example", list(EXAMPLES.keys()))
+        code = st.text_area("Python (sync API)", value=EXAMPLES[example].strip(), height=260, key=f"playground_code_{example}")
+
+        if st.button("▶️ Run", type="primary"):
+            result = pool.run(code)
+            r1, r2 = st.columns([1, 1])
+            with r1:
+                if result["ok"]:
+                    st.success(f"✅ Passed in {result['exec_ms']:.0f} ms (click-to-result {result['total_ms']:.0f} ms)")
+                else:
+                    st.error(f"❌ Failed after {result['exec_ms']:.0f} ms")
+                    st.code(result["error"], language="text")
+                if result["output"]:
+                    st.markdown("**Output**")
+                    st.code(result["output"], language="text")
+            with r2:
+                if result["screenshot"]:
+                    st.image(result["screenshot"], caption="Final page state", use_column_width=True)
+
+        stats = pool.stats()
+        st.markdown("#### ♻️ Browser Pool")
+        m1, m2, m3, m4, m5 = st.columns(5)
+        m1.metric("Warm Browsers", f"{stats['idle']} / {stats['size']}")
+        m2.metric("Runs", stats["runs"])
+        m3.metric("Contexts per Launch", f"{stats['contexts_per_launch']:.1f}")
+        m4.metric("Median Run", f"{stats['p50_ms']:.0f} ms" if stats["p50_ms"] is not None else "—")
+        m5.metric("Timeouts", stats["timeouts"])
+        st.caption(
+            f"Pool size is set with `PLAYGROUND_POOL_SIZE` (now {stats['size']}). Each run is capped at "
+            f"{DEFAULT_RUN_TIMEOUT:.0f}s; a stuck browser is killed and replaced. Browsers are recycled after "
+            f"a few hundred contexts. Launched {stats['launches']} browsers so far, {stats['recycled']} recycled."
+        )
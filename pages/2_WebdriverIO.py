@@ -1,5 +1,10 @@
 import streamlit as st
 import os
+import plotly.express as px
+
+from utils.selector_bench import load_results, summarize
+from utils import images, scaffold, snippets
+from utils import web_vitals_audit as vitals
 
 st.set_page_config(layout="wide", page_title="WebdriverIO Expert Guide")
 
@@ -26,7 +31,32 @@ with col1:
 with col2:
     c1, c2, c3 = st.columns([0.1, 2, 0.1])
     with c2:
-        st.image("assets/wdio_ecosystem_1765635940013.png", caption="The Extensible WDIO Ecosystem")
+        st.image(images.variant("assets/wdio_ecosystem_1765635940013.png"), caption="The Extensible WDIO Ecosystem")
+
+with st.expander("📦 Download a starter project"):
+    st.write("A ready-to-run WebdriverIO v8 project built from the snippets on this page: `wdio.conf.js` for "
+             "either protocol, a smoke spec, and the composable page objects from tab 2.")
+    sc1, sc2, sc3 = st.columns(3)
+    starter_name = sc1.text_input("Project name", "wdio-starter", key="wdio_starter_name")
+    starter_url = sc2.text_input("Base URL", "http://localhost:3000", key="wdio_starter_url")
+    starter_protocol = sc3.selectbox("Protocol", scaffold.WDIO_PROTOCOLS, key="wdio_starter_protocol")
+    so1, so2, so3 = st.columns(3)
+    starter_browsers = so1.multiselect("Browsers", scaffold.WDIO_BROWSERS, ["chrome"], key="wdio_starter_browsers",
+                                       disabled=starter_protocol == "devtools",
+                                       help="DevTools mode always runs Chrome")
+    starter_components = so2.checkbox("Page objects (tab 2)", True, key="wdio_starter_components")
+    starter_visual = so3.checkbox("Visual service (tab 4)", False, key="wdio_starter_visual")
+    try:
+        starter = scaffold.normalize("webdriverio", project=starter_name, base_url=starter_url,
+                                     protocol=starter_protocol, browsers=starter_browsers,
+                                     components=starter_components, visual=starter_visual)
+    except scaffold.ScaffoldError as e:
+        st.error(f"❌ {e}")
+    else:
+        # The zip is built when the button is clicked, and identical choices come from a shared cache
+        st.download_button("⬇️ Download .zip", lambda: scaffold.build("webdriverio", **starter),
+                           file_name=f"{starter['project']}.zip", mime="application/zip",
+                           on_click="ignore", key="wdio_starter_download")
 
 tabs = st.tabs([
     "🧬 1. Architecture", 
@@ -34,7 +64,7 @@ tabs = st.tabs([
     "📱 3. Mobile (Appium)", 
     "🔌 4. Service Layer",
     "🧠 5. Expert Selectors"
-])
+], key="tab", bind="query-params")
 
 # ----------------------------------------------------------------------------
 # TAB 1: ARCHITECTURE
@@ -47,7 +77,7 @@ with tabs[0]:
     
     c1, c2, c3 = st.columns([1, 3, 1])
     with c2:
-        st.image("assets/wdio_protocol_architecture_1765635963941.png", caption="Dual-Protocol Architecture")
+        st.image(images.variant("assets/wdio_protocol_architecture_1765635963941.png"), caption="Dual-Protocol Architecture")
     
     st.markdown("### 🚦 How to Configure modes")
     
@@ -55,29 +85,12 @@ with tabs[0]:
     with c1:
         st.markdown("**1. Standard Mode (WebDriver)**")
         st.caption("Best for: True Cross-Browser Testing & Cloud Grids")
-        st.code("""
-// wdio.conf.js
-capabilities: [{
-    browserName: 'firefox', // Uses GeckoDriver
-    browserVersion: 'latest'
-}, {
-    browserName: 'safari', // Uses SafariDriver
-}]
-        """, language="javascript")
+        st.code(snippets.WDIO_STANDARD_CAPABILITIES, language="javascript")
         
     with c2:
         st.markdown("**2. Automation Protocol (DevTools)**")
         st.caption("Best for: Speed, Network Interception, Tracing")
-        st.code("""
-// wdio.conf.js
-capabilities: [{
-    browserName: 'chrome',
-    'wdio:devtoolsOptions': {
-        headless: true
-    }
-}],
-automationProtocol: 'devtools' // 🚀 PUPPETEER MODE
-        """, language="javascript")
+        st.code(snippets.WDIO_DEVTOOLS_CAPABILITIES, language="javascript")
 
 # ----------------------------------------------------------------------------
 # TAB 2: PAGE OBJECTS
@@ -98,40 +111,12 @@ with tabs[1]:
     
     c1, c2, c3 = st.columns([1, 3, 1])
     with c2:
-        st.image("assets/page_object_pattern_1765635989376.png", caption="Separation of Concerns Pattern")
+        st.image(images.variant("assets/page_object_pattern_1765635989376.png"), caption="Separation of Concerns Pattern")
     
     st.markdown("### 🧑‍🍳 Expert Pattern: Composable Components")
     st.markdown("Don't just make `Page` classes. Make `Component` classes for reusable widgets (Navbars, Modals).")
     
-    st.code("""
-// 1. BASE COMPONENT (The Reusable Widget)
-class Component {
-    constructor(selector) { this.root = selector; }
-    
-    get main() { return $(this.root); }
-    async isVisible() { return await this.main.isDisplayed(); }
-}
-
-// 2. SEARCH BAR COMPONENT (Specific Logic)
-class SearchBar extends Component {
-    get input() { return this.main.$('input.search-term'); }
-    get btn()   { return this.main.$('button.search-btn'); }
-    
-    async search(text) {
-        await this.input.setValue(text);
-        await this.btn.click();
-    }
-}
-
-// 3. PAGE CLASS (Composing Components)
-class HomePage {
-    constructor() {
-        // Reuse the component!
-        this.navSearch = new SearchBar('header.global-nav');
-        this.footerSearch = new SearchBar('footer.site-map');
-    }
-}
-    """, language="javascript")
+    st.code(snippets.WDIO_COMPONENTS, language="javascript")
 
 # ----------------------------------------------------------------------------
 # TAB 3: MOBILE
@@ -144,7 +129,7 @@ with tabs[2]:
     
     c1, c2, c3 = st.columns([1, 3, 1])
     with c2:
-        st.image("assets/appium_architecture_1765636011256.png", caption="One Codebase, Native Execution")
+        st.image(images.variant("assets/appium_architecture_1765636011256.png"), caption="One Codebase, Native Execution")
     
     st.markdown("### 🤖 Android vs 🍎 iOS Strategies")
     
@@ -191,16 +176,74 @@ with tabs[3]:
         | **Intercept** | Network Mocking | Simpler wrapper over DevTools mocking |
         """)
 
+    st.code(snippets.WDIO_VISUAL_SERVICE, language="javascript")
+    st.caption("The Playwright page has a Python visual diff engine with the same block-out masks and an in-app "
+               "diff viewer (🏭 Industry Patterns tab).")
+
+    st.markdown("#### 🐍 The Same Shared Store for pytest-xdist")
+    st.write("Python suites get the same trick from `utils/shared_store.py`: the controlling pytest process "
+             "runs a small key-value server on a private Unix socket, and every xdist worker connects to it. "
+             "`compute_once` fetches an expensive value (an OAuth token, seeded test data) in exactly one "
+             "worker while the others wait for it; if that worker crashes, the next one takes over.")
     st.code("""
-// wdio.conf.js - Using the Visual Regression Service
-services: [
-    ['visual', {
-        autoSaveBaseline: true,
-        blockOutStatusBar: true, // Ignore phone status bar
-        blockOutToolBar: true
-    }]
-],
-    """, language="javascript")
+# Run the suite with the plugin loaded
+#   pytest -p utils.pytest_shared_store -n auto
+
+# conftest.py
+import pytest
+
+@pytest.fixture(scope="session")
+def api_token(shared_store):
+    # One login for the whole run, not one per worker; re-fetched after 50 minutes
+    return shared_store.compute_once("api-token", fetch_token, ttl=3000)
+    """, language="python")
+    st.info("After the first call each worker keeps the value in memory, so later reads take well under "
+            "a microsecond. Going to the server costs one socket round trip (tens of µs). "
+            "`python benchmarks/bench_shared_store.py` compares both paths with flock-guarded token files "
+            "for 1, 8 and 32 workers.")
+
+    st.markdown("#### 🏎️ Lighthouse-Style Budgets for This Academy")
+    st.write("`python -m utils.web_vitals_audit` cold-loads every page and tab of this app in headless Chromium. "
+             "It records LCP, CLS, blocking time, tab-switch latency, bytes per resource type and JS heap into "
+             "`data/web_vitals/results.jsonl`, one line per commit. With `--enforce` it fails on budget "
+             "violations or regressions against the stored baseline, and the e2e suite checks the same "
+             "page-load budgets.")
+    history = vitals.load_history()
+    if not history:
+        st.info("No audits recorded yet. Run `python -m utils.web_vitals_audit --save-baseline` on a machine "
+                "with Chromium installed (`playwright install chromium`).")
+    else:
+        latest = history[-1]
+        env = latest["environment"]
+        st.caption(f"Latest audit {latest['measured_at'][:10]} at commit {latest['commit'] or '?'} · "
+                   f"Chromium {env['chromium']} · median of {latest['runs']} cold loads")
+        summary = vitals.summarize(latest)
+        show_tabs = st.toggle("Include tab switches", key="vitals_tabs", bind="query-params")
+        if not show_tabs:
+            summary = summary[summary["state"] == vitals.PAGE_LOAD]
+        st.dataframe(summary.round(2), use_container_width=True, hide_index=True)
+        over = vitals.check_budgets(latest)
+        if over:
+            st.error(f"{len(over)} metric(s) over budget")
+            st.dataframe(over, use_container_width=True, hide_index=True)
+        baseline = vitals.load_baseline()
+        if baseline is not None:
+            regressions = vitals.find_regressions(latest, baseline)
+            if regressions:
+                st.warning(f"{len(regressions)} regression(s) against the baseline from commit {baseline['commit']}")
+                st.dataframe(regressions, use_container_width=True, hide_index=True)
+            else:
+                st.success(f"No regressions against the baseline from commit {baseline['commit']}.")
+        trend = vitals.history_frame(history)
+        if len(history) > 1:
+            metric = st.selectbox("Trend", ["transfer_kb", "lcp_ms", "image_kb", "js_heap_mb", "total_blocking_ms"],
+                                  key="vitals_metric", bind="query-params")
+            fig = px.line(trend, x="measured_at", y=metric, color="page", markers=True, hover_data=["commit"])
+            budget = vitals.budget_for("Playwright", vitals.PAGE_LOAD).get(metric)
+            if budget is not None:
+                fig.add_hline(y=budget, line_dash="dot", annotation_text="Playwright budget")
+            fig.update_layout(height=360, margin=dict(l=0, r=0, t=10, b=0))
+            st.plotly_chart(fig, use_container_width=True)
 
 # ----------------------------------------------------------------------------
 # TAB 5: SELECTORS
@@ -231,3 +274,37 @@ const submitBtn = await $('.login-form').$('.btn-primary');
 // No need for 'shadowRoot.querySelector' nightmare
 const el = await $('>>>.deep-element-inside-shadow-root');
     """, language="javascript")
+
+    st.markdown("#### ⏱️ What Does Each Strategy Cost?")
+    st.markdown("""
+    Every page in the lab is generated locally: a product catalogue of 10k+ elements with a login form at the
+    very end, built flat, 40 levels deep, with hundreds of declarative shadow roots, or both. Each strategy
+    locates the same **Sign in** button in headless Chromium, interleaved over repeated trials.
+    """)
+    bench = load_results()
+    if bench is None:
+        st.info("No measurements recorded yet. Run `python -m utils.selector_bench` on a machine with "
+                "Chromium installed (`playwright install chromium`) to create `data/benchmarks/selector_strategies.json`.")
+    else:
+        env = bench["environment"]
+        st.caption(f"Measured {bench['measured_at'][:10]} · Chromium {env['chromium']} · Playwright {env['playwright']} · "
+                   f"{env['cpus']} CPUs · median of {bench['trials']} trials after {bench['warmup']} warm-up rounds")
+        summary = summarize(bench)
+        page_names = list(dict.fromkeys(summary["page"]))
+        picked = st.multiselect("Pages", page_names, default=page_names[:4], key="wdio_bench_pages",
+                                bind="query-params")
+        shown = summary[summary["page"].isin(picked)]
+        fig = px.bar(shown, x="strategy", y="median_ms", color="page", barmode="group",
+                     error_y=shown["p95_ms"] - shown["median_ms"], hover_data=["selector", "matches", "min_ms"],
+                     labels={"median_ms": "median ms (whisker = p95)", "strategy": ""})
+        fig.update_layout(height=420, margin=dict(l=0, r=0, t=10, b=0))
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(shown[["page", "strategy", "selector", "matches", "median_ms", "p95_ms", "over_round_trip_ms"]].round(3),
+                     use_container_width=True, hide_index=True)
+        misses = shown[shown["matches"] == 0]
+        if len(misses):
+            st.warning(f"{', '.join(sorted(set(misses['strategy'])))} found nothing on "
+                       f"{', '.join(sorted(set(misses['page'])))}: XPath cannot cross shadow-root boundaries, "
+                       "so on Web Component pages it is not an option at any speed.")
+        st.caption("`round trip` is a bare `page.evaluate('0')`; `over_round_trip_ms` is what the query itself costs "
+                   "on top of the protocol hop every command pays.")
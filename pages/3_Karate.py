@@ -1,8 +1,31 @@
 import streamlit as st
 import os
+import json
+import time
+import requests
+from utils.fuzzy_match import SchemaError
+import pandas as pd
+import plotly.graph_objects as go
+from utils.mock_server import MockDefinitionError, MockServer, MockService
+from utils.load_generator import (LoadTest, constant_users_per_sec, describe_profile, peak_rate, profile_duration,
+                                  ramp_users)
+from utils.report_ingest import ReportFormatError
+from utils.cache import spill
+from utils import images, job_ui, scaffold, snippets
 
 st.set_page_config(layout="wide", page_title="Karate Expert Guide")
 
+# Load tests run inside the server process, so each session gets a bounded one at a time
+LOAD_TEST_MAX_RPS = 500
+LOAD_TEST_MAX_SECONDS = 30
+LOAD_TEST_DRAIN_SECONDS = 5
+
+
+@st.cache_resource(show_spinner="Starting the payment mock...")
+def get_payment_mock():
+    return MockServer(MockService.from_file("fixtures/mocks/payment-mock.feature")).start_in_thread()
+
+
 st.header("🥋 Karate: The Unified Test Platform")
 st.markdown("### API, UI, Mocks, and Performance - In One Language")
 
@@ -25,7 +48,29 @@ with col1:
 with col2:
     c1, c2, c3 = st.columns([0.2, 2, 0.2])
     with c2:
-        st.image("assets/karate_unified_architecture_1765636269592.png", caption="Unified Automaton Platform")
+        st.image(images.variant("assets/karate_unified_architecture_1765636269592.png"), caption="Unified Automaton Platform")
+
+with st.expander("📦 Download a starter project"):
+    st.write("A ready-to-run Maven project built from the snippets on this page: a JUnit 5 runner, "
+             "`karate-config.js`, and a payments suite that starts the bundled mock, so `mvn test` works offline.")
+    sc1, sc2 = st.columns(2)
+    starter_name = sc1.text_input("Project name", "karate-starter", key="karate_starter_name")
+    starter_url = sc2.text_input("Base URL for @external features", "https://jsonplaceholder.typicode.com",
+                                 key="karate_starter_url")
+    so1, so2, so3 = st.columns(3)
+    starter_mock = so1.checkbox("Payment mock + suite (tab 4)", True, key="karate_starter_mock")
+    starter_api = so2.checkbox("User API example (tab 1)", True, key="karate_starter_api")
+    starter_ui = so3.checkbox("Hybrid UI example (tab 5)", False, key="karate_starter_ui")
+    try:
+        starter = scaffold.normalize("karate", project=starter_name, base_url=starter_url, mock=starter_mock,
+                                     api_example=starter_api, ui_example=starter_ui)
+    except scaffold.ScaffoldError as e:
+        st.error(f"❌ {e}")
+    else:
+        # The zip is built when the button is clicked, and identical choices come from a shared cache
+        st.download_button("⬇️ Download .zip", lambda: scaffold.build("karate", **starter),
+                           file_name=f"{starter['project']}.zip", mime="application/zip",
+                           on_click="ignore", key="karate_starter_download")
 
 tabs = st.tabs([
     "📜 1. Gherkin++", 
@@ -33,7 +78,7 @@ tabs = st.tabs([
     "🚀 3. Performance Reuse", 
     "🎭 4. Total Mocking",
     "🖥️ 5. Hybrid UI"
-])
+], key="tab", bind="query-params")
 
 # ----------------------------------------------------------------------------
 # TAB 1: SYNTAX
@@ -42,28 +87,7 @@ with tabs[0]:
     st.subheader("Gherkin on Steroids")
     st.markdown("Karate doesn't require Java/Python 'Step Definitions'. The Gherkin **IS** the code.")
     
-    st.code("""
-Feature: User Management API
-
-    Background:
-        * url 'https://jsonplaceholder.typicode.com'
-        * def authToken = 'Bearer 12345'
-        * configure headers = { Authorization: '#(authToken)' }
-
-    Scenario: Create and Fetch User
-        # 1. CREATE
-        Given path 'users'
-        And request { name: 'John Wick', job: 'Assassin' }
-        When method post
-        Then status 201
-        And def userId = response.id
-
-        # 2. FETCH (Chaining variables)
-        Given path 'users', userId
-        When method get
-        Then status 200
-        And match response contains { name: 'John Wick' }
-    """, language="gherkin")
+    st.code(snippets.KARATE_USERS_FEATURE, language="gherkin")
 
 # ----------------------------------------------------------------------------
 # TAB 2: API
@@ -84,7 +108,7 @@ with tabs[1]:
     
     c1, c2, c3 = st.columns([1, 3, 1])
     with c2:
-        st.image("assets/karate_fuzzy_matching_1765636302212.png", caption="Fuzzy Matching Visualization")
+        st.image(images.variant("assets/karate_fuzzy_matching_1765636302212.png"), caption="Fuzzy Matching Visualization")
     
     st.markdown("### 🧬 Expert Validation Patterns")
     st.code("""
@@ -109,6 +133,62 @@ Scenario: Validate Complex Dynamic Response
     Then match response == userSchema
     """, language="gherkin")
 
+    st.markdown("### 🧪 Try It: Validate Your Own JSON")
+    st.markdown("Paste a schema in Karate syntax (comments, unquoted keys and single quotes are fine) and a response to match against it.")
+
+    v1, v2 = st.columns(2)
+    with v1:
+        schema_text = st.text_area("Schema", height=320, value="""{
+    id: '#number',              # Type validation
+    uuid: '#uuid',              # UUID format check
+    email: '#regex ^[a-z]+@.*', # Regex pattern
+    tags: '#[] #string',        # Array of Strings
+    address: {                  # Nested Object
+        city: '#string',
+        zip: '#? _ > 0'         # Zip must be positive
+    },
+    metadata: '#ignore'         # Ignore dynamic fields
+}""")
+    with v2:
+        response_text = st.text_area("Response", height=320, value="""{
+  "id": 42,
+  "uuid": "3f2b8c1e-9d4a-4e7b-8a61-0c5d2e9f7b13",
+  "email": "john@wick.com",
+  "tags": ["vip", "beta", 7],
+  "address": { "city": "New York", "zip": -10001 },
+  "metadata": { "requestId": "abc" }
+}""")
+        uploaded = st.file_uploader("...or upload a large JSON response", type=["json"])
+
+    match_mode = st.radio("Assertion", ["match ==", "match contains", "match each"], horizontal=True,
+                          key="match_mode", bind="query-params")
+
+    if st.button("🔍 Validate", type="primary"):
+        response = uploaded.getvalue() if uploaded else response_text
+        # Large uploads are parsed and matched in the job pool; the result stays until the next click
+        job_ui.submit("json_match", "utils.fuzzy_match:validate_text", (response, schema_text),
+                      {"mode": "contains" if match_mode == "match contains" else "==",
+                       "each": match_mode == "match each"},
+                      label="Validating the response", progress=True, inline=len(response) < job_ui.INLINE_BYTES)
+    match_job = job_ui.current("json_match")
+    if match_job is not None:
+        try:
+            mismatches, timings = match_job.result()
+        except json.JSONDecodeError as exc:
+            st.error(f"Response is not valid JSON: {exc}")
+        except SchemaError as exc:
+            st.error(f"Schema error: {exc}")
+        else:
+            if mismatches:
+                st.error(f"❌ {len(mismatches)} mismatch(es){' (showing first 50)' if len(mismatches) >= 50 else ''}")
+                st.dataframe([m._asdict() for m in mismatches], use_container_width=True, hide_index=True)
+            else:
+                st.success("✅ Response matches the schema")
+            st.caption(
+                f"Parse {timings['parse']:.1f} ms · compile {timings['compile']:.2f} ms (cached by schema text) "
+                f"· match {timings['match']:.2f} ms"
+            )
+
 # ----------------------------------------------------------------------------
 # TAB 3: PERFORMANCE
 # ----------------------------------------------------------------------------
@@ -120,7 +200,7 @@ with tabs[2]:
     
     c1, c2, c3 = st.columns([1, 3, 1])
     with c2:
-        st.image("assets/gatling_performance_integration_1765636322718.png", caption="Zero-Code Refactoring Workflow")
+        st.image(images.variant("assets/gatling_performance_integration_1765636322718.png"), caption="Zero-Code Refactoring Workflow")
     
     st.markdown("#### Scala Simulation Wrapper")
     st.code("""
@@ -145,6 +225,134 @@ class PerformanceTest extends Simulation {
 }
     """, language="scala")
 
+    st.markdown("### 🧪 Try It: Run This Injection Profile")
+    st.markdown("""
+    The same **open-model** profile, executed by the academy's Python load engine against the bundled payment mock.
+    Users arrive on schedule even if the server is slow. Latency is measured from each user's *scheduled* start, so a stalled server shows up in the percentiles (no coordinated omission).
+    """)
+
+    l1, l2, l3 = st.columns(3)
+    with l1:
+        ramp_n = st.number_input("rampUsers", min_value=0, max_value=5000, value=100, step=50)
+        ramp_s = st.number_input("during (seconds)", min_value=1, max_value=30, value=5, key="ramp_during")
+    with l2:
+        const_rate = st.number_input("constantUsersPerSec", min_value=0, max_value=2000, value=50, step=50)
+        const_s = st.number_input("during (seconds)", min_value=1, max_value=30, value=10, key="const_during")
+    with l3:
+        endpoint = st.selectbox("Target", ["GET /health (fast)", "POST /pay (500 ms responseDelay)", "GET /payments/{id} (templated)"])
+        max_conns = st.number_input("Max connections", min_value=1, max_value=1024, value=128)
+
+    profile = [s for s in (ramp_users(ramp_n, ramp_s) if ramp_n else None,
+                           constant_users_per_sec(const_rate, const_s) if const_rate else None) if s]
+    st.code(describe_profile(profile) or "// nothing to inject", language="scala")
+    peak, duration = peak_rate(profile), profile_duration(profile)
+    too_big = peak > LOAD_TEST_MAX_RPS or duration > LOAD_TEST_MAX_SECONDS
+    if too_big:
+        st.warning(f"This shared server runs at most {LOAD_TEST_MAX_RPS} users/s for {LOAD_TEST_MAX_SECONDS}s per learner. "
+                   f"This profile peaks at {peak:.0f} users/s and lasts {duration:.0f}s.")
+
+    # A test left over from an interrupted run of this session is stopped before anything else
+    leftover = st.session_state.pop("karate_load_test", None)
+    if leftover is not None:
+        leftover.stop()
+
+    if st.button("🚀 Start Load Test", type="primary", disabled=not profile or too_big):
+        mock = get_payment_mock()
+        method, path = {"GET /health (fast)": ("GET", "/health"),
+                        "POST /pay (500 ms responseDelay)": ("POST", "/pay"),
+                        "GET /payments/{id} (templated)": ("GET", "/payments/42")}[endpoint]
+        test = LoadTest(mock.url + path, profile, method=method,
+                        body='{"amount": 10}' if method == "POST" else None,
+                        headers={"Content-Type": "application/json"}, max_connections=max_conns,
+                        max_duration=duration + LOAD_TEST_DRAIN_SECONDS).start_in_thread()
+        st.session_state["karate_load_test"] = test
+
+        status = st.empty()
+        rate_chart = st.empty()
+        latency_chart = st.empty()
+        frame = 0
+        try:
+            while True:
+                finished = test.finished
+                snaps = pd.DataFrame(test.snapshots)
+                if not snaps.empty:
+                    fig = go.Figure()
+                    fig.add_trace(go.Scatter(x=snaps["t"], y=snaps["target_rps"], name="Target", line=dict(dash="dash", color="#94a3b8")))
+                    fig.add_trace(go.Scatter(x=snaps["t"], y=snaps["completed_rps"], name="Completed", line=dict(color="#2563eb")))
+                    fig.update_layout(title="Throughput (req/s)", height=300, margin=dict(t=40, b=20), xaxis_title="seconds")
+                    rate_chart.plotly_chart(fig, use_container_width=True, key=f"load_rate_{frame}")
+
+                    fig = go.Figure()
+                    for col, color in (("p50_ms", "#22c55e"), ("p95_ms", "#f59e0b"), ("p99_ms", "#ef4444")):
+                        fig.add_trace(go.Scatter(x=snaps["t"], y=snaps[col], name=col.split("_")[0], line=dict(color=color)))
+                    fig.update_layout(title="Latency percentiles per second (ms)", height=300, margin=dict(t=40, b=20), xaxis_title="seconds")
+                    latency_chart.plotly_chart(fig, use_container_width=True, key=f"load_latency_{frame}")
+                    last = snaps.iloc[-1]
+                    status.info(f"⏱️ {last['t']:.0f}s · sent {int(last['sent'])} · completed {int(last['completed'])} · in flight {int(last['in_flight'])}")
+                frame += 1
+                if finished:
+                    break
+                time.sleep(0.5)
+        finally:
+            # A rerun or a closed tab interrupts the loop above; the test must not outlive it
+            test.stop()
+            st.session_state.pop("karate_load_test", None)
+
+        summary = test.summary()
+        status.success(f"✅ {summary['requests']} requests in {summary['duration_s']:.1f}s ({summary['mean_rps']:.0f} req/s), "
+                       f"{sum(summary['errors'].values())} errors, {test.connections_opened} connections opened")
+        st.dataframe(pd.DataFrame({
+            "Percentile": [f"p{p:g}" for p in summary["percentiles"]],
+            "Latency from schedule (ms)": summary["latency_ms"],
+            "Service time (ms)": summary["service_time_ms"],
+        }), hide_index=True, use_container_width=True)
+        if summary["errors"]:
+            st.warning(f"Errors: {summary['errors']}")
+
+    st.markdown("---")
+    st.markdown("### 📊 Read Your Own Results")
+    st.caption("Upload a Gatling `simulation.log`, a JUnit XML report or a Karate/Cucumber JSON report. "
+               "Files are parsed in a streaming pass and cached by content hash, so re-uploads are instant.")
+    report = st.file_uploader("Result file", type=["log", "txt", "xml", "json"], key="karate_report")
+    bucket_s = st.select_slider("Timeline bucket", options=[1, 5, 10, 30, 60], value=1, format_func=lambda s: f"{s}s")
+    report_job = None
+    if report is not None:
+        # Parsed in the job pool from a copy in the cache, written once when a new file or bucket size starts a job
+        report_job = job_ui.run_job("karate_report", (report.file_id, bucket_s), "utils.report_ingest:analyze_report",
+                                    lambda: (spill(report, "uploads"), bucket_s * 1000), label=f"Parsing {report.name}",
+                                    progress=True)
+    if report_job is not None:
+        try:
+            overview, per_request, timeline, cache_hit = report_job.result()
+        except ReportFormatError as e:
+            st.error(f"❌ {e}")
+        else:
+            if overview is None:
+                st.warning("No request records found in this file.")
+            else:
+                st.caption(f"{overview['format']} · {report.size / 1e6:.1f} MB · "
+                           f"{'loaded from cache' if cache_hit else 'parsed'} in {report_job.run_ms / 1000:.2f}s")
+                m = st.columns(5)
+                m[0].metric("Requests", f"{overview['requests']:,}")
+                m[1].metric("Error rate", f"{overview['error_rate_%']:.2f}%")
+                m[2].metric("Throughput", f"{overview['mean_throughput']:.0f}/s")
+                m[3].metric("p95", f"{overview['p95_ms']:.0f} ms")
+                m[4].metric("p99", f"{overview['p99_ms']:.0f} ms")
+
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(x=timeline["t_s"], y=timeline["throughput_per_s"], name="Throughput", line=dict(color="#2563eb")))
+                fig.add_trace(go.Bar(x=timeline["t_s"], y=timeline["errors_per_s"], name="Errors", marker_color="#ef4444"))
+                fig.update_layout(title="Throughput and errors (per second)", height=300, margin=dict(t=40, b=20), xaxis_title="seconds")
+                st.plotly_chart(fig, use_container_width=True)
+
+                fig = go.Figure()
+                for col, color in (("p50_ms", "#22c55e"), ("p95_ms", "#f59e0b"), ("p99_ms", "#ef4444")):
+                    fig.add_trace(go.Scatter(x=timeline["t_s"], y=timeline[col], name=col.split("_")[0], line=dict(color=color)))
+                fig.update_layout(title="Response time percentiles over time (ms)", height=300, margin=dict(t=40, b=20), xaxis_title="seconds")
+                st.plotly_chart(fig, use_container_width=True)
+
+                st.dataframe(per_request.round(1), hide_index=True, use_container_width=True)
+
 # ----------------------------------------------------------------------------
 # TAB 4: MOCKS
 # ----------------------------------------------------------------------------
@@ -162,7 +370,7 @@ with tabs[3]:
     
     c1, c2, c3 = st.columns([1, 3, 1])
     with c2:
-        st.image("assets/mock_server_flow_1765636342641.png", caption="Mocking Architecture")
+        st.image(images.variant("assets/mock_server_flow_1765636342641.png"), caption="Mocking Architecture")
     
     st.markdown("### 💻 Standalone Mock Server")
     st.code("""
@@ -182,6 +390,50 @@ Feature: Payment Service Mock
         * def responseStatus = 400
     """, language="gherkin")
 
+    st.info("💡 Karate picks the **first** scenario whose predicate matches. In the snippet above, a negative amount POSTed to `/pay` hits the first scenario, so put specific checks first.")
+
+    st.markdown("### 🧪 Try It: A Live Mock Server")
+    st.markdown("The bundled `fixtures/mocks/payment-mock.feature` is running as a real HTTP server inside the academy. Send it requests, or edit the feature below to see which scenario wins.")
+
+    mock = get_payment_mock()
+    with open("fixtures/mocks/payment-mock.feature", encoding="utf-8") as f:
+        bundled_feature = f.read()
+
+    q1, q2 = st.columns([1, 1])
+    with q1:
+        mock_method = st.selectbox("Method", ["POST", "GET", "PUT", "DELETE"])
+        mock_path = st.text_input("Path", value="/pay")
+        mock_body = st.text_area("Body (JSON)", value='{ "amount": 250 }', height=100)
+        send = st.button("📨 Send to live mock", type="primary")
+    with q2:
+        feature_text = st.text_area("Mock feature", value=bundled_feature, height=330)
+
+    if send and not mock_path.startswith("/"):
+        # Appended to the mock's URL, so anything else could point the request at another host
+        st.error("The path must start with `/`.")
+    elif send:
+        body = mock_body.encode("utf-8") if mock_method in ("POST", "PUT") else b""
+        try:
+            service = MockService(feature_text)
+        except MockDefinitionError as exc:
+            st.error(f"Feature error: {exc}")
+        else:
+            # Dispatched once: scenarios update Background state and hit counters
+            status, _, resp_body, delay, scenario = service.dispatch(mock_method, mock_path,
+                                                                     {"Content-Type": "application/json"}, body)
+            st.markdown(f"**Matched scenario:** `{scenario.header if scenario else 'none'}`")
+            if feature_text.strip() == bundled_feature.strip():
+                t0 = time.perf_counter()
+                resp = requests.request(mock_method, mock.url + mock_path, data=body or None,
+                                        headers={"Content-Type": "application/json"}, timeout=10)
+                elapsed = (time.perf_counter() - t0) * 1000
+                st.markdown(f"**HTTP {resp.status_code}** in {elapsed:.0f} ms (including any `responseDelay`)")
+                st.code(resp.text, language="json")
+            else:
+                st.markdown(f"**HTTP {status}** (edited feature is dispatched in-process; `responseDelay` would add {delay:.0f} ms)")
+                st.code(resp_body.decode("utf-8", "replace"), language="json")
+    st.caption(f"Live mock at `{mock.url}` has served {mock.requests} requests. Run your own with `python -m utils.mock_server my-mock.feature --port 8090`.")
+
 # ----------------------------------------------------------------------------
 # TAB 5: UI
 # ----------------------------------------------------------------------------
@@ -189,22 +441,4 @@ with tabs[4]:
     st.subheader("🖥️ Hybrid UI + API Automation")
     st.markdown("Use API calls to set up data, then drive the browser. **Faster than pure UI testing.**")
     
-    st.code("""
-Scenario: Order History Check
-    # 1. API: Create Order (Backend)
-    * url 'https://api.shop.com'
-    * path 'orders'
-    * request { item: 'Laptop', price: 1000 }
-    * method post
-    * def orderId = response.id
-
-    # 2. UI: Verify in Fractal
-    * configure driver = { type: 'chrome' }
-    Given driver 'https://shop.com/login'
-    And input('#user', 'admin')
-    And click('#login')
-    
-    # 3. Validation
-    And waitForUrl('/dashboard')
-    Then match text('.order-list') contains orderId
-    """, language="gherkin")
+    st.code(snippets.KARATE_HYBRID_UI_SCENARIO, language="gherkin")
@@ -1,4 +1,12 @@
 import streamlit as st
+import zipfile
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from utils.flakiness import HistoryError, score_history
+from utils import job_ui
+from utils.cache import spill
+from utils.framework_bench import load_results as load_execution_results, summarize as summarize_execution
 
 st.header("⚡ Playwright vs WebdriverIO vs Karate vs Selenium")
 
@@ -34,13 +42,27 @@ cols[2].markdown("WebDriver + DevTools")
 cols[3].markdown("HTTP + DevTools")
 cols[4].markdown("WebDriver (HTTP)")
 
-# Row 3
+# Row 3: measured by utils/framework_bench.py where a dataset exists, else the editorial rating
+execution = load_execution_results()
+execution_steps, execution_stability = summarize_execution(execution) if execution else (None, None)
+
+
+def measured_cell(stack, rating):
+    if execution is None:
+        return rating
+    row = execution_stability[execution_stability["stack"] == stack]
+    if row.empty:
+        return rating
+    p50 = execution_steps[(execution_steps["stack"] == stack) & (execution_steps["step"] == "scenario")]["p50_ms"].iloc[0]
+    return f"{p50:,.0f} ms p50 · {row['pass_rate_%'].iloc[0]:.0f}% passed"
+
+
 cols = st.columns(5)
 cols[0].markdown("Speed/Stability")
-cols[1].markdown("⭐⭐⭐⭐⭐ (Highest)")
+cols[1].markdown(measured_cell("Playwright", "⭐⭐⭐⭐⭐ (Highest)"))
 cols[2].markdown("⭐⭐⭐⭐")
 cols[3].markdown("⭐⭐⭐")
-cols[4].markdown("⭐⭐ (Flaky)")
+cols[4].markdown(measured_cell("Selenium", "⭐⭐ (Flaky)"))
 
 # Row 4
 cols = st.columns(5)
@@ -58,6 +80,107 @@ cols[2].markdown("Possible (Axios)")
 cols[3].markdown("⭐⭐⭐⭐⭐ (Best)")
 cols[4].markdown("No (Need RestAssured)")
 
+# ----------------------------------------------------------------------------
+# MEASURED EXECUTION SPEED
+# ----------------------------------------------------------------------------
+st.markdown("---")
+st.subheader("⏱️ Measured Execution Speed")
+st.markdown("""
+The same scenario (launch, fresh context, navigation, login form, a mocked 500 on checkout, teardown) runs
+against the bundled fixture site on loopback with every Python stack installed on the benchmark machine.
+""")
+if execution is None:
+    st.info("No measurements recorded yet. Run `python -m utils.framework_bench` on a machine with Chromium "
+            "(and optionally Selenium + chromedriver) to create `data/benchmarks/framework_execution.json`. "
+            "Until then, Speed/Stability in the matrix above shows editorial ratings.")
+else:
+    env = execution["environment"]
+    st.caption(f"Measured {execution['measured_at'][:10]} · {env['platform']} · {env['cpus']} CPUs · "
+               f"{execution['warmup']} warm-up iterations discarded")
+    fig = go.Figure()
+    for stack, rows in execution_steps[execution_steps["step"] != "scenario"].groupby("stack", sort=False):
+        fig.add_trace(go.Bar(name=stack, x=rows["step"], y=rows["p50_ms"],
+                             error_y=dict(type="data", array=rows["p95_ms"] - rows["p50_ms"], symmetric=False),
+                             customdata=rows[["p90_ms", "p99_ms", "n"]],
+                             hovertemplate="%{x}: p50 %{y:.1f} ms<br>p90 %{customdata[0]:.1f} · "
+                                           "p99 %{customdata[1]:.1f} ms<br>n=%{customdata[2]}"))
+    fig.update_layout(barmode="group", height=400, yaxis_title="ms (bar = p50, whisker = p95)",
+                      margin=dict(l=0, r=0, t=10, b=0))
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(execution_stability.round(1), hide_index=True, use_container_width=True)
+    with st.expander("Percentiles per step"):
+        st.dataframe(execution_steps.round(1), hide_index=True, use_container_width=True)
+        st.json(execution["steps"])
+    for entry in execution["skipped"]:
+        st.caption(f"{entry['stack']} was not measured: {entry['reason']}")
+    failures = [(entry["stack"], failure) for entry in execution["stacks"] for failure in entry["failures"]]
+    if failures:
+        with st.expander(f"{len(failures)} failed iterations"):
+            st.dataframe(pd.DataFrame(failures, columns=["stack", "error"]), hide_index=True, use_container_width=True)
+
+
+# ----------------------------------------------------------------------------
+# FLAKINESS
+# ----------------------------------------------------------------------------
+st.markdown("---")
+st.subheader("🔬 Measure Flakiness in Your Own Suite")
+st.markdown("""
+Stability stars are opinions; your CI history is data. Upload a zip of **JUnit XML reports from many runs**
+(one folder per run, or one file per run) and see which tests flip between pass and fail.
+""")
+
+history_zip = st.file_uploader("JUnit XML history (.zip)", type=["zip"], key="flaky_history")
+bad_share = st.slider("Count a run as an infrastructure failure when two or more tests, and at least this share of them, failed",
+                      5, 100, 20, format="%d%%", key="flaky_bad_share", bind="query-params")
+
+history_job = None
+if history_zip is not None:
+    # Parsed in the job pool, with per-run progress, from a copy in the cache written when a new upload starts a job.
+    # One parser per job: the pool already bounds CPU use, and cancelling kills only the pool's worker.
+    history_job = job_ui.run_job("flaky_history", history_zip.file_id, "utils.flakiness:load_history",
+                                 lambda: (spill(history_zip, "uploads", ".zip"),), {"workers": 1},
+                                 label="Building the test x run matrix", progress=True)
+if history_job is not None:
+    try:
+        history, cache_hit = history_job.result()
+    except (HistoryError, zipfile.BadZipFile) as e:
+        st.error(f"❌ {e}")
+    else:
+        ranking, runs = score_history(history, bad_share / 100)
+        flaky = ranking[ranking["score"] > 0]
+        m = st.columns(4)
+        m[0].metric("Tests", f"{len(history.tests):,}")
+        m[1].metric("Runs", f"{len(history.runs):,}")
+        m[2].metric("Flaky tests", f"{len(flaky):,}")
+        m[3].metric("Infrastructure-failure runs", f"{int(runs['bad_run'].sum()):,}")
+        if cache_hit:
+            st.caption("Matrix loaded from the on-disk cache.")
+
+        st.markdown("#### Flakiest tests")
+        st.caption("**flip_rate**: pass↔fail changes between consecutive runs · **isolation**: 1.0 = every failure was a one-off · "
+                   "**infra_share**: failures that coincided with infrastructure-failure runs · **score** = flip_rate × (1 − infra_share)")
+        st.dataframe(flaky.head(100).round(3), hide_index=True, use_container_width=True)
+
+        if not flaky.empty:
+            top = flaky.head(25)
+            rows = pd.Index(history.tests).get_indexer(top["test"])
+            recent = slice(max(0, len(history.runs) - 100), len(history.runs))
+            # 0 not run, 1 passed, 2 failed, 3 passed on retry, 4 skipped
+            z = history.outcome[rows, recent].astype(float)
+            fig = go.Figure(go.Heatmap(
+                z=z, x=history.runs[recent], y=top["test"], zmin=0, zmax=4, showscale=False,
+                colorscale=[[0, "#e5e7eb"], [0.2, "#e5e7eb"], [0.2, "#22c55e"], [0.4, "#22c55e"], [0.4, "#ef4444"],
+                            [0.6, "#ef4444"], [0.6, "#f59e0b"], [0.8, "#f59e0b"], [0.8, "#94a3b8"], [1, "#94a3b8"]],
+            ))
+            fig.update_layout(title="Last 100 runs of the 25 flakiest tests (green pass, red fail, amber passed on retry)",
+                              height=max(300, 22 * len(top)), margin=dict(t=40, b=20), yaxis=dict(autorange="reversed"))
+            st.plotly_chart(fig, use_container_width=True)
+
+        fig = go.Figure(go.Bar(x=runs["run"], y=runs["fail_share_%"],
+                               marker_color=np.where(runs["bad_run"], "#ef4444", "#94a3b8")))
+        fig.update_layout(title="Failed tests per run (%)", height=280, margin=dict(t=40, b=20))
+        st.plotly_chart(fig, use_container_width=True)
+
 
 # ----------------------------------------------------------------------------
 # SCENARIOS
@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from utils import cache
+from utils.app_server import AppServer
+
+# =============================================================================
+# ACADEMY SERVER (one per test run)
+# =============================================================================
+# The controlling pytest process boots app.py once before any xdist worker
+# starts and hands the URL to the workers through workerinput, so N workers
+# share one Streamlit server instead of booting N. Pass --app-url (or set
+# ACADEMY_APP_URL) to test an academy that is already running. Runs that do not
+# include tests/e2e boot nothing, and the booted academy never fetches release feeds.
+APP_URL_ENV = "ACADEMY_APP_URL"
+E2E_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "e2e")
+
+_server = None
+
+
+def pytest_addoption(parser):
+    parser.addoption("--app-url", default=os.environ.get(APP_URL_ENV),
+                     help="test a running academy instead of booting app.py")
+
+
+def pytest_configure(config):
+    global _server
+    config.addinivalue_line("markers", "assets: let images, media and fonts load (blocked by default)")
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is not None:
+        os.environ[APP_URL_ENV] = workerinput[APP_URL_ENV]
+    elif config.getoption("app_url"):
+        os.environ[APP_URL_ENV] = config.getoption("app_url").rstrip("/")
+    elif not config.getoption("collectonly") and _runs_e2e(config):
+        _server = AppServer(env={"ACADEMY_RELEASE_FEEDS": "off"}).start()
+        os.environ[APP_URL_ENV] = _server.url
+
+
+def _runs_e2e(config):
+    for arg in config.args:
+        path = os.path.join(str(config.invocation_params.dir), arg.split("::")[0])
+        path = os.path.abspath(path)
+        if path == E2E_DIR or path.startswith(E2E_DIR + os.sep) or E2E_DIR.startswith(path + os.sep):
+            return True
+    return False
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    node.workerinput[APP_URL_ENV] = os.environ.get(APP_URL_ENV, "")
+
+
+def pytest_unconfigure(config):
+    global _server
+    if _server is not None:
+        _server.stop()
+        _server = None
+
+
+@pytest.fixture(scope="session")
+def base_url():
+    """Used by pytest-playwright as every context's base_url, so tests can page.goto("/?nav=Karate")."""
+    return os.environ[APP_URL_ENV]
+
+
+# =============================================================================
+# SHARED CACHE (one empty directory per test)
+# =============================================================================
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Points utils.cache at the test's tmp_path and keeps the background prune from starting."""
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(cache, "_next_prune", float("inf"))
+    return tmp_path
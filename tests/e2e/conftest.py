@@ -0,0 +1,62 @@
+import re
+from urllib.parse import urlsplit
+
+import pytest
+from playwright.sync_api import expect
+
+# =============================================================================
+# PAGE FIXTURES
+# =============================================================================
+# Images, media and fonts are irrelevant to most checks, so they are aborted
+# unless a test is marked @pytest.mark.assets; requests leaving the app's
+# origin (icon CDNs) are always aborted, which keeps the suite offline.
+HEAVY_ASSETS = re.compile(r"/media/|\.(png|jpe?g|gif|webp|svg|woff2?|ttf)(\?|$)")
+LOAD_TIMEOUT = 30_000
+
+APP = '[data-testid="stApp"]'
+
+
+@pytest.fixture
+def context(context, base_url, request):
+    origin = re.escape(f"{urlsplit(base_url).scheme}://{urlsplit(base_url).netloc}")
+    context.route(re.compile(rf"^(?!{origin}[/?]|{origin}$)"), lambda route: route.abort())
+    if request.node.get_closest_marker("assets") is None:
+        context.route(HEAVY_ASSETS, lambda route: route.abort())
+    context.set_default_timeout(LOAD_TIMEOUT)
+    return context
+
+
+@pytest.fixture
+def open_nav(page):
+    """Opens a nav option by URL and waits until its script run is done."""
+    def open_(nav):
+        page.goto(f"/?nav={nav}")
+        expect(page.locator(APP)).to_have_attribute("data-test-script-state", "notRunning", timeout=LOAD_TIMEOUT)
+        return page
+    return open_
+
+
+@pytest.fixture
+def open_url(page):
+    """Opens a URL in a new page of the test's context (a new app session) and waits until its script run is done."""
+    def open_(url):
+        fresh = page.context.new_page()
+        fresh.goto(url)
+        expect(fresh.locator(APP)).to_have_attribute("data-test-script-state", "notRunning", timeout=LOAD_TIMEOUT)
+        return fresh
+    return open_
+
+
+@pytest.fixture
+def each_tab(page):
+    """Clicks through every top-level tab, yielding its label and panel."""
+    def each():
+        tabs = page.get_by_role("tab")
+        for i in range(tabs.count()):
+            tab = tabs.nth(i)
+            tab.click()
+            expect(tab).to_have_attribute("aria-selected", "true")
+            panel = page.get_by_role("tabpanel").filter(visible=True).first
+            expect(panel).to_be_visible()
+            yield tab.inner_text().strip(), panel
+    return each
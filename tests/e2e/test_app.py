@@ -0,0 +1,84 @@
+import re
+
+import pytest
+from playwright.sync_api import expect
+
+from utils.seo_manager import SEO_METADATA
+
+# Every nav option, with a heading that proves its content rendered
+NAV_HEADINGS = {
+    "Home": "Welcome to the Future of Automation",
+    "Playwright": "Playwright: The Modern Automation Standard",
+    "WebdriverIO": "WebdriverIO: The Full-Stack Powerhouse",
+    "Karate": "Karate: The Unified Test Platform",
+    "Comparisons": "Playwright vs WebdriverIO vs Karate vs Selenium",
+}
+NAVS_WITH_CODE = ["Playwright", "WebdriverIO", "Karate"]
+NAVS_WITH_IMAGES = ["Playwright", "WebdriverIO", "Karate"]
+
+
+@pytest.mark.parametrize("nav", NAV_HEADINGS)
+def test_nav_renders(open_nav, nav):
+    page = open_nav(nav)
+    expect(page.get_by_role("heading", name=NAV_HEADINGS[nav])).to_be_visible()
+    expect(page.get_by_test_id("stException")).to_have_count(0)
+    expect(page).to_have_url(f"/?nav={nav}")
+
+
+@pytest.mark.parametrize("nav", NAV_HEADINGS)
+def test_seo_meta(open_nav, nav):
+    page = open_nav(nav)
+    meta = SEO_METADATA[nav]
+    # Rendered into a hidden block for crawlers, so it is attached but never visible
+    expect(page.locator("h1", has_text=meta["title"])).to_be_attached()
+    expect(page.locator("p", has_text=meta["description"])).to_be_attached()
+
+
+@pytest.mark.parametrize("nav", NAV_HEADINGS)
+def test_every_tab_renders(open_nav, each_tab, nav):
+    page = open_nav(nav)
+    for label, panel in each_tab():
+        expect(panel, f"tab {label!r} is empty").not_to_be_empty()
+        expect(panel.get_by_test_id("stException"), f"tab {label!r} raised").to_have_count(0)
+    expect(page.get_by_test_id("stException")).to_have_count(0)
+
+
+@pytest.mark.parametrize("nav", NAVS_WITH_CODE)
+def test_code_blocks_render(open_nav, each_tab, nav):
+    open_nav(nav)
+    seen = 0
+    for label, panel in each_tab():
+        blocks = panel.get_by_test_id("stCode").filter(visible=True)
+        for i in range(blocks.count()):
+            expect(blocks.nth(i).locator("code"), f"empty code block in tab {label!r}").not_to_be_empty()
+        seen += blocks.count()
+    assert seen > 0
+
+
+@pytest.mark.assets
+@pytest.mark.parametrize("nav", NAVS_WITH_IMAGES)
+def test_images_load(open_nav, each_tab, nav):
+    page = open_nav(nav)
+    loaded = set()
+    for label, _ in each_tab():
+        images = page.get_by_test_id("stImage").locator("img").filter(visible=True)
+        for i in range(images.count()):
+            image = images.nth(i)
+            src = image.get_attribute("src")
+            if src in loaded:
+                continue
+            # decode() resolves once the image is loaded and rejects for a broken one
+            width = image.evaluate("img => img.decode().then(() => img.naturalWidth, () => 0)")
+            assert width > 0, f"broken image {src} in tab {label!r}"
+            loaded.add(src)
+    assert loaded
+
+
+def test_url_restores_page_and_tab(open_nav, open_url):
+    # Routing keeps nothing server-side, so a new session (e.g. on another replica) opens the same view
+    page = open_nav("Karate")
+    page.get_by_role("tab", name=re.compile("JSON Power")).click()
+    expect(page).to_have_url(re.compile(r"[?&]tab=.*JSON"))
+    fresh = open_url(page.url)
+    expect(fresh.get_by_role("heading", name=NAV_HEADINGS["Karate"])).to_be_visible()
+    expect(fresh.get_by_role("tab", name=re.compile("JSON Power"))).to_have_attribute("aria-selected", "true")
@@ -0,0 +1,14 @@
+import pytest
+
+from utils.web_vitals_audit import BYTE_BUDGETS, NAV_OPTIONS, audit_nav, budget_for, check_budgets
+
+
+# Timing budgets (LCP, TBT) are flaky under -n auto; `python -m utils.web_vitals_audit --enforce`
+# checks them in a serial run.
+@pytest.mark.assets
+@pytest.mark.parametrize("nav", NAV_OPTIONS)
+def test_page_weight_within_budget(browser, base_url, nav):
+    routes = audit_nav(browser, base_url, nav, tabs=False)
+    over = check_budgets({"routes": routes}, metrics=BYTE_BUDGETS)
+    budget = {metric: budget_for(nav, routes[0]["tab"])[metric] for metric in BYTE_BUDGETS}
+    assert not over, f"{nav} is over budget {budget}: {over}"
@@ -0,0 +1,87 @@
+import io
+import os
+import time
+
+from utils import cache
+
+DAY = 86400
+
+
+def entry(name, size, age_days, namespace="reports"):
+    path = cache.cache_path(namespace, name, ".npz")
+    cache.write_atomic(path, lambda f: f.write(b"x" * size))
+    with cache.cache_lock(path):
+        pass
+    used = time.time() - age_days * DAY
+    os.utime(path, (used, used))
+    return path
+
+
+# =============================================================================
+# PRUNING
+# =============================================================================
+def test_entries_unused_for_max_age_are_removed():
+    old, recent = entry("old", 10, age_days=8), entry("recent", 10, age_days=1)
+
+    result = cache.prune(max_bytes=1 << 30, max_age=7 * DAY)
+
+    assert not os.path.exists(old) and not os.path.exists(old + ".lock")
+    assert os.path.exists(recent) and os.path.exists(recent + ".lock")
+    assert result == {"removed": 1, "freed": 10, "kept": 10}
+
+
+def test_least_recently_used_entries_go_until_the_cache_fits():
+    paths = [entry(f"e{i}", 100, age_days=i, namespace=("images", "traces")[i % 2]) for i in range(1, 6)]
+
+    cache.prune(max_bytes=250, max_age=30 * DAY)
+
+    assert [os.path.exists(path) for path in paths] == [True, True, False, False, False]
+
+
+def test_entries_being_built_are_kept():
+    path = entry("busy", 100, age_days=30)
+
+    with cache.cache_lock(path):
+        result = cache.prune(max_bytes=0, max_age=DAY)
+
+    assert os.path.exists(path)
+    assert result["removed"] == 0
+
+
+def test_leftover_temp_files_are_removed():
+    directory = os.path.dirname(entry("kept", 10, age_days=0))
+    stale, fresh = os.path.join(directory, ".tmp-stale"), os.path.join(directory, ".tmp-fresh")
+    for path in (stale, fresh):
+        open(path, "wb").close()
+    os.utime(stale, (time.time() - DAY, time.time() - DAY))
+
+    cache.prune()
+
+    assert not os.path.exists(stale)
+    assert os.path.exists(fresh)
+
+
+def test_lock_survives_its_file_being_pruned():
+    path = cache.cache_path("reports", "entry", ".npz")
+    with cache.cache_lock(path):
+        os.unlink(path + ".lock")
+    with cache.cache_lock(path) as held:
+        assert held
+        assert os.path.exists(path + ".lock")
+
+
+# =============================================================================
+# SPILLED UPLOADS
+# =============================================================================
+def test_upload_is_spilled_once_per_content():
+    upload = io.BytesIO(b"report" * 1000)
+
+    path = cache.spill(upload, "uploads", ".xml")
+    os.utime(path, (0, 0))
+    again = cache.spill(io.BytesIO(b"report" * 1000), "uploads", ".xml")
+
+    assert again == path and path.endswith(".xml")
+    assert open(path, "rb").read() == upload.getvalue()
+    assert upload.tell() == 0
+    assert os.stat(path).st_mtime > 0
+    assert cache.spill(io.BytesIO(b"other"), "uploads", ".xml") != path
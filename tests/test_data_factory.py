@@ -0,0 +1,49 @@
+import io
+
+import pandas as pd
+import pytest
+
+from utils import data_factory
+
+
+def downloaded(schema, rows, seed, batch_size=data_factory.BATCH_SIZE):
+    buffer = io.BytesIO()
+    data_factory.write(schema, rows, buffer, "csv", seed, batch_size)
+    buffer.seek(0)
+    return pd.read_csv(buffer)
+
+
+def shown(frame):
+    """The preview as it would read back from CSV."""
+    return pd.read_csv(io.StringIO(frame.to_csv(index=False)))
+
+
+# =============================================================================
+# PREVIEW / DOWNLOAD PARITY
+# =============================================================================
+@pytest.mark.parametrize("schema_name", list(data_factory.SCHEMAS))
+@pytest.mark.parametrize("rows", [1_000, 2_500])
+def test_preview_is_the_start_of_the_download(schema_name, rows):
+    schema = data_factory.SCHEMAS[schema_name]
+
+    preview = data_factory.preview(schema, 1000, seed=42, total_rows=rows)
+
+    pd.testing.assert_frame_equal(shown(preview), downloaded(schema, rows, seed=42).head(1000))
+
+
+def test_preview_of_a_large_download_matches_its_first_batch():
+    schema = data_factory.SCHEMAS["patients"]
+
+    preview = data_factory.preview(schema, 100, seed=7, total_rows=10_000, batch_size=1_000)
+
+    pd.testing.assert_frame_equal(shown(preview), downloaded(schema, 10_000, seed=7, batch_size=1_000).head(100))
+
+
+def test_preview_matches_the_cached_export():
+    schema = data_factory.SCHEMAS["customers"]
+
+    preview = data_factory.preview(schema, 1000, seed=3, total_rows=5_000)
+    with open(data_factory.export(schema, 5_000, "csv", seed=3), "rb") as f:
+        exported = pd.read_csv(f)
+
+    pd.testing.assert_frame_equal(shown(preview), exported.head(1000))
@@ -0,0 +1,117 @@
+import io
+import zipfile
+
+import numpy as np
+import pytest
+
+from utils import cache, flakiness
+from utils.flakiness import FAILED, PASSED, History, HistoryError, load_history, parse_junit_run, score_history
+
+
+def history(rows):
+    """A History from {test: "PF.." per run}, P = passed, F = failed, R = failed then passed on retry."""
+    codes = {"P": PASSED, "F": FAILED, "R": PASSED | FAILED}
+    outcome = np.array([[codes[c] for c in runs] for runs in rows.values()], dtype=np.uint8)
+    return History(list(rows), [f"run-{i}" for i in range(outcome.shape[1])], outcome,
+                   np.ones(outcome.shape, dtype=np.float32))
+
+
+def junit(cases):
+    return f'<testsuite name="s">{cases}</testsuite>'.encode()
+
+
+# =============================================================================
+# SCORING WITH FEW TESTS
+# =============================================================================
+def test_a_test_failing_alone_is_not_an_infrastructure_failure():
+    ranking, runs = score_history(history({"a": "PFPFP", "b": "PPPPP", "c": "PPPPP"}))
+    a = ranking.set_index("test").loc["a"]
+
+    assert a["infra_share"] == 0
+    assert a["score"] > 0
+    assert not runs["bad_run"].any()
+
+
+def test_failures_shared_with_other_tests_count_as_infrastructure():
+    ranking, runs = score_history(history({"a": "PFPPP", "b": "PFPPP", "c": "PPPFP"}))
+    by_test = ranking.set_index("test")
+
+    assert by_test.loc["a", "infra_share"] == 1
+    assert by_test.loc["a", "score"] == 0
+    assert by_test.loc["c", "infra_share"] == 0
+    assert runs["bad_run"].tolist() == [False, True, False, False, False]
+
+
+def test_single_test_history_is_scored_on_flips():
+    ranking, _ = score_history(history({"only": "PFPFPF"}))
+
+    assert ranking.loc[0, "infra_share"] == 0
+    assert ranking.loc[0, "flip_rate"] == 1
+
+
+# =============================================================================
+# SUREFIRE RERUNS
+# =============================================================================
+def test_flaky_failure_is_a_pass_on_retry():
+    names, _, bits, _ = parse_junit_run([io.BytesIO(junit(
+        '<testcase name="flaky"><flakyFailure message="x"/></testcase>'
+        '<testcase name="broken"><failure/><rerunFailure/><rerunFailure/></testcase>'
+        '<testcase name="ok"/>'))])
+
+    assert dict(zip(names, bits.tolist())) == {"flaky": PASSED | FAILED, "broken": FAILED, "ok": PASSED}
+
+
+# =============================================================================
+# REPORT TIMES
+# =============================================================================
+@pytest.mark.parametrize("time, ms", [("1.5", 1500), ("1,234.5", 1234500), ("0,25", 250), ("", 0)])
+def test_testcase_times_in_common_formats(time, ms):
+    _, durations, _, _ = parse_junit_run([io.BytesIO(junit(f'<testcase name="t" time="{time}"/>'))])
+
+    assert durations.tolist() == [ms]
+
+
+def test_unreadable_time_names_the_report():
+    report = io.BytesIO(junit('<testcase name="t" time="1.5s"/>'))
+    report.name = "run-7/TEST-checkout.xml"
+
+    with pytest.raises(HistoryError, match="'1.5s' for test 't' in run-7/TEST-checkout.xml"):
+        parse_junit_run([report])
+
+
+# =============================================================================
+# PARSER PROCESSES
+# =============================================================================
+RUNS = 2 * flakiness.MIN_RUNS_PER_WORKER
+
+
+def archive(broken=b""):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as z:
+        for i in range(RUNS):
+            z.writestr(f"run-{i:03d}/TEST-suite.xml", broken if broken and i == 7 else
+                       junit(f'<testcase name="t{i % 3}"/><testcase name="all"><failure/></testcase>'))
+    return buffer.getvalue()
+
+
+def test_parallel_parse_matches_serial_parse():
+    parallel, _ = load_history(archive(), workers=2)
+    cache.prune(max_bytes=0, max_age=0, now=float("inf"))
+    serial, _ = load_history(archive(), workers=1)
+
+    # Parallel runs are interned in completion order, so only the rows per test must agree
+    assert dict(zip(parallel.tests, parallel.outcome.tolist())) == dict(zip(serial.tests, serial.outcome.tolist()))
+
+
+def test_malformed_report_in_a_worker_is_a_history_error():
+    with pytest.raises(HistoryError, match="Malformed JUnit XML"):
+        load_history(archive(broken=junit('<testcase name="t1"></testcas>')), workers=2)
+
+
+def test_unexpected_worker_error_reaches_the_parent():
+    data = archive()
+    # Same length, so the archive still opens, but the member fails its CRC check in the worker
+    data = data.replace(b'name="t1"', b'name="t9"', 1)
+
+    with pytest.raises(RuntimeError, match="BadZipFile"):
+        load_history(data, workers=2)
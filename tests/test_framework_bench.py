@@ -0,0 +1,33 @@
+from utils import framework_bench
+from utils.framework_bench import run_benchmark
+
+
+class FlakyStack:
+    """Fails every other iteration with an exception that has no message, like a bare `assert`."""
+    name = "Flaky"
+    versions = {}
+
+    def __init__(self):
+        self.calls = 0
+
+    def iteration(self, watch, base_url):
+        self.calls += 1
+        with watch.step("launch"):
+            if not self.calls % 2:
+                raise AssertionError()
+
+    def close(self):
+        pass
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+def test_failures_without_a_message_are_counted(monkeypatch):
+    monkeypatch.setitem(framework_bench.STACKS, "flaky", FlakyStack)
+
+    results = run_benchmark(["flaky"], iterations=4, warmup=0, log=lambda message: None)
+
+    [stack] = results["stacks"]
+    assert stack["failures"] == ["AssertionError: AssertionError"] * 2
+    assert len(stack["samples"]["launch"]) == 2
@@ -0,0 +1,62 @@
+import time
+
+import pytest
+
+from utils.fuzzy_match import SchemaError, match, match_each, parse_karate_json
+
+RESPONSE = {"total": 2, "users": [{"id": 1, "tags": ["a"]}, {"id": 2, "tags": []}]}
+
+
+# =============================================================================
+# '$' IN SELF-VALIDATION
+# =============================================================================
+def test_dollar_is_the_matched_document():
+    schema = "{ total: '#? _ == $.users.length', users: '#[] #object' }"
+
+    assert match(RESPONSE, schema) == []
+    assert [m.path for m in match(dict(RESPONSE, total=3), schema)] == ["$.total"]
+
+
+def test_dollar_in_match_each_is_the_whole_array():
+    users = RESPONSE["users"]
+
+    assert match_each(users, "{ id: '#? _ <= $.length', tags: '#array' }") == []
+    assert len(match_each(users, "{ id: '#? _ < $.length', tags: '#array' }")) == 1
+
+
+def test_dollar_does_not_leak_between_matches():
+    match(RESPONSE, "{ total: '#? $.total == 2', users: '#ignore' }")
+
+    assert match({"total": 2}, "{ total: '#? $.users == null' }") == []
+
+
+# =============================================================================
+# RESOURCE CAPS
+# =============================================================================
+@pytest.mark.parametrize("expression", [
+    "_ ** 99999999 > 0", "'x' * 10**9 == _", "[0] * _ == []",
+    "(((7**64)**64)**64)**64 > 0", "(2**63)**64 * (2**63)**64 > 0",
+    "len(str([[0]*99999]*99999)) > 0", "len('%s' % (([0]*99999, [0]*99999),)) > 0",
+])
+def test_huge_powers_and_repetitions_fail_fast(expression):
+    started = time.perf_counter()
+
+    assert match(10 ** 9, f'"#? {expression}"')
+    assert time.perf_counter() - started < 1
+
+
+def test_small_powers_and_repetitions_still_work():
+    assert match(2, "'#? _ ** 10 == 1024 && _ * 3 == 6 && \\'ab\\' * _ == \\'abab\\''") == []
+
+
+# =============================================================================
+# OBJECT AND ARRAY LITERALS
+# =============================================================================
+@pytest.mark.parametrize("text", ["{ a: 1 b: 2 }", "[1 2]", "{ a: [1, 2] b: 3 }"])
+def test_missing_comma_is_rejected(text):
+    with pytest.raises(SchemaError, match="Expected ','"):
+        parse_karate_json(text)
+
+
+def test_trailing_commas_are_still_accepted():
+    assert parse_karate_json("{ a: [1, 2,], b: 'x', }") == {"a": [1, 2], "b": "x"}
@@ -0,0 +1,99 @@
+import io
+import json
+
+import pytest
+
+from utils.har_replay import HarError, HarIndex, fulfill_headers
+
+
+def entry(method, url, status=200, text="", body=None, headers=()):
+    request = {"method": method, "url": url, "headers": []}
+    if body is not None:
+        request["postData"] = {"mimeType": "application/json", "text": json.dumps(body)}
+    return {"request": request, "response": {
+        "status": status, "headers": [{"name": k, "value": v} for k, v in headers],
+        "content": {"mimeType": "application/json", "text": text}}}
+
+
+def upload(entries):
+    return io.BytesIO(json.dumps({"log": {"version": "1.2", "entries": entries}}).encode())
+
+
+@pytest.fixture
+def har():
+    har = HarIndex.from_upload(upload([
+        entry("GET", "https://shop.test/api/cart?page=1", text="page 1"),
+        entry("POST", "https://shop.test/api/pay", text="paid 10", body={"amount": 10, "currency": "EUR"}),
+        entry("GET", "https://shop.test/api/status", text="pending"),
+        entry("GET", "https://shop.test/api/status", text="settled",
+              headers=[("Set-Cookie", "a=1"), ("Set-Cookie", "b=2"), ("Content-Length", "7")]),
+    ]))
+    yield har
+    har.close()
+
+
+def body(match):
+    return match.response.body.decode() if match else None
+
+
+# =============================================================================
+# MATCHING
+# =============================================================================
+def test_exact_match_then_fallbacks(har):
+    exact = har.lookup("GET", "https://shop.test/api/cart?page=1&_=123")
+    json_body = har.lookup("POST", "https://shop.test/api/pay", b'{"currency":"EUR","amount":10}', "application/json")
+    other_body = har.lookup("POST", "https://shop.test/api/pay", b'{"amount":99}', "application/json")
+    other_query = har.lookup("GET", "https://shop.test/api/cart?page=7")
+
+    assert (exact.level, body(exact)) == ("exact", "page 1")
+    assert (json_body.level, body(json_body)) == ("exact", "paid 10")
+    assert (other_body.level, body(other_body)) == ("ignore body", "paid 10")
+    assert (other_query.level, body(other_query)) == ("ignore query", "page 1")
+    assert har.lookup("GET", "https://other.test/api/cart") is None
+    assert har.stats()["recent_misses"] == ["GET https://other.test/api/cart"]
+
+
+def test_repeated_requests_replay_in_order_then_repeat_the_last(har):
+    replies = [body(har.lookup("GET", "https://shop.test/api/status")) for _ in range(3)]
+
+    assert replies == ["pending", "settled", "settled"]
+
+
+def test_views_keep_their_own_cursors(har):
+    first, second = har.view(), har.view()
+    first.lookup("GET", "https://shop.test/api/status")
+
+    assert body(second.lookup("GET", "https://shop.test/api/status")) == "pending"
+    assert body(first.lookup("GET", "https://shop.test/api/status")) == "settled"
+    assert body(har.lookup("GET", "https://shop.test/api/status")) == "pending"
+    first.close()
+    assert body(har.lookup("GET", "https://shop.test/api/cart?page=1")) == "page 1"
+
+
+def test_repeated_headers_are_kept_and_transfer_headers_dropped(har):
+    har.lookup("GET", "https://shop.test/api/status")
+    status, headers, payload, _, _ = har.dispatch("GET", "https://shop.test/api/status")
+
+    assert (status, payload) == (200, b"settled")
+    assert headers == [("Set-Cookie", "a=1"), ("Set-Cookie", "b=2")]
+    assert fulfill_headers(headers) == {"Set-Cookie": "a=1\nb=2"}
+
+
+# =============================================================================
+# MALFORMED FILES
+# =============================================================================
+@pytest.mark.parametrize("entries, message", [
+    (["not an entry"], "entry 0 is malformed"),
+    ([entry("GET", "https://shop.test/"), {"request": {"method": "GET", "url": "https://shop.test/x"}}],
+     "entry 1 has no 'response' field"),
+    ([{"request": {"method": "GET", "url": "https://shop.test/"}, "response": {"headers": [{}]}}],
+     "entry 0 has no 'name' field"),
+])
+def test_malformed_entries_are_har_errors(entries, message):
+    with pytest.raises(HarError, match=message):
+        HarIndex.from_upload(upload(entries))
+
+
+def test_not_json_is_a_har_error():
+    with pytest.raises(HarError):
+        HarIndex.from_upload(io.BytesIO(b'{"log": {"entries": [{"request": '))
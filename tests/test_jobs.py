@@ -0,0 +1,42 @@
+import pytest
+
+from utils.fuzzy_match import SchemaError
+from utils.jobs import DONE, JobError, JobPool
+
+
+@pytest.fixture
+def pool():
+    pool = JobPool(workers=1)
+    yield pool
+    pool.close()
+
+
+# =============================================================================
+# FAILURES
+# =============================================================================
+def test_rejected_target_is_a_job_error_and_keeps_the_worker(pool):
+    job = pool.submit("os:system", ("true",))
+
+    with pytest.raises(JobError, match="utils.<module>:<function>"):
+        job.result(timeout=30)
+    assert pool.submit("utils.fuzzy_match:parse_karate_json", ("{ a: 1 }",)).result(timeout=30) == {"a": 1}
+    assert pool.stats()["launches"] == 1
+
+
+def test_target_exceptions_keep_their_type(pool):
+    job = pool.submit("utils.fuzzy_match:parse_karate_json", ("{ a: 1 b: 2 }",))
+
+    with pytest.raises(SchemaError, match="Expected ','"):
+        job.result(timeout=30)
+    assert "SchemaError" in job.traceback
+
+
+def test_unpicklable_result_is_reported_and_keeps_the_worker(pool):
+    job = pool.submit("utils.jobs:_progress_sender", (None,))
+
+    with pytest.raises(JobError, match="cannot be sent back"):
+        job.result(timeout=30)
+    follow_up = pool.submit("utils.fuzzy_match:parse_karate_json", ("[1]",))
+    follow_up.wait(30)
+    assert follow_up.status == DONE
+    assert pool.stats()["launches"] == 1
@@ -0,0 +1,52 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+from utils.load_generator import LoadTest, at_once_users
+
+
+@pytest.fixture
+def silent_server():
+    """Accepts connections and reads requests, but never answers."""
+    server = socket.create_server(("127.0.0.1", 0))
+    clients = []
+
+    def accept():
+        while True:
+            try:
+                clients.append(server.accept()[0])
+            except OSError:
+                return
+    threading.Thread(target=accept, daemon=True).start()
+    yield f"http://127.0.0.1:{server.getsockname()[1]}/"
+    server.close()
+    for client in clients:
+        client.close()
+
+
+# =============================================================================
+# HARD STOP
+# =============================================================================
+def test_requests_in_flight_at_max_duration_are_timeouts(silent_server):
+    test = LoadTest(silent_server, [at_once_users(3)], timeout=30, interval=0.1, max_duration=0.5)
+
+    asyncio.run(test.run())
+
+    summary = test.summary()
+    assert summary["requests"] == 3 and summary["errors"] == {"KO timeout": 3}
+    # They waited until the hard stop, not the 30 s timeout
+    assert 400 <= summary["max_ms"] < 5000
+
+
+def test_stop_abandons_requests_without_counting_them(silent_server):
+    test = LoadTest(silent_server, [at_once_users(3)], timeout=30, interval=0.1).start_in_thread()
+    deadline = time.monotonic() + 5
+    while not test._in_flight and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    test.stop(wait=5)
+
+    assert test.finished and sum(test.outcomes.values()) == 0
@@ -0,0 +1,75 @@
+import pytest
+
+from utils.locator_scorer import LocatorIndex, css_escape
+
+PAGE = """
+<html><body>
+  <div id="user.name"><button class="btn">Save</button></div>
+  <div id="1st"><button class="btn">Save</button></div>
+  <input class="md:w-1/2" placeholder="Search">
+  <span id="a&quot;b">quoted</span>
+</body></html>
+"""
+
+
+# =============================================================================
+# CSS.escape()
+# =============================================================================
+@pytest.mark.parametrize("ident, escaped", [
+    ("user-name_2", "user-name_2"),
+    ("user.name", "user\\.name"),
+    ("1st", "\\31 st"),
+    ("-1st", "-\\31 st"),
+    ("-", "\\-"),
+    ("md:w-1/2", "md\\:w-1\\/2"),
+    ('a"b c', 'a\\"b\\ c'),
+    ("tab\there", "tab\\9 here"),
+    ("nul\0", "nul�"),
+    ("café", "café"),
+])
+def test_css_escape_matches_the_browser(ident, escaped):
+    assert css_escape(ident) == escaped
+
+
+# =============================================================================
+# SUGGESTED LOCATORS
+# =============================================================================
+def codes(index, element):
+    return [candidate.code for candidate in index.suggest(element)]
+
+
+def test_ids_and_classes_are_escaped_in_suggestions():
+    index = LocatorIndex(PAGE)
+    by_id = {value: i for i, value in index.ids.items()}
+    search = next(i for i, value in index.placeholders.items() if value == "Search")
+
+    assert 'page.locator("#user\\\\.name")' in codes(index, by_id["user.name"])
+    assert 'page.locator("#\\\\31 st")' in codes(index, by_id["1st"])
+    assert 'page.locator("#a\\\\\\"b")' in codes(index, by_id['a"b'])
+    assert 'page.locator("input.md\\\\:w-1\\\\/2")' in codes(index, search)
+
+
+def test_scoped_locators_anchor_on_escaped_ids():
+    index = LocatorIndex(PAGE)
+    first_save = next(i for i, role in index.roles.items() if role == "button")
+
+    assert any(code.startswith('page.locator("#user\\\\.name").get_by_role') for code in codes(index, first_save))
+
+
+# =============================================================================
+# ACCESSIBLE NAMES
+# =============================================================================
+def test_labelledby_an_empty_element_falls_back_to_the_text():
+    index = LocatorIndex('<html><body><span id="x"></span><button aria-labelledby="x">Go</button></body></html>')
+    button = next(i for i, role in index.roles.items() if role == "button")
+
+    assert index.names[button] == "Go"
+    assert 'page.get_by_role("button", name="Go")' in codes(index, button)
+
+
+def test_labelledby_joins_the_referenced_texts():
+    index = LocatorIndex('<html><body><span id="a">Save</span><span id="b"></span><span id="c">draft</span>'
+                         '<button aria-labelledby="a b c">S</button></body></html>')
+    button = next(i for i, role in index.roles.items() if role == "button")
+
+    assert index.names[button] == "Save draft"
@@ -0,0 +1,90 @@
+import json
+import socket
+
+import pytest
+import requests
+
+from utils.mock_server import MockDefinitionError, MockServer, MockService
+
+FEATURE = """
+Feature: Payments
+
+    Background:
+        * def paymentId = 0
+
+    Scenario: pathMatches('/pay') && methodIs('post') && bodyPath('$.amount') < 0
+        * def response = { error: 'Invalid Amount' }
+        * def responseStatus = 400
+
+    Scenario: pathMatches('/pay') && methodIs('post')
+        * def req = request
+        * def paymentId = paymentId + 1
+        * def response = { txnId: '#(paymentId)', amount: '#(req.amount)' }
+
+    Scenario: pathMatches('/payments/{id}') && methodIs('get')
+        * def response = { txnId: '#(pathParams.id)' }
+
+    Scenario:
+        * def response = { error: 'Not Found' }
+        * def responseStatus = 404
+"""
+
+
+def call(service, method, target, body=None):
+    status, _, payload, _, scenario = service.dispatch(method, target, {"Content-Type": "application/json"},
+                                                       json.dumps(body).encode() if body is not None else b"")
+    return status, json.loads(payload), scenario.ordinal if scenario else None
+
+
+@pytest.fixture
+def server():
+    server = MockServer(MockService(FEATURE)).start_in_thread()
+    yield server
+    server.stop()
+
+
+# =============================================================================
+# DISPATCH
+# =============================================================================
+def test_first_matching_scenario_wins():
+    service = MockService(FEATURE)
+
+    assert call(service, "POST", "/pay", {"amount": -5}) == (400, {"error": "Invalid Amount"}, 0)
+    assert call(service, "POST", "/pay", {"amount": 5})[2] == 1
+    assert call(service, "GET", "/pay")[:2] == (404, {"error": "Not Found"})
+
+
+def test_background_state_and_path_params():
+    service = MockService(FEATURE)
+
+    assert [call(service, "POST", "/pay", {"amount": 9})[1] for _ in range(2)] == \
+        [{"txnId": 1, "amount": 9}, {"txnId": 2, "amount": 9}]
+    assert call(service, "GET", "/payments/42?expand=1") == (200, {"txnId": "42"}, 2)
+    assert service.hits == {1: 2, 2: 1}
+
+
+def test_feature_without_scenarios_is_rejected():
+    with pytest.raises(MockDefinitionError):
+        MockService("Feature: empty\n    Background:\n        * def x = 1\n")
+
+
+# =============================================================================
+# HTTP SERVER
+# =============================================================================
+def test_requests_are_served_over_keep_alive(server):
+    with requests.Session() as session:
+        first = session.post(server.url + "/pay", json={"amount": 3}, timeout=5)
+        second = session.get(server.url + "/payments/7", timeout=5)
+
+    assert (first.status_code, first.json()) == (200, {"txnId": 1, "amount": 3})
+    assert (second.status_code, second.json()) == (200, {"txnId": "7"})
+    assert server.requests == 2
+
+
+def test_malformed_content_length_is_a_400(server):
+    with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+        sock.sendall(b"POST /pay HTTP/1.1\r\nHost: x\r\nContent-Length: -1\r\n\r\n")
+        reply = sock.recv(1024)
+
+    assert reply.startswith(b"HTTP/1.1 400 ")
+    assert b"Connection: close" in reply
@@ -0,0 +1,184 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils import release_feeds
+
+# =============================================================================
+# STAND-IN FEED SERVER
+# =============================================================================
+# Serves GitHub-style release Atom feeds on loopback with ETag/Last-Modified
+# validators, so the whole fetch path runs offline.
+LAST_MODIFIED = "Tue, 15 Oct 2024 08:00:00 GMT"
+NOTES = "&lt;h2&gt;Highlights&lt;/h2&gt;&lt;p&gt;New in {tag}: &lt;code&gt;expect.poll&lt;/code&gt;&lt;/p&gt;"
+
+
+def atom(*releases):
+    entries = "".join(f"""
+  <entry>
+    <id>tag:github.com,2008:Repository/1/{tag}</id>
+    <updated>{updated}</updated>
+    <link rel="alternate" type="text/html" href="https://github.com/acme/tool/releases/tag/{tag}"/>
+    <title>{tag}</title>
+    <content type="html">{NOTES.format(tag=tag)}</content>
+  </entry>""" for tag, updated in releases)
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <id>tag:github.com,2008:https://github.com/acme/tool/releases</id>
+  <title>Release notes from tool</title>
+  <updated>2024-10-15T08:00:00Z</updated>{entries}
+</feed>""".encode("utf-8")
+
+
+class FeedServer:
+    def __init__(self):
+        self.feeds = {}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                feed = server.feeds.get(self.path)
+                if feed is None:
+                    self.send_response(500)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body, etag = feed
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/atom+xml")
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", LAST_MODIFIED)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def publish(self, path, body, etag):
+        self.feeds[path] = (body, etag)
+        return self.url + path
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = FeedServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def session():
+    with release_feeds.new_session() as session:
+        yield session
+
+
+# =============================================================================
+# TESTS
+# =============================================================================
+def test_fetch_parses_and_persists(server, session):
+    releases = [("v1.48.0", "2024-10-01T10:00:00Z"), ("v1.49.0-beta-1", "2024-10-10T10:00:00Z"),
+                ("v1.47.2", "2024-09-01T10:00:00Z")]
+    url = server.publish("/tool.atom", atom(*releases), '"v1"')
+    state = release_feeds.refresh_feed(session, "Tool", url)
+
+    assert state["status"] == "updated"
+    assert [e["version"] for e in state["entries"]] == ["1.49.0-beta-1", "1.48.0", "1.47.2"]
+    assert state["entries"][0]["prerelease"]
+    assert release_feeds.latest_release(state)["version"] == "1.48.0"
+    assert state["entries"][1]["summary"] == "Highlights New in v1.48.0: expect.poll"
+    assert state["entries"][1]["link"].endswith("/releases/tag/v1.48.0")
+
+    # Page renders read the persisted copy, with the server gone
+    server.close()
+    assert release_feeds.read_feed("Tool")["entries"] == state["entries"]
+
+
+def test_unchanged_feed_is_a_conditional_304(server, session):
+    url = server.publish("/tool.atom", atom(("v1.48.0", "2024-10-01T10:00:00Z")), '"v1"')
+    first = release_feeds.refresh_feed(session, "Tool", url)
+    second = release_feeds.refresh_feed(session, "Tool", url)
+
+    _, headers = server.requests[-1]
+    assert headers["If-None-Match"] == '"v1"'
+    assert headers["If-Modified-Since"] == LAST_MODIFIED
+    assert second["status"] == "not modified"
+    assert second["entries"] == first["entries"]
+    assert second["checked_at"] >= first["checked_at"]
+
+
+def test_changed_feed_replaces_entries(server, session):
+    url = server.publish("/tool.atom", atom(("v1.48.0", "2024-10-01T10:00:00Z")), '"v1"')
+    release_feeds.refresh_feed(session, "Tool", url)
+    server.publish("/tool.atom", atom(("v1.49.0", "2024-11-01T10:00:00Z"), ("v1.48.0", "2024-10-01T10:00:00Z")), '"v2"')
+    state = release_feeds.refresh_feed(session, "Tool", url)
+
+    assert state["status"] == "updated"
+    assert state["etag"] == '"v2"'
+    assert release_feeds.latest_release(state)["version"] == "1.49.0"
+
+
+def test_failure_keeps_previous_entries(server, session):
+    url = server.publish("/tool.atom", atom(("v1.48.0", "2024-10-01T10:00:00Z")), '"v1"')
+    release_feeds.refresh_feed(session, "Tool", url)
+    del server.feeds["/tool.atom"]
+    state = release_feeds.refresh_feed(session, "Tool", url)
+
+    assert state["status"] == "failed"
+    assert "500" in state["error"]
+    assert [e["version"] for e in state["entries"]] == ["1.48.0"]
+
+
+def test_not_a_feed_is_reported(server, session):
+    url = server.publish("/page.html", b"<html><body>Releases</body></html>", '"html"')
+    state = release_feeds.refresh_feed(session, "Tool", url)
+
+    assert state["status"] == "failed"
+    assert state["entries"] == []
+
+
+def test_recently_checked_feed_is_not_fetched(server, session):
+    url = server.publish("/tool.atom", atom(("v1.48.0", "2024-10-01T10:00:00Z")), '"v1"')
+    release_feeds.refresh_feed(session, "Tool", url)
+    # Another replica asking within max_age reuses the stored copy
+    release_feeds.refresh_feed(session, "Tool", url, max_age=3600)
+
+    assert len(server.requests) == 1
+
+
+def test_refresher_fetches_in_the_background(server):
+    feeds = {name: server.publish(f"/{name}.atom", atom(("v2.0.0", "2024-10-01T10:00:00Z")), f'"{name}"')
+             for name in ("One", "Two")}
+    refresher = release_feeds.FeedRefresher(feeds, interval=3600).start()
+    try:
+        for _ in range(100):
+            if refresher.rounds:
+                break
+            time.sleep(0.05)
+    finally:
+        refresher.stop()
+
+    assert refresher.rounds == 1
+    assert refresher.last_error is None
+    assert {name: release_feeds.latest_release(state)["version"] for name, state in
+            release_feeds.read_feeds(feeds).items()} == {"One": "2.0.0", "Two": "2.0.0"}
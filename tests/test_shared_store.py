@@ -0,0 +1,143 @@
+import threading
+import time
+
+import pytest
+
+from utils.shared_store import SharedStore, StoreClient, StoreError
+
+pytest_plugins = ["pytester"]
+
+
+@pytest.fixture
+def store():
+    store = SharedStore().start()
+    yield store
+    store.stop()
+
+
+@pytest.fixture
+def connect(store):
+    clients = []
+
+    def connect():
+        clients.append(StoreClient(store.address, store.authkey))
+        return clients[-1]
+    yield connect
+    for client in clients:
+        client.close()
+
+
+def in_threads(count, target):
+    results, threads = [None] * count, []
+    for i in range(count):
+        threads.append(threading.Thread(target=lambda i=i: results.__setitem__(i, target())))
+        threads[-1].start()
+    for thread in threads:
+        thread.join(10)
+    return results
+
+
+# =============================================================================
+# GET / SET
+# =============================================================================
+def test_values_are_shared_between_clients(connect):
+    writer, reader = connect(), connect()
+    writer.set("user", {"name": "admin"})
+
+    assert reader.get("user") == {"name": "admin"}
+    writer.delete("user")
+    assert reader.get("user", "gone") == "gone"
+
+
+def test_values_expire_after_their_ttl(connect):
+    client = connect()
+    client.set("token", "abc", ttl=0.2)
+    time.sleep(0.3)
+
+    assert client.get("token") is None
+
+
+def test_wrong_authkey_cannot_connect(store):
+    with pytest.raises(Exception):
+        StoreClient(store.address, b"not the key")
+
+
+# =============================================================================
+# COMPUTE ONCE
+# =============================================================================
+def test_compute_once_runs_the_factory_in_one_client(connect):
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.2)
+        return "token"
+
+    clients = [connect() for _ in range(4)]
+    results = in_threads(4, lambda: clients.pop().compute_once("token", factory, wait=5))
+
+    assert results == ["token"] * 4
+    assert len(calls) == 1
+
+
+def test_threads_of_one_client_do_not_block_each_other(connect):
+    client, calls = connect(), []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.2)
+        return "token"
+
+    started = time.perf_counter()
+    results = in_threads(3, lambda: client.compute_once("token", factory, wait=5))
+
+    assert results == ["token"] * 3
+    assert len(calls) == 1
+    assert time.perf_counter() - started < 2
+
+
+def test_failed_factory_lets_the_next_client_compute(connect):
+    first, second = connect(), connect()
+
+    def broken():
+        raise RuntimeError("login page down")
+
+    with pytest.raises(RuntimeError):
+        first.compute_once("token", broken)
+    assert second.compute_once("token", lambda: "token") == "token"
+
+
+def test_waiting_for_a_stuck_computation_times_out(connect):
+    owner, waiter = connect(), connect()
+    gate = threading.Event()
+    thread = threading.Thread(target=lambda: owner.compute_once("token", lambda: gate.wait(5) and "late"))
+    thread.start()
+    time.sleep(0.1)
+    try:
+        with pytest.raises(StoreError, match="timed out"):
+            waiter.compute_once("token", lambda: "mine", wait=0.2)
+    finally:
+        gate.set()
+        thread.join()
+
+
+# =============================================================================
+# PYTEST PLUGIN
+# =============================================================================
+def test_plugin_shares_one_value_across_the_session(pytester):
+    pytester.makepyfile("""
+        import itertools
+
+        counter = itertools.count(1)
+
+        def test_one(shared_store):
+            assert shared_store.compute_once("n", lambda: next(counter)) == 1
+
+        def test_two(shared_store):
+            assert shared_store.compute_once("n", lambda: next(counter)) == 1
+            assert shared_store.stats()["computed"] == 1
+    """)
+
+    result = pytester.runpytest("-p", "utils.pytest_shared_store", "-p", "no:playwright", "-p", "no:cacheprovider")
+
+    result.assert_outcomes(passed=2)
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from utils.storage_states import StatePool, fixture_roles
+
+
+@pytest.fixture
+def logins(monkeypatch):
+    """Stands in for the browser: writes each stale state and records where it ran."""
+    calls = []
+
+    async def run(self, stale, probe):
+        await asyncio.sleep(0)
+        calls.append((list(stale), threading.current_thread().name))
+        now = time.time()
+        for name in stale:
+            with open(self.path(name), "w", encoding="utf-8") as f:
+                json.dump({"cookies": [], "origins": []}, f)
+            self._write_meta(name, {"created_at": now, "expires_at": now + self.ttl, "probed_at": now,
+                                    "tenant": self.roles[name].tenant})
+        return {name: {"action": "generated", "ms": 1.0} for name in stale}
+
+    monkeypatch.setattr(StatePool, "_run", run)
+    return calls
+
+
+# =============================================================================
+# EVENT LOOPS
+# =============================================================================
+def test_get_works_inside_a_running_event_loop(logins):
+    pool = StatePool(fixture_roles(2))
+
+    async def fixture():
+        # pytest-playwright's sync fixtures run with an event loop like this one
+        return pool.get("role-01")
+
+    path = asyncio.run(fixture())
+
+    assert path == pool.path("role-01") and pool.is_fresh("role-01")
+    assert logins == [(["role-01"], "storage-state-login")]
+
+
+def test_ensure_without_a_loop_runs_on_the_calling_thread(logins):
+    report = StatePool(fixture_roles(2)).ensure()
+
+    assert [report[name]["action"] for name in ("role-01", "role-02")] == ["generated", "generated"]
+    assert logins == [(["role-01", "role-02"], threading.current_thread().name)]
+
+
+def test_login_errors_reach_the_caller_inside_a_loop(monkeypatch):
+    async def run(self, stale, probe):
+        raise RuntimeError("browser not installed")
+
+    monkeypatch.setattr(StatePool, "_run", run)
+    pool = StatePool(fixture_roles(1))
+
+    async def fixture():
+        pool.ensure()
+
+    with pytest.raises(RuntimeError, match="browser not installed"):
+        asyncio.run(fixture())
+
+
+# =============================================================================
+# SHARED GENERATION
+# =============================================================================
+def test_concurrent_callers_log_in_once(logins):
+    pool = StatePool(fixture_roles(3))
+    threads = [threading.Thread(target=pool.ensure) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(logins) == 1
+    assert pool.ensure()["role-02"]["action"] == "cached"
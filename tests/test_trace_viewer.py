@@ -0,0 +1,100 @@
+import io
+import json
+import time
+import zipfile
+
+import pytest
+
+from utils import trace_viewer
+from utils.trace_viewer import TraceArchive
+
+
+def trace_zip(*snapshots):
+    """A trace.zip with one click whose after-snapshot is the last of `snapshots` (html trees, oldest first)."""
+    events = [
+        {"type": "context-options", "version": 7, "browserName": "chromium", "options": {}},
+        {"type": "before", "callId": "call@1", "apiName": "page.click", "startTime": 10.0,
+         "params": {"selector": "#go"}},
+    ]
+    for i, html in enumerate(snapshots):
+        events.append({"type": "frame-snapshot", "snapshot": {
+            "snapshotName": f"after@{i}", "pageId": "page@1", "frameId": "frame@1", "doctype": "html", "html": html}})
+    events.append({"type": "after", "callId": "call@1", "endTime": 25.0,
+                   "afterSnapshot": f"after@{len(snapshots) - 1}"})
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("trace.trace", "\n".join(json.dumps(event) for event in events) + "\n")
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.fixture
+def open_trace():
+    opened = []
+
+    def open_trace(*snapshots):
+        opened.append(TraceArchive.from_upload(trace_zip(*snapshots)))
+        return opened[-1]
+    yield open_trace
+    for trace in opened:
+        trace.close()
+
+
+# =============================================================================
+# TIMELINE AND RENDERING
+# =============================================================================
+def test_actions_and_a_safe_snapshot(open_trace):
+    trace = open_trace(["HTML", {}, ["BODY", {"onload": "steal()"},
+                                     ["A", {"href": "java\tscript:alert(1)", "title": "x"}, "Go"],
+                                     ["SCRIPT", {}, "alert(1)"]]])
+
+    timeline = trace.timeline()
+    assert timeline[["action", "detail", "duration_ms"]].values.tolist() == [["page.click", "selector=#go", 15.0]]
+    assert trace.snapshot_html(trace.actions[0].after_snapshot) == \
+        '<!DOCTYPE html><html><body><a title="x">Go</a></body></html>'
+
+
+def test_references_into_an_earlier_snapshot_are_followed(open_trace):
+    trace = open_trace(["P", {}, "kept"], ["DIV", {}, [[1, 1]]])
+
+    assert trace.snapshot_html("after@1") == "<!DOCTYPE html><div><p>kept</p></div>"
+
+
+def test_index_trace_builds_the_index_the_page_opens(monkeypatch):
+    path = trace_viewer.spill(trace_zip(["P", {}, "kept"]), "traces", ".zip")
+
+    path, digest = trace_viewer.index_trace(path)
+    monkeypatch.setattr(trace_viewer, "_build_index", lambda archive, spill: pytest.fail("index rebuilt"))
+    trace = TraceArchive(path, digest)
+    try:
+        assert [action.api_name for action in trace.actions] == ["page.click"]
+    finally:
+        trace.close()
+
+
+@pytest.mark.parametrize("data", [b"", b"nope"])
+def test_an_upload_that_is_not_a_zip_is_a_trace_error(data):
+    with pytest.raises(trace_viewer.TraceError, match="Not a zip archive"):
+        TraceArchive.from_upload(io.BytesIO(data))
+
+
+# =============================================================================
+# HOSTILE SNAPSHOTS
+# =============================================================================
+def test_snapshot_referencing_itself_is_not_expanded(open_trace):
+    trace = open_trace(["HTML", {}, ["BODY", {}, [[0, 0]]]])
+
+    assert trace.snapshot_html("after@0") == "<!DOCTYPE html><html><body></body></html>"
+
+
+def test_doubling_references_are_cut_off(open_trace, monkeypatch):
+    monkeypatch.setattr(trace_viewer, "MAX_SNAPSHOT_NODES", 10_000)
+    # Each snapshot holds its predecessor twice: 2**40 nodes when fully expanded
+    trace = open_trace(["P", {}, "x"], ["DIV", {}, [[1, 1]], [[1, 1]]],
+                       *(["DIV", {}, [[1, 0]], [[1, 0]]] for _ in range(39)))
+    started = time.perf_counter()
+
+    html = trace.snapshot_html("after@40")
+
+    assert time.perf_counter() - started < 2
+    assert html.endswith("<!-- snapshot truncated -->")
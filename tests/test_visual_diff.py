@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from utils import visual_diff
+from utils.visual_diff import BaselineStore, VisualDiffError, compare_images, encode_png, status_bar
+
+
+def screenshot(height=100, width=70):
+    """A gradient, so that no two tiles are alike; the size is not a multiple of the tile."""
+    y, x = np.mgrid[0:height, 0:width]
+    return np.stack([x * 3 % 256, y * 2 % 256, (x + y) % 256], axis=-1).astype(np.uint8)
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """Counts how often an image is decoded."""
+    calls = []
+    load_pixels = visual_diff.load_pixels
+
+    def counting(source):
+        calls.append(source)
+        return load_pixels(source)
+    monkeypatch.setattr(visual_diff, "load_pixels", counting)
+    return calls
+
+
+# =============================================================================
+# COMPARISON
+# =============================================================================
+def test_byte_identical_screenshots_are_not_decoded(decodes):
+    png = encode_png(screenshot())
+    compare_images(png, encode_png(screenshot()))
+    decodes.clear()
+
+    result = compare_images(png, png)
+
+    assert result.status == "identical" and decodes == []
+
+
+def test_changed_pixels_are_found_in_their_tile_only():
+    actual = screenshot()
+    actual[40:44, 66:70] = 255 - actual[40:44, 66:70]
+
+    result = compare_images(encode_png(screenshot()), encode_png(actual), max_diff_ratio=0)
+
+    assert result.status == "changed"
+    assert result.changed_tiles == [(1, 2)] and result.diff_pixels == 16
+    assert result.diff_ratio == 16 / (100 * 70)
+
+
+def test_differences_within_tolerance_pass():
+    actual = screenshot()
+    actual[:, :10] = np.clip(actual[:, :10].astype(int) + 5, 0, 255).astype(np.uint8)
+
+    result = compare_images(encode_png(screenshot()), encode_png(actual), tolerance=8)
+
+    assert result.status == "within tolerance" and result.diff_pixels == 0
+    assert result.changed_tiles
+
+
+def test_masked_areas_are_ignored():
+    actual = screenshot()
+    actual[:20] = 0
+
+    result = compare_images(encode_png(screenshot()), encode_png(actual), masks=[status_bar(20)])
+
+    assert result.status == "identical"
+
+
+def test_a_resized_screenshot_is_a_size_change():
+    result = compare_images(encode_png(screenshot()), encode_png(screenshot(width=72)))
+
+    assert result.status == "size changed" and result.diff_ratio == 1.0
+
+
+# =============================================================================
+# BASELINE STORE
+# =============================================================================
+def test_store_compares_against_the_baseline_file(tmp_path):
+    (tmp_path / "home.png").write_bytes(encode_png(screenshot()))
+    store = BaselineStore(str(tmp_path))
+    actual = screenshot()
+    actual[0:8, 0:8] = 0
+
+    assert store.compare("home.png", screenshot()).status == "identical"
+    assert store.compare("home.png", actual).changed_tiles == [(0, 0)]
+    with pytest.raises(VisualDiffError, match="no baseline named 'missing.png'"):
+        store.compare("missing.png", actual)
+
+
+def test_unreadable_image_is_a_visual_diff_error():
+    with pytest.raises(VisualDiffError, match="not a readable image"):
+        compare_images(b"not a png", encode_png(screenshot()))
@@ -0,0 +1,109 @@
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+from utils.worker_process import ROOT
+
+# =============================================================================
+# APP SERVER
+# =============================================================================
+# Boots `streamlit run app.py` on a free port for end-to-end tests and waits
+# for Streamlit's health endpoint. File watching, usage stats and the browser
+# launch are switched off, so the server starts in a couple of seconds.
+HEALTH_PATH = "/_stcore/health"
+STARTUP_TIMEOUT = 60
+
+
+class AppServerError(RuntimeError):
+    pass
+
+
+def free_port(host="127.0.0.1"):
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class AppServer:
+    """
+    A Streamlit process serving app.py.
+
+        with AppServer() as server:
+            page.goto(f"{server.url}/?nav=Playwright")
+    """
+
+    def __init__(self, script="app.py", host="127.0.0.1", port=None, env=None):
+        self.script = script
+        self.host = host
+        self.port = port or free_port(host)
+        self.url = f"http://{host}:{self.port}"
+        self.env = env
+        self.process = None
+        self._log = []
+
+    def start(self, timeout=STARTUP_TIMEOUT):
+        command = [sys.executable, "-m", "streamlit", "run", self.script,
+                   "--server.address", self.host, "--server.port", str(self.port),
+                   "--server.headless", "true", "--server.fileWatcherType", "none",
+                   "--browser.gatherUsageStats", "false"]
+        self.process = subprocess.Popen(command, cwd=ROOT, env=dict(os.environ, **(self.env or {})),
+                                        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        # Keep draining the log so a chatty app never blocks on a full pipe
+        threading.Thread(target=self._drain, daemon=True).start()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise AppServerError(f"streamlit exited with code {self.process.returncode}:\n{self.log()}")
+            try:
+                with urllib.request.urlopen(self.url + HEALTH_PATH, timeout=1) as response:
+                    if response.read().strip() == b"ok":
+                        return self
+            except OSError:
+                pass
+            time.sleep(0.1)
+        self.stop()
+        raise AppServerError(f"streamlit did not become healthy within {timeout}s:\n{self.log()}")
+
+    def _drain(self):
+        for line in self.process.stdout:
+            self._log.append(line)
+            del self._log[:-200]
+
+    def log(self):
+        return "".join(self._log)
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve app.py on a free port until interrupted.")
+    parser.add_argument("--port", type=int)
+    args = parser.parse_args()
+    with AppServer(port=args.port) as server:
+        print(f"Academy running on {server.url} (Ctrl+C to stop)")
+        try:
+            server.process.wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
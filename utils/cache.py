@@ -0,0 +1,232 @@
+import argparse
+import contextlib
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, writes are still atomic
+    fcntl = None
+
+# =============================================================================
+# ON-DISK CACHE
+# =============================================================================
+# Expensive parse results (report columns, indexes, signatures) are stored under
+# CACHE_DIR/<namespace>/<key><suffix>, keyed by a content digest of the input.
+# Every replica on a node points at the same directory (ACADEMY_CACHE_DIR), so
+# an artifact built by one replica is a cache hit for all of them. One replica
+# at a time prunes it in the background: entries unused for MAX_AGE go first,
+# then the least recently used ones until it fits in MAX_BYTES.
+CACHE_DIR = os.environ.get(
+    "ACADEMY_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"),
+)
+MAX_BYTES = int(float(os.environ.get("ACADEMY_CACHE_MAX_MB", "2048")) * 1024 * 1024)
+MAX_AGE = float(os.environ.get("ACADEMY_CACHE_MAX_AGE_DAYS", "7")) * 86400
+PRUNE_INTERVAL = 600
+# Entries used this recently are never evicted for size, temp files this young may still be written
+GRACE_SECONDS = 60
+TEMP_MAX_AGE = 3600
+
+
+def digest_stream(fileobj, algorithm="blake2b"):
+    """Hex digest of a binary file object, read in chunks. Rewinds the stream afterwards."""
+    fileobj.seek(0)
+    digest = hashlib.file_digest(fileobj, algorithm).hexdigest()
+    fileobj.seek(0)
+    return digest
+
+
+def digest_bytes(data, algorithm="blake2b"):
+    return hashlib.new(algorithm, data).hexdigest()
+
+
+def cache_path(namespace, key, suffix=""):
+    """Path for a cache entry. The namespace directory is created on demand."""
+    directory = os.path.join(CACHE_DIR, namespace)
+    os.makedirs(directory, exist_ok=True)
+    maybe_prune()
+    return os.path.join(directory, f"{key}{suffix}")
+
+
+def write_atomic(path, write):
+    """Calls write(fileobj) on a temp file next to path, then renames it into place."""
+    directory = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def spill(fileobj, namespace, suffix="", chunk_size=1 << 20):
+    """
+    Copies a seekable binary file object (an upload) into the cache, once per
+    content digest, in chunks. Returns its path, which a worker process can open.
+    """
+    path = cache_path(namespace, digest_stream(fileobj), suffix)
+    if os.path.exists(path):
+        # Counts as a use, so the LRU prune keeps it
+        with contextlib.suppress(OSError):
+            os.utime(path)
+    else:
+        write_atomic(path, lambda f: shutil.copyfileobj(fileobj, f, chunk_size))
+        fileobj.seek(0)
+    return path
+
+
+@contextlib.contextmanager
+def cache_lock(path, blocking=True):
+    """
+    Exclusive lock on path + ".lock", held across threads, processes and replicas
+    sharing CACHE_DIR. Re-check for the entry once it is held, so concurrent
+    requests for the same artifact build it once and the others load it.
+    Yields True once held; with blocking=False, yields False if someone else holds it.
+    """
+    if fcntl is None:
+        yield True
+        return
+    while True:
+        f = open(path + ".lock", "ab")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            f.close()
+            break
+        # prune() may have removed the lock file while this process waited on it
+        try:
+            if os.stat(path + ".lock").st_ino == os.fstat(f.fileno()).st_ino:
+                break
+        except FileNotFoundError:
+            pass
+        f.close()
+    if f.closed:
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        fcntl.flock(f, fcntl.LOCK_UN)
+        f.close()
+
+
+# =============================================================================
+# PRUNING
+# =============================================================================
+def _files(root):
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                yield path, name, os.stat(path)
+            except OSError:
+                continue
+
+
+def _remove(path):
+    """Removes a file unless its lock is held (an entry being built). Returns True if it was removed."""
+    with cache_lock(path, blocking=False) as held:
+        if held:
+            try:
+                os.unlink(path)
+                return True
+            except FileNotFoundError:
+                pass
+    return False
+
+
+def _remove_lock(lock):
+    if fcntl is None:
+        return
+    with open(lock, "ab") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(lock)
+
+
+def prune(max_bytes=MAX_BYTES, max_age=MAX_AGE, now=None):
+    """
+    Removes entries not used (read or written) for `max_age` seconds, then the least
+    recently used ones until the cache fits in `max_bytes`, along with leftover temp
+    files and the lock files of removed entries. Returns {"removed", "freed", "kept"} in files/bytes.
+    """
+    now = time.time() if now is None else now
+    entries, locks = [], []
+    removed = freed = 0
+    for path, name, stat in _files(CACHE_DIR):
+        if name.endswith(".lock"):
+            locks.append(path)
+        elif name.startswith(".tmp-"):
+            if now - stat.st_mtime > TEMP_MAX_AGE:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(path)
+                    removed, freed = removed + 1, freed + stat.st_size
+        elif not name.startswith("."):
+            entries.append((max(stat.st_atime, stat.st_mtime), stat.st_size, path))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    for used, size, path in entries:
+        expired = now - used > max_age
+        if (expired or total > max_bytes and now - used > GRACE_SECONDS) and _remove(path):
+            total -= size
+            removed, freed = removed + 1, freed + size
+    for lock in locks:
+        if not os.path.exists(lock[:-len(".lock")]):
+            _remove_lock(lock)
+    return {"removed": removed, "freed": freed, "kept": total}
+
+
+_next_prune = 0.0
+
+
+def maybe_prune():
+    """
+    Starts prune() on a daemon thread, at most every PRUNE_INTERVAL seconds per
+    process and across all replicas sharing CACHE_DIR (a stamp file records the last run).
+    """
+    global _next_prune
+    now = time.monotonic()
+    if now < _next_prune:
+        return
+    _next_prune = now + PRUNE_INTERVAL
+    stamp = os.path.join(CACHE_DIR, ".pruned")
+    try:
+        if time.time() - os.stat(stamp).st_mtime < PRUNE_INTERVAL:
+            return
+    except OSError:
+        pass
+    threading.Thread(target=_prune_once, args=(stamp,), name="cache-prune", daemon=True).start()
+
+
+def _prune_once(stamp):
+    with cache_lock(stamp, blocking=False) as held:
+        if held:
+            with open(stamp, "ab"):
+                os.utime(stamp)
+            prune()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prune the shared on-disk cache by age and size.")
+    parser.add_argument("--max-mb", type=float, default=MAX_BYTES / 1024 / 1024)
+    parser.add_argument("--max-age-days", type=float, default=MAX_AGE / 86400)
+    args = parser.parse_args()
+
+    result = prune(int(args.max_mb * 1024 * 1024), args.max_age_days * 86400)
+    print(f"{CACHE_DIR}: removed {result['removed']} files ({result['freed'] / 1e6:.1f} MB), "
+          f"{result['kept'] / 1e6:.1f} MB kept")
+
+
+if __name__ == "__main__":
+    main()
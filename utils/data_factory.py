@@ -0,0 +1,441 @@
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import zlib
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from utils.cache import cache_lock, cache_path, digest_bytes, write_atomic
+
+# =============================================================================
+# SCHEMA
+# =============================================================================
+# A schema is a list of Fields generated in order; a field may refer to fields
+# declared before it (an email built from the name columns, a discharge date
+# some days after admission, an amount whose distribution depends on a tier).
+# Every value is synthetic: names come from small built-in lists and emails
+# only use the reserved example.* domains (RFC 2606), so nothing can collide
+# with a real person or mailbox.
+Field = namedtuple("Field", ["name", "kind", "params"])
+
+FIRST_NAMES = np.array([
+    "Aria", "Ben", "Chloe", "Dev", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jonas", "Kira", "Luca",
+    "Maya", "Nico", "Olga", "Priya", "Quinn", "Rosa", "Sami", "Tara", "Umar", "Vera", "Wen", "Xavi",
+    "Yara", "Zane", "Amir", "Bea", "Caleb", "Dina", "Emil", "Fatima", "Gus", "Hana", "Ivan", "Jade",
+    "Kofi", "Lena", "Mateo", "Nora", "Omar", "Pia", "Rafael", "Sofia", "Theo", "Uma", "Viktor", "Zoe",
+])
+LAST_NAMES = np.array([
+    "Adler", "Banerjee", "Costa", "Dubois", "Eriksen", "Fischer", "Garcia", "Haddad", "Ibrahim", "Jensen",
+    "Kowalski", "Lindqvist", "Moreau", "Nakamura", "Okafor", "Petrov", "Quintero", "Rossi", "Schmidt",
+    "Tanaka", "Uddin", "Varga", "Wagner", "Xu", "Yilmaz", "Zhang", "Alvarez", "Brennan", "Chen", "Dlamini",
+    "Estevez", "Fontaine", "Gupta", "Horvat", "Ivanova", "Johansson", "Kim", "Larsen", "Mensah", "Novak",
+])
+SAFE_DOMAINS = ("example.com", "example.org", "example.net")
+
+
+BATCH_SIZE = 100_000
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def sequence(name, prefix="", start=1, width=8):
+    """Unique zero-padded row numbers: PAT-00000001, PAT-00000002, ..."""
+    return Field(name, "sequence", {"prefix": prefix, "start": start, "width": width})
+
+
+def uuid4(name):
+    return Field(name, "uuid4", {})
+
+
+def first_name(name="first_name"):
+    return Field(name, "choice", {"values": FIRST_NAMES, "weights": None})
+
+
+def last_name(name="last_name"):
+    return Field(name, "choice", {"values": LAST_NAMES, "weights": None})
+
+
+def full_name(name, first="first_name", last="last_name"):
+    return Field(name, "join", {"fields": (first, last), "sep": " "})
+
+
+def email(name, first="first_name", last="last_name", domains=SAFE_DOMAINS):
+    """first.last<NN>@example.* built from earlier name fields; the number keeps most addresses distinct."""
+    return Field(name, "email", {"fields": (first, last), "domains": np.array(domains)})
+
+
+def choice(name, values, weights=None):
+    return Field(name, "choice", {"values": np.array(values), "weights": weights})
+
+
+def integer(name, low, high, by=None):
+    """Uniform integers in [low, high]. With by=, low and high are dicts keyed by that field's values."""
+    return Field(name, "integer", {"low": low, "high": high, "by": by})
+
+
+def normal(name, mean, std, low=None, high=None, decimals=2, by=None):
+    return Field(name, "normal", {"mean": mean, "std": std, "low": low, "high": high, "decimals": decimals, "by": by})
+
+
+def lognormal(name, median, sigma, decimals=2, by=None):
+    """Right-skewed amounts (claims, transactions) around a median."""
+    return Field(name, "lognormal", {"median": median, "sigma": sigma, "decimals": decimals, "by": by})
+
+
+def date_between(name, start, end):
+    return Field(name, "date", {"start": np.datetime64(start, "D"), "end": np.datetime64(end, "D")})
+
+
+def days_after(name, field, low, high):
+    """A date low..high days after an earlier date field (admission -> discharge)."""
+    return Field(name, "days_after", {"field": field, "low": low, "high": high})
+
+
+def pattern(name, template):
+    """Fixed-format codes: '#' is a digit, '@' an uppercase letter, anything else is literal."""
+    return Field(name, "pattern", {"template": template})
+
+
+PATIENT_SCHEMA = [
+    sequence("patient_id", "PAT-", width=8),
+    pattern("mrn", "MRN-@@######"),
+    first_name(),
+    last_name(),
+    email("email"),
+    choice("sex", ["F", "M", "X"], [0.49, 0.49, 0.02]),
+    date_between("date_of_birth", "1930-01-01", "2023-12-31"),
+    choice("plan", ["basic", "standard", "premium"], [0.5, 0.35, 0.15]),
+    date_between("admitted_on", "2024-01-01", "2025-12-31"),
+    days_after("discharged_on", "admitted_on", 0, 21),
+    lognormal("claim_amount", {"basic": 800, "standard": 1500, "premium": 3200}, 0.8, by="plan"),
+]
+
+CUSTOMER_SCHEMA = [
+    uuid4("customer_id"),
+    first_name(),
+    last_name(),
+    full_name("full_name"),
+    email("email"),
+    pattern("iban", "DE## #### #### #### #### ##"),
+    choice("tier", ["retail", "gold", "private"], [0.8, 0.17, 0.03]),
+    integer("credit_score", {"retail": 480, "gold": 640, "private": 720},
+            {"retail": 760, "gold": 820, "private": 850}, by="tier"),
+    lognormal("monthly_spend", {"retail": 900, "gold": 3500, "private": 12000}, 0.6, by="tier"),
+    date_between("customer_since", "2005-01-01", "2025-12-31"),
+]
+
+SCHEMAS = {"patients": PATIENT_SCHEMA, "customers": CUSTOMER_SCHEMA}
+
+
+def validate_schema(schema):
+    """Raises SchemaError for duplicate names or references to fields not declared earlier."""
+    seen = set()
+    for field in schema:
+        if field.name in seen:
+            raise SchemaError(f"duplicate field {field.name!r}")
+        refs = list(field.params.get("fields", ()))
+        for key in ("field", "by"):
+            if field.params.get(key):
+                refs.append(field.params[key])
+        for ref in refs:
+            if ref not in seen:
+                raise SchemaError(f"{field.name!r} refers to {ref!r}, which must be declared before it")
+        seen.add(field.name)
+
+
+# =============================================================================
+# VECTORIZED GENERATORS
+# =============================================================================
+# Strings are assembled as (rows, width) matrices of code points and viewed as
+# a fixed-width unicode array, so a million IDs cost a few array operations
+# instead of a million Python format calls.
+_DIGITS = np.frombuffer("0123456789".encode("utf-32-le"), dtype=np.uint32)
+_LETTERS = np.frombuffer("ABCDEFGHIJKLMNOPQRSTUVWXYZ".encode("utf-32-le"), dtype=np.uint32)
+_HEX = np.frombuffer("0123456789abcdef".encode("utf-32-le"), dtype=np.uint32)
+
+
+def _codepoints_to_str(matrix):
+    matrix = np.ascontiguousarray(matrix, dtype=np.uint32)
+    return matrix.view(f"<U{matrix.shape[1]}").ravel()
+
+
+def _literal(text):
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+def _sequence(rng, n, offset, params):
+    prefix, width = params["prefix"], params["width"]
+    numbers = params["start"] + offset + np.arange(n, dtype=np.int64)
+    if numbers[-1] >= 10 ** width:
+        raise SchemaError(f"sequence needs more than {width} digits")
+    digits = _DIGITS[numbers[:, None] // 10 ** np.arange(width - 1, -1, -1) % 10]
+    return _codepoints_to_str(np.hstack([np.broadcast_to(_literal(prefix), (n, len(prefix))), digits]))
+
+
+def _uuid4(rng, n, offset, params):
+    raw = rng.integers(0, 256, (n, 16), dtype=np.uint8)
+    raw[:, 6] = raw[:, 6] & 0x0F | 0x40
+    raw[:, 8] = raw[:, 8] & 0x3F | 0x80
+    nibbles = np.empty((n, 32), dtype=np.uint8)
+    nibbles[:, 0::2], nibbles[:, 1::2] = raw >> 4, raw & 0x0F
+    hexes = _HEX[nibbles]
+    dash = np.full((n, 1), ord("-"), dtype=np.uint32)
+    return _codepoints_to_str(np.hstack([hexes[:, :8], dash, hexes[:, 8:12], dash, hexes[:, 12:16], dash,
+                                         hexes[:, 16:20], dash, hexes[:, 20:]]))
+
+
+def _pattern(rng, n, offset, params):
+    template = _literal(params["template"])
+    matrix = np.broadcast_to(template, (n, len(template))).copy()
+    digit_cols = np.flatnonzero(template == ord("#"))
+    letter_cols = np.flatnonzero(template == ord("@"))
+    matrix[:, digit_cols] = _DIGITS[rng.integers(0, 10, (n, len(digit_cols)))]
+    matrix[:, letter_cols] = _LETTERS[rng.integers(0, 26, (n, len(letter_cols)))]
+    return _codepoints_to_str(matrix)
+
+
+def _choice(rng, n, offset, params):
+    values, weights = params["values"], params["weights"]
+    if weights is None:
+        codes = rng.integers(0, len(values), n)
+    else:
+        cumulative = np.cumsum(weights, dtype=float)
+        codes = np.searchsorted(cumulative / cumulative[-1], rng.random(n), side="right")
+    return pd.Categorical.from_codes(codes.astype(np.int16), categories=values)
+
+
+def _by(params, key, columns):
+    """A parameter as a scalar, or per row when given as a dict keyed by the `by` field's values."""
+    value = params[key]
+    if not isinstance(value, dict):
+        return value
+    categorical = columns[params["by"]]
+    try:
+        lookup = np.array([value[category] for category in categorical.categories], dtype=float)
+    except KeyError as exc:
+        raise SchemaError(f"{key} has no value for {params['by']}={exc.args[0]!r}") from None
+    return lookup[categorical.codes]
+
+
+def _strings(column):
+    """A fixed-width unicode array; categoricals are expanded from their (small) category list."""
+    if isinstance(column, pd.Categorical):
+        return np.asarray(column.categories, dtype=str)[column.codes]
+    return column
+
+
+def _integer(rng, n, offset, params, columns):
+    low, high = _by(params, "low", columns), _by(params, "high", columns)
+    return np.floor(low + rng.random(n) * (np.asarray(high) - low + 1)).astype(np.int64)
+
+
+def _normal(rng, n, offset, params, columns):
+    values = rng.normal(_by(params, "mean", columns), _by(params, "std", columns), n)
+    if params["low"] is not None or params["high"] is not None:
+        values = np.clip(values, params["low"], params["high"])
+    return values.round(params["decimals"])
+
+
+def _lognormal(rng, n, offset, params, columns):
+    median = _by(params, "median", columns)
+    return (median * np.exp(rng.normal(0, params["sigma"], n))).round(params["decimals"])
+
+
+def _date(rng, n, offset, params):
+    span = (params["end"] - params["start"]).astype(np.int64) + 1
+    return params["start"] + rng.integers(0, span, n).astype("timedelta64[D]")
+
+
+def _days_after(rng, n, offset, params, columns):
+    return columns[params["field"]] + rng.integers(params["low"], params["high"] + 1, n).astype("timedelta64[D]")
+
+
+def _join(rng, n, offset, params, columns):
+    first, second = (_strings(columns[name]) for name in params["fields"])
+    return np.char.add(np.char.add(first, params["sep"]), second)
+
+
+_EMAIL_NUMBERS = np.array([""] + [str(i) for i in range(1, 1000)])
+
+
+def _email(rng, n, offset, params, columns):
+    parts = []
+    for name in params["fields"]:
+        column = columns[name]
+        if isinstance(column, pd.Categorical):
+            parts.append(np.char.lower(np.asarray(column.categories, dtype=str))[column.codes])
+        else:
+            parts.append(np.char.lower(column))
+    local = np.char.add(np.char.add(parts[0], "."), parts[1])
+    numbers = np.where(rng.random(n) < 0.7, rng.integers(1, 1000, n), 0)
+    domain = params["domains"][rng.integers(0, len(params["domains"]), n)]
+    return np.char.add(np.char.add(np.char.add(local, _EMAIL_NUMBERS[numbers]), "@"), domain)
+
+
+_INDEPENDENT = {"sequence": _sequence, "uuid4": _uuid4, "pattern": _pattern, "choice": _choice, "date": _date}
+_DEPENDENT = {"integer": _integer, "normal": _normal, "lognormal": _lognormal, "days_after": _days_after,
+              "join": _join, "email": _email}
+
+
+def generate_columns(schema, rows, seed=0, batch_size=BATCH_SIZE):
+    """
+    Yields dicts of column arrays of up to batch_size rows until `rows` have been produced.
+    Each (batch, field name) pair draws from its own SeedSequence child, so output is
+    reproducible for a given seed and batch size, and adding or reordering fields
+    does not change the values of the others.
+    """
+    validate_schema(schema)
+    entropy = np.random.SeedSequence(seed).entropy
+    keys = [zlib.crc32(field.name.encode("utf-8")) for field in schema]
+    for batch, offset in enumerate(range(0, rows, batch_size)):
+        n = min(batch_size, rows - offset)
+        columns = {}
+        for key, field in zip(keys, schema):
+            rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(batch, key)))
+            if field.kind in _INDEPENDENT:
+                columns[field.name] = _INDEPENDENT[field.kind](rng, n, offset, field.params)
+            elif field.kind in _DEPENDENT:
+                columns[field.name] = _DEPENDENT[field.kind](rng, n, offset, field.params, columns)
+            else:
+                raise SchemaError(f"unknown field kind {field.kind!r}")
+        yield columns
+
+
+def generate(schema, rows, seed=0, batch_size=BATCH_SIZE):
+    """Like generate_columns(), as DataFrames."""
+    for columns in generate_columns(schema, rows, seed, batch_size):
+        yield pd.DataFrame(columns, copy=False)
+
+
+def preview(schema, rows=1000, seed=0, total_rows=None, batch_size=BATCH_SIZE):
+    """
+    The first `rows` records of the dataset that write()/export() produce for
+    `total_rows` (default: `rows`) with the same seed. Draws depend on the batch
+    length, so the whole first batch is generated and then sliced.
+    """
+    total_rows = rows if total_rows is None else total_rows
+    first = next(generate(schema, min(total_rows, batch_size), seed, batch_size))
+    return first.head(rows)
+
+
+# =============================================================================
+# STREAMING WRITERS
+# =============================================================================
+# Writers consume the column batches one at a time, so memory stays at one batch
+# no matter how many rows are written. CSV and Parquet go through Arrow; JSON
+# lines are assembled column-wise with Arrow string kernels.
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+
+
+def _arrow_table(columns):
+    arrays = {}
+    for name, column in columns.items():
+        if isinstance(column, pd.Categorical):
+            arrays[name] = pa.DictionaryArray.from_arrays(column.codes, np.asarray(column.categories, dtype=str))
+        else:
+            arrays[name] = pa.array(column)
+    return pa.table(arrays)
+
+
+def write_csv(batches, fileobj):
+    for i, columns in enumerate(batches):
+        table = _arrow_table(columns)
+        table = table.cast(pa.schema([pa.field(f.name, pa.string()) if pa.types.is_dictionary(f.type) else f
+                                      for f in table.schema]))
+        pa_csv.write_csv(table, fileobj, pa_csv.WriteOptions(include_header=i == 0, quoting_style="needed"))
+
+
+def _json_tokens(array):
+    """JSON tokens for one Arrow column, as a string array."""
+    if pa.types.is_dictionary(array.type):
+        tokens = pa.array([json.dumps(value) for value in array.dictionary.to_pylist()])
+        return tokens.take(array.indices)
+    if pa.types.is_string(array.type):
+        escaped = pc.replace_substring(pc.replace_substring(array, "\\", "\\\\"), '"', '\\"')
+        return pc.binary_join_element_wise('"', escaped, '"', "")
+    if pa.types.is_date(array.type):
+        return pc.binary_join_element_wise('"', array.cast(pa.string()), '"', "")
+    return array.cast(pa.string())
+
+
+def write_jsonl(batches, fileobj):
+    for columns in batches:
+        table = _arrow_table(columns)
+        fields = [pc.binary_join_element_wise(json.dumps(name) + ":", _json_tokens(table.column(name).combine_chunks()), "")
+                  for name in table.column_names]
+        lines = pc.binary_join_element_wise("{", pc.binary_join_element_wise(*fields, ","), "}\n", "")
+        offsets, data = lines.buffers()[1:]
+        first, last = np.frombuffer(offsets, dtype=np.int32)[[lines.offset, lines.offset + len(lines)]]
+        fileobj.write(memoryview(data)[first:last])
+
+
+def write_parquet(batches, fileobj):
+    writer = None
+    try:
+        for columns in batches:
+            table = _arrow_table(columns)
+            if writer is None:
+                writer = pq.ParquetWriter(fileobj, table.schema, compression="zstd")
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "parquet": write_parquet}
+
+
+def write(schema, rows, fileobj, fmt="csv", seed=0, batch_size=BATCH_SIZE):
+    """Generates `rows` records straight into a binary file object."""
+    WRITERS[fmt](generate_columns(schema, rows, seed, batch_size), fileobj)
+
+
+def to_bytes(schema, rows, fmt="csv", seed=0):
+    buffer = io.BytesIO()
+    write(schema, rows, buffer, fmt, seed)
+    return buffer.getvalue()
+
+
+def export(schema, rows, fmt="csv", seed=0):
+    """Writes the dataset once under CACHE_DIR/data_factory and returns its path; output is deterministic."""
+    key = digest_bytes(f"{schema!r}|{rows}|{seed}".encode("utf-8"))
+    path = cache_path("data_factory", key, f".{fmt}")
+    if not os.path.exists(path):
+        with cache_lock(path):
+            if not os.path.exists(path):
+                write_atomic(path, lambda f: write(schema, rows, f, fmt, seed))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream synthetic PII-free records to a file or stdout.")
+    parser.add_argument("schema", choices=list(SCHEMAS))
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=list(FORMATS), default="csv")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--out", help="output file (default: stdout)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.out:
+        with open(args.out, "wb") as f:
+            write(SCHEMAS[args.schema], args.rows, f, args.format, args.seed, args.batch_size)
+        print(f"{args.rows:,} {args.schema} -> {args.out} in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    else:
+        write(SCHEMAS[args.schema], args.rows, sys.stdout.buffer, args.format, args.seed, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
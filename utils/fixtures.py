@@ -0,0 +1,144 @@
+import json
+import mimetypes
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# =============================================================================
+# LOCAL FIXTURE SITE
+# =============================================================================
+# The bundled pages under fixtures/playground are served on a fake origin via
+# Playwright routing, so learner code runs fully offline and never leaves the
+# browser context.
+FIXTURE_ORIGIN = "http://academy.test"
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "playground")
+FIXTURE_PASSWORD = "1234"
+SESSION_TTL_SECONDS = 3600
+
+_file_cache = {}
+
+
+def _read_fixture(path):
+    """Returns the bytes of a fixture file, reading each file from disk once."""
+    if path not in _file_cache:
+        name = os.path.normpath(path.lstrip("/") or "login.html")
+        full_path = os.path.join(FIXTURE_DIR, name)
+        if name.startswith("..") or not os.path.isfile(full_path):
+            _file_cache[path] = None
+        else:
+            with open(full_path, "rb") as f:
+                _file_cache[path] = f.read()
+    return _file_cache[path]
+
+
+def _json_response(status, payload):
+    return status, {"Content-Type": "application/json"}, json.dumps(payload).encode("utf-8")
+
+
+def _api_login(body):
+    username = body.get("username", "").strip()
+    if not username or body.get("password") != FIXTURE_PASSWORD:
+        return _json_response(401, {"error": "Invalid credentials"})
+    return _json_response(200, {
+        "token": f"tok-{username}-{body.get('tenant') or 'default'}",
+        "user": username,
+        "role": username.split("@")[0],
+        "tenant": body.get("tenant") or "default",
+        "expires_in": SESSION_TTL_SECONDS,
+    })
+
+
+def _api_payments(body):
+    if body.get("amount", 0) < 0:
+        return _json_response(400, {"error": "Invalid Amount"})
+    return _json_response(200, {"success": True, "txnId": "TXN-0001"})
+
+
+FIXTURE_API = {
+    ("POST", "/api/login"): _api_login,
+    ("POST", "/api/payments"): _api_payments,
+}
+
+
+def fixture_response(method, path, body=None):
+    """Resolves a request against the fixture site. Returns (status, headers, body)."""
+    handler = FIXTURE_API.get((method.upper(), path))
+    if handler is not None:
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return _json_response(400, {"error": "Malformed JSON"})
+        return handler(payload)
+
+    content = _read_fixture(path)
+    if content is None:
+        return 404, {"Content-Type": "text/plain"}, b"Not Found"
+    content_type = mimetypes.guess_type(path)[0] or "text/html"
+    return 200, {"Content-Type": content_type}, content
+
+
+def _fulfill_fixture(route):
+    request = route.request
+    status, headers, body = fixture_response(request.method, urlsplit(request.url).path, request.post_data_buffer)
+    route.fulfill(status=status, headers=headers, body=body)
+
+
+def _abort_external(route):
+    route.abort("blockedbyclient")
+
+
+def install_fixture_routes(context):
+    """Serves the fixture site on FIXTURE_ORIGIN and blocks every other host."""
+    # Routes are matched newest-first, so the fixture handler wins for its origin
+    context.route("**/*", _abort_external)
+    context.route(f"{FIXTURE_ORIGIN}/**", _fulfill_fixture)
+
+
+async def _fulfill_fixture_async(route):
+    request = route.request
+    status, headers, body = fixture_response(request.method, urlsplit(request.url).path, request.post_data_buffer)
+    await route.fulfill(status=status, headers=headers, body=body)
+
+
+async def _abort_external_async(route):
+    await route.abort("blockedbyclient")
+
+
+async def install_fixture_routes_async(context):
+    """install_fixture_routes() for contexts from playwright.async_api."""
+    await context.route("**/*", _abort_external_async)
+    await context.route(f"{FIXTURE_ORIGIN}/**", _fulfill_fixture_async)
+
+
+# =============================================================================
+# REAL HTTP SERVER
+# =============================================================================
+# Stacks that cannot intercept requests in-process (Selenium, other browsers)
+# load the same fixture site from a loopback server instead.
+class _FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        status, headers, content = fixture_response(self.command, urlsplit(self.path).path, body)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fixtures(host="127.0.0.1", port=0):
+    """Serves the fixture site over real HTTP on a background thread. Returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), _FixtureHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
@@ -0,0 +1,420 @@
+import argparse
+import io
+import os
+import pyexpat
+import re
+import sys
+import zipfile
+from collections import namedtuple
+from multiprocessing.connection import wait
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import cache_lock, cache_path, digest_bytes, digest_stream, write_atomic
+from utils.report_ingest import parse_timestamp_ms
+from utils.worker_process import spawn_worker, worker_connection
+
+# =============================================================================
+# TEST HISTORY MATRIX
+# =============================================================================
+# Many CI runs of JUnit XML are reduced to a tests x runs matrix of outcome bits
+# plus a matching float32 duration matrix. A test that failed and then passed on
+# retry within one run (a repeated testcase, or Surefire's <flakyFailure>) has
+# both PASSED and FAILED set.
+NOT_RUN, PASSED, FAILED, SKIPPED = 0, 1, 2, 4
+History = namedtuple("History", ["tests", "runs", "outcome", "duration_ms"])
+
+MIN_RUNS_PER_WORKER = 16
+DEFAULT_WORKERS = min(os.cpu_count() or 1, 8)
+BAD_RUN_SHARE = 0.2
+
+
+class HistoryError(ValueError):
+    pass
+
+
+# =============================================================================
+# STREAMING JUNIT PARSER
+# =============================================================================
+_GROUPED_NUMBER = re.compile(r"\d{1,3}(,\d{3})+(\.\d*)?\Z")
+
+
+def parse_seconds(text):
+    """
+    A testcase's time attribute in seconds, or None if it is not a number.
+    Accepts the grouping commas some Surefire versions write ("1,234.5") and a
+    decimal comma ("0,25").
+    """
+    text = (text or "0").strip()
+    if _GROUPED_NUMBER.match(text):
+        text = text.replace(",", "")
+    elif text.count(",") == 1 and "." not in text:
+        text = text.replace(",", ".")
+    try:
+        seconds = float(text)
+    except ValueError:
+        return None
+    return seconds if np.isfinite(seconds) else None
+
+
+def parse_junit_run(files):
+    """
+    Parses the JUnit XML files of one CI run with expat, without building a tree.
+    Returns (test_names, durations_ms float32, outcome_bits uint8, started_ms or None).
+    """
+    names, times, bits = [], [], []
+    started = []
+    add_name, add_time, add_bits = names.append, times.append, bits.append
+
+    def start(tag, attrs):
+        if tag == "testcase":
+            classname = attrs.get("classname")
+            name = attrs.get("name", "?")
+            seconds = parse_seconds(attrs.get("time"))
+            if seconds is None:
+                raise HistoryError(f"Invalid time {attrs.get('time')!r} for test {name!r} in {current[0]}")
+            add_name(f"{classname}.{name}" if classname else name)
+            add_time(seconds)
+            add_bits(PASSED)
+        elif tag == "failure" or tag == "error":
+            if bits:
+                bits[-1] = FAILED
+        elif tag == "flakyFailure" or tag == "flakyError":
+            # Failed, then passed when Surefire reran it; <rerunFailure> only repeats a <failure>
+            if bits:
+                bits[-1] |= FAILED
+        elif tag == "skipped":
+            if bits:
+                bits[-1] = SKIPPED
+        elif tag == "testsuite":
+            stamp = parse_timestamp_ms(attrs.get("timestamp"))
+            if stamp is not None:
+                started.append(stamp)
+
+    current = [None]
+    for f in files:
+        current[0] = getattr(f, "name", "report")
+        parser = pyexpat.ParserCreate()
+        parser.StartElementHandler = start
+        try:
+            parser.ParseFile(f)
+        except pyexpat.ExpatError as e:
+            raise HistoryError(f"Malformed JUnit XML in {current[0]}: {e}") from None
+    durations = np.array(times, dtype=np.float32) * 1000 if times else np.empty(0, np.float32)
+    return names, durations, np.array(bits, dtype=np.uint8), min(started) if started else None
+
+
+def _natural_key(name):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+def _group_runs(paths):
+    """
+    Groups report paths into runs: by parent directory when reports live in more
+    than one directory (one folder per CI run), otherwise one file per run.
+    """
+    paths = [p for p in paths if p.lower().endswith(".xml") and "/__MACOSX/" not in f"/{p}"]
+    parents = {os.path.dirname(p) for p in paths}
+    groups = {}
+    for p in sorted(paths):
+        groups.setdefault(os.path.dirname(p) if len(parents) > 1 else p, []).append(p)
+    return sorted(groups.items(), key=lambda item: _natural_key(item[0]))
+
+
+class _Source:
+    """A zip archive or a directory of reports, openable from any process."""
+
+    def __init__(self, path):
+        self.path = path
+        self.is_zip = zipfile.is_zipfile(path)
+        if self.is_zip:
+            with zipfile.ZipFile(path) as z:
+                self.members = [i.filename for i in z.infolist() if not i.is_dir()]
+        elif os.path.isdir(path):
+            self.members = [os.path.relpath(os.path.join(d, f), path)
+                            for d, _, files in os.walk(path) for f in files]
+        else:
+            raise HistoryError(f"{path} is neither a zip archive nor a directory")
+
+    def parse(self, members):
+        if self.is_zip:
+            with zipfile.ZipFile(self.path) as z:
+                handles = [z.open(m) for m in members]
+                try:
+                    return parse_junit_run(handles)
+                finally:
+                    for h in handles:
+                        h.close()
+        handles = [open(os.path.join(self.path, m), "rb") for m in members]
+        try:
+            return parse_junit_run(handles)
+        finally:
+            for h in handles:
+                h.close()
+
+
+def _worker_main(conn):
+    # Errors go back as plain strings: exception classes defined in __main__ do not unpickle in the parent
+    try:
+        source_path, jobs = conn.recv()
+        source = _Source(source_path)
+        for index, members in jobs:
+            conn.send(("run", index, source.parse(members)))
+        conn.send(("done",))
+    except (EOFError, BrokenPipeError):
+        pass
+    except Exception as e:
+        conn.send(("failed", type(e).__name__, str(e)))
+
+
+def _iter_runs(source, runs, workers):
+    """
+    Yields (run_index, parsed_run) as runs are parsed, fanning out to worker
+    processes for large histories. Runs arrive in completion order.
+    """
+    workers = min(workers, len(runs) // MIN_RUNS_PER_WORKER)
+    if workers <= 1:
+        for index, (_, members) in enumerate(runs):
+            yield index, source.parse(members)
+        return
+    batches = [[] for _ in range(workers)]
+    for index, (_, members) in enumerate(runs):
+        batches[index % workers].append((index, members))
+    started = []
+    try:
+        for batch in batches:
+            process, conn = spawn_worker("utils.flakiness", "--worker")
+            conn.send((source.path, batch))
+            started.append((process, conn))
+        pending = [conn for _, conn in started]
+        while pending:
+            for conn in wait(pending):
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    raise RuntimeError("A report parser process exited unexpectedly.") from None
+                if message[0] == "run":
+                    yield message[1:]
+                elif message[0] == "done":
+                    pending.remove(conn)
+                elif message[1] == "HistoryError":
+                    raise HistoryError(message[2])
+                else:
+                    raise RuntimeError(f"A report parser process failed: {message[1]}: {message[2]}")
+    finally:
+        for process, conn in started:
+            conn.close()
+            process.wait()
+
+
+def _build_matrix(labels, parsed_runs):
+    """Interns test names run by run so only one run's names are held at a time."""
+    ids = {}
+    columns = [None] * len(labels)
+    previous_names, previous_codes = None, None
+    for index, (names, durations, bits, started) in parsed_runs:
+        if names == previous_names:
+            codes = previous_codes
+        else:
+            codes = np.fromiter((ids.setdefault(n, len(ids)) for n in names), dtype=np.int64, count=len(names))
+            previous_names, previous_codes = names, codes
+        columns[index] = (codes, durations, bits, started)
+
+    outcome = np.zeros((len(ids), len(labels)), dtype=np.uint8)
+    duration = np.full((len(ids), len(labels)), np.nan, dtype=np.float32)
+    for run, (codes, durations, bits, _) in enumerate(columns):
+        # ufunc.at keeps both outcomes when a retried test appears twice in a run
+        np.bitwise_or.at(outcome[:, run], codes, bits)
+        duration[codes, run] = durations
+
+    # Chronological order when every run carries a suite timestamp, else by name
+    stamps = [column[3] for column in columns]
+    if all(s is not None for s in stamps):
+        order = np.argsort(np.array(stamps), kind="stable")
+        labels = [labels[i] for i in order]
+        outcome, duration = outcome[:, order], duration[:, order]
+    return History(list(ids), labels, outcome, duration)
+
+
+# =============================================================================
+# LOADING + CACHE
+# =============================================================================
+def _save(path, history):
+    def write(f):
+        np.savez(f, tests=np.array(history.tests, dtype=str), runs=np.array(history.runs, dtype=str),
+                 outcome=history.outcome, duration_ms=history.duration_ms)
+    write_atomic(path, write)
+
+
+def _load(path):
+    with np.load(path) as data:
+        return History(data["tests"].tolist(), data["runs"].tolist(), data["outcome"], data["duration_ms"])
+
+
+def _directory_digest(path):
+    entries = []
+    for d, _, files in os.walk(path):
+        for f in files:
+            st = os.stat(os.path.join(d, f))
+            entries.append(f"{os.path.relpath(os.path.join(d, f), path)}:{st.st_size}:{st.st_mtime_ns}")
+    return digest_bytes("\n".join(sorted(entries)).encode())
+
+
+def _reporting(parsed_runs, total, progress):
+    for done, item in enumerate(parsed_runs, 1):
+        progress(done / total, f"Parsed {done:,} of {total:,} runs")
+        yield item
+
+
+def load_history(source, workers=DEFAULT_WORKERS, progress=None):
+    """
+    Builds the test x run matrix from a directory or zip of JUnit XML reports.
+    `source` is a path, the bytes of a zip or a seekable binary file object holding
+    one. The matrix is cached on disk by content digest. Returns (History, cache_hit).
+    progress(fraction, message), if given, is called as runs are parsed.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        if os.path.isdir(path):
+            digest = _directory_digest(path)
+        else:
+            with open(path, "rb") as f:
+                digest = digest_stream(f)
+    else:
+        digest = digest_stream(source)
+        path = cache_path("flakiness", digest, ".zip")
+        if not os.path.exists(path):
+            # Worker processes need the archive on disk
+            write_atomic(path, lambda f: f.write(source.read()))
+            source.seek(0)
+    matrix_path = cache_path("flakiness", digest, ".npz")
+    if os.path.exists(matrix_path):
+        return _load(matrix_path), True
+    with cache_lock(matrix_path):
+        if os.path.exists(matrix_path):
+            return _load(matrix_path), True
+        src = _Source(path)
+        runs = _group_runs(src.members)
+        if not runs:
+            raise HistoryError("No JUnit XML reports found.")
+        parsed = _iter_runs(src, runs, workers)
+        if progress:
+            parsed = _reporting(parsed, len(runs), progress)
+        history = _build_matrix([label for label, _ in runs], parsed)
+        if not history.tests:
+            raise HistoryError("The reports contain no test cases.")
+        _save(matrix_path, history)
+    return history, False
+
+
+# =============================================================================
+# VECTORIZED SCORING
+# =============================================================================
+def _previous_executed(executed):
+    """For every cell, the column of the last executed run strictly before it (-1 if none)."""
+    n_runs = executed.shape[1]
+    dtype = np.int16 if n_runs < np.iinfo(np.int16).max else np.int32
+    last = np.where(executed, np.arange(n_runs, dtype=dtype), dtype(-1))
+    np.maximum.accumulate(last, axis=1, out=last)
+    previous = np.empty_like(last)
+    previous[:, 0] = -1
+    previous[:, 1:] = last[:, :-1]
+    return previous
+
+
+def score_history(history, bad_run_share=BAD_RUN_SHARE):
+    """
+    Scores every test over the run history. Returns (ranking, runs) DataFrames.
+
+    - flip_rate: pass<->fail transitions between consecutive executed runs (a
+      pass on retry within one run counts as a flip), per opportunity.
+    - isolation: failure streaks per failure; 1.0 means every failure was a
+      one-off, low values mean consecutive failures (a real breakage).
+    - infra_share: share of a test's failures in runs where at least one other
+      test, and at least `bad_run_share` of the other tests, failed too
+      (environment problems). A test failing alone is never blamed on the run.
+    - duration_cv: coefficient of variation of the test's duration.
+    - score: flip_rate * (1 - infra_share), for tests that both passed and failed.
+    """
+    outcome = history.outcome
+    passed = (outcome & PASSED) != 0
+    failed = (outcome & FAILED) != 0
+    executed = passed | failed
+    state = outcome & (PASSED | FAILED)
+
+    n_exec = executed.sum(axis=1)
+    n_fail = failed.sum(axis=1)
+    n_pass = passed.sum(axis=1)
+    retried = (passed & failed).sum(axis=1)
+
+    previous = _previous_executed(executed)
+    has_previous = previous >= 0
+    previous_state = np.take_along_axis(state, np.maximum(previous, 0), axis=1)
+    flips = (executed & has_previous & (state != previous_state)).sum(axis=1) + retried
+    streaks = (failed & ~(has_previous & ((previous_state & FAILED) != 0))).sum(axis=1)
+
+    run_exec = executed.sum(axis=0)
+    run_fail = failed.sum(axis=0)
+    run_fail_share = run_fail / np.maximum(run_exec, 1)
+    bad_runs = (run_fail >= 2) & (run_fail_share >= bad_run_share)
+    # Judged on the other tests of the run, so a test's own failure never makes its run look bad
+    rows, cols = np.nonzero(failed)
+    other_fail, other_exec = run_fail[cols] - 1, run_exec[cols] - 1
+    infra = (other_fail >= 1) & (other_fail >= bad_run_share * other_exec)
+    infra_fail = np.bincount(rows[infra], minlength=len(history.tests))
+
+    d = np.where(executed, history.duration_ms, 0).astype(np.float64)
+    mean = d.sum(axis=1) / np.maximum(n_exec, 1)
+    var = np.maximum((d * d).sum(axis=1) / np.maximum(n_exec, 1) - mean * mean, 0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        flip_rate = flips / np.maximum(n_exec - 1 + retried, 1)
+        infra_share = np.where(n_fail > 0, infra_fail / np.maximum(n_fail, 1), 0.0)
+        ranking = pd.DataFrame({
+            "test": history.tests,
+            "runs": n_exec,
+            "failures": n_fail,
+            "fail_rate_%": n_fail / np.maximum(n_exec, 1) * 100,
+            "flips": flips,
+            "flip_rate": flip_rate,
+            "passed_on_retry": retried,
+            "isolation": np.where(n_fail > 0, streaks / np.maximum(n_fail, 1), np.nan),
+            "infra_share": infra_share,
+            "mean_ms": mean,
+            "duration_cv": np.where(mean > 0, np.sqrt(var) / mean, np.nan),
+            "score": np.where((n_fail > 0) & (n_pass > 0), flip_rate * (1 - infra_share), 0.0),
+        })
+    ranking = ranking.sort_values(["score", "fail_rate_%"], ascending=False, ignore_index=True)
+    runs = pd.DataFrame({
+        "run": history.runs,
+        "tests": run_exec,
+        "failures": run_fail,
+        "fail_share_%": run_fail_share * 100,
+        "bad_run": bad_runs,
+    })
+    return ranking, runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank the flakiest tests in a directory or zip of JUnit XML runs.")
+    parser.add_argument("source")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--bad-run-share", type=float, default=BAD_RUN_SHARE)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+    history, hit = load_history(args.source, workers=args.workers)
+    ranking, runs = score_history(history, args.bad_run_share)
+    print(f"{len(history.tests):,} tests x {len(history.runs):,} runs, "
+          f"{int(runs['bad_run'].sum())} bad runs{' [cached]' if hit else ''}")
+    with pd.option_context("display.width", 200, "display.max_colwidth", 60):
+        print(ranking.head(args.top).round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    if sys.argv[2:3] == ["--worker"]:
+        _worker_main(worker_connection())
+    else:
+        main()
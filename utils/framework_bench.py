@@ -0,0 +1,287 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import write_atomic
+from utils.fixtures import FIXTURE_PASSWORD, serve_fixtures
+
+# =============================================================================
+# SCENARIO
+# =============================================================================
+# Every stack runs the same scenario against the bundled fixture site served on
+# loopback, split into timed steps. A step a stack has no equivalent for (a
+# Selenium session is its own isolation unit, there is no separate context) is
+# left out of its samples rather than reported as zero.
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "benchmarks")
+DEFAULT_DATASET = os.path.join(DATA_DIR, "framework_execution.json")
+DATASET_VERSION = 1
+
+STEPS = ["launch", "new_context", "navigate", "form_fill", "network_mock", "teardown"]
+STEP_NOTES = {
+    "launch": "start a headless Chromium (Selenium: chromedriver + new session)",
+    "new_context": "fresh isolated context and page",
+    "navigate": "load /login.html",
+    "form_fill": "fill username and password, submit, wait for the dashboard",
+    "network_mock": "fail POST /api/payments with a 500, pay, wait for the error message",
+    "teardown": "close the context and browser (Selenium: quit the session)",
+}
+ERROR_TEXT = "Something went wrong. Please try again."
+
+# Selenium has no request interception without BiDi, so the payment call is
+# failed by stubbing fetch in the page, which is what most Selenium suites do.
+_FETCH_STUB = """
+const realFetch = window.fetch;
+window.fetch = (url, init) => String(url).endsWith('/api/payments')
+    ? Promise.resolve(new Response('Internal Server Error', {status: 500}))
+    : realFetch(url, init);
+"""
+
+
+class StackUnavailable(Exception):
+    pass
+
+
+class _Stopwatch:
+    def __init__(self):
+        self.laps = {}
+
+    @contextlib.contextmanager
+    def step(self, name):
+        started = time.perf_counter()
+        yield
+        self.laps[name] = (time.perf_counter() - started) * 1000
+
+
+# =============================================================================
+# STACKS
+# =============================================================================
+class PlaywrightStack:
+    name = "Playwright"
+
+    def __init__(self):
+        from playwright.sync_api import expect, sync_playwright
+
+        self._expect = expect
+        self._manager = sync_playwright()
+        self._p = self._manager.start()
+        self.versions = {"library": metadata.version("playwright"), "browser": None}
+
+    def iteration(self, watch, base_url):
+        browser = None
+        try:
+            with watch.step("launch"):
+                browser = self._p.chromium.launch(headless=True)
+            self.versions["browser"] = browser.version
+            with watch.step("new_context"):
+                context = browser.new_context(base_url=base_url)
+                page = context.new_page()
+            with watch.step("navigate"):
+                page.goto("/login.html")
+            with watch.step("form_fill"):
+                page.get_by_label("Username").fill("admin")
+                page.get_by_label("Password").fill(FIXTURE_PASSWORD)
+                page.get_by_role("button", name="Sign in").click()
+                page.wait_for_url("**/dashboard.html")
+            with watch.step("network_mock"):
+                page.route("**/api/payments", lambda route: route.fulfill(status=500, body="Internal Server Error"))
+                page.goto("/checkout.html")
+                page.get_by_role("button", name="Pay Now").click()
+                self._expect(page.get_by_text(ERROR_TEXT)).to_be_visible()
+            with watch.step("teardown"):
+                context.close()
+                browser.close()
+                browser = None
+        finally:
+            if browser is not None:
+                browser.close()
+
+    def close(self):
+        self._manager.__exit__(None, None, None)
+
+
+class SeleniumStack:
+    """Selenium with a chromedriver already on the machine (CHROMEDRIVER or PATH); never downloads one."""
+    name = "Selenium"
+
+    def __init__(self):
+        try:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.service import Service
+        except ImportError:
+            raise StackUnavailable("selenium is not installed") from None
+        driver_path = os.environ.get("CHROMEDRIVER") or shutil.which("chromedriver")
+        if not driver_path:
+            raise StackUnavailable("no local chromedriver (put it on PATH or set CHROMEDRIVER)")
+        self._webdriver = webdriver
+        self._service = Service(driver_path)
+        self.versions = {"library": metadata.version("selenium"), "browser": None}
+
+    def _options(self):
+        options = self._webdriver.ChromeOptions()
+        options.add_argument("--headless=new")
+        if os.environ.get("CHROME_BINARY"):
+            options.binary_location = os.environ["CHROME_BINARY"]
+        return options
+
+    def iteration(self, watch, base_url):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        driver = None
+        try:
+            with watch.step("launch"):
+                driver = self._webdriver.Chrome(service=self._service, options=self._options())
+            self.versions["browser"] = driver.capabilities.get("browserVersion")
+            wait = WebDriverWait(driver, 5)
+            with watch.step("navigate"):
+                driver.get(f"{base_url}/login.html")
+            with watch.step("form_fill"):
+                driver.find_element(By.ID, "username").send_keys("admin")
+                driver.find_element(By.ID, "password").send_keys(FIXTURE_PASSWORD)
+                driver.find_element(By.CSS_SELECTOR, "#login-form button[type=submit]").click()
+                wait.until(EC.url_contains("/dashboard.html"))
+            with watch.step("network_mock"):
+                driver.get(f"{base_url}/checkout.html")
+                driver.execute_script(_FETCH_STUB)
+                driver.find_element(By.ID, "pay").click()
+                wait.until(EC.text_to_be_present_in_element((By.ID, "status"), ERROR_TEXT))
+            with watch.step("teardown"):
+                driver.quit()
+                driver = None
+        finally:
+            if driver is not None:
+                driver.quit()
+
+    def close(self):
+        pass
+
+
+STACKS = {"playwright": PlaywrightStack, "selenium": SeleniumStack}
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+def run_benchmark(stacks=tuple(STACKS), iterations=30, warmup=3, log=print):
+    """
+    Runs the scenario warmup + iterations times per available stack.
+    Failed iterations are counted (stability) and excluded from the timings.
+    Returns the dataset dict written by save_results().
+    """
+    server, base_url = serve_fixtures()
+    measured, skipped = [], []
+    try:
+        for key in stacks:
+            try:
+                stack = STACKS[key]()
+            except StackUnavailable as exc:
+                log(f"{key}: skipped ({exc})")
+                skipped.append({"stack": key, "reason": str(exc)})
+                continue
+            samples = {step: [] for step in STEPS}
+            failures, last_error = [], None
+            try:
+                for i in range(warmup + iterations):
+                    watch = _Stopwatch()
+                    try:
+                        stack.iteration(watch, base_url)
+                    except Exception as exc:
+                        # A bare `assert x` has no message; its first line would not exist
+                        first_line = (str(exc).strip().splitlines() or [type(exc).__name__])[0]
+                        last_error = f"{type(exc).__name__}: {first_line}"[:300]
+                        if i >= warmup:
+                            failures.append(last_error)
+                        continue
+                    if i >= warmup:
+                        for step, ms in watch.laps.items():
+                            samples[step].append(round(ms, 3))
+            finally:
+                stack.close()
+            samples = {step: ms for step, ms in samples.items() if ms}
+            if not samples:
+                log(f"{key}: skipped, no iteration passed ({last_error})")
+                skipped.append({"stack": key, "reason": last_error})
+                continue
+            measured.append({"stack": stack.name, "versions": stack.versions, "iterations": iterations,
+                             "failures": failures, "samples": samples})
+            log(f"{stack.name}: {iterations - len(failures)}/{iterations} passed")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return {
+        "version": DATASET_VERSION,
+        "measured_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "warmup": warmup,
+        "steps": STEP_NOTES,
+        "stacks": measured,
+        "skipped": skipped,
+    }
+
+
+def save_results(results, path=DEFAULT_DATASET):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_atomic(path, lambda f: f.write(json.dumps(results, indent=1).encode("utf-8")))
+
+
+def load_results(path=DEFAULT_DATASET):
+    """The stored dataset, or None if the benchmark has not been run yet."""
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        results = json.load(f)
+    return results if results.get("version") == DATASET_VERSION else None
+
+
+def summarize(results):
+    """
+    Percentiles per stack and step, plus a "scenario" row for the whole iteration.
+    Returns (steps, stability) DataFrames.
+    """
+    rows, stability = [], []
+    for entry in results["stacks"]:
+        samples = {step: np.asarray(ms, dtype=float) for step, ms in entry["samples"].items()}
+        if samples:
+            samples["scenario"] = np.sum(list(samples.values()), axis=0)
+        for step, ms in samples.items():
+            p50, p90, p95, p99 = np.percentile(ms, [50, 90, 95, 99])
+            rows.append({"stack": entry["stack"], "step": step, "n": len(ms), "p50_ms": p50, "p90_ms": p90,
+                         "p95_ms": p95, "p99_ms": p99, "mean_ms": ms.mean()})
+        passed = entry["iterations"] - len(entry["failures"])
+        stability.append({"stack": entry["stack"], "iterations": entry["iterations"], "passed": passed,
+                          "pass_rate_%": 100 * passed / max(entry["iterations"], 1),
+                          "library": entry["versions"]["library"], "browser": entry["versions"]["browser"]})
+    return pd.DataFrame(rows), pd.DataFrame(stability)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the fixture-site scenario on each local automation stack.")
+    parser.add_argument("--stacks", nargs="+", choices=list(STACKS), default=list(STACKS))
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--out", default=DEFAULT_DATASET)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.stacks, args.iterations, args.warmup)
+    if not results["stacks"]:
+        raise SystemExit("no stack could be measured; nothing written")
+    save_results(results, args.out)
+    steps, stability = summarize(results)
+    print(stability.to_string(index=False))
+    print(steps.round(1).to_string(index=False))
+    print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
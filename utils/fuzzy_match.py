@@ -0,0 +1,638 @@
+import ast
+import contextvars
+import functools
+import json
+import re
+import time
+from collections import namedtuple
+
+# =============================================================================
+# KARATE-STYLE FUZZY MATCHING
+# =============================================================================
+# A schema such as { id: '#number', tags: '#[] #string' } is compiled once into a
+# tree of matcher nodes. Each node has a fast boolean check() used on the happy
+# path and an explain() that is only run on failure to build path-level reports.
+
+Mismatch = namedtuple("Mismatch", ["path", "reason"])
+
+
+class SchemaError(ValueError):
+    """Raised when a schema or self-validation expression cannot be compiled."""
+
+
+class _Missing:
+    def __repr__(self):
+        return "<missing>"
+
+
+MISSING = _Missing()
+
+UUID_RE = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+ARRAY_MARKER_RE = re.compile(r"#\[(.*?)\]\s*(.*)$", re.S)
+TYPE_MARKERS = {
+    "boolean": (bool,),
+    "number": (int, float),
+    "string": (str,),
+    "array": (list,),
+    "object": (dict,),
+}
+
+
+# =============================================================================
+# LENIENT KARATE / JS-OBJECT PARSER
+# =============================================================================
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+|\#[^\n]*|//[^\n]*|/\*.*?\*/)
+  | (?P<str>'(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*")
+  | (?P<num>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<punct>[{}\[\]:,])
+""", re.X | re.S)
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "/": "/", "\\": "\\", "'": "'", '"': '"'}
+
+
+def _unquote(token):
+    body = token[1:-1]
+    if "\\" not in body:
+        return body
+    out, i = [], 0
+    while i < len(body):
+        ch = body[i]
+        if ch == "\\" and i + 1 < len(body):
+            nxt = body[i + 1]
+            if nxt == "u":
+                out.append(chr(int(body[i + 2:i + 6], 16)))
+                i += 6
+                continue
+            out.append(_ESCAPES.get(nxt, nxt))
+            i += 2
+            continue
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def _tokenize(text):
+    pos, tokens = 0, []
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if not m:
+            raise SchemaError(f"Unexpected character {text[pos]!r} at offset {pos}")
+        pos = m.end()
+        if m.lastgroup != "ws":
+            tokens.append((m.lastgroup, m.group()))
+    return tokens
+
+
+def parse_karate_json(text):
+    """
+    Parses JSON as written in Karate feature files: unquoted keys, single quotes,
+    trailing commas and '#' or '//' comments are all accepted.
+    """
+    text = text.strip()
+    if text.startswith('"""'):
+        text = text.strip('"').strip()
+    tokens = _tokenize(text)
+    if not tokens:
+        raise SchemaError("Schema is empty")
+    pos = 0
+
+    def separator(close="}"):
+        nonlocal pos
+        if tokens[pos][1] == ",":
+            pos += 1
+        elif tokens[pos][1] != close:
+            raise SchemaError(f"Expected ',' or {close!r}, got {tokens[pos][1]!r}")
+
+    def value():
+        nonlocal pos
+        kind, tok = tokens[pos]
+        pos += 1
+        if kind == "str":
+            return _unquote(tok)
+        if kind == "num":
+            return float(tok) if any(c in tok for c in ".eE") else int(tok)
+        if kind == "name":
+            if tok in ("true", "false", "null"):
+                return {"true": True, "false": False, "null": None}[tok]
+            raise SchemaError(f"Unexpected identifier {tok!r}")
+        if tok == "{":
+            obj = {}
+            while tokens[pos][1] != "}":
+                k_kind, key = tokens[pos]
+                if k_kind not in ("str", "name", "num"):
+                    raise SchemaError(f"Expected a key, got {key!r}")
+                key = _unquote(key) if k_kind == "str" else key
+                if tokens[pos + 1][1] != ":":
+                    raise SchemaError(f"Expected ':' after key {key!r}")
+                pos += 2
+                obj[key] = value()
+                separator()
+            pos += 1
+            return obj
+        if tok == "[":
+            arr = []
+            while tokens[pos][1] != "]":
+                arr.append(value())
+                separator("]")
+            pos += 1
+            return arr
+        raise SchemaError(f"Unexpected token {tok!r}")
+
+    try:
+        result = value()
+    except IndexError:
+        raise SchemaError("Unexpected end of schema") from None
+    if pos != len(tokens):
+        raise SchemaError(f"Unexpected trailing content {tokens[pos][1]!r}")
+    return result
+
+
+# =============================================================================
+# SELF-VALIDATION EXPRESSIONS ('#? _ > 0')
+# =============================================================================
+# Caps on the results of '**', '*', '%' and str(), so nesting them cannot build
+# huge numbers or sequences: expressions run on the caller's thread
+MAX_EXPONENT = 64
+MAX_INT_BITS = 4096
+MAX_REPEAT = 100_000
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.FloorDiv, ast.Pow,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn, ast.Is, ast.IsNot,
+    ast.IfExp, ast.Name, ast.Load, ast.Constant, ast.Subscript, ast.Slice, ast.Call,
+    ast.List, ast.Tuple, ast.Dict, ast.Attribute,
+)
+
+
+def _js_to_python(expr):
+    expr = expr.replace("===", "==").replace("!==", "!=")
+    expr = expr.replace("&&", " and ").replace("||", " or ")
+    expr = re.sub(r"!(?!=)", " not ", expr)
+    expr = re.sub(r"\btrue\b", "True", expr)
+    expr = re.sub(r"\bfalse\b", "False", expr)
+    expr = re.sub(r"\bnull\b", "None", expr)
+    return expr.replace("$", "_root_")
+
+
+# The document being matched, which '$' refers to in expressions
+_root = contextvars.ContextVar("fuzzy_match_root", default=None)
+
+
+def _size(value, limit=MAX_REPEAT):
+    """Characters and items in `value`, nested ones included; counting stops past `limit`."""
+    sized = (str, list, tuple, dict)
+    if not isinstance(value, sized):
+        return 1
+    total, stack = 0, [value]
+    while stack and total <= limit:
+        value = stack.pop()
+        total += len(value)
+        if not isinstance(value, str):
+            items = [*value.keys(), *value.values()] if isinstance(value, dict) else value
+            stack.extend(item for item in items if isinstance(item, sized))
+    return total
+
+
+def _pow(base, exponent):
+    if abs(exponent) > MAX_EXPONENT:
+        raise ValueError(f"exponent {exponent} is larger than {MAX_EXPONENT}")
+    if isinstance(base, int) and isinstance(exponent, int) and base.bit_length() * exponent > MAX_INT_BITS:
+        raise ValueError(f"number larger than {MAX_INT_BITS} bits")
+    return base ** exponent
+
+
+def _mul(left, right):
+    for sequence, times in ((left, right), (right, left)):
+        if isinstance(sequence, (str, list, tuple)) and isinstance(times, int) and \
+                _size(sequence, MAX_REPEAT // max(times, 1)) * times > MAX_REPEAT:
+            raise ValueError(f"repetition longer than {MAX_REPEAT} items")
+    if isinstance(left, int) and isinstance(right, int) and left.bit_length() + right.bit_length() > MAX_INT_BITS:
+        raise ValueError(f"number larger than {MAX_INT_BITS} bits")
+    return left * right
+
+
+def _mod(left, right):
+    if isinstance(left, str) and _size(right) > MAX_REPEAT:
+        raise ValueError(f"formatting more than {MAX_REPEAT} items")
+    return left % right
+
+
+def _str(value=""):
+    if _size(value) > MAX_REPEAT:
+        raise ValueError(f"str() of more than {MAX_REPEAT} items")
+    return str(value)
+
+
+_SAFE_FUNCS = {"len": len, "abs": abs, "min": min, "max": max, "round": round,
+               "str": _str, "int": int, "float": float}
+
+
+def _get_attr(obj, name):
+    if name == "length":
+        return len(obj)
+    if isinstance(obj, dict):
+        return obj.get(name)
+    raise TypeError(f"cannot read property {name!r} of {type(obj).__name__}")
+
+
+class _AttributeToCall(ast.NodeTransformer):
+    """Turns 'a.b' into _get_attr_(a, 'b'), and '**', '*' and '%' into size-checked calls."""
+
+    def visit_Attribute(self, node):
+        self.generic_visit(node)
+        return ast.copy_location(ast.Call(
+            func=ast.Name(id="_get_attr_", ctx=ast.Load()),
+            args=[node.value, ast.Constant(node.attr)], keywords=[]), node)
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        func = {ast.Pow: "_pow_", ast.Mult: "_mul_", ast.Mod: "_mod_"}.get(type(node.op))
+        if func is None:
+            return node
+        return ast.copy_location(ast.Call(func=ast.Name(id=func, ctx=ast.Load()),
+                                          args=[node.left, node.right], keywords=[]), node)
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_expression(expr):
+    """
+    Compiles a JS-flavoured Karate expression ('_ > 0 && _.length < 5') into a
+    callable taking a dict of variables. Only arithmetic, comparisons, boolean
+    logic, indexing, '.length' and a handful of builtins are allowed. '$' is the
+    document passed to match() or match_each().
+    """
+    source = _js_to_python(expr.strip())
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError as exc:
+        raise SchemaError(f"Invalid expression {expr!r}: {exc.msg}") from None
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise SchemaError(f"Unsupported syntax in expression {expr!r}: {type(node).__name__}")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in _SAFE_FUNCS):
+            raise SchemaError(f"Only {', '.join(sorted(_SAFE_FUNCS))} may be called in {expr!r}")
+        if isinstance(node, ast.Name) and node.id.startswith("__"):
+            raise SchemaError(f"Name {node.id!r} is not allowed in {expr!r}")
+    tree = ast.fix_missing_locations(_AttributeToCall().visit(tree))
+    code = compile(tree, f"<expr {expr}>", "eval")
+    globals_ = {"__builtins__": {}, "_get_attr_": _get_attr, "_pow_": _pow, "_mul_": _mul, "_mod_": _mod,
+                **_SAFE_FUNCS}
+
+    if "_root_" not in code.co_names:
+        return lambda variables: eval(code, globals_, variables)
+
+    def evaluate(variables):
+        return eval(code, globals_, {"_root_": _root.get(), **variables})
+
+    return evaluate
+
+
+# =============================================================================
+# MATCHER NODES
+# =============================================================================
+def _describe(value):
+    if value is MISSING:
+        return "missing"
+    text = repr(value)
+    return text if len(text) <= 60 else text[:57] + "..."
+
+
+class _Node:
+    # Missing keys fail unless the node says otherwise
+    accepts_missing = False
+
+    def check(self, value):
+        raise NotImplementedError
+
+    def explain(self, value, path, errors, limit):
+        if len(errors) < limit and not self.check(value):
+            errors.append(Mismatch(path, self.reason(value)))
+
+    def reason(self, value):
+        return f"expected {self.label}, got {_describe(value)}"
+
+
+class _Ignore(_Node):
+    label = "#ignore"
+    accepts_missing = True
+
+    def check(self, value):
+        return True
+
+
+class _Present(_Node):
+    label = "#present"
+
+    def check(self, value):
+        return value is not MISSING
+
+
+class _NotPresent(_Node):
+    label = "#notpresent"
+    accepts_missing = True
+
+    def check(self, value):
+        return value is MISSING
+
+
+class _Null(_Node):
+    label = "#null"
+
+    def check(self, value):
+        return value is None
+
+
+class _NotNull(_Node):
+    label = "#notnull"
+
+    def check(self, value):
+        return value is not None and value is not MISSING
+
+
+class _Type(_Node):
+    def __init__(self, name):
+        self.label = f"#{name}"
+        self.types = TYPE_MARKERS[name]
+
+    def check(self, value):
+        return type(value) in self.types
+
+
+class _Regex(_Node):
+    def __init__(self, pattern, label):
+        try:
+            self.pattern = re.compile(pattern)
+        except re.error as exc:
+            raise SchemaError(f"Invalid regex {pattern!r}: {exc}") from None
+        self.fullmatch = self.pattern.fullmatch
+        self.label = label
+
+    def check(self, value):
+        return type(value) is str and self.fullmatch(value) is not None
+
+
+class _Predicate(_Node):
+    def __init__(self, expr, base=None):
+        self.expr = expr
+        self.evaluate = compile_expression(expr)
+        self.base = base
+        self.label = f"{base.label + '? ' if base else '#? '}{expr}"
+
+    def check(self, value):
+        if value is MISSING or (self.base is not None and not self.base.check(value)):
+            return False
+        try:
+            return bool(self.evaluate({"_": value}))
+        except Exception:
+            return False
+
+
+class _Optional(_Node):
+    accepts_missing = True
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.label = "#" + inner.label
+
+    def check(self, value):
+        return value is MISSING or value is None or self.inner.check(value)
+
+    def explain(self, value, path, errors, limit):
+        if value is not MISSING and value is not None:
+            self.inner.explain(value, path, errors, limit)
+
+
+class _Literal(_Node):
+    def __init__(self, value):
+        self.value = value
+        self.label = repr(value)
+        self.strict_type = type(value) if isinstance(value, (bool, str)) or value is None else None
+
+    def check(self, value):
+        if self.strict_type is not None:
+            return type(value) is self.strict_type and value == self.value
+        return type(value) is not bool and value == self.value
+
+
+class _Array(_Node):
+    """'#[]', '#[3]', '#[_ > 0]' optionally followed by an element marker ('#[] #string')."""
+
+    def __init__(self, length_spec, element):
+        self.element = element
+        self.length_check = None
+        self.label = f"#[{length_spec}]" + (f" {element.label}" if element else "")
+        if length_spec.strip().isdigit():
+            expected = int(length_spec)
+            self.length_check = lambda n: n == expected
+        elif length_spec.strip():
+            evaluate = compile_expression(length_spec)
+            self.length_check = lambda n: bool(evaluate({"_": n}))
+
+    def check(self, value):
+        if type(value) is not list:
+            return False
+        if self.length_check is not None and not self.length_check(len(value)):
+            return False
+        return self.element is None or all(map(self.element.check, value))
+
+    def explain(self, value, path, errors, limit):
+        if type(value) is not list:
+            errors.append(Mismatch(path, f"expected an array, got {_describe(value)}"))
+            return
+        if self.length_check is not None and not self.length_check(len(value)):
+            errors.append(Mismatch(path, f"array length {len(value)} does not satisfy {self.label}"))
+        if self.element is not None:
+            check = self.element.check
+            for i, item in enumerate(value):
+                if len(errors) >= limit:
+                    return
+                if not check(item):
+                    self.element.explain(item, f"{path}[{i}]", errors, limit)
+
+
+class _Object(_Node):
+    label = "an object"
+
+    def __init__(self, fields, strict):
+        self.fields = fields
+        self.strict = strict
+        self._checks = tuple((key, node.check) for key, node in fields.items())
+
+    def check(self, value):
+        if type(value) is not dict:
+            return False
+        get = value.get
+        for key, check in self._checks:
+            if not check(get(key, MISSING)):
+                return False
+        return not self.strict or len(value) <= len(self.fields) and all(k in self.fields for k in value)
+
+    def explain(self, value, path, errors, limit):
+        if type(value) is not dict:
+            errors.append(Mismatch(path, f"expected an object, got {_describe(value)}"))
+            return
+        for key, node in self.fields.items():
+            if len(errors) >= limit:
+                return
+            item = value.get(key, MISSING)
+            if item is MISSING and not node.accepts_missing:
+                errors.append(Mismatch(f"{path}.{key}", f"missing key (expected {node.label})"))
+            elif not node.check(item):
+                node.explain(item, f"{path}.{key}", errors, limit)
+        if self.strict:
+            extra = [k for k in value if k not in self.fields]
+            if extra and len(errors) < limit:
+                errors.append(Mismatch(path, f"unexpected keys: {', '.join(map(str, extra[:10]))}"))
+
+
+class _List(_Node):
+    label = "an array"
+
+    def __init__(self, items, strict):
+        self.items = items
+        self.strict = strict
+
+    def check(self, value):
+        if type(value) is not list:
+            return False
+        if self.strict:
+            return len(value) == len(self.items) and all(n.check(v) for n, v in zip(self.items, value))
+        return all(any(n.check(v) for v in value) for n in self.items)
+
+    def explain(self, value, path, errors, limit):
+        if type(value) is not list:
+            errors.append(Mismatch(path, f"expected an array, got {_describe(value)}"))
+            return
+        if not self.strict:
+            for n in self.items:
+                if not any(n.check(v) for v in value) and len(errors) < limit:
+                    errors.append(Mismatch(path, f"no element matches {n.label}"))
+            return
+        if len(value) != len(self.items):
+            errors.append(Mismatch(path, f"expected {len(self.items)} elements, got {len(value)}"))
+        for i, (node, item) in enumerate(zip(self.items, value)):
+            if len(errors) >= limit:
+                return
+            if not node.check(item):
+                node.explain(item, f"{path}[{i}]", errors, limit)
+
+
+# =============================================================================
+# SCHEMA COMPILATION
+# =============================================================================
+_SIMPLE_MARKERS = {
+    "ignore": _Ignore, "present": _Present, "notpresent": _NotPresent,
+    "null": _Null, "notnull": _NotNull,
+}
+
+
+def _compile_marker(marker):
+    if marker.startswith("##"):
+        return _Optional(_compile_marker(marker[1:]))
+    body = marker[1:]
+    if body.startswith("["):
+        m = ARRAY_MARKER_RE.match(marker)
+        if not m:
+            raise SchemaError(f"Invalid array marker {marker!r}")
+        element = m.group(2).strip()
+        return _Array(m.group(1), _compile_marker(element) if element else None)
+    if body.startswith("?"):
+        return _Predicate(body[1:].strip())
+    if body.startswith("regex"):
+        return _Regex(body[5:].strip(), marker)
+    name, sep, expr = body.partition("?")
+    name = name.strip()
+    if name in _SIMPLE_MARKERS and not sep:
+        return _SIMPLE_MARKERS[name]()
+    if name == "uuid":
+        base = _Regex(UUID_RE.pattern, "#uuid")
+    elif name in TYPE_MARKERS:
+        base = _Type(name)
+    else:
+        raise SchemaError(f"Unknown marker {marker!r}")
+    return _Predicate(expr.strip(), base) if sep else base
+
+
+def compile_schema(schema, mode="=="):
+    """Compiles a parsed schema (dict/list/marker string/literal) into a matcher tree."""
+    strict = mode == "=="
+    if isinstance(schema, dict):
+        return _Object({k: compile_schema(v, mode) for k, v in schema.items()}, strict)
+    if isinstance(schema, list):
+        return _List([compile_schema(v, mode) for v in schema], strict)
+    if isinstance(schema, str) and schema.startswith("#") and not schema.startswith("#("):
+        return _compile_marker(schema.strip())
+    return _Literal(schema)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_schema_text(text, mode="=="):
+    """Parses and compiles schema text. Results are cached by (text, mode)."""
+    return compile_schema(parse_karate_json(text), mode)
+
+
+def _resolve(schema, mode):
+    if isinstance(schema, _Node):
+        return schema
+    if isinstance(schema, str) and not schema.lstrip().startswith("#"):
+        return compile_schema_text(schema, mode)
+    return compile_schema(schema, mode)
+
+
+def match(actual, schema, mode="==", max_errors=50):
+    """
+    Matches a decoded JSON value against a schema ('==' or 'contains').
+    The schema may be Karate-style text, an already parsed value, or a compiled matcher.
+    Returns a list of Mismatch(path, reason); an empty list means the match passed.
+    """
+    matcher = _resolve(schema, mode)
+    token = _root.set(actual)
+    try:
+        if matcher.check(actual):
+            return []
+        errors = []
+        matcher.explain(actual, "$", errors, max_errors)
+        return errors
+    finally:
+        _root.reset(token)
+
+
+def match_each(actual, schema, mode="==", max_errors=50):
+    """Karate's 'match each': every element of the array must match the schema."""
+    if type(actual) is not list:
+        return [Mismatch("$", f"expected an array, got {_describe(actual)}")]
+    matcher = _resolve(schema, mode)
+    token = _root.set(actual)
+    try:
+        if all(map(matcher.check, actual)):
+            return []
+        errors = []
+        for i, item in enumerate(actual):
+            if len(errors) >= max_errors:
+                break
+            if not matcher.check(item):
+                matcher.explain(item, f"$[{i}]", errors, max_errors)
+        return errors
+    finally:
+        _root.reset(token)
+
+
+def validate_text(response, schema_text, mode="==", each=False, progress=None):
+    """
+    Parses a JSON response (str or bytes) and matches it against schema text in one
+    call, so it can run as a utils.jobs job. Returns (mismatches, timings_ms).
+    """
+    t0 = time.perf_counter()
+    if progress:
+        progress(0.0, "Parsing the response")
+    actual = json.loads(response)
+    t1 = time.perf_counter()
+    if progress:
+        progress(0.5, "Matching")
+    matcher = compile_schema_text(schema_text, mode)
+    t2 = time.perf_counter()
+    mismatches = match_each(actual, matcher) if each else match(actual, matcher)
+    t3 = time.perf_counter()
+    return mismatches, {"parse": (t1 - t0) * 1000, "compile": (t2 - t1) * 1000, "match": (t3 - t2) * 1000}
@@ -0,0 +1,348 @@
+import argparse
+import base64
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+import zipfile
+from collections import Counter, deque, namedtuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from utils.cache import spill
+from utils.json_stream import iter_json_array
+
+# =============================================================================
+# REQUEST KEYS
+# =============================================================================
+# A request is reduced to (method, host, path, query, body digest). Each match
+# level keeps a subset of those parts and has its own dict, so a lookup is one
+# hash probe per level no matter how many entries the HAR holds. Levels are
+# tried strictest first; the default fallbacks drop the body, then the query.
+Response = namedtuple("Response", ["status", "headers", "body"])
+Match = namedtuple("Match", ["level", "entry", "response"])
+
+PARTS = ("method", "host", "path", "query", "body")
+DEFAULT_FALLBACKS = ("body", "query")
+DEFAULT_IGNORED_PARAMS = ("_",)
+MAX_MISSES = 50
+COPY_BYTES = 1 << 20
+
+# Bodies are replayed decoded, so the transfer headers of the recording no longer apply
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+
+class HarError(ValueError):
+    pass
+
+
+def fulfill_headers(pairs):
+    """
+    Header (name, value) pairs as the dict route.fulfill() takes. Repeated headers are
+    joined; Set-Cookie values with newlines, which Playwright splits into separate headers.
+    """
+    merged = {}
+    for name, value in pairs:
+        key = name.lower()
+        if key in merged:
+            first, previous = merged[key]
+            merged[key] = (first, previous + ("\n" if key == "set-cookie" else ", ") + value)
+        else:
+            merged[key] = (name, value)
+    return dict(merged.values())
+
+
+def _body_digest(body, content_type=""):
+    """Digest of a request body; JSON bodies are canonicalized so key order and spacing do not matter."""
+    if not body:
+        return ""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if "json" in (content_type or ""):
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+        except ValueError:
+            pass
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+def request_key(method, url, body=None, content_type="", ignored_params=DEFAULT_IGNORED_PARAMS):
+    """The full (method, host, path, query, body) key of a request. host is None for origin-less targets."""
+    parts = urlsplit(url)
+    host = None
+    if parts.netloc:
+        host = parts.hostname or ""
+        default_port = {"http": 80, "https": 443}.get(parts.scheme)
+        if parts.port and parts.port != default_port:
+            host = f"{host}:{parts.port}"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if k not in ignored_params))
+    return (method.upper(), host, parts.path or "/", query, _body_digest(body, content_type))
+
+
+def _levels(fallbacks, match_host):
+    """The ordered list of part-index tuples each index keeps."""
+    keep = [i for i, part in enumerate(PARTS) if match_host or part != "host"]
+    levels = [tuple(keep)]
+    for dropped in fallbacks:
+        if dropped not in PARTS or dropped == "method":
+            raise HarError(f"cannot fall back on {dropped!r}; choose from {PARTS[1:]}")
+        keep = [i for i in keep if PARTS[i] != dropped]
+        levels.append(tuple(keep))
+    return levels
+
+
+# =============================================================================
+# HAR INDEX
+# =============================================================================
+class HarIndex:
+    """
+    An in-memory replay index over the entries of a HAR file.
+    Repeated identical requests (polling, retries) replay their recorded
+    responses in order and then keep returning the last one.
+    """
+
+    def __init__(self, fallbacks=DEFAULT_FALLBACKS, match_host=True, ignored_params=DEFAULT_IGNORED_PARAMS):
+        self.fallbacks = tuple(fallbacks)
+        self.match_host = match_host
+        self.ignored_params = tuple(ignored_params)
+        self.level_names = ["exact"] + [f"ignore {part}" for part in self.fallbacks]
+        self._levels = _levels(self.fallbacks, match_host)
+        self._indexes = [{} for _ in self._levels]
+        self._cursors = {}
+        self._lock = threading.Lock()
+        self._zip = None
+        self._owner = True
+        self.entries = []
+        self.urls = []
+        self.hits = Counter()
+        self.misses = deque(maxlen=MAX_MISSES)
+
+    @classmethod
+    def load(cls, path, **options):
+        """Streams a .har (or a Playwright .zip HAR with attached bodies) into an index."""
+        index = cls(**options)
+        if zipfile.is_zipfile(path):
+            index._zip = zipfile.ZipFile(path)
+            names = [n for n in index._zip.namelist() if n.endswith(".har")]
+            if not names:
+                raise HarError("zip contains no .har file")
+            with index._zip.open(names[0]) as f:
+                index.add_entries(iter_json_array(f, key="entries"))
+        else:
+            with open(path, "rb") as f:
+                index.add_entries(iter_json_array(f, key="entries"))
+        return index
+
+    @classmethod
+    def from_upload(cls, fileobj, **options):
+        """Copies an uploaded HAR into the cache directory (once) and streams it from disk."""
+        return cls.load(spill(fileobj, "har", ".har", COPY_BYTES), **options)
+
+    def add_entries(self, entries):
+        number = len(self.entries)
+        try:
+            for number, entry in enumerate(entries, number):
+                self.add(entry)
+        except KeyError as exc:
+            raise HarError(f"not a HAR file: entry {number} has no {exc} field") from None
+        except (ValueError, TypeError, AttributeError) as exc:
+            raise HarError(f"not a HAR file: entry {number} is malformed ({exc})") from None
+
+    def add(self, entry):
+        request, response = entry["request"], entry["response"]
+        post = request.get("postData") or {}
+        key = request_key(request["method"], request["url"], post.get("text"), post.get("mimeType", ""),
+                          self.ignored_params)
+        if not self.match_host:
+            key = key[:1] + (None,) + key[2:]
+        content = response.get("content") or {}
+        if "_file" in content:
+            body = ("zip", content["_file"])
+        elif content.get("encoding") == "base64":
+            body = base64.b64decode(content.get("text") or "")
+        else:
+            body = (content.get("text") or "").encode("utf-8")
+        headers = tuple((h["name"], h["value"]) for h in response.get("headers", ())
+                        if h["name"].lower() not in _DROPPED_HEADERS and not h["name"].startswith(":"))
+        number = len(self.entries)
+        self.entries.append(Response(response.get("status") or 200, headers, body))
+        self.urls.append((request["method"], request["url"]))
+        for level, index in zip(self._levels, self._indexes):
+            index.setdefault(tuple(key[i] for i in level), []).append(number)
+
+    def _body(self, body):
+        if isinstance(body, tuple):
+            return self._zip.read(body[1])
+        return body
+
+    def lookup(self, method, url, body=None, content_type=""):
+        """Returns a Match for the request, or None. Advances the per-key replay cursor."""
+        key = request_key(method, url, body, content_type, self.ignored_params)
+        if not self.match_host:
+            key = key[:1] + (None,) + key[2:]
+        for number, (level, index) in enumerate(zip(self._levels, self._indexes)):
+            level_key = tuple(key[i] for i in level)
+            candidates = index.get(level_key)
+            if candidates:
+                with self._lock:
+                    cursor = self._cursors.get((number, level_key), 0)
+                    self._cursors[(number, level_key)] = min(cursor + 1, len(candidates) - 1)
+                    self.hits[self.level_names[number]] += 1
+                entry = candidates[cursor]
+                status, headers, stored = self.entries[entry]
+                return Match(self.level_names[number], entry, Response(status, headers, self._body(stored)))
+        with self._lock:
+            self.hits["miss"] += 1
+            self.misses.append(f"{method.upper()} {url}")
+        return None
+
+    def rewind(self):
+        with self._lock:
+            self._cursors.clear()
+
+    def view(self):
+        """
+        A replay over the same entries with its own cursors and counters, so that
+        replays sharing one loaded index (one per session or test) do not move each
+        other's position. Closing a view leaves the index open.
+        """
+        view = copy.copy(self)
+        view._cursors = {}
+        view._lock = threading.Lock()
+        view._owner = False
+        view.hits = Counter()
+        view.misses = deque(maxlen=MAX_MISSES)
+        return view
+
+    def stats(self):
+        methods = Counter(method for method, _ in self.urls)
+        hosts = Counter(urlsplit(url).netloc for _, url in self.urls)
+        return {"entries": len(self.entries), "unique_requests": len(self._indexes[0]),
+                "methods": dict(methods), "hosts": dict(hosts.most_common(10)),
+                "hits": dict(self.hits), "recent_misses": list(self.misses)}
+
+    # -------------------------------------------------------------------------
+    # Playwright routing
+    # -------------------------------------------------------------------------
+    def route_handler(self, not_found="abort"):
+        """A route handler replaying matches; unmatched requests are aborted or passed on (not_found="fallback")."""
+        def handle(route):
+            request = route.request
+            match = self.lookup(request.method, request.url, request.post_data_buffer,
+                                request.headers.get("content-type", ""))
+            if match is None and not_found == "fallback":
+                route.fallback()
+            elif match is None:
+                route.abort("blockedbyclient")
+            else:
+                status, headers, body = match.response
+                route.fulfill(status=status, headers=fulfill_headers(headers), body=body)
+        return handle
+
+    def install(self, context_or_page, url="**/*", not_found="abort"):
+        context_or_page.route(url, self.route_handler(not_found))
+
+    # -------------------------------------------------------------------------
+    # HTTP stand-in (same interface as MockService, so MockServer can serve it)
+    # -------------------------------------------------------------------------
+    def dispatch(self, method, target, headers=None, body=b""):
+        headers = headers or {}
+        match = self.lookup(method, target, body, headers.get("content-type", ""))
+        if match is None:
+            return 404, {"Content-Type": "text/plain"}, b"No recorded response for this request", 0.0, None
+        # Kept as (name, value) pairs so repeated headers such as Set-Cookie all go out
+        status, resp_headers, resp_body = match.response
+        return status, list(resp_headers), resp_body, 0.0, match
+
+    def close(self):
+        if self._zip is not None and self._owner:
+            self._zip.close()
+
+
+def serve_har(index, host="127.0.0.1", port=0):
+    """Serves a HarIndex over HTTP on a background event loop. Returns the running MockServer."""
+    from utils.mock_server import MockServer
+
+    if index.match_host:
+        raise HarError("the HTTP stand-in sees only paths; load the HAR with match_host=False")
+    return MockServer(index).start_in_thread(host, port)
+
+
+# =============================================================================
+# RECORDING
+# =============================================================================
+def fixture_flow(page):
+    """Signs in to the bundled fixture shop and pays, so the recording covers GET, POST and an API call."""
+    page.goto("/login.html")
+    page.get_by_label("Username").fill("admin")
+    page.get_by_label("Password").fill("1234")
+    page.get_by_role("button", name="Sign in").click()
+    page.wait_for_url("**/dashboard.html")
+    page.goto("/checkout.html")
+    page.get_by_role("button", name="Pay Now").click()
+    page.get_by_text("Payment confirmed").wait_for()
+
+
+def record_har(base_url, path, actions=None, url_filter=None):
+    """Records everything a headless Chromium session does on base_url into a HAR file with embedded bodies."""
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        context = browser.new_context(base_url=base_url, record_har_path=path, record_har_content="embed",
+                                      record_har_url_filter=url_filter)
+        page = context.new_page()
+        if actions is None:
+            page.goto(base_url)
+        else:
+            actions(page)
+        context.close()
+        browser.close()
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record, inspect and replay HAR files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rec = commands.add_parser("record", help="record a session into a HAR")
+    rec.add_argument("out")
+    rec.add_argument("--url", help="app to record (default: the bundled fixture shop, with a login + pay flow)")
+    stats = commands.add_parser("stats", help="load a HAR and print index statistics")
+    stats.add_argument("har")
+    serve = commands.add_parser("serve", help="serve a HAR as a local HTTP stand-in")
+    serve.add_argument("har")
+    serve.add_argument("--port", type=int, default=8091)
+    serve.add_argument("--fallbacks", nargs="*", default=list(DEFAULT_FALLBACKS))
+    args = parser.parse_args()
+
+    if args.command == "record":
+        if args.url:
+            record_har(args.url, args.out)
+        else:
+            from utils.fixtures import serve_fixtures
+
+            server, base_url = serve_fixtures()
+            try:
+                record_har(base_url, args.out, fixture_flow)
+            finally:
+                server.shutdown()
+        print(f"wrote {args.out} ({os.path.getsize(args.out):,} bytes)")
+    elif args.command == "stats":
+        started = time.perf_counter()
+        index = HarIndex.load(args.har)
+        print(f"indexed in {time.perf_counter() - started:.2f}s")
+        print(json.dumps(index.stats(), indent=2))
+    else:
+        index = HarIndex.load(args.har, fallbacks=args.fallbacks, match_host=False)
+        server = serve_har(index, port=args.port)
+        print(f"Replaying {len(index.entries):,} entries on {server.url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
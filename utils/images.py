@@ -0,0 +1,77 @@
+import argparse
+import glob
+import io
+import os
+
+from PIL import Image
+
+from utils.cache import cache_lock, cache_path, digest_bytes, write_atomic
+
+# =============================================================================
+# IMAGE VARIANTS
+# =============================================================================
+# The diagrams in assets/ are 1024 px PNGs of 350-860 KB. Pages show a JPEG
+# variant instead, encoded once into the shared cache: encoding takes tens of
+# milliseconds, so it must not happen on every rerun, nor once per replica.
+# st.image() sends JPEG, PNG and GIF files as they are but re-encodes anything
+# else (WebP included) as a quality-90 JPEG on every call, hence JPEG by default.
+VARIANT_VERSION = 1
+DEFAULT_WIDTH = 1024
+DEFAULT_FORMAT = "jpeg"
+DEFAULT_QUALITY = 80
+FORMATS = {"webp": "WEBP", "jpeg": "JPEG", "png": "PNG"}
+
+
+def encode_variant(source, width=DEFAULT_WIDTH, fmt=DEFAULT_FORMAT, quality=DEFAULT_QUALITY):
+    """Bytes of the image at `source`, scaled down to at most `width` px and encoded as `fmt`."""
+    with Image.open(source) as image:
+        image = image.convert("RGBA" if fmt != "jpeg" and "A" in image.getbands() else "RGB")
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        options = {"quality": quality, "method": 4} if fmt == "webp" else \
+            {"quality": quality, "optimize": True, "progressive": True}
+        buffer = io.BytesIO()
+        image.save(buffer, FORMATS[fmt], **options)
+        return buffer.getvalue()
+
+
+def variant(source, width=DEFAULT_WIDTH, fmt=DEFAULT_FORMAT, quality=DEFAULT_QUALITY):
+    """
+    Path of a cached variant of the image file `source`, for st.image(). Keyed by
+    the source's path, size and mtime, so an edited asset gets a new variant.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown image format {fmt!r}; expected one of {', '.join(FORMATS)}.")
+    stat = os.stat(source)
+    key = digest_bytes(repr((VARIANT_VERSION, os.path.abspath(source), stat.st_size, stat.st_mtime_ns,
+                             width, fmt, quality)).encode("utf-8"))
+    path = cache_path("images", key, f".{fmt}")
+    if not os.path.exists(path):
+        with cache_lock(path):
+            if not os.path.exists(path):
+                data = encode_variant(source, width, fmt, quality)
+                write_atomic(path, lambda f: f.write(data))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the cached image variants the pages serve.")
+    parser.add_argument("sources", nargs="*", help="image files (default: assets/*.png)")
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH)
+    parser.add_argument("--format", choices=list(FORMATS), default=DEFAULT_FORMAT)
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY)
+    args = parser.parse_args()
+
+    sources = args.sources or sorted(glob.glob(os.path.join("assets", "*.png")))
+    before = after = 0
+    for source in sources:
+        path = variant(source, args.width, args.format, args.quality)
+        before += os.path.getsize(source)
+        after += os.path.getsize(path)
+        print(f"{os.path.getsize(source) / 1024:8.0f} KB -> {os.path.getsize(path) / 1024:6.0f} KB  {source}")
+    if sources:
+        print(f"{len(sources)} images: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
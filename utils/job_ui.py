@@ -0,0 +1,134 @@
+import pandas as pd
+import streamlit as st
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from utils.jobs import CANCELLED, JobError, JobPool, JobRejected, run_inline
+
+# =============================================================================
+# JOB POOL IN STREAMLIT PAGES
+# =============================================================================
+# One JobPool per server process, shared by every session. A page submits heavy
+# work under a key, and the Job handle is kept in st.session_state. While the
+# job is queued or running, a fragment polls it and shows its progress. That
+# fragment rerun is the only work this session does, so other learners' reruns
+# are not slowed down. When the job finishes, the page reruns once and renders
+# the result.
+INLINE_BYTES = 256 * 1024
+POLL_SECONDS = 0.5
+
+
+def _session_alive(session_id):
+    return not runtime.exists() or runtime.get_instance().is_active_session(session_id)
+
+
+@st.cache_resource(show_spinner=False)
+def get_pool():
+    return JobPool(is_alive=_session_alive)
+
+
+def session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+def submit(key, target, args=(), kwargs=None, label=None, progress=False, inline=False):
+    """
+    Starts a job for `key`, replacing (and cancelling) this session's previous one.
+    With inline=True the target runs right here instead, for inputs too small to be
+    worth a round trip. Returns the Job, or None when the pool rejected it.
+    """
+    state_key = f"_job_{key}"
+    previous = st.session_state.pop(state_key, None)
+    if previous is not None:
+        previous[1].cancel()
+    if inline:
+        job = run_inline(target, args, kwargs, label=label, progress=progress)
+    else:
+        try:
+            job = get_pool().submit(target, args, kwargs, session=session_id(), label=label, progress=progress)
+        except JobRejected as e:
+            st.warning(f"⏳ {e}")
+            return None
+    st.session_state[state_key] = (None, job)
+    return job
+
+
+def current(key):
+    """
+    The finished Job for `key`; job.result() returns its value or re-raises the
+    feature's own exception. None while it runs (a progress panel is shown
+    instead), after a cancel, crash or timeout, or if there is no job.
+    """
+    entry = st.session_state.get(f"_job_{key}")
+    if entry is None:
+        return None
+    job = entry[1]
+    if job.status == CANCELLED or isinstance(job.error, JobError):
+        # Crashes and timeouts are the pool's, not the feature's, so they are reported here
+        if job.status == CANCELLED:
+            st.info(f"⏹️ {job.label} was cancelled.")
+        else:
+            st.error(f"❌ {job.error}")
+        if st.button("Run again", key=f"_job_again_{key}"):
+            del st.session_state[f"_job_{key}"]
+            st.rerun()
+        return None
+    if job.done():
+        return job
+    _progress_panel(key, job)
+    return None
+
+
+def run_job(key, signature, target, args=(), kwargs=None, label=None, progress=False, inline=False):
+    """
+    submit() + current() for work that follows the page's inputs: a job is started
+    whenever `signature` (anything comparable, e.g. an upload's file_id and the
+    options) differs from the one the current job was started for. `args` may be
+    a zero-argument callable, called only then, so big uploads are not copied on
+    every rerun.
+    """
+    entry = st.session_state.get(f"_job_{key}")
+    if entry is None or entry[0] != signature:
+        if callable(args):
+            args = args()
+        if submit(key, target, args, kwargs, label=label, progress=progress, inline=inline) is None:
+            return None
+        st.session_state[f"_job_{key}"] = (signature, st.session_state[f"_job_{key}"][1])
+    return current(key)
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def _progress_panel(key, job):
+    if job.done():
+        st.rerun()
+    stats = get_pool().stats()
+    position = job.position()
+    if position:
+        text = f"⏳ {job.label}: waiting, number {position} in the queue"
+    else:
+        text = f"⚙️ {job.label}: {job.message or 'running'} ({job.run_ms / 1000:.1f}s)"
+    st.progress(job.progress, text=text)
+    c1, c2 = st.columns([1, 5])
+    if c1.button("Cancel", key=f"_job_cancel_{key}"):
+        job.cancel()
+        st.rerun()
+    c2.caption(f"Job queue: {stats['running']}/{stats['workers']} workers busy · {stats['queued']} waiting · "
+               f"{stats['rejected']} turned away")
+
+
+def render_queue_metrics():
+    """Queue depth and worker usage of the shared pool, for the sidebar."""
+    pool = get_pool()
+    stats = pool.stats()
+    st.markdown("#### ⚙️ Background jobs")
+    m1, m2 = st.columns(2)
+    m1.metric("Waiting", stats["queued"], help=f"At most {stats['max_queue']}; further jobs are turned away")
+    m2.metric("Running", f"{stats['running']}/{stats['workers']}")
+    depth = pd.DataFrame(pool.depth_history(), columns=["time", "queued", "running"])
+    if len(depth) > 1:
+        depth["time"] = pd.to_datetime(depth["time"], unit="s")
+        st.line_chart(depth.set_index("time"), height=140)
+    wait = "-" if stats["p50_wait_ms"] is None else f"{stats['p50_wait_ms']:.0f} ms"
+    st.caption(f"{stats['done']} done · {stats['cancelled']} cancelled · {stats['rejected']} turned away · "
+               f"median wait {wait}")
@@ -0,0 +1,488 @@
+import importlib
+import itertools
+import os
+import pickle
+import statistics
+import subprocess
+import threading
+import time
+import traceback
+from collections import deque
+
+from utils.worker_process import spawn_worker, worker_connection
+
+# =============================================================================
+# JOB POOL CONFIGURATION
+# =============================================================================
+# Streamlit runs every session's script on a thread of one process, so CPU-heavy
+# work done inline holds the GIL and slows every other learner's reruns. Heavy
+# features submit it here instead: a fixed set of `python -m utils.jobs` worker
+# processes takes jobs from one bounded FIFO queue.
+#
+# Backpressure comes from two limits: each session may have only a few jobs
+# queued or running, and a full queue rejects new work (JobRejected) instead of
+# growing. A running job is cancelled by killing its worker, which is replaced,
+# and jobs of sessions that have gone away are cancelled the same way.
+# Targets are "utils.module:function" strings resolved inside the worker;
+# arguments and results travel pickled over the worker's socket. A failure is
+# sent as its type name and message, plus the pickled exception when the parent
+# can rebuild it: the worker runs as __main__, so its own JobError cannot be.
+DEFAULT_WORKERS = int(os.environ.get("ACADEMY_JOB_WORKERS", min(os.cpu_count() or 1, 4)))
+DEFAULT_MAX_QUEUE = int(os.environ.get("ACADEMY_JOB_QUEUE", "32"))
+DEFAULT_PER_SESSION = 2
+DEFAULT_TIMEOUT = 300
+MAX_JOBS_PER_WORKER = 200
+PROGRESS_INTERVAL = 0.1
+POLL_INTERVAL = 0.25
+SESSION_GRACE = 10
+REAP_INTERVAL = 2
+DEPTH_SAMPLES = 600
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+class JobError(RuntimeError):
+    pass
+
+
+class JobRejected(JobError):
+    """The queue or the session's share of it is full; try again later."""
+
+
+class JobCancelled(JobError):
+    pass
+
+
+def _resolve(target):
+    module, _, name = target.partition(":")
+    if not module.startswith("utils.") or not name:
+        raise JobError(f"Job targets must look like 'utils.<module>:<function>', not {target!r}")
+    return getattr(importlib.import_module(module), name)
+
+
+# =============================================================================
+# WORKER PROCESS
+# =============================================================================
+def _progress_sender(conn):
+    """progress(fraction, message) for a job, throttled to one message per PROGRESS_INTERVAL."""
+    last = [0.0]
+
+    def progress(fraction, message=""):
+        now = time.monotonic()
+        if now - last[0] >= PROGRESS_INTERVAL or fraction >= 1:
+            last[0] = now
+            conn.send(("progress", min(max(float(fraction), 0.0), 1.0), str(message)))
+    return progress
+
+
+def _failure(error, tb):
+    """The ("failed", pickled exception or None, type name, message, traceback) reply for an exception."""
+    data = None
+    if type(error).__module__ != "__main__":
+        try:
+            data = pickle.dumps(error)
+        except Exception:
+            pass
+    return ("failed", data, type(error).__name__, str(error), tb)
+
+
+def _load_error(data, name, message):
+    """The exception a worker reported, or a JobError carrying its type and message."""
+    if data is not None:
+        try:
+            return pickle.loads(data)
+        except Exception:
+            pass
+    return JobError(message if name == JobError.__name__ else f"{name}: {message}")
+
+
+def _worker_main(conn):
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        target, args, kwargs, with_progress = job
+        if with_progress:
+            kwargs = dict(kwargs, progress=_progress_sender(conn))
+        try:
+            reply = ("done", _resolve(target)(*args, **kwargs))
+        except Exception as e:
+            reply = _failure(e, traceback.format_exc(limit=-3))
+        try:
+            conn.send(reply)
+        except Exception:
+            # The result could not be pickled; send what can be
+            conn.send(("failed", None, JobError.__name__, f"{target} returned something that cannot be sent back: "
+                       f"{traceback.format_exc(limit=0).strip()}", ""))
+
+
+class _Worker:
+    def __init__(self):
+        self.process, self.conn = spawn_worker("utils.jobs")
+        self.jobs = 0
+
+    def kill(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait(timeout=5)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        self.kill()
+
+
+# =============================================================================
+# JOBS
+# =============================================================================
+class Job:
+    """Handle for a submitted job. Safe to keep in st.session_state across reruns."""
+
+    def __init__(self, pool, job_id, target, args, kwargs, session, label, with_progress, timeout):
+        self.id = job_id
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs
+        self.session = session
+        self.label = label or target
+        self.with_progress = with_progress
+        self.timeout = timeout
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.traceback = ""
+        self.submitted = time.monotonic()
+        self.started = None
+        self.finished = None
+        self._pool = pool
+        self._result = None
+        self._error = None
+        self._cancel = False
+        self._done = threading.Event()
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def result(self, timeout=None):
+        """The target's return value. Re-raises the target's exception; JobCancelled if cancelled."""
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"{self.label} is still {self.status}")
+        if self.status == CANCELLED:
+            raise JobCancelled(f"{self.label} was cancelled")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    @property
+    def error(self):
+        return self._error
+
+    def cancel(self):
+        return self._pool.cancel(self) if self._pool is not None else False
+
+    def position(self):
+        """1-based place in the queue, or 0 once the job has left it."""
+        return self._pool.position(self) if self._pool is not None else 0
+
+    @property
+    def wait_ms(self):
+        end = self.started or self.finished or time.monotonic()
+        return (end - self.submitted) * 1000
+
+    @property
+    def run_ms(self):
+        if self.started is None:
+            return 0.0
+        return ((self.finished or time.monotonic()) - self.started) * 1000
+
+    def _finish(self, status, result=None, error=None):
+        self.status = status
+        self._result = result
+        self._error = error
+        self.finished = time.monotonic()
+        if status == DONE:
+            self.progress = 1.0
+        self.args = self.kwargs = None
+        self._done.set()
+
+
+def run_inline(target, args=(), kwargs=None, label=None, progress=False):
+    """Runs a job target on the calling thread and returns the finished Job. For inputs too small to offload."""
+    job = Job(None, 0, target, args, kwargs or {}, None, label, progress, None)
+    job.status = RUNNING
+    job.started = time.monotonic()
+    kwargs = dict(kwargs or {})
+    if progress:
+        kwargs["progress"] = lambda fraction, message="": None
+    try:
+        job._finish(DONE, result=_resolve(target)(*args, **kwargs))
+    except Exception as e:
+        job.traceback = traceback.format_exc(limit=-3)
+        job._finish(FAILED, error=e)
+    return job
+
+
+# =============================================================================
+# POOL
+# =============================================================================
+class JobPool:
+    """
+    A fixed set of worker processes fed from one bounded FIFO queue.
+    `is_alive(session)` is polled for sessions with pending work; their jobs are
+    cancelled once it has returned False for SESSION_GRACE seconds.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_queue=DEFAULT_MAX_QUEUE, per_session=DEFAULT_PER_SESSION,
+                 timeout=DEFAULT_TIMEOUT, is_alive=None):
+        self.size = workers
+        self.max_queue = max_queue
+        self.per_session = per_session
+        self.timeout = timeout
+        self._is_alive = is_alive
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._running = {}
+        self._sessions = {}
+        self._ids = itertools.count(1)
+        self._closed = False
+        self._stop = threading.Event()
+        self._waits = deque(maxlen=200)
+        self._runtimes = deque(maxlen=200)
+        self._depth = deque(maxlen=DEPTH_SAMPLES)
+        self._stats = {"submitted": 0, "done": 0, "failed": 0, "cancelled": 0, "rejected": 0,
+                       "timeouts": 0, "crashes": 0, "launches": 0}
+        self._threads = [threading.Thread(target=self._serve, name=f"job-worker-{i}", daemon=True)
+                         for i in range(workers)]
+        if is_alive is not None:
+            self._threads.append(threading.Thread(target=self._reap, name="job-reaper", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    # -------------------------------------------------------------------------
+    # Submitting and cancelling
+    # -------------------------------------------------------------------------
+    def submit(self, target, args=(), kwargs=None, session=None, label=None, progress=False, timeout=None):
+        """
+        Queues target(*args, **kwargs) and returns its Job. With progress=True the
+        target is also passed progress(fraction, message). Raises JobRejected
+        when the queue or the session's share of it is full.
+        """
+        with self._cond:
+            if self._closed:
+                raise JobError("The job pool is shut down")
+            if session is not None and self._sessions.get(session, 0) >= self.per_session:
+                self._stats["rejected"] += 1
+                raise JobRejected(f"You already have {self.per_session} jobs running. "
+                                  "Wait for one to finish or cancel it.")
+            if len(self._queue) >= self.max_queue:
+                self._stats["rejected"] += 1
+                raise JobRejected(f"The server is busy ({len(self._queue)} jobs waiting). "
+                                  "Please try again in a moment.")
+            job = Job(self, next(self._ids), target, tuple(args), dict(kwargs or {}), session, label, progress,
+                      timeout or self.timeout)
+            self._queue.append(job)
+            if session is not None:
+                self._sessions[session] = self._sessions.get(session, 0) + 1
+            self._stats["submitted"] += 1
+            self._sample()
+            self._cond.notify()
+        return job
+
+    def cancel(self, job):
+        """Drops a queued job or kills the worker running it. Returns False if it had already finished."""
+        with self._cond:
+            if job.done():
+                return False
+            if job.status == QUEUED:
+                self._queue.remove(job)
+                self._finish(job, CANCELLED)
+                return True
+            job._cancel = True
+            worker = self._running.get(job)
+        # The serving thread sees the worker die, records the cancellation and starts a new worker
+        if worker is not None and worker.process.poll() is None:
+            worker.process.kill()
+        return True
+
+    def cancel_session(self, session):
+        with self._cond:
+            jobs = [job for job in itertools.chain(self._queue, self._running) if job.session == session]
+        for job in jobs:
+            self.cancel(job)
+        return len(jobs)
+
+    def position(self, job):
+        with self._cond:
+            try:
+                return self._queue.index(job) + 1
+            except ValueError:
+                return 0
+
+    # -------------------------------------------------------------------------
+    # Serving (one thread per worker process)
+    # -------------------------------------------------------------------------
+    def _finish(self, job, status, result=None, error=None):
+        """Records a job's outcome. Caller holds self._cond."""
+        self._running.pop(job, None)
+        if job.session is not None:
+            left = self._sessions.get(job.session, 1) - 1
+            if left:
+                self._sessions[job.session] = left
+            else:
+                self._sessions.pop(job.session, None)
+        job._finish(status, result, error)
+        self._stats[status] += 1
+        if job.started is not None:
+            self._waits.append(job.wait_ms)
+            if status == DONE:
+                self._runtimes.append(job.run_ms)
+        self._sample()
+        self._cond.notify_all()
+
+    def _serve(self):
+        worker = None
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    break
+                job = self._queue.popleft()
+                job.status = RUNNING
+                job.started = time.monotonic()
+                self._running[job] = None
+                self._sample()
+            if worker is not None and worker.jobs >= MAX_JOBS_PER_WORKER:
+                worker.stop()
+                worker = None
+            if worker is None:
+                worker = _Worker()
+                with self._cond:
+                    self._stats["launches"] += 1
+            with self._cond:
+                self._running[job] = worker
+            if not self._run(job, worker):
+                worker.kill()
+                worker = None
+        if worker is not None:
+            worker.stop()
+
+    def _run(self, job, worker):
+        """Sends one job to a worker and relays its messages. Returns False if the worker must be replaced."""
+        deadline = job.started + job.timeout
+        if job._cancel:
+            with self._cond:
+                self._finish(job, CANCELLED)
+            return True
+        try:
+            worker.conn.send((job.target, job.args, job.kwargs, job.with_progress))
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    with self._cond:
+                        self._stats["timeouts"] += 1
+                        self._finish(job, FAILED, error=JobError(
+                            f"{job.label} exceeded the {job.timeout:g}s limit and was stopped."))
+                    return False
+                if not worker.conn.poll(min(remaining, POLL_INTERVAL)):
+                    continue
+                message = worker.conn.recv()
+                if message[0] == "progress":
+                    job.progress, job.message = message[1], message[2]
+                    continue
+                worker.jobs += 1
+                with self._cond:
+                    if message[0] == "done":
+                        self._finish(job, DONE, result=message[1])
+                    else:
+                        job.traceback = message[4]
+                        self._finish(job, FAILED, error=_load_error(*message[1:4]))
+                return True
+        except (EOFError, OSError):
+            with self._cond:
+                if job._cancel:
+                    self._finish(job, CANCELLED)
+                else:
+                    self._stats["crashes"] += 1
+                    self._finish(job, FAILED, error=JobError(
+                        f"The worker running {job.label} crashed. A fresh one is being started."))
+            return False
+        except Exception as e:
+            # The whole reply was read but could not be unpickled here; the worker itself is fine
+            worker.jobs += 1
+            with self._cond:
+                self._finish(job, FAILED, error=JobError(f"The result of {job.label} could not be read: {e}"))
+            return True
+
+    def _reap(self):
+        """Cancels the jobs of sessions that stayed gone for SESSION_GRACE seconds."""
+        gone_since = {}
+        while not self._stop.wait(REAP_INTERVAL):
+            with self._cond:
+                sessions = {job.session for job in itertools.chain(self._queue, self._running)
+                            if job.session is not None}
+            now = time.monotonic()
+            for session in sessions:
+                if self._is_alive(session):
+                    gone_since.pop(session, None)
+                elif now - gone_since.setdefault(session, now) >= SESSION_GRACE:
+                    self.cancel_session(session)
+                    gone_since.pop(session)
+            for session in set(gone_since) - sessions:
+                gone_since.pop(session)
+
+    # -------------------------------------------------------------------------
+    # Metrics
+    # -------------------------------------------------------------------------
+    def _sample(self):
+        """Appends a (time, queued, running) point. Caller holds self._cond."""
+        self._depth.append((time.time(), len(self._queue), len(self._running)))
+
+    def stats(self):
+        """Queue depth, worker usage and outcome counters for display."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["queued"] = len(self._queue)
+            stats["running"] = len(self._running)
+            stats["sessions"] = len(self._sessions)
+            waits = list(self._waits)
+            runtimes = list(self._runtimes)
+        stats["workers"] = self.size
+        stats["max_queue"] = self.max_queue
+        stats["p50_wait_ms"] = statistics.median(waits) if waits else None
+        stats["p50_run_ms"] = statistics.median(runtimes) if runtimes else None
+        return stats
+
+    def depth_history(self):
+        """[(unix time, queued, running)] at every change, most recent DEPTH_SAMPLES."""
+        with self._cond:
+            return list(self._depth)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            queued = list(self._queue)
+            self._queue.clear()
+            for job in queued:
+                self._finish(job, CANCELLED)
+            running = list(self._running)
+            self._cond.notify_all()
+        self._stop.set()
+        for job in running:
+            self.cancel(job)
+        for thread in self._threads:
+            thread.join(timeout=10)
+
+
+if __name__ == "__main__":
+    _worker_main(worker_connection())
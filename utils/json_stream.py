@@ -0,0 +1,71 @@
+import codecs
+import json
+import re
+
+# =============================================================================
+# STREAMING JSON ARRAYS
+# =============================================================================
+# Large reports and HAR files are a single JSON document whose bulk is one array.
+# iter_json_array() yields that array's elements one at a time, so memory is
+# bounded by the largest element rather than by the file.
+
+READ_SIZE = 1 << 20
+_WS_COMMA = re.compile(r"[\s,]*")
+
+
+def iter_json_array(fileobj, key=None, read_size=READ_SIZE):
+    """
+    Yields the elements of a JSON array from a binary or text file object.
+    With key=None the document itself must be an array; otherwise the first
+    array value of `"key": [` found in the stream is used.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+
+    def read(size):
+        chunk = fileobj.read(size)
+        if isinstance(chunk, bytes):
+            return utf8.decode(chunk, final=not chunk)
+        return chunk
+
+    buf, eof = "", False
+    opener = re.compile(r"\s*\[" if key is None else r'"%s"\s*:\s*\[' % re.escape(key))
+    while True:
+        m = opener.search(buf) if key is not None else opener.match(buf)
+        if m:
+            pos = m.end()
+            break
+        if eof:
+            raise ValueError(f"No JSON array found{f' for key {key!r}' if key else ''}")
+        chunk = read(read_size)
+        eof = not chunk
+        # Keep a tail so a key split across chunks is still found
+        buf = (buf[-len(key) - 16:] if key is not None else buf) + chunk
+
+    size = read_size
+    while True:
+        pos = _WS_COMMA.match(buf, pos).end()
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        try:
+            if pos >= len(buf):
+                raise json.JSONDecodeError("need more data", buf, pos)
+            value, end = decoder.raw_decode(buf, pos)
+            if end == len(buf) and not eof:
+                # A number at the end of the buffer may continue in the next chunk
+                raise json.JSONDecodeError("need more data", buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise ValueError("Truncated JSON array") from None
+            chunk = read(size)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+            # Grow reads for very large elements so re-parsing stays amortized
+            size = min(size * 2, 64 * read_size)
+            continue
+        size = read_size
+        pos = end
+        yield value
+        if pos > read_size:
+            buf, pos = buf[pos:], 0
@@ -31,16 +31,12 @@ def render_header():
     </div>
     """, unsafe_allow_html=True)
 
-def render_navigation():
+def render_navigation(current="Home"):
+    """The nav menu, opened on `current` (the page in the URL). Returns the page to show."""
     nav_options = ["Home", "Playwright", "WebdriverIO", "Karate", "Comparisons"]
     icons = ["house", "play-circle", "robot", "lightning", "bar-chart"]
     
-    default_index = 0
-    if "nav_selection" in st.session_state:
-        try:
-            default_index = nav_options.index(st.session_state.nav_selection)
-        except ValueError:
-            default_index = 0
+    default_index = nav_options.index(current) if current in nav_options else 0
             
     selected = option_menu(
         menu_title=None,
@@ -75,7 +71,6 @@ def render_navigation():
             },
         }
     )
-    st.session_state.nav_selection = selected
     st.markdown("<br>", unsafe_allow_html=True)
     return selected
 
@@ -0,0 +1,429 @@
+import argparse
+import asyncio
+import threading
+import time
+from collections import Counter, namedtuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+# =============================================================================
+# INJECTION PROFILES (Gatling open model)
+# =============================================================================
+# Users arrive on a pre-computed schedule whether or not earlier requests have
+# finished. Latency is measured from each user's *scheduled* arrival, so a stalled
+# server shows up in the percentiles instead of silently lowering the send rate
+# (no coordinated omission).
+
+InjectionStep = namedtuple("InjectionStep", ["kind", "users", "rate", "during"])
+
+
+def at_once_users(users):
+    return InjectionStep("atOnceUsers", users, None, 0.0)
+
+
+def ramp_users(users, during):
+    return InjectionStep("rampUsers", users, None, float(during))
+
+
+def constant_users_per_sec(rate, during):
+    return InjectionStep("constantUsersPerSec", int(round(rate * during)), float(rate), float(during))
+
+
+def nothing_for(during):
+    return InjectionStep("nothingFor", 0, None, float(during))
+
+
+def build_schedule(steps):
+    """Returns the arrival offsets (seconds from start) of every user, sorted."""
+    offsets, start = [], 0.0
+    for step in steps:
+        if step.users:
+            if step.kind == "atOnceUsers":
+                offsets.append(np.full(step.users, start))
+            else:
+                offsets.append(start + np.arange(step.users) * (step.during / step.users))
+        start += step.during
+    if not offsets:
+        return np.empty(0)
+    return np.concatenate(offsets)
+
+
+def profile_duration(steps):
+    """Seconds the injection lasts, not counting the wait for the last responses."""
+    return sum(step.during for step in steps)
+
+
+def peak_rate(steps):
+    """Highest arrival rate of a profile in users per second (an atOnceUsers burst counts as one second)."""
+    return max((step.users / step.during if step.during else step.users for step in steps if step.users),
+               default=0.0)
+
+
+def describe_profile(steps):
+    """Renders steps the way they would appear in a Gatling simulation."""
+    parts = []
+    for s in steps:
+        if s.kind == "atOnceUsers":
+            parts.append(f"atOnceUsers({s.users})")
+        elif s.kind == "constantUsersPerSec":
+            parts.append(f"constantUsersPerSec({s.rate:g}) during ({s.during:g} seconds)")
+        elif s.kind == "nothingFor":
+            parts.append(f"nothingFor({s.during:g} seconds)")
+        else:
+            parts.append(f"{s.kind}({s.users}) during ({s.during:g} seconds)")
+    return ",\n".join(parts)
+
+
+# =============================================================================
+# HDR-STYLE LATENCY HISTOGRAM
+# =============================================================================
+class LatencyHistogram:
+    """
+    Log-linear histogram in the style of HdrHistogram. Values are microseconds;
+    every bucket is at most 1/2**(bits-1) wide relative to its value, so with the
+    default 11 bits percentiles are accurate to ~0.1% from 1 us up to an hour.
+    """
+
+    def __init__(self, bits=11, max_value_us=3_600_000_000):
+        self.bits = bits
+        self.half = 1 << (bits - 1)
+        self.max_value = max_value_us
+        self.counts = np.zeros(self._index(np.array([max_value_us]))[0] + 1, dtype=np.int64)
+        self.total = 0
+        self.max_seen = 0
+        self._sum = 0.0
+
+    def _index(self, values):
+        exp = np.maximum(np.floor(np.log2(np.maximum(values, 1))).astype(np.int64) - (self.bits - 1), 0)
+        return exp * self.half + (values >> exp)
+
+    def _bounds(self, index):
+        index = np.asarray(index, dtype=np.int64)
+        exp = np.maximum(index // self.half - 1, 0)
+        lower = (index - exp * self.half) << exp
+        return lower, lower + (1 << exp) - 1
+
+    def record_many(self, values_us):
+        values = np.clip(np.asarray(values_us, dtype=np.int64), 0, self.max_value)
+        if values.size == 0:
+            return
+        self.counts += np.bincount(self._index(values), minlength=self.counts.size)
+        self.total += int(values.size)
+        self.max_seen = max(self.max_seen, int(values.max()))
+        self._sum += float(values.sum())
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.total += other.total
+        self.max_seen = max(self.max_seen, other.max_seen)
+        self._sum += other._sum
+
+    def percentiles(self, quantiles):
+        """Values (us) at the given percentiles (0-100), computed in one vectorized pass."""
+        quantiles = np.asarray(quantiles, dtype=np.float64)
+        if self.total == 0:
+            return np.full(quantiles.shape, np.nan)
+        cumulative = np.cumsum(self.counts)
+        ranks = np.maximum(np.ceil(quantiles / 100.0 * self.total), 1)
+        _, upper = self._bounds(np.searchsorted(cumulative, ranks))
+        return np.minimum(upper, self.max_seen).astype(np.float64)
+
+    def mean(self):
+        return self._sum / self.total if self.total else float("nan")
+
+
+# =============================================================================
+# POOLED ASYNCIO HTTP/1.1 CLIENT
+# =============================================================================
+class _Connection:
+    __slots__ = ("reader", "writer")
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+
+class ConnectionPool:
+    """Keep-alive connections to a single host, capped at max_connections."""
+
+    def __init__(self, host, port, max_connections):
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.opened = 0
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def request(self, payload, timeout):
+        await self._slots.acquire()
+        conn = None
+        try:
+            conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), timeout)
+                conn = _Connection(reader, writer)
+                self.opened += 1
+            sent = time.perf_counter()
+            conn.writer.write(payload)
+            status, keep_alive = await asyncio.wait_for(self._read_response(conn.reader), timeout)
+            if keep_alive:
+                self._idle.append(conn)
+            else:
+                conn.writer.close()
+            return status, sent
+        except BaseException:
+            if conn is not None:
+                conn.writer.close()
+            raise
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    async def _read_response(reader):
+        head = await reader.readuntil(b"\r\n\r\n")
+        status_line, _, header_block = head.partition(b"\r\n")
+        status = int(status_line.split(b" ", 2)[1])
+        headers = {}
+        for line in header_block.split(b"\r\n"):
+            name, sep, value = line.partition(b":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        if headers.get(b"transfer-encoding", b"").lower() == b"chunked":
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        else:
+            length = int(headers.get(b"content-length", b"0"))
+            if length:
+                await reader.readexactly(length)
+        return status, headers.get(b"connection", b"").lower() != b"close"
+
+    def close(self):
+        for conn in self._idle:
+            conn.writer.close()
+        self._idle.clear()
+
+
+# =============================================================================
+# LOAD TEST ENGINE
+# =============================================================================
+class LoadTest:
+    """Runs an injection profile against one HTTP endpoint and records HDR latencies."""
+
+    def __init__(self, url, steps, method="GET", body=None, headers=None,
+                 max_connections=256, timeout=10.0, max_in_flight=20000, interval=1.0, max_duration=None):
+        parts = urlsplit(url)
+        self.url = url
+        self.steps = list(steps)
+        self.schedule = build_schedule(self.steps)
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self.interval = interval
+        # A hard stop, in-flight requests included; None waits for the last response
+        self.max_duration = max_duration
+        self._pool_args = (parts.hostname, parts.port or 80, max_connections)
+
+        body = body.encode("utf-8") if isinstance(body, str) else (body or b"")
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        lines = [f"{method.upper()} {target} HTTP/1.1", f"Host: {parts.netloc}", f"Content-Length: {len(body)}"]
+        lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        self.payload = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+        self.latency = LatencyHistogram()
+        self.service_time = LatencyHistogram()
+        self.outcomes = Counter()
+        self.snapshots = []
+        self.started_at = None
+        self.finished = False
+        self._stop = False
+        self._in_flight = 0
+        self._pending_latency = []
+        self._pending_service = []
+        self._interval_latency = []
+        self._thread = None
+        self.connections_opened = 0
+
+    async def _user(self, pool, intended):
+        try:
+            status, sent = await pool.request(self.payload, self.timeout)
+            done = time.perf_counter()
+            self._pending_latency.append(done - intended)
+            self._pending_service.append(done - sent)
+            self._interval_latency.append(done - intended)
+            self.outcomes["OK" if status < 400 else f"KO {status}"] += 1
+        except asyncio.TimeoutError:
+            self.outcomes["KO timeout"] += 1
+        except asyncio.CancelledError:
+            # Cut off by max_duration rather than stop(): a timeout after waiting this long
+            if not self._stop:
+                waited = time.perf_counter() - intended
+                self._pending_latency.append(waited)
+                self._interval_latency.append(waited)
+                self.outcomes["KO timeout"] += 1
+            raise
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError) as exc:
+            self.outcomes[f"KO {type(exc).__name__}"] += 1
+        finally:
+            self._in_flight -= 1
+
+    def _flush(self):
+        if self._pending_latency:
+            self.latency.record_many(np.array(self._pending_latency) * 1e6)
+            self.service_time.record_many(np.array(self._pending_service) * 1e6)
+            self._pending_latency.clear()
+            self._pending_service.clear()
+
+    def _snapshot(self, elapsed, sent, previous):
+        interval = np.array(self._interval_latency) * 1000
+        self._interval_latency.clear()
+        completed = sum(self.outcomes.values())
+        window = elapsed - previous["t"] or self.interval
+        p50, p95, p99 = np.percentile(interval, [50, 95, 99]) if interval.size else (np.nan,) * 3
+        snap = {
+            "t": elapsed,
+            "target_rps": float(np.count_nonzero((self.schedule > previous["t"]) & (self.schedule <= elapsed)) / window),
+            "sent_rps": (sent - previous["sent"]) / window,
+            "completed_rps": (completed - previous["completed"]) / window,
+            "errors": completed - self.outcomes["OK"],
+            "in_flight": self._in_flight,
+            "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+            "sent": sent, "completed": completed,
+        }
+        self.snapshots.append(snap)
+        return snap
+
+    async def run(self):
+        pool = ConnectionPool(*self._pool_args)
+        loop_start = time.perf_counter() + 0.05
+        self.started_at = time.time()
+        schedule = self.schedule
+        tasks = set()
+        sent = 0
+        last = {"t": 0.0, "sent": 0, "completed": 0}
+        next_snapshot = self.interval
+        deadline = self.max_duration if self.max_duration is not None else float("inf")
+        try:
+            while sent < schedule.size and not self._stop and time.perf_counter() - loop_start < deadline:
+                elapsed = time.perf_counter() - loop_start
+                due = int(np.searchsorted(schedule, elapsed, side="right"))
+                for i in range(sent, due):
+                    if self._in_flight >= self.max_in_flight:
+                        self.outcomes["KO dropped (max in flight)"] += 1
+                        continue
+                    self._in_flight += 1
+                    task = asyncio.ensure_future(self._user(pool, loop_start + schedule[i]))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                sent = due
+                if elapsed >= next_snapshot:
+                    self._flush()
+                    last = self._snapshot(elapsed, sent, last)
+                    next_snapshot += self.interval
+                wake = min(schedule[sent] if sent < schedule.size else elapsed, next_snapshot)
+                await asyncio.sleep(max(wake - (time.perf_counter() - loop_start), 0))
+            while tasks and not self._stop:
+                await asyncio.sleep(min(self.interval, 0.05))
+                elapsed = time.perf_counter() - loop_start
+                if elapsed >= deadline:
+                    break
+                if elapsed >= next_snapshot:
+                    self._flush()
+                    last = self._snapshot(elapsed, sent, last)
+                    next_snapshot += self.interval
+            for task in list(tasks):
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self._flush()
+            elapsed = time.perf_counter() - loop_start
+            if elapsed - last["t"] >= self.interval / 4 or not self.snapshots:
+                self._snapshot(elapsed, sent, last)
+            pool.close()
+            self.connections_opened = pool.opened
+            self.finished = True
+
+    def start_in_thread(self):
+        """Runs the test on a private event loop thread so a UI can poll snapshots."""
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()), name="load-test", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, wait=None):
+        """Stops sending and abandons in-flight requests. With `wait`, joins the thread for up to that many seconds."""
+        self._stop = True
+        if wait is not None and self._thread is not None:
+            self._thread.join(wait)
+
+    def summary(self):
+        pcts = [50, 75, 90, 95, 99, 99.9]
+        corrected = self.latency.percentiles(pcts) / 1000
+        service = self.service_time.percentiles(pcts) / 1000
+        duration = self.snapshots[-1]["t"] if self.snapshots else 0.0
+        completed = sum(self.outcomes.values())
+        return {
+            "requests": completed,
+            "ok": self.outcomes["OK"],
+            "errors": {k: v for k, v in self.outcomes.items() if k != "OK"},
+            "duration_s": duration,
+            "mean_rps": completed / duration if duration else 0.0,
+            "percentiles": pcts,
+            "latency_ms": corrected.tolist(),
+            "service_time_ms": service.tolist(),
+            "max_ms": self.latency.max_seen / 1000,
+            "mean_ms": self.latency.mean() / 1000,
+        }
+
+
+def _parse_step(kind, spec):
+    if kind == "ramp":
+        users, during = spec.split(":")
+        return ramp_users(int(users), float(during))
+    if kind == "constant":
+        rate, during = spec.split(":")
+        return constant_users_per_sec(float(rate), float(during))
+    if kind == "once":
+        return at_once_users(int(spec))
+    return nothing_for(float(spec))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Open-model load generator. Steps run in the order given, e.g. "
+                    "--ramp 100:5 --constant 50:10 (users:seconds, rate:seconds)."
+    )
+    parser.add_argument("url")
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--body", default=None)
+    parser.add_argument("--header", action="append", default=[], help="'Name: value'")
+    parser.add_argument("--connections", type=int, default=256)
+    parser.add_argument("--ramp", dest="steps", action="append", type=lambda v: ("ramp", v))
+    parser.add_argument("--constant", dest="steps", action="append", type=lambda v: ("constant", v))
+    parser.add_argument("--once", dest="steps", action="append", type=lambda v: ("once", v))
+    parser.add_argument("--pause", dest="steps", action="append", type=lambda v: ("pause", v))
+    args = parser.parse_args()
+
+    steps = [_parse_step(kind, spec) for kind, spec in (args.steps or [("constant", "50:10")])]
+    headers = dict(h.split(":", 1) for h in args.header)
+    test = LoadTest(args.url, steps, method=args.method, body=args.body,
+                    headers={k.strip(): v.strip() for k, v in headers.items()}, max_connections=args.connections)
+    print(describe_profile(steps))
+    test.start_in_thread()
+    printed = 0
+    while not test.finished:
+        time.sleep(0.2)
+        for snap in test.snapshots[printed:]:
+            print(f"t={snap['t']:5.1f}s target {snap['target_rps']:8.0f}/s sent {snap['sent_rps']:8.0f}/s "
+                  f"done {snap['completed_rps']:8.0f}/s p50 {snap['p50_ms']:7.2f} p99 {snap['p99_ms']:7.2f} ms "
+                  f"in-flight {snap['in_flight']}")
+        printed = len(test.snapshots)
+    summary = test.summary()
+    print(f"\n{summary['requests']} requests, {summary['mean_rps']:.0f}/s, errors {summary['errors']}")
+    for p, lat, svc in zip(summary["percentiles"], summary["latency_ms"], summary["service_time_ms"]):
+        print(f"  p{p:<5} {lat:9.2f} ms   (service time {svc:9.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+import argparse
+import gc
+import pickle
+import re
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from utils.cache import cache_lock, cache_path, digest_bytes, write_atomic
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# =============================================================================
+# DOCUMENT INDEX
+# =============================================================================
+# One pass over the parsed document records, per element, the facts locators are
+# built from (tag, implicit/explicit role, accessible name, label, ids, classes,
+# test ids, position). Lookup tables are built from those columns, so the parse
+# tree itself is dropped and the index can be pickled and cached by document hash.
+Candidate = namedtuple("Candidate", ["code", "strategy", "matches", "brittleness", "score", "note"])
+
+MAX_NAME = 120
+MEMORY_CACHE_SIZE = 4
+INDEX_VERSION = 1
+TEST_ID_ATTRIBUTES = ("data-testid", "data-test-id", "data-test", "data-qa", "data-cy")
+
+# Lower is better: how likely each strategy is to break on an unrelated change
+BRITTLENESS = {
+    "test_id": 0.05, "role": 0.1, "label": 0.15, "alt": 0.25, "placeholder": 0.3, "text": 0.3,
+    "title": 0.35, "id": 0.35, "css": 0.7, "xpath": 0.95,
+}
+
+_INPUT_ROLES = {
+    "button": "button", "submit": "button", "reset": "button", "image": "button",
+    "checkbox": "checkbox", "radio": "radio", "range": "slider", "number": "spinbutton",
+    "search": "searchbox", "email": "textbox", "tel": "textbox", "text": "textbox", "url": "textbox",
+    "password": None, "hidden": None, "file": None, "color": None, "date": None,
+}
+_TAG_ROLES = {
+    "button": "button", "textarea": "textbox", "option": "option", "nav": "navigation", "main": "main",
+    "aside": "complementary", "article": "article", "dialog": "dialog", "table": "table", "tr": "row",
+    "td": "cell", "th": "columnheader", "ul": "list", "ol": "list", "li": "listitem", "progress": "progressbar",
+    "h1": "heading", "h2": "heading", "h3": "heading", "h4": "heading", "h5": "heading", "h6": "heading",
+    "summary": "button", "fieldset": "group", "hr": "separator", "header": "banner", "footer": "contentinfo",
+}
+# Roles whose accessible name comes from their text content
+_NAME_FROM_CONTENT = {
+    "button", "link", "heading", "option", "cell", "columnheader", "rowheader", "tab", "menuitem",
+    "checkbox", "radio", "switch", "treeitem", "tooltip", "listitem",
+}
+_NO_TEXT_TAGS = {"script", "style", "head", "title", "meta", "link", "input", "img", "br", "hr", "select", "textarea"}
+_LABELABLE = {"input", "select", "textarea", "button", "meter", "output", "progress"}
+_GENERATED_ID = re.compile(r"(^:r[0-9a-z]+:$)|(^(ember|ext-gen|yui_|react-select-|mui-|headlessui-)\S*\d)|[0-9a-f]{8,}|^[a-z]{1,3}-[0-9a-z]{5,}$", re.I)
+_HASHED_CLASS = re.compile(r"^(css|sc|jss|emotion|makeStyles|styled)-|_[a-zA-Z0-9]{5,}$|^[a-zA-Z]{1,3}[0-9][a-zA-Z0-9]{4,}$")
+_STRING = etree.XPath("string()") if etree is not None else None
+
+
+class LocatorIndexError(ValueError):
+    pass
+
+
+def _clean(text):
+    if not text:
+        return ""
+    text = " ".join(text.split())
+    return text if len(text) <= MAX_NAME else text[:MAX_NAME]
+
+
+def _role(tag, attrs):
+    """Implicit ARIA role of an element (explicit role attributes are handled by the caller)."""
+    if tag == "input":
+        return _INPUT_ROLES.get((attrs.get("type") or "text").lower(), "textbox")
+    if tag == "a" or tag == "area":
+        return "link" if attrs.get("href") is not None else None
+    if tag == "img":
+        return "presentation" if attrs.get("alt") == "" else "img"
+    if tag == "select":
+        return "listbox" if attrs.get("multiple") is not None or (attrs.get("size") or "1") not in ("", "0", "1") else "combobox"
+    if tag == "section" or tag == "form":
+        # Only exposed as landmarks when they have an accessible name
+        if attrs.get("aria-label") or attrs.get("aria-labelledby") or attrs.get("title"):
+            return "region" if tag == "section" else "form"
+        return None
+    return _TAG_ROLES.get(tag)
+
+
+def _parse(html):
+    if etree is None:
+        raise LocatorIndexError("The locator scorer needs lxml: pip install lxml")
+    # Plain etree elements: lxml.html's element class lookup runs in Python per node
+    root = etree.fromstring(html, etree.HTMLParser(remove_comments=True, remove_pis=True))
+    if root is None:
+        raise LocatorIndexError("The document contains no elements.")
+    return root
+
+
+def _text(el):
+    return (el.text or "") if len(el) == 0 else _STRING(el)
+
+
+def _sibling_positions(parents, tags):
+    """1-based position of each element among same-tag siblings, and the size of that group."""
+    codes = {}
+    tag_codes = np.fromiter((codes.setdefault(t, len(codes)) for t in tags), np.int64, len(tags))
+    keys = (parents.astype(np.int64) + 1) * max(len(codes), 1) + tag_codes
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    sizes = np.diff(np.r_[starts, len(keys)])
+    group = np.repeat(np.arange(len(starts)), sizes)
+    nth = np.empty(len(keys), np.int32)
+    nth[order] = np.arange(len(keys)) - starts[group] + 1
+    total = np.empty(len(keys), np.int32)
+    total[order] = sizes[group]
+    return nth, total
+
+
+def _depths(parents):
+    """Tree depth per element by pointer jumping over the parent array."""
+    depth = np.zeros(len(parents), np.int32)
+    ancestor = parents.copy()
+    while True:
+        alive = ancestor >= 0
+        if not alive.any():
+            return depth
+        depth += alive
+        ancestor[alive] = parents[ancestor[alive]]
+
+
+_ROLE_TAGS = {"a", "area", "input", "select", "img", "section", "form", *_TAG_ROLES}
+_INDEXED_ATTRIBUTES = ("id", "class", "role", "placeholder", "title", "alt", "aria-label", "aria-labelledby", "for",
+                       *TEST_ID_ATTRIBUTES)
+
+
+class LocatorIndex:
+    """
+    Per-element columns plus lookup tables for counting locator matches. Element
+    selection and text extraction run in lxml's XPath engine; Python only touches
+    the elements each table needs.
+    """
+
+    def __init__(self, html):
+        root = _parse(html)
+        elements = root.xpath("//*")
+        if not elements:
+            raise LocatorIndexError("The document contains no elements.")
+        position = {el: i for i, el in enumerate(elements)}
+        self.tags = [el.tag for el in elements]
+        self.parents = np.fromiter((position.get(el.getparent(), -1) for el in elements), np.int32, len(elements))
+        self.nth, self.same_tag_siblings = _sibling_positions(self.parents, self.tags)
+        self.depth = _depths(self.parents)
+
+        # One traversal for every attribute; each result knows its name and element
+        columns = {name: {} for name in _INDEXED_ATTRIBUTES}
+        for value in root.xpath("//@*"):
+            column = columns.get(value.attrname)
+            if column is not None:
+                column[position[value.getparent()]] = str(value)
+        self.ids = columns["id"]
+        self.classes = {i: tuple(v.split()) for i, v in columns["class"].items() if v.strip()}
+        self.test_ids = {}
+        for name in TEST_ID_ATTRIBUTES:
+            for i, value in columns[name].items():
+                self.test_ids.setdefault(i, value)
+        self.placeholders = columns["placeholder"]
+        self.titles = columns["title"]
+        self.alts = {i: v for i, v in columns["alt"].items() if self.tags[i] in ("img", "area", "input")}
+
+        self.by_id, self.by_test_id = {}, {}
+        for i, value in self.ids.items():
+            self.by_id.setdefault(value, []).append(i)
+        for i, value in self.test_ids.items():
+            self.by_test_id.setdefault(value, []).append(i)
+
+        # Roles and accessible names, for elements that can have a role at all
+        self.roles, self.names, self.labels, self.texts = {}, {}, {}, {}
+        labelled_by = {}
+        # Tag filtering in Python beats a many-way XPath union, which has to sort its result
+        candidates = {i for i, tag in enumerate(self.tags) if tag in _ROLE_TAGS}
+        candidates.update(columns["role"])
+        aria_label, aria_labelledby = columns["aria-label"], columns["aria-labelledby"]
+        for i in sorted(candidates):
+            el = elements[i]
+            tag = self.tags[i]
+            role = columns["role"][i].split()[0] if i in columns["role"] and columns["role"][i].strip() else _role(tag, el)
+            if not role:
+                continue
+            self.roles[i] = role
+            name = aria_label.get(i)
+            if i in aria_labelledby:
+                labelled_by[i] = aria_labelledby[i].split()
+            if not name:
+                if tag == "img":
+                    name = self.alts.get(i)
+                elif tag == "input":
+                    kind = (el.get("type") or "").lower()
+                    if kind in ("submit", "button", "reset"):
+                        name = el.get("value") or ("Submit" if kind == "submit" else None)
+                elif role in _NAME_FROM_CONTENT:
+                    name = _text(el)
+            name = _clean(name)
+            if name:
+                self.names[i] = name
+
+        # Labels: label[for=id], else the first labelable descendant of the label
+        for label in root.iter("label"):
+            target = label.get("for")
+            if target:
+                matches = [i for i in self.by_id.get(target, ()) if self.tags[i] in _LABELABLE]
+                index = matches[0] if matches else None
+            else:
+                wrapped = next(label.iter(*_LABELABLE), None)
+                index = position[wrapped] if wrapped is not None else None
+            if index is None or index in self.labels:
+                continue
+            text = _clean(_text(label))
+            if text:
+                self.labels[index] = text
+                if index not in self.names and self.tags[index] != "button":
+                    self.names[index] = text
+        for index, ids in labelled_by.items():
+            text = _clean(" ".join(_text(elements[self.by_id[i][0]]) for i in ids if i in self.by_id))
+            if text:
+                self.names[index] = text
+                if self.tags[index] in _LABELABLE:
+                    self.labels[index] = text
+
+        # Leaf text for get_by_text
+        has_children = np.zeros(len(elements), dtype=bool)
+        has_children[self.parents[self.parents >= 0]] = True
+        for i in np.flatnonzero(~has_children).tolist():
+            if self.tags[i] in _NO_TEXT_TAGS:
+                continue
+            el = elements[i]
+            text = self.names.get(i) or _clean(_text(el))
+            if text:
+                self.texts[i] = text
+
+        self.by_role = {}
+        for i, role in self.roles.items():
+            names, indices = self.by_role.setdefault(role, ([], []))
+            names.append(self.names.get(i, "").lower())
+            indices.append(i)
+        self.by_label, self.by_text, self.by_tag_class = {}, {}, {}
+        for i, label in self.labels.items():
+            self.by_label.setdefault(label.lower(), []).append(i)
+        for i, text in self.texts.items():
+            self.by_text.setdefault(text.lower(), []).append(i)
+        for i, classes in self.classes.items():
+            for c in classes:
+                key = (self.tags[i], c)
+                self.by_tag_class[key] = self.by_tag_class.get(key, 0) + 1
+
+    def __len__(self):
+        return len(self.tags)
+
+    # -------------------------------------------------------------------------
+    # Matching (mirrors Playwright's default case-insensitive substring match)
+    # -------------------------------------------------------------------------
+    def role_matches(self, role, name, exact=False):
+        names, indices = self.by_role.get(role, ([], []))
+        if name is None:
+            return list(indices)
+        needle = name.lower()
+        if exact:
+            return [i for n, i in zip(names, indices) if n == needle]
+        return [i for n, i in zip(names, indices) if needle in n]
+
+    def _substring_matches(self, table, text, exact=False):
+        needle = text.lower()
+        if exact:
+            return list(table.get(needle, []))
+        return [i for key, indices in table.items() if needle in key for i in indices]
+
+    def attribute_matches(self, column, text):
+        needle = text.lower()
+        return [i for i, value in column.items() if needle in value.lower()]
+
+    def subtree(self, index):
+        """(start, end) range of element indices inside the element, itself included."""
+        after = np.flatnonzero(self.depth[index + 1:] <= self.depth[index])
+        return index, index + 1 + (int(after[0]) if after.size else len(self.depth) - index - 1)
+
+    def anchor(self, index):
+        """Closest ancestor with a unique test id or stable id, as (locator code, brittleness), or None."""
+        ancestor = int(self.parents[index])
+        while ancestor >= 0:
+            test_id = self.test_ids.get(ancestor)
+            if test_id and len(self.by_test_id[test_id]) == 1:
+                return ancestor, f"page.get_by_test_id({_quote(test_id)})", BRITTLENESS["test_id"]
+            el_id = self.ids.get(ancestor)
+            if el_id and len(self.by_id[el_id]) == 1 and not _GENERATED_ID.search(el_id):
+                return ancestor, f"page.locator({_quote('#' + css_escape(el_id))})", BRITTLENESS["id"]
+            ancestor = int(self.parents[ancestor])
+        return None
+
+    def xpath(self, index):
+        steps = []
+        while index >= 0:
+            parent = int(self.parents[index])
+            tag = self.tags[index]
+            steps.append(f"{tag}[{self.nth[index]}]" if self.same_tag_siblings[index] > 1 else tag)
+            index = parent
+        return "//" + "/".join(reversed(steps))
+
+    # -------------------------------------------------------------------------
+    # Targets and suggestions
+    # -------------------------------------------------------------------------
+    def targets(self, limit=None):
+        """Elements worth locating: anything with a role and a name, a label, a test id or an id."""
+        named = (i for i, role in self.roles.items() if i in self.names and role not in ("listitem", "cell", "row"))
+        with_id = (i for i in self.ids if self.tags[i] not in ("html", "body", "head"))
+        out = sorted(set(named).union(self.labels, self.test_ids, with_id))
+        return out[:limit] if limit else out
+
+    def describe(self, index):
+        shown = (("id", self.ids.get(index)), ("class", " ".join(self.classes.get(index, ()))))
+        attrs = "".join(f' {k}="{v}"' for k, v in shown if v)
+        name = self.names.get(index) or self.labels.get(index) or self.placeholders.get(index) or ""
+        return f"<{self.tags[index]}{attrs}> {name[:60]}".strip()
+
+    def suggest(self, index):
+        """Ranked Candidate locators for the element at `index` (best first)."""
+        candidates = []
+        shared = []
+
+        def add(code, strategy, matches, note="", penalty=0.0):
+            if index not in matches:
+                return
+            brittleness = min(BRITTLENESS[strategy] + penalty, 1.0)
+            count = len(matches)
+            if count > 1 and code.startswith("page.get_by_"):
+                shared.append((code, strategy, matches, brittleness))
+            score = 100 * (1 - brittleness) / (1 if count == 1 else 2 * count ** 0.5)
+            candidates.append(Candidate(code, strategy, count, round(brittleness, 2), round(score, 1), note))
+            if count > 1:
+                position = matches.index(index)
+                nth = ".first" if position == 0 else f".nth({position})"
+                candidates.append(Candidate(code + nth, strategy, 1, round(min(brittleness + 0.3, 1.0), 2),
+                                            round(100 * (1 - min(brittleness + 0.3, 1.0)) * 0.9, 1),
+                                            "positional among equal matches"))
+
+        q = _quote
+        test_id = self.test_ids.get(index)
+        if test_id:
+            add(f"page.get_by_test_id({q(test_id)})", "test_id", self.by_test_id[test_id], "explicit test contract")
+        role, name = self.roles.get(index), self.names.get(index)
+        if role and role not in ("presentation", "none", "generic"):
+            if name:
+                matches = self.role_matches(role, name)
+                if len(matches) > 1:
+                    exact = self.role_matches(role, name, exact=True)
+                    if len(exact) < len(matches):
+                        add(f"page.get_by_role({q(role)}, name={q(name)}, exact=True)", "role", exact, "exact name")
+                add(f"page.get_by_role({q(role)}, name={q(name)})", "role", matches, "what a user or screen reader sees",
+                    penalty=0.1 if len(name) > 40 else 0.0)
+            else:
+                add(f"page.get_by_role({q(role)})", "role", self.role_matches(role, None), "no accessible name", penalty=0.2)
+        label = self.labels.get(index)
+        if label:
+            add(f"page.get_by_label({q(label)})", "label", self._substring_matches(self.by_label, label), "label association")
+        for column, strategy, method in ((self.placeholders, "placeholder", "get_by_placeholder"),
+                                         (self.alts, "alt", "get_by_alt_text"), (self.titles, "title", "get_by_title")):
+            value = column.get(index)
+            if value:
+                add(f"page.{method}({q(value)})", strategy, self.attribute_matches(column, value))
+        text = self.texts.get(index)
+        if text and not (role and name):
+            add(f"page.get_by_text({q(text)})", "text", self._substring_matches(self.by_text, text),
+                "copy changes break it", penalty=0.1 if len(text) > 40 else 0.0)
+        el_id = self.ids.get(index)
+        if el_id:
+            generated = bool(_GENERATED_ID.search(el_id))
+            add(f"page.locator({q('#' + css_escape(el_id))})", "id", self.by_id[el_id],
+                "looks generated" if generated else "", penalty=0.45 if generated else 0.0)
+        classes = self.classes.get(index)
+        if classes:
+            tag = self.tags[index]
+            best = min(classes, key=lambda c: self.by_tag_class[(tag, c)])
+            count = self.by_tag_class[(tag, best)]
+            hashed = bool(_HASHED_CLASS.search(best))
+            # Positions among shared classes come from a scan of the sparse class column
+            matches = [index] if count == 1 else [i for i, cs in self.classes.items() if best in cs and self.tags[i] == tag]
+            add(f"page.locator({q(css_escape(tag) + '.' + css_escape(best))})", "css", matches,
+                "hashed class name" if hashed else "styling hook",
+                penalty=0.2 if hashed else 0.0)
+        add(f'page.locator("xpath={self.xpath(index)}")', "xpath", [index], "breaks on any layout change")
+
+        # Repeated components: scope the user-facing locator to a uniquely identified ancestor
+        anchor = self.anchor(index) if shared else None
+        if anchor:
+            ancestor, prefix, anchor_brittleness = anchor
+            start, end = self.subtree(ancestor)
+            for code, strategy, matches, brittleness in shared:
+                inside = [m for m in matches if start <= m < end]
+                scoped = min(max(brittleness, anchor_brittleness) + 0.05, 1.0)
+                score = 100 * (1 - scoped) / (1 if len(inside) == 1 else 2 * len(inside) ** 0.5)
+                candidates.append(Candidate(prefix + code[len("page"):], strategy, len(inside), round(scoped, 2),
+                                            round(score, 1), "scoped to a uniquely identified container"))
+        # Drop duplicates, best first
+        seen, ranked = set(), []
+        for c in sorted(candidates, key=lambda c: (-c.score, c.brittleness)):
+            if c.code not in seen:
+                seen.add(c.code)
+                ranked.append(c)
+        return ranked
+
+
+def _quote(value):
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def css_escape(ident):
+    """Escapes a string for use as a CSS identifier, like the browser's CSS.escape()."""
+    out = []
+    for i, ch in enumerate(ident):
+        code = ord(ch)
+        if code == 0:
+            out.append("\ufffd")
+        elif code < 0x20 or code == 0x7F or "0" <= ch <= "9" and (i == 0 or i == 1 and ident[0] == "-"):
+            out.append(f"\\{code:x} ")
+        elif i == 0 and ch == "-" and len(ident) == 1:
+            out.append("\\-")
+        elif code >= 0x80 or ch in "-_" or ch.isascii() and ch.isalnum():
+            out.append(ch)
+        else:
+            out.append("\\" + ch)
+    return "".join(out)
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+_memory = OrderedDict()
+
+
+def _load_index(path):
+    try:
+        with open(path, "rb") as f:
+            # Plain state, not the instance, so `python -m` runs and imports share entries
+            index = LocatorIndex.__new__(LocatorIndex)
+            index.__dict__.update(pickle.load(f))
+            return index
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def _build_index(data):
+    # The build allocates hundreds of thousands of small objects; pausing the
+    # cyclic GC avoids repeated collections while it runs
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return LocatorIndex(data)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def build_index(html):
+    """
+    LocatorIndex for an HTML document (bytes or str), cached in memory and on disk
+    by document hash. Returns (index, cache_hit).
+    """
+    data = html.encode("utf-8") if isinstance(html, str) else html
+    key = digest_bytes(data)
+    if key in _memory:
+        _memory.move_to_end(key)
+        return _memory[key], True
+    path = cache_path("locators", f"{key}-v{INDEX_VERSION}", ".pkl")
+    index = _load_index(path)
+    hit = index is not None
+    if not hit:
+        with cache_lock(path):
+            index = _load_index(path)
+            hit = index is not None
+            if not hit:
+                index = _build_index(data)
+                write_atomic(path, lambda f: pickle.dump(index.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL))
+    _memory[key] = index
+    if len(_memory) > MEMORY_CACHE_SIZE:
+        _memory.popitem(last=False)
+    return index, hit
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suggest resilient Playwright locators for elements of an HTML page.")
+    parser.add_argument("html")
+    parser.add_argument("--limit", type=int, default=10, help="number of target elements to show")
+    args = parser.parse_args()
+    with open(args.html, "rb") as f:
+        data = f.read()
+    started = time.perf_counter()
+    index, hit = build_index(data)
+    print(f"{len(index):,} elements indexed in {(time.perf_counter() - started) * 1000:.0f} ms{' [cached]' if hit else ''}")
+    for target in index.targets(limit=args.limit):
+        print(f"\n{index.describe(target)}")
+        for c in index.suggest(target)[:4]:
+            print(f"  {c.score:5.1f}  {c.code}  ({c.matches} match{'es' if c.matches != 1 else ''})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,483 @@
+import argparse
+import asyncio
+import copy
+import json
+import re
+import threading
+from collections import Counter
+from urllib.parse import parse_qs, urlsplit
+
+from utils.fuzzy_match import SchemaError, compile_expression, parse_karate_json
+
+# =============================================================================
+# KARATE-STYLE MOCK SERVER
+# =============================================================================
+# Loads a Karate mock feature (Background + one Scenario per route), compiles the
+# scenario predicates into a dispatch table indexed by (method, path) and serves
+# it over a small asyncio HTTP/1.1 server. Only residual predicates such as
+# bodyPath(...) are evaluated per request, and static responses are serialized
+# once at load time.
+
+MAX_ROUTE_CACHE = 10000
+MAX_BODY_BYTES = 10 * 1024 * 1024
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 401: "Unauthorized",
+           403: "Forbidden", 404: "Not Found", 409: "Conflict", 411: "Length Required",
+           413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error",
+           502: "Bad Gateway", 503: "Service Unavailable"}
+
+_CALL_RE = re.compile(r"(pathMatches|methodIs|bodyPath|paramValue|paramExists|headerContains|typeContains)"
+                      r"\(\s*'([^']*)'\s*(?:,\s*'([^']*)'\s*)?\)")
+_DEF_RE = re.compile(r"^\*\s+def\s+(\w+)\s*=\s*(.+)$")
+_EMBEDDED_RE = re.compile(r"^#\((.+)\)$")
+_PATH_PARAM_RE = re.compile(r"\{(\w+)\}")
+_JSON_PATH_RE = re.compile(r"\.(\w+)|\[(\d+)\]")
+_SPECIAL_DEFS = ("response", "responseStatus", "responseDelay", "responseHeaders")
+
+
+class MockDefinitionError(ValueError):
+    """Raised when a mock feature file cannot be compiled."""
+
+
+def _strip_comment(line):
+    """Drops a trailing '//' comment that is not inside a quoted string."""
+    quote = None
+    for i, ch in enumerate(line):
+        if quote:
+            if ch == quote and line[i - 1] != "\\":
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif line.startswith("//", i):
+            return line[:i].rstrip()
+    return line
+
+
+def _json_path_getter(path):
+    """Compiles a simple JSON path ('$.a.b[0]') into a getter returning None when absent."""
+    if not path.startswith("$"):
+        raise MockDefinitionError(f"Unsupported JSON path {path!r}")
+    steps = [name if name else int(index) for name, index in _JSON_PATH_RE.findall(path[1:])]
+
+    def get(doc):
+        for step in steps:
+            try:
+                doc = doc[step]
+            except (KeyError, IndexError, TypeError):
+                return None
+        return doc
+
+    return get
+
+
+def _has_embedded(value):
+    if isinstance(value, str):
+        return _EMBEDDED_RE.match(value) is not None
+    if isinstance(value, dict):
+        return any(_has_embedded(v) for v in value.values())
+    if isinstance(value, list):
+        return any(_has_embedded(v) for v in value)
+    return False
+
+
+def _resolve_embedded(value, env):
+    if isinstance(value, str):
+        m = _EMBEDDED_RE.match(value)
+        return compile_expression(m.group(1))(env) if m else value
+    if isinstance(value, dict):
+        return {k: _resolve_embedded(v, env) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_resolve_embedded(v, env) for v in value]
+    return value
+
+
+def _compile_value(source):
+    """Compiles the right-hand side of '* def x = ...' into a function of the environment."""
+    source = source.strip()
+    if source[:1] in "{[" or source[:1] in "'\"":
+        try:
+            literal = parse_karate_json(source)
+        except SchemaError as exc:
+            raise MockDefinitionError(f"Invalid value {source!r}: {exc}") from None
+        if _has_embedded(literal):
+            return lambda env: _resolve_embedded(literal, env)
+        return lambda env: copy.deepcopy(literal)
+    try:
+        evaluate = compile_expression(source)
+    except SchemaError as exc:
+        raise MockDefinitionError(str(exc)) from None
+    return evaluate
+
+
+def _encode(body):
+    if body is None:
+        return b""
+    if isinstance(body, (bytes, bytearray)):
+        return bytes(body)
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    return json.dumps(body, separators=(",", ":")).encode("utf-8")
+
+
+# =============================================================================
+# SCENARIO COMPILATION
+# =============================================================================
+class Scenario:
+    """One compiled mock scenario: indexable path/method plus residual predicates."""
+
+    def __init__(self, ordinal, header, steps):
+        self.ordinal = ordinal
+        self.header = header or "(catch-all)"
+        self.method = None
+        self.path = None
+        self.path_regex = None
+        self.residual = None
+        self.residual_vars = {}
+        self._compile_predicate(header)
+        self._compile_steps(steps)
+
+    def _compile_predicate(self, header):
+        if not header.strip():
+            return
+        if "||" in header:
+            raise MockDefinitionError(f"'||' is not supported in scenario predicates: {header!r}")
+        residual_terms = []
+        for term in (t.strip() for t in header.split("&&")):
+            m = _CALL_RE.fullmatch(term)
+            if m and m.group(1) == "pathMatches":
+                self._compile_path(m.group(2))
+            elif m and m.group(1) == "methodIs":
+                self.method = m.group(2).upper()
+            else:
+                residual_terms.append(term)
+        if residual_terms:
+            expr = " && ".join(residual_terms)
+            expr = _CALL_RE.sub(self._bind_request_var, expr)
+            try:
+                self.residual = compile_expression(expr)
+            except SchemaError as exc:
+                raise MockDefinitionError(f"Invalid predicate {header!r}: {exc}") from None
+
+    def _bind_request_var(self, m):
+        name = f"_req{len(self.residual_vars)}_"
+        func, arg, arg2 = m.group(1), m.group(2), m.group(3)
+        if func == "bodyPath":
+            get = _json_path_getter(arg)
+            self.residual_vars[name] = lambda req: get(req["body"])
+        elif func == "paramValue":
+            self.residual_vars[name] = lambda req: (req["params"].get(arg) or [None])[0]
+        elif func == "paramExists":
+            self.residual_vars[name] = lambda req: arg in req["params"]
+        elif func == "headerContains":
+            key = arg.lower()
+            self.residual_vars[name] = lambda req: arg2 in req["headers"].get(key, "")
+        elif func == "typeContains":
+            self.residual_vars[name] = lambda req: arg in req["headers"].get("content-type", "")
+        else:
+            raise MockDefinitionError(f"{func}() can only be combined with '&&'")
+        return name
+
+    def _compile_path(self, pattern):
+        if "{" in pattern:
+            regex = "^" + _PATH_PARAM_RE.sub(r"(?P<\1>[^/]+)", re.escape(pattern).replace(r"\{", "{").replace(r"\}", "}")) + "$"
+            self.path_regex = re.compile(regex)
+        else:
+            self.path = pattern
+
+    def _compile_steps(self, steps):
+        self.defs = []
+        for step in steps:
+            m = _DEF_RE.match(step)
+            if not m:
+                raise MockDefinitionError(f"Unsupported step {step!r}; only '* def' is understood")
+            self.defs.append((m.group(1), _compile_value(m.group(2))))
+        names = [name for name, _ in self.defs]
+        self.dynamic = any(name not in _SPECIAL_DEFS for name in names)
+        # Fully static scenarios are rendered once; everything else is evaluated per request
+        self.static_response = None
+        if not self.dynamic:
+            try:
+                values = {name: fn({}) for name, fn in self.defs}
+            except Exception:
+                self.dynamic = True
+            else:
+                self.static_response = self._finish(values)
+
+    def _finish(self, values):
+        headers = {"Content-Type": "application/json"}
+        headers.update(values.get("responseHeaders") or {})
+        body = values.get("response")
+        if isinstance(body, str) and "Content-Type" not in (values.get("responseHeaders") or {}):
+            headers["Content-Type"] = "text/plain"
+        return (int(values.get("responseStatus", 200)), headers, _encode(body),
+                float(values.get("responseDelay", 0) or 0))
+
+    def matches(self, request):
+        if self.residual is None:
+            return True
+        env = {name: get(request) for name, get in self.residual_vars.items()}
+        try:
+            return bool(self.residual(env))
+        except Exception:
+            return False
+
+    def respond(self, request, state, path_params):
+        if self.static_response is not None:
+            return self.static_response
+        env = dict(state)
+        env.update(request=request["body"], requestParams=request["params"], pathParams=path_params)
+        values = {}
+        for name, fn in self.defs:
+            value = fn(env)
+            env[name] = value
+            if name in state:
+                state[name] = value
+            values[name] = value
+        return self._finish(values)
+
+
+def parse_feature(text):
+    """Splits a mock feature into (background steps, [(scenario header, steps)])."""
+    background, scenarios, current = [], [], None
+    for raw in text.splitlines():
+        line = _strip_comment(raw.strip())
+        if not line or line.startswith("#") or line.startswith("Feature:"):
+            continue
+        if line.startswith("Background:"):
+            current = background
+        elif line.startswith("Scenario:"):
+            scenarios.append((line[len("Scenario:"):].strip(), []))
+            current = scenarios[-1][1]
+        elif current is None:
+            continue
+        else:
+            current.append(line)
+    return background, scenarios
+
+
+# =============================================================================
+# DISPATCH
+# =============================================================================
+class MockService:
+    """The compiled dispatch table for one mock feature."""
+
+    def __init__(self, feature_text):
+        background, scenario_defs = parse_feature(feature_text)
+        if not scenario_defs:
+            raise MockDefinitionError("The feature has no Scenario blocks")
+        self.state = {}
+        for step in background:
+            m = _DEF_RE.match(step)
+            if not m:
+                raise MockDefinitionError(f"Unsupported Background step {step!r}")
+            self.state[m.group(1)] = _compile_value(m.group(2))(dict(self.state))
+        self.scenarios = [Scenario(i, header, steps) for i, (header, steps) in enumerate(scenario_defs)]
+        self.hits = Counter()
+        self._lock = threading.Lock()
+
+        self._exact = {}
+        self._templates = []
+        self._any_path = []
+        for sc in self.scenarios:
+            if sc.path is not None:
+                self._exact.setdefault((sc.method, sc.path), []).append(sc)
+            elif sc.path_regex is not None:
+                self._templates.append(sc)
+            else:
+                self._any_path.append(sc)
+        self._route_cache = {}
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(f.read())
+
+    def _candidates(self, method, path):
+        """Scenarios that can match (method, path), in feature-file order."""
+        key = (method, path)
+        cached = self._route_cache.get(key)
+        if cached is not None:
+            return cached
+        found = []
+        for sc in self._exact.get((method, path), []) + self._exact.get((None, path), []):
+            found.append((sc, {}))
+        for sc in self._templates:
+            if sc.method in (None, method):
+                m = sc.path_regex.match(path)
+                if m:
+                    found.append((sc, m.groupdict()))
+        for sc in self._any_path:
+            if sc.method in (None, method):
+                found.append((sc, {}))
+        found.sort(key=lambda item: item[0].ordinal)
+        if len(self._route_cache) >= MAX_ROUTE_CACHE:
+            self._route_cache.clear()
+        self._route_cache[key] = found
+        return found
+
+    def dispatch(self, method, target, headers=None, body=b""):
+        """Resolves a request. Returns (status, headers, body bytes, delay ms, scenario or None)."""
+        url = urlsplit(target)
+        method = method.upper()
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        parsed_body = None
+        if body:
+            try:
+                parsed_body = json.loads(body)
+            except ValueError:
+                parsed_body = body.decode("utf-8", "replace")
+        request = {"method": method, "path": url.path, "params": parse_qs(url.query),
+                   "headers": headers, "body": parsed_body}
+
+        for sc, path_params in self._candidates(method, url.path):
+            if sc.matches(request):
+                with self._lock:
+                    self.hits[sc.ordinal] += 1
+                    try:
+                        status, resp_headers, resp_body, delay = sc.respond(request, self.state, path_params)
+                    except Exception as exc:
+                        return 500, {"Content-Type": "text/plain"}, f"Mock error: {exc}".encode(), 0.0, sc
+                return status, resp_headers, resp_body, delay, sc
+        return 404, {"Content-Type": "text/plain"}, b"No mock scenario matched", 0.0, None
+
+
+# =============================================================================
+# ASYNCIO HTTP SERVER
+# =============================================================================
+def _response_bytes(status, headers, body, keep_alive):
+    """`headers` is a dict or a list of (name, value) pairs, for repeated headers."""
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}"]
+    lines.extend(f"{k}: {v}" for k, v in (headers.items() if isinstance(headers, dict) else headers))
+    lines.append(f"Content-Length: {len(body)}")
+    lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+class MockServer:
+    """Serves a MockService over HTTP/1.1 with keep-alive. Delays never block other requests."""
+
+    def __init__(self, service):
+        self.service = service
+        self.requests = 0
+        self._server = None
+        self._loop = None
+        self._thread = None
+        self._writers = set()
+        self.port = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    async def _handle(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                request_line, _, header_block = head.decode("latin-1").partition("\r\n")
+                try:
+                    method, target, version = request_line.split(" ", 2)
+                except ValueError:
+                    writer.write(_response_bytes(400, {}, b"", False))
+                    break
+                headers = {}
+                for line in header_block.split("\r\n"):
+                    name, sep, value = line.partition(":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close" and version != "HTTP/1.0"
+                if "chunked" in headers.get("transfer-encoding", ""):
+                    writer.write(_response_bytes(411, {}, b"", False))
+                    break
+                length = headers.get("content-length", "") or "0"
+                if not (length.isascii() and length.isdigit()):
+                    writer.write(_response_bytes(400, {}, b"", False))
+                    break
+                length = int(length)
+                if length > MAX_BODY_BYTES:
+                    writer.write(_response_bytes(413, {}, b"", False))
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                self.requests += 1
+                status, resp_headers, resp_body, delay, _ = self.service.dispatch(method, target, headers, body)
+                if delay:
+                    await asyncio.sleep(delay / 1000)
+                writer.write(_response_bytes(status, resp_headers, resp_body, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._server = await asyncio.start_server(self._handle, host, port, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    def start_in_thread(self, host="127.0.0.1", port=0):
+        """Runs the server on its own event loop thread. Returns once it is listening."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.start(host, port))
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="karate-mock", daemon=True)
+        self._thread.start()
+        ready.wait(10)
+        return self
+
+    async def _shutdown(self):
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        # Let the connection handlers observe EOF and finish before the loop stops
+        for _ in range(3):
+            await asyncio.sleep(0)
+        asyncio.get_running_loop().stop()
+
+    def stop(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+            self._loop = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a Karate mock feature file over HTTP.")
+    parser.add_argument("feature", help="Path to the mock .feature file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    args = parser.parse_args()
+
+    server = MockServer(MockService.from_file(args.feature))
+
+    async def serve():
+        srv = await server.start(args.host, args.port)
+        print(f"Mock listening on http://{args.host}:{server.port} ({len(server.service.scenarios)} scenarios)")
+        async with srv:
+            await srv.serve_forever()
+
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
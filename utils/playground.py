@@ -0,0 +1,368 @@
+import builtins
+import contextlib
+import io
+import os
+import queue
+import statistics
+import subprocess
+import threading
+import time
+import traceback
+from collections import deque
+
+from utils.fixtures import FIXTURE_ORIGIN, install_fixture_routes
+from utils.worker_process import spawn_worker, worker_connection
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, the run timeout still applies
+    resource = None
+
+# =============================================================================
+# PLAYGROUND CONFIGURATION
+# =============================================================================
+# The playground runs learner code as real Python, as the academy's own user
+# and with the host's network and files. The limits below contain mistakes, not
+# attackers: code can reach the interpreter's internals through any object
+# (type(page).__init__.__globals__). Offer it to trusted learners only, and set
+# PLAYGROUND_ENABLED=off on a public deployment.
+ENABLED = os.environ.get("PLAYGROUND_ENABLED", "on").lower() not in ("off", "0", "false")
+DEFAULT_POOL_SIZE = int(os.environ.get("PLAYGROUND_POOL_SIZE", "2"))
+DEFAULT_RUN_TIMEOUT = float(os.environ.get("PLAYGROUND_RUN_TIMEOUT", "10"))
+ACTION_TIMEOUT_MS = 3000
+MAX_RUNS_PER_BROWSER = 200
+MAX_OUTPUT_CHARS = 20000
+CPU_SECONDS_PER_RUN = int(os.environ.get("PLAYGROUND_CPU_SECONDS", "10"))
+MEMORY_LIMIT_MB = int(os.environ.get("PLAYGROUND_MEMORY_MB", "1024"))
+LAUNCH_BACKOFF = 1.0
+LAUNCH_BACKOFF_MAX = 60.0
+
+# Workers get only these environment variables, so the server's secrets are not one print() away
+WORKER_ENV = ("PATH", "HOME", "LANG", "LC_ALL", "TMPDIR", "TEMP", "TMP", "PYTHONPATH", "PLAYWRIGHT_BROWSERS_PATH",
+              "SYSTEMROOT", "LOCALAPPDATA", "USERPROFILE")
+# ...and can import only these modules; open() and the like are not available either
+ALLOWED_IMPORTS = {"re", "json", "math", "random", "time", "datetime", "string", "collections", "itertools",
+                   "functools", "uuid", "decimal", "statistics", "textwrap"}
+BLOCKED_BUILTINS = ("open", "input", "breakpoint", "help", "exit", "quit")
+
+EXAMPLES = {
+    "Smart Locators (login)": """
+page.goto("/login.html")
+page.get_by_label("Username").fill("admin")
+page.get_by_label("Password").fill("1234")
+page.get_by_role("button", name="Sign in").click()
+
+expect(page.get_by_role("heading", name="Welcome, admin")).to_be_visible()
+print(page.title())
+""",
+    "Network Mocking (500 on checkout)": """
+page.route("**/api/payments", lambda route: route.fulfill(
+    status=500,
+    body="Internal Server Error"
+))
+
+page.goto("/checkout.html")
+page.get_by_role("button", name="Pay Now").click()
+
+expect(page.get_by_text("Something went wrong. Please try again.")).to_be_visible()
+print("UI handled the crash gracefully")
+""",
+    "Auth & State (storage_state)": """
+page.goto("/login.html")
+page.get_by_label("Username").fill("admin")
+page.get_by_label("Password").fill("1234")
+page.get_by_role("button", name="Sign in").click()
+page.wait_for_url("**/dashboard.html")
+
+state = context.storage_state()  # 💾 The "Season Pass"
+print("cookies:", [c["name"] for c in state["cookies"]])
+print("localStorage:", state["origins"][0]["localStorage"])
+""",
+}
+
+
+# =============================================================================
+# WORKER PROCESS
+# =============================================================================
+# The worker process has a scrubbed environment, rlimits on CPU time and memory,
+# and is killed when a run overstays. The restricted builtins below only keep the
+# obvious doors (os, open, urllib) shut; none of this is a sandbox (see above).
+def _worker_env():
+    return {name: value for name, value in os.environ.items() if name in WORKER_ENV}
+
+
+def _import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name.split(".")[0] not in ALLOWED_IMPORTS:
+        raise ImportError(f"import of {name!r} is not allowed in the playground")
+    return builtins.__import__(name, globals, locals, fromlist, level)
+
+
+def _sandbox_builtins():
+    allowed = {name: value for name, value in vars(builtins).items() if name not in BLOCKED_BUILTINS}
+    allowed["__import__"] = _import
+    return allowed
+
+
+def _limit_resources():
+    """Caps the worker's address space. Called after Chromium started, which the limit would not fit."""
+    if resource is None:
+        return
+    limit = MEMORY_LIMIT_MB * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard == resource.RLIM_INFINITY or limit < hard:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _limit_cpu(seconds):
+    """Lets the next run use `seconds` more CPU time before the kernel stops the worker."""
+    if resource is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = int(usage.ru_utime + usage.ru_stime) + seconds + 1
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _execute(browser, expect, code, action_timeout_ms):
+    """Runs learner code against a fresh context and tears the context down."""
+    started = time.perf_counter()
+    stdout = io.StringIO()
+    result = {"ok": False, "output": "", "error": None, "screenshot": None}
+    context = browser.new_context(base_url=FIXTURE_ORIGIN, viewport={"width": 1000, "height": 700})
+    try:
+        install_fixture_routes(context)
+        context.set_default_timeout(action_timeout_ms)
+        page = context.new_page()
+        namespace = {"__builtins__": _sandbox_builtins(), "page": page, "context": context, "expect": expect,
+                     "BASE_URL": FIXTURE_ORIGIN}
+        try:
+            with contextlib.redirect_stdout(stdout):
+                exec(compile(code, "<playground>", "exec"), namespace)
+            result["ok"] = True
+        except Exception:
+            result["error"] = traceback.format_exc(limit=-3)
+        try:
+            result["screenshot"] = page.screenshot(type="jpeg", quality=70)
+        except Exception:
+            pass
+    finally:
+        context.close()
+    result["output"] = stdout.getvalue()[:MAX_OUTPUT_CHARS]
+    result["exec_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def _worker_main(conn):
+    """Entry point of a pooled worker: one warm Chromium, many short-lived contexts."""
+    from playwright.sync_api import expect, sync_playwright
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        _limit_resources()
+        conn.send(("ready", browser.version))
+        while True:
+            try:
+                job = conn.recv()
+            except EOFError:
+                break
+            if job is None:
+                break
+            _limit_cpu(CPU_SECONDS_PER_RUN)
+            try:
+                conn.send(("done", _execute(browser, expect, job["code"], job["action_timeout_ms"])))
+            except Exception:
+                conn.send(("done", {"ok": False, "output": "", "screenshot": None,
+                                    "error": traceback.format_exc(limit=-3), "exec_ms": 0.0}))
+        browser.close()
+
+
+class _Worker:
+    def __init__(self):
+        self.process, self.conn = spawn_worker("utils.playground", env=_worker_env())
+        self.runs = 0
+        self.browser_version = None
+
+    def kill(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait(timeout=5)
+        self.conn.close()
+
+
+# =============================================================================
+# BROWSER POOL
+# =============================================================================
+class BrowserPool:
+    """
+    A fixed-size pool of pre-launched headless Chromium browsers.
+    Each browser lives in its own worker process, so learner code is isolated from
+    the app and a runaway script can be killed without affecting other learners.
+    """
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, run_timeout=DEFAULT_RUN_TIMEOUT):
+        self.size = size
+        self.run_timeout = run_timeout
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._durations = deque(maxlen=200)
+        self._waits = deque(maxlen=200)
+        self._stats = {"launches": 0, "runs": 0, "timeouts": 0, "errors": 0, "recycled": 0}
+        self._live = 0
+        self._starting = 0
+        self._failures = 0
+        self.browser_version = None
+        for _ in range(size):
+            self._launch()
+
+    @property
+    def launch_failed(self):
+        """True while the last launch failed and no browser is up."""
+        with self._lock:
+            return self._failures > 0 and self._live == 0
+
+    def _launch(self):
+        """Starts a worker in the background and adds it to the idle queue once warm."""
+        with self._lock:
+            self._stats["launches"] += 1
+            self._starting += 1
+        threading.Thread(target=self._warm_up, daemon=True).start()
+
+    def _warm_up(self):
+        worker = None
+        try:
+            worker = _Worker()
+            if not worker.conn.poll(60):
+                raise TimeoutError("Chromium did not start within 60s")
+            _, worker.browser_version = worker.conn.recv()
+        except (EOFError, OSError, TimeoutError):
+            if worker is not None:
+                worker.kill()
+            with self._lock:
+                self._starting -= 1
+                self._stats["errors"] += 1
+                self._failures += 1
+                delay = min(LAUNCH_BACKOFF * 2 ** (self._failures - 1), LAUNCH_BACKOFF_MAX)
+            # Try again later rather than leaving the pool a browser short for good
+            if not self._closed.wait(delay):
+                self._launch()
+            return
+        self.browser_version = worker.browser_version
+        with self._lock:
+            self._starting -= 1
+            self._failures = 0
+            if not self._closed.is_set():
+                self._live += 1
+                self._idle.put(worker)
+                return
+        worker.kill()
+
+    def _release(self, worker):
+        if worker.runs >= MAX_RUNS_PER_BROWSER:
+            with self._lock:
+                self._stats["recycled"] += 1
+            self._discard(worker)
+            return
+        with self._lock:
+            if not self._closed.is_set():
+                self._idle.put(worker)
+                return
+        self._discard(worker)
+
+    def _discard(self, worker):
+        with self._lock:
+            self._live -= 1
+        worker.kill()
+        if not self._closed.is_set():
+            self._launch()
+
+    def _acquire(self, timeout):
+        """An idle worker, or None after `timeout` seconds or as soon as no browser is up or starting."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if self._live == 0 and self._starting == 0:
+                    return None
+            try:
+                return self._idle.get(timeout=min(0.25, max(deadline - time.monotonic(), 0)))
+            except queue.Empty:
+                if time.monotonic() >= deadline:
+                    return None
+
+    def run(self, code, run_timeout=None, action_timeout_ms=ACTION_TIMEOUT_MS):
+        """Runs learner code on a warm browser. Returns a result dict (never raises)."""
+        run_timeout = run_timeout or self.run_timeout
+        requested = time.perf_counter()
+        worker = None if self._closed.is_set() else self._acquire(run_timeout)
+        if worker is None:
+            error = "All playground browsers are busy. Please try again in a moment."
+            if self.launch_failed:
+                error = "No browser could be started. Check that `playwright install chromium` was run on the server."
+            return {"ok": False, "output": "", "screenshot": None, "exec_ms": 0.0,
+                    "total_ms": (time.perf_counter() - requested) * 1000, "error": error}
+        acquired = time.perf_counter()
+
+        try:
+            worker.conn.send({"code": code, "action_timeout_ms": action_timeout_ms})
+            if not worker.conn.poll(run_timeout):
+                raise TimeoutError
+            _, result = worker.conn.recv()
+        except TimeoutError:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            self._discard(worker)
+            return {"ok": False, "output": "", "screenshot": None, "exec_ms": run_timeout * 1000,
+                    "total_ms": (time.perf_counter() - requested) * 1000,
+                    "error": f"Run exceeded the {run_timeout:.0f}s limit and was stopped."}
+        except (EOFError, OSError):
+            with self._lock:
+                self._stats["errors"] += 1
+            self._discard(worker)
+            return {"ok": False, "output": "", "screenshot": None, "exec_ms": 0.0,
+                    "total_ms": (time.perf_counter() - requested) * 1000,
+                    "error": "The browser worker crashed. A fresh one is being started."}
+
+        worker.runs += 1
+        self._release(worker)
+        result["total_ms"] = (time.perf_counter() - requested) * 1000
+        with self._lock:
+            self._stats["runs"] += 1
+            self._durations.append(result["total_ms"])
+            self._waits.append((acquired - requested) * 1000)
+        return result
+
+    def stats(self):
+        """Pool sizing and reuse counters for display."""
+        with self._lock:
+            stats = dict(self._stats)
+            durations = list(self._durations)
+            waits = list(self._waits)
+        stats["size"] = self.size
+        stats["idle"] = self._idle.qsize()
+        stats["contexts_per_launch"] = stats["runs"] / max(stats["launches"], 1)
+        stats["p50_ms"] = statistics.median(durations) if durations else None
+        stats["mean_wait_ms"] = statistics.fmean(waits) if waits else None
+        return stats
+
+    def close(self):
+        """Stops the idle workers now; busy ones are stopped when their run ends."""
+        self._closed.set()
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                worker.conn.send(None)
+                worker.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+            with self._lock:
+                self._live -= 1
+            worker.kill()
+
+
+if __name__ == "__main__":
+    _worker_main(worker_connection())
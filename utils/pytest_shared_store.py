@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from utils.shared_store import ADDRESS_ENV, AUTHKEY_ENV, SharedStore, StoreClient
+
+# =============================================================================
+# PYTEST PLUGIN
+# =============================================================================
+# Load with `pytest -p utils.pytest_shared_store` (works with and without
+# pytest-xdist). The controlling process starts the store before any worker
+# exists; xdist workers receive its address through workerinput.
+
+_store = None
+
+
+def pytest_configure(config):
+    global _store
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is not None:
+        os.environ[ADDRESS_ENV] = workerinput[ADDRESS_ENV]
+        os.environ[AUTHKEY_ENV] = workerinput[AUTHKEY_ENV]
+        return
+    _store = SharedStore().start()
+    os.environ.update(_store.environ())
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    node.workerinput.update(_store.environ())
+
+
+def pytest_unconfigure(config):
+    global _store
+    if _store is not None:
+        _store.stop()
+        _store = None
+
+
+@pytest.fixture(scope="session")
+def shared_store():
+    """A StoreClient connected to the session's store. Use compute_once() for values every worker needs."""
+    client = StoreClient.from_env()
+    yield client
+    client.close()
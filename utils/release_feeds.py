@@ -0,0 +1,252 @@
+import argparse
+import calendar
+import json
+import os
+import re
+import threading
+import time
+
+import feedparser
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from utils.cache import cache_lock, cache_path, write_atomic
+
+# =============================================================================
+# RELEASE FEEDS
+# =============================================================================
+# The Home page's "What's new" panel only reads parsed feeds from the shared
+# cache. A FeedRefresher thread is the only code that goes to the network. It
+# sends the stored ETag / Last-Modified, so an unchanged feed costs a 304
+# without a body. Set ACADEMY_RELEASE_FEEDS=off to keep the academy offline.
+FEEDS = {
+    "Playwright": "https://github.com/microsoft/playwright/releases.atom",
+    "WebdriverIO": "https://github.com/webdriverio/webdriverio/releases.atom",
+    "Karate": "https://github.com/karatelabs/karate/releases.atom",
+}
+ENABLED = os.environ.get("ACADEMY_RELEASE_FEEDS", "on").lower() not in ("off", "0", "false")
+REFRESH_INTERVAL = int(os.environ.get("ACADEMY_FEED_INTERVAL", 3600))
+RETRY_INTERVAL = 300
+REQUEST_TIMEOUT = 10
+MAX_ENTRIES = 10
+SUMMARY_CHARS = 280
+USER_AGENT = "automation-testing-academy/release-notes"
+CACHE_VERSION = 1
+
+_VERSION = re.compile(r"v?(\d+\.\d+(?:\.\d+)?(?:[-.+][0-9A-Za-z.-]+)?)")
+_PRERELEASE = re.compile(r"alpha|beta|rc|next|canary|preview", re.IGNORECASE)
+
+
+class FeedError(ValueError):
+    pass
+
+
+# =============================================================================
+# PARSING
+# =============================================================================
+def _text(html, limit=SUMMARY_CHARS):
+    text = " ".join(BeautifulSoup(html or "", "html.parser").get_text(" ").split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def parse_feed(content):
+    """Release entries of an Atom/RSS document (bytes), newest first, as plain JSON-able dicts."""
+    parsed = feedparser.parse(content)
+    if not parsed.version:
+        raise FeedError(f"Not an Atom or RSS feed: {parsed.get('bozo_exception') or 'unknown format'}")
+    entries = []
+    for entry in parsed.entries:
+        title = " ".join(entry.get("title", "").split())
+        published = entry.get("published_parsed") or entry.get("updated_parsed")
+        content = entry.get("content")
+        match = _VERSION.search(title)
+        version = match.group(1) if match else title
+        entries.append({
+            "title": title,
+            "version": version,
+            "prerelease": bool(_PRERELEASE.search(version)),
+            "link": entry.get("link", ""),
+            "published": calendar.timegm(published) if published else None,
+            "summary": _text(content[0].get("value") if content else entry.get("summary")),
+        })
+    entries.sort(key=lambda e: e["published"] or 0, reverse=True)
+    return entries[:MAX_ENTRIES]
+
+
+def latest_release(state):
+    """The newest stable entry of a feed state (None before the first fetch or without one)."""
+    if not state:
+        return None
+    return next((entry for entry in state["entries"] if not entry["prerelease"]), None)
+
+
+# =============================================================================
+# PERSISTED CACHE (read by page renders, never fetches)
+# =============================================================================
+_memory = {}
+
+
+def _slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def feed_path(name):
+    return cache_path("release_feeds", _slug(name), ".json")
+
+
+def read_feed(name):
+    """
+    The stored state of a feed: entries, validators, checked_at, status and error.
+    None before its first fetch. Re-parsed only when another process rewrote it.
+    """
+    path = feed_path(name)
+    try:
+        stamp = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    cached = _memory.get(path)
+    if cached is None or cached[0] != stamp:
+        try:
+            with open(path, "rb") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("cache_version") != CACHE_VERSION:
+            return None
+        cached = _memory[path] = (stamp, state)
+    return cached[1]
+
+
+def read_feeds(feeds=None):
+    return {name: read_feed(name) for name in (FEEDS if feeds is None else feeds)}
+
+
+# =============================================================================
+# FETCHING
+# =============================================================================
+def new_session(pool_size=len(FEEDS)):
+    """A requests session that keeps one connection per feed host alive between refreshes."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=1)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def _is_fresh(state, url, max_age, now):
+    if state is None or state["url"] != url:
+        return False
+    limit = max_age if state["status"] != "failed" else min(max_age, RETRY_INTERVAL)
+    return now - state["checked_at"] < limit
+
+
+def refresh_feed(session, name, url, max_age=0):
+    """
+    Fetches one feed and stores the parsed result, unless some process (any replica
+    sharing the cache) checked it less than `max_age` seconds ago. A failed fetch
+    keeps the previous entries and records the error. Returns the stored state.
+    """
+    path = feed_path(name)
+    with cache_lock(path):
+        previous = read_feed(name)
+        now = time.time()
+        if _is_fresh(previous, url, max_age, now):
+            return previous
+        same = previous is not None and previous["url"] == url
+        state = dict(previous) if same else {"cache_version": CACHE_VERSION, "name": name, "url": url, "etag": None,
+                                             "last_modified": None, "fetched_at": None, "entries": []}
+        headers = {}
+        if state["etag"]:
+            headers["If-None-Match"] = state["etag"]
+        if state["last_modified"]:
+            headers["If-Modified-Since"] = state["last_modified"]
+        state.update(checked_at=now, error=None)
+        try:
+            response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+            if response.status_code == 304:
+                state["status"] = "not modified"
+            else:
+                response.raise_for_status()
+                state.update(entries=parse_feed(response.content), etag=response.headers.get("ETag"),
+                             last_modified=response.headers.get("Last-Modified"), fetched_at=now, status="updated")
+        except (requests.RequestException, FeedError) as e:
+            state.update(status="failed", error=str(e))
+        write_atomic(path, lambda f: f.write(json.dumps(state).encode("utf-8")))
+        return state
+
+
+class FeedRefresher:
+    """
+    Refreshes the feeds on a daemon thread through one pooled session, every
+    `interval` seconds (sooner after a failure). Every replica runs one; the cache
+    lock and max_age let the first to get there fetch and the others skip.
+    """
+
+    def __init__(self, feeds=None, interval=REFRESH_INTERVAL, session=None):
+        self.feeds = dict(FEEDS if feeds is None else feeds)
+        self.interval = interval
+        self.session = session or new_session(len(self.feeds))
+        self.rounds = 0
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh_all(self, max_age=0):
+        return {name: refresh_feed(self.session, name, url, max_age) for name, url in self.feeds.items()}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="release-feeds", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            delay = self.interval
+            try:
+                states = self.refresh_all(max_age=self.interval)
+                if any(state["status"] == "failed" for state in states.values()):
+                    delay = min(delay, RETRY_INTERVAL)
+                self.last_error = None
+            except Exception as e:
+                # A broken cache directory must not end the thread; try again later
+                self.last_error = repr(e)
+                delay = min(delay, RETRY_INTERVAL)
+            self.rounds += 1
+            self._stop.wait(delay)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch the release feeds into the cache and print what's new.")
+    parser.add_argument("--cached", action="store_true", help="print the cached feeds without fetching")
+    parser.add_argument("--max-age", type=int, default=0, help="skip feeds checked less than this many seconds ago")
+    parser.add_argument("--limit", type=int, default=3, help="releases to print per feed")
+    args = parser.parse_args()
+
+    if args.cached:
+        states = read_feeds()
+    else:
+        session = new_session()
+        with session:
+            states = {name: refresh_feed(session, name, url, args.max_age) for name, url in FEEDS.items()}
+    for name, state in states.items():
+        if state is None:
+            print(f"{name}: not fetched yet")
+            continue
+        print(f"{name}: {state['status']}" + (f" ({state['error']})" if state["error"] else ""))
+        for entry in state["entries"][:args.limit]:
+            day = time.strftime("%Y-%m-%d", time.gmtime(entry["published"])) if entry["published"] else "?"
+            print(f"  {entry['version']:<16} {day}  {entry['link']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+import argparse
+import csv
+import io
+import os
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import cache_lock, cache_path, digest_stream, write_atomic
+from utils.json_stream import iter_json_array
+
+# =============================================================================
+# RESULT COLUMNS
+# =============================================================================
+# Every supported report is reduced to the same columnar form: one row per
+# request/scenario with an interned name code, start time, duration and outcome.
+ResultColumns = namedtuple("ResultColumns", ["format", "names", "code", "start_ms", "duration_ms", "ok"])
+
+GATLING_CHUNK_BYTES = 64 * 1024 * 1024
+JUNIT_CHUNK_ROWS = 1_000_000
+PERCENTILES = (50, 95, 99)
+VALUE_BITS = 40
+
+
+class ReportFormatError(ValueError):
+    """Raised when an uploaded file is not a recognised report."""
+
+
+class _Columns:
+    """Accumulates parsed rows chunk by chunk and interns request names."""
+
+    def __init__(self):
+        self.names = []
+        self._codes = {}
+        self.parts = {"code": [], "start_ms": [], "duration_ms": [], "ok": []}
+
+    def intern(self, name):
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def add(self, code, start_ms, duration_ms, ok):
+        self.parts["code"].append(np.asarray(code, dtype=np.int32))
+        self.parts["start_ms"].append(np.asarray(start_ms, dtype=np.int64))
+        self.parts["duration_ms"].append(np.asarray(duration_ms, dtype=np.float64))
+        self.parts["ok"].append(np.asarray(ok, dtype=bool))
+
+    def finish(self, fmt):
+        arrays = {k: np.concatenate(v) if v else np.empty(0) for k, v in self.parts.items()}
+        return ResultColumns(fmt, self.names, arrays["code"].astype(np.int32), arrays["start_ms"].astype(np.int64),
+                             arrays["duration_ms"].astype(np.float64), arrays["ok"].astype(bool))
+
+
+# =============================================================================
+# PARSERS
+# =============================================================================
+def _gatling_columns(line):
+    """(name, start, end, status) column indexes for a REQUEST line: 2.x has 11 fields, 3.x has 7."""
+    fields = line.rstrip(b"\r\n").split(b"\t")
+    if len(fields) >= 10 and fields[9] in (b"OK", b"KO"):
+        return 11, (4, 5, 8, 9)
+    return 7, (2, 3, 4, 5)
+
+
+def parse_gatling_log(fileobj):
+    """
+    Parses a Gatling simulation.log (2.x or 3.x text format) in bounded-size chunks.
+    REQUEST lines are filtered at the bytes level and handed to pandas' C parser
+    with typed columns, so only the four fields we need are ever materialised.
+    """
+    cols = _Columns()
+    layout = None
+    while True:
+        lines = fileobj.readlines(GATLING_CHUNK_BYTES)
+        if not lines:
+            break
+        requests = [line for line in lines if line.startswith(b"REQUEST\t")]
+        if not requests:
+            continue
+        if layout is None:
+            n_fields, layout = _gatling_columns(requests[0])
+        name_col, start_col, end_col, status_col = layout
+        chunk = pd.read_csv(
+            io.BytesIO(b"".join(requests)), sep="\t", header=None, names=range(n_fields),
+            usecols=list(layout), quoting=csv.QUOTE_NONE, keep_default_na=False, engine="c",
+            dtype={name_col: "category", status_col: "category"}, on_bad_lines="skip",
+        )
+        start = pd.to_numeric(chunk[start_col], errors="coerce").to_numpy(dtype=np.float64)
+        end = pd.to_numeric(chunk[end_col], errors="coerce").to_numpy(dtype=np.float64)
+        valid = ~(np.isnan(start) | np.isnan(end))
+        names = chunk[name_col].cat
+        mapping = np.array([cols.intern(str(n)) for n in names.categories], dtype=np.int32)
+        cols.add(mapping[names.codes.to_numpy()][valid], start[valid], (end - start)[valid],
+                 (chunk[status_col] == "OK").to_numpy()[valid])
+    return cols.finish("gatling")
+
+
+def parse_timestamp_ms(value):
+    if not value:
+        return None
+    try:
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000)
+    except ValueError:
+        return None
+
+
+def parse_junit_xml(fileobj):
+    """Streams JUnit XML with iterparse, dropping each test case once it is read."""
+    cols = _Columns()
+    codes, starts, durations, oks = [], [], [], []
+    suite_clock = 0
+    stack = []
+    for event, elem in ET.iterparse(fileobj, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            if elem.tag == "testsuite":
+                suite_clock = parse_timestamp_ms(elem.get("timestamp")) or suite_clock
+            continue
+        stack.pop()
+        if elem.tag != "testcase":
+            continue
+        duration = float(elem.get("time") or 0) * 1000
+        classname = elem.get("classname")
+        name = f"{classname}.{elem.get('name')}" if classname else elem.get("name", "?")
+        if not any(child.tag == "skipped" for child in elem):
+            codes.append(cols.intern(name))
+            starts.append(suite_clock)
+            durations.append(duration)
+            oks.append(not any(child.tag in ("failure", "error") for child in elem))
+        suite_clock += int(duration)
+        if stack:
+            stack[-1].remove(elem)
+        if len(codes) >= JUNIT_CHUNK_ROWS:
+            cols.add(codes, starts, durations, oks)
+            codes, starts, durations, oks = [], [], [], []
+    cols.add(codes, starts, durations, oks)
+    return cols.finish("junit")
+
+
+def parse_cucumber_json(fileobj):
+    """Streams a Karate/Cucumber JSON report feature by feature."""
+    cols = _Columns()
+    codes, starts, durations, oks = [], [], [], []
+    clock = 0
+    for feature in iter_json_array(fileobj):
+        feature_name = feature.get("name") or feature.get("uri", "feature")
+        for element in feature.get("elements", []):
+            if element.get("type") == "background":
+                continue
+            steps = element.get("steps", [])
+            duration = sum((s.get("result") or {}).get("duration", 0) for s in steps) / 1e6
+            ok = all((s.get("result") or {}).get("status") in ("passed", "skipped") for s in steps)
+            start = parse_timestamp_ms(element.get("start_timestamp"))
+            codes.append(cols.intern(f"{feature_name} › {element.get('name', '?')}"))
+            starts.append(start if start is not None else clock)
+            durations.append(duration)
+            oks.append(ok)
+            clock = (start if start is not None else clock) + int(duration)
+    cols.add(codes, starts, durations, oks)
+    return cols.finish("karate-json")
+
+
+def detect_format(fileobj):
+    head = fileobj.read(4096)
+    fileobj.seek(0)
+    text = head.decode("utf-8", "replace").lstrip("﻿ \r\n\t")
+    if text.startswith("<"):
+        return "junit"
+    if text.startswith("["):
+        return "karate-json"
+    if text.startswith(("RUN\t", "ASSERTION\t", "USER\t", "REQUEST\t", "GROUP\t", "ERROR\t")):
+        return "gatling"
+    raise ReportFormatError("Unrecognised report. Expected a Gatling simulation.log, a JUnit XML or a Karate/Cucumber JSON report.")
+
+
+PARSERS = {"gatling": parse_gatling_log, "junit": parse_junit_xml, "karate-json": parse_cucumber_json}
+
+
+# =============================================================================
+# CACHED INGESTION
+# =============================================================================
+def _save(path, cols):
+    def write(f):
+        np.savez(f, format=np.array(cols.format), names=np.array(cols.names, dtype=str), code=cols.code,
+                 start_ms=cols.start_ms, duration_ms=cols.duration_ms, ok=cols.ok)
+    write_atomic(path, write)
+
+
+def _load(path):
+    with np.load(path) as data:
+        return ResultColumns(str(data["format"]), data["names"].tolist(), data["code"], data["start_ms"],
+                             data["duration_ms"], data["ok"])
+
+
+def ingest(fileobj):
+    """
+    Parses a report from a seekable binary file object. The result is cached on
+    disk by content digest, so re-uploading the same file skips parsing.
+    Returns (ResultColumns, cache_hit).
+    """
+    path = cache_path("reports", digest_stream(fileobj), ".npz")
+    if os.path.exists(path):
+        return _load(path), True
+    with cache_lock(path):
+        if os.path.exists(path):
+            return _load(path), True
+        fmt = detect_format(fileobj)
+        cols = PARSERS[fmt](fileobj)
+        if cols.code.size == 0:
+            raise ReportFormatError(f"The {fmt} report contains no request or test results.")
+        _save(path, cols)
+    return cols, False
+
+
+def ingest_path(path):
+    with open(path, "rb") as f:
+        return ingest(f)
+
+
+def analyze_report(source, bucket_ms=1000, progress=None):
+    """
+    ingest() and analyze() for a report file's path (or its raw bytes), as one
+    utils.jobs job. Returns (summary, per_request, timeline, cache_hit); the first
+    three are None for a report without results.
+    """
+    if progress:
+        progress(0.0, "Parsing")
+    cols, hit = ingest(io.BytesIO(source)) if isinstance(source, (bytes, bytearray)) else ingest_path(source)
+    if not len(cols.code):
+        return None, None, None, hit
+    if progress:
+        progress(0.8, "Computing percentiles")
+    return (*analyze(cols, bucket_ms=bucket_ms), hit)
+
+
+# =============================================================================
+# VECTORIZED ANALYSIS
+# =============================================================================
+def grouped_percentiles(groups, values, n_groups, percentiles=PERCENTILES):
+    """
+    Nearest-rank percentiles of non-negative values per group id, without a Python
+    loop over groups. Group and value (at microsecond resolution) are packed into
+    one int64 key so a single sort orders by group, then by value.
+    """
+    mask = (1 << VALUE_BITS) - 1
+    scaled = np.clip(np.round(values * 1000), 0, mask).astype(np.int64)
+    keys = np.sort((groups.astype(np.int64) << VALUE_BITS) | scaled)
+    sorted_values = (keys & mask) / 1000.0
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    out = np.full((len(percentiles), n_groups), np.nan)
+    present = counts > 0
+    for i, p in enumerate(percentiles):
+        rank = np.ceil(p / 100.0 * counts[present]).astype(np.int64) - 1
+        out[i, present] = sorted_values[starts[present] + np.maximum(rank, 0)]
+    return out
+
+
+def analyze(cols, bucket_ms=1000):
+    """Per-request statistics and a throughput/error/latency timeline."""
+    n = len(cols.names)
+    count = np.bincount(cols.code, minlength=n)
+    ko = np.bincount(cols.code, weights=~cols.ok, minlength=n).astype(np.int64)
+    total_ms = np.bincount(cols.code, weights=cols.duration_ms, minlength=n)
+    max_ms = np.full(n, -np.inf)
+    np.maximum.at(max_ms, cols.code, cols.duration_ms)
+    pcts = grouped_percentiles(cols.code, cols.duration_ms, n)
+
+    per_request = pd.DataFrame({
+        "request": cols.names,
+        "count": count,
+        "ko": ko,
+        "error_rate_%": np.where(count > 0, ko / np.maximum(count, 1) * 100, 0.0),
+        "mean_ms": total_ms / np.maximum(count, 1),
+        **{f"p{p}_ms": pcts[i] for i, p in enumerate(PERCENTILES)},
+        "max_ms": max_ms,
+    }).sort_values("count", ascending=False, ignore_index=True)
+
+    t0 = int(cols.start_ms.min())
+    bucket = ((cols.start_ms - t0) // bucket_ms).astype(np.int64)
+    n_buckets = int(bucket.max()) + 1
+    b_count = np.bincount(bucket, minlength=n_buckets)
+    b_ko = np.bincount(bucket, weights=~cols.ok, minlength=n_buckets)
+    b_pcts = grouped_percentiles(bucket, cols.duration_ms, n_buckets)
+    timeline = pd.DataFrame({
+        "t_s": np.arange(n_buckets) * bucket_ms / 1000,
+        "throughput_per_s": b_count * (1000 / bucket_ms),
+        "errors_per_s": b_ko * (1000 / bucket_ms),
+        **{f"p{p}_ms": b_pcts[i] for i, p in enumerate(PERCENTILES)},
+    })
+
+    duration_s = max((int(cols.start_ms.max()) - t0) / 1000, bucket_ms / 1000)
+    overall = grouped_percentiles(np.zeros(cols.code.size, np.int64), cols.duration_ms, 1)[:, 0]
+    summary = {
+        "format": cols.format,
+        "requests": int(cols.code.size),
+        "distinct": n,
+        "errors": int((~cols.ok).sum()),
+        "error_rate_%": float((~cols.ok).mean() * 100),
+        "duration_s": duration_s,
+        "mean_throughput": cols.code.size / duration_s,
+        **{f"p{p}_ms": float(v) for p, v in zip(PERCENTILES, overall)},
+    }
+    return summary, per_request, timeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise a Gatling simulation.log, JUnit XML or Karate JSON report.")
+    parser.add_argument("report")
+    args = parser.parse_args()
+    cols, hit = ingest_path(args.report)
+    summary, per_request, _ = analyze(cols)
+    print(f"{summary['format']}: {summary['requests']:,} results, {summary['errors']:,} errors "
+          f"({summary['error_rate_%']:.2f}%), {summary['mean_throughput']:.1f}/s{' [cached]' if hit else ''}")
+    with pd.option_context("display.width", 160, "display.max_rows", 50):
+        print(per_request.round(1).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,573 @@
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import textwrap
+import threading
+import zipfile
+from collections import OrderedDict
+from string import Template
+
+from utils import snippets
+
+# =============================================================================
+# STARTER-PROJECT SCAFFOLDS
+# =============================================================================
+# Each framework page offers a ready-to-run starter project, assembled from the
+# templates below and the same snippets the page shows (utils/snippets.py).
+# The zip is written entry by entry into an unseekable in-memory sink and
+# handed out as chunks (iter_zip), so no temp file is ever created.
+#
+# Entries carry a fixed timestamp, so the same parameters always produce the
+# same bytes. Built archives are kept in a small LRU keyed by the normalized
+# parameters, and concurrent requests for the same key wait for one build
+# instead of each zipping their own: a classroom of 200 clicking "Download"
+# at once builds each distinct starter exactly once.
+FRAMEWORKS = ("playwright", "webdriverio", "karate")
+PLAYWRIGHT_BROWSERS = ("chromium", "firefox", "webkit")
+WDIO_PROTOCOLS = ("webdriver", "devtools")
+WDIO_BROWSERS = ("chrome", "firefox", "MicrosoftEdge")
+
+MAX_ARCHIVES = 32
+MAX_ARCHIVE_BYTES = 16 * 1024 * 1024
+ZIP_DATE = (2024, 1, 1, 0, 0, 0)
+MOCK_FEATURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "fixtures", "mocks", "payment-mock.feature")
+
+_PROJECT_NAME = re.compile(r"[a-z0-9][a-z0-9._-]{0,63}")
+
+
+class ScaffoldError(ValueError):
+    pass
+
+
+# Defaults per framework; normalize() rejects any other parameter name
+DEFAULTS = {
+    "playwright": {
+        "project": "playwright-starter",
+        "base_url": "http://localhost:3000",
+        "browser": "chromium",
+        "auth": True,
+        "mocking": True,
+        "api_shortcut": True,
+    },
+    "webdriverio": {
+        "project": "wdio-starter",
+        "base_url": "http://localhost:3000",
+        "protocol": "webdriver",
+        "browsers": ("chrome",),
+        "components": True,
+        "visual": False,
+    },
+    "karate": {
+        "project": "karate-starter",
+        "base_url": "https://jsonplaceholder.typicode.com",
+        "mock": True,
+        "api_example": True,
+        "ui_example": False,
+    },
+}
+
+
+def normalize(framework, **params):
+    """Validated parameters with defaults filled in. Raises ScaffoldError."""
+    if framework not in DEFAULTS:
+        raise ScaffoldError(f"Unknown framework {framework!r}; expected one of {', '.join(FRAMEWORKS)}")
+    unknown = set(params) - set(DEFAULTS[framework])
+    if unknown:
+        raise ScaffoldError(f"Unknown {framework} parameter(s): {', '.join(sorted(unknown))}")
+    merged = {**DEFAULTS[framework], **params}
+
+    project = str(merged["project"]).strip()
+    if not _PROJECT_NAME.fullmatch(project):
+        raise ScaffoldError("Project name must be lowercase letters, digits, '.', '-' or '_' (at most 64)")
+    merged["project"] = project
+    base_url = str(merged["base_url"]).strip().rstrip("/")
+    if not re.fullmatch(r"https?://[^\s'\"`$\\]+", base_url):
+        raise ScaffoldError("Base URL must be an http:// or https:// URL")
+    merged["base_url"] = base_url
+
+    if framework == "playwright" and merged["browser"] not in PLAYWRIGHT_BROWSERS:
+        raise ScaffoldError(f"Browser must be one of {', '.join(PLAYWRIGHT_BROWSERS)}")
+    if framework == "webdriverio":
+        if merged["protocol"] not in WDIO_PROTOCOLS:
+            raise ScaffoldError(f"Protocol must be one of {', '.join(WDIO_PROTOCOLS)}")
+        # DevTools mode drives Chrome through Puppeteer only
+        browsers = ("chrome",) if merged["protocol"] == "devtools" else merged["browsers"]
+        browsers = tuple(b for b in WDIO_BROWSERS if b in set(browsers))
+        if not browsers:
+            raise ScaffoldError(f"Pick at least one of {', '.join(WDIO_BROWSERS)}")
+        merged["browsers"] = browsers
+    for name, default in DEFAULTS[framework].items():
+        if isinstance(default, bool):
+            merged[name] = bool(merged[name])
+    return merged
+
+
+def _strip_header(snippet):
+    """Drops the leading `// wdio.conf.js` comment that labels a config fragment on the page."""
+    lines = snippet.splitlines(keepends=True)
+    return "".join(lines[1:]) if lines and lines[0].startswith("// wdio.conf.js") else snippet
+
+
+# =============================================================================
+# TEMPLATES
+# =============================================================================
+# string.Template keeps `{}` free for Python, JS and Java; only ${name} is
+# substituted, and files without parameters are copied verbatim.
+PLAYWRIGHT_README = Template("""\
+# ${project}
+
+A pytest-playwright starter from the Automation Testing Academy.
+
+```bash
+python -m venv .venv && . .venv/bin/activate
+pip install -r requirements.txt
+playwright install ${browser}
+pytest
+```
+
+`pytest.ini` points every test at `${base_url}` and runs ${browser}.
+`tests/test_smoke.py` works against any site. The other tests are the patterns
+from the academy's Playwright page and expect your app's routes and selectors:
+edit them to match.
+${notes}""")
+
+PLAYWRIGHT_INI = Template("""\
+[pytest]
+base_url = ${base_url}
+addopts = --browser ${browser}
+testpaths = tests
+""")
+
+PLAYWRIGHT_SMOKE_TEST = """\
+import re
+
+from playwright.sync_api import expect
+
+
+def test_home_page_loads(page):
+    page.goto("/")
+    expect(page).to_have_title(re.compile(r".+"))
+"""
+
+PLAYWRIGHT_TEST_HEADER = "from playwright.sync_api import expect\n\n\n"
+
+WDIO_README = Template("""\
+# ${project}
+
+A WebdriverIO starter from the Automation Testing Academy.
+
+```bash
+npm install
+npm test
+```
+
+`wdio.conf.js` points every spec at `${base_url}` and runs in ${protocol} mode
+on ${browsers}. `test/specs/smoke.e2e.js` works against any site; the
+component spec uses the page objects from the academy's WebdriverIO page and
+expects your app's selectors.
+${notes}""")
+
+WDIO_PACKAGE = Template("""\
+{
+  "name": "${project}",
+  "private": true,
+  "scripts": {
+    "test": "wdio run ./wdio.conf.js"
+  },
+  "devDependencies": ${dependencies}
+}
+""")
+
+WDIO_CONFIG = Template("""\
+exports.config = {
+    runner: 'local',
+    specs: ['./test/specs/**/*.e2e.js'],
+    maxInstances: 5,
+    baseUrl: '${base_url}',
+    framework: 'mocha',
+    reporters: ['spec'],
+    mochaOpts: { timeout: 60000 },
+
+${capabilities}${services}};
+""")
+
+WDIO_SMOKE_SPEC = """\
+describe('starter', () => {
+    it('opens the home page', async () => {
+        await browser.url('/');
+        await expect($('body')).toBeDisplayed();
+    });
+});
+"""
+
+WDIO_COMPONENT_SPEC = """\
+const { HomePage } = require('../pageobjects/components');
+
+describe('search', () => {
+    it('searches from the global nav', async () => {
+        const home = new HomePage();
+        await browser.url('/');
+        await home.navSearch.search('laptop');
+        await expect(browser).toHaveUrl(expect.stringContaining('laptop'));
+    });
+});
+"""
+
+KARATE_README = Template("""\
+# ${project}
+
+A Karate starter from the Automation Testing Academy (Java 17, Maven).
+
+```bash
+mvn test
+```
+
+Features tagged `@external` need a real server and are skipped by default:
+
+```bash
+mvn test -Dkarate.options="--tags @external" -DbaseUrl=${base_url}
+```
+${notes}""")
+
+KARATE_POM = Template("""\
+<?xml version="1.0" encoding="UTF-8"?>
+<project xmlns="http://maven.apache.org/POM/4.0.0"
+         xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+         xsi:schemaLocation="http://maven.apache.org/POM/4.0.0 http://maven.apache.org/xsd/maven-4.0.0.xsd">
+    <modelVersion>4.0.0</modelVersion>
+    <groupId>academy</groupId>
+    <artifactId>${project}</artifactId>
+    <version>1.0.0</version>
+
+    <properties>
+        <project.build.sourceEncoding>UTF-8</project.build.sourceEncoding>
+        <maven.compiler.release>17</maven.compiler.release>
+        <karate.version>1.5.0</karate.version>
+    </properties>
+
+    <dependencies>
+        <dependency>
+            <groupId>io.karatelabs</groupId>
+            <artifactId>karate-junit5</artifactId>
+            <version>$${karate.version}</version>
+            <scope>test</scope>
+        </dependency>
+    </dependencies>
+
+    <build>
+        <testResources>
+            <testResource>
+                <directory>src/test/java</directory>
+                <excludes>
+                    <exclude>**/*.java</exclude>
+                </excludes>
+            </testResource>
+        </testResources>
+        <plugins>
+            <plugin>
+                <groupId>org.apache.maven.plugins</groupId>
+                <artifactId>maven-surefire-plugin</artifactId>
+                <version>3.2.5</version>
+            </plugin>
+        </plugins>
+    </build>
+</project>
+""")
+
+KARATE_CONFIG = Template("""\
+function fn() {
+    return {
+        baseUrl: karate.properties['baseUrl'] || '${base_url}'
+    };
+}
+""")
+
+KARATE_RUNNER = """\
+package starter;
+
+import com.intuit.karate.junit5.Karate;
+
+class StarterTest {
+
+    @Karate.Test
+    Karate all() {
+        // @external features need a real server: run them with --tags @external
+        return Karate.run().tags("~@external").relativeTo(getClass());
+    }
+}
+"""
+
+KARATE_PAYMENTS_FEATURE = """\
+Feature: Payments against the bundled mock
+
+    Background:
+        * def server = karate.start('classpath:starter/mocks/payment-mock.feature')
+        * url 'http://localhost:' + server.port
+
+    Scenario: Pay and fetch the settled payment
+        Given path 'pay'
+        And request { amount: 250 }
+        When method post
+        Then status 200
+        And match response == { success: true, txnId: '#number', amount: 250 }
+
+        Given path 'payments', response.txnId
+        When method get
+        Then status 200
+        And match response.status == 'SETTLED'
+
+    Scenario: A negative amount is rejected
+        Given path 'pay'
+        And request { amount: -5 }
+        When method post
+        Then status 400
+        And match response == { error: 'Invalid Amount' }
+"""
+
+
+# =============================================================================
+# PROJECT FILES
+# =============================================================================
+def _playwright_files(p):
+    notes = []
+    files = [
+        ("requirements.txt", "pytest-playwright\n"),
+        ("pytest.ini", PLAYWRIGHT_INI.substitute(p)),
+        ("tests/test_smoke.py", PLAYWRIGHT_SMOKE_TEST),
+    ]
+    if p["auth"]:
+        # The snippet lives at the root so its session fixtures apply to every test
+        files.append(("conftest.py", snippets.PLAYWRIGHT_AUTH_CONFTEST.split("\n", 1)[1]))
+        files.append(("tests/test_admin.py", snippets.PLAYWRIGHT_AUTH_TEST.split("\n", 1)[1]))
+        notes.append("- `conftest.py` logs in once per run and reuses the saved `auth.json` in every "
+                     "context. Update the login URL and selectors for your app.")
+    if p["api_shortcut"]:
+        files.append(("tests/test_dashboard.py", PLAYWRIGHT_TEST_HEADER + snippets.PLAYWRIGHT_API_SHORTCUT_TEST))
+    if p["mocking"]:
+        files.append(("tests/test_checkout.py", PLAYWRIGHT_TEST_HEADER + snippets.PLAYWRIGHT_SERVER_CRASH_TEST))
+    readme = PLAYWRIGHT_README.substitute(p, notes="\n" + "\n".join(notes) + "\n" if notes else "")
+    return [("README.md", readme)] + files
+
+
+def _wdio_capabilities(p):
+    if p["protocol"] == "devtools":
+        return _strip_header(snippets.WDIO_DEVTOOLS_CAPABILITIES)
+    entries = ", ".join(f"{{\n    browserName: '{browser}'\n}}" for browser in p["browsers"])
+    return f"capabilities: [{entries}],\n"
+
+
+def _wdio_files(p):
+    dependencies = {
+        "@wdio/cli": "^8.40.0",
+        "@wdio/local-runner": "^8.40.0",
+        "@wdio/mocha-framework": "^8.40.0",
+        "@wdio/spec-reporter": "^8.40.0",
+    }
+    notes = []
+    if p["protocol"] == "devtools":
+        # automationProtocol: 'devtools' was removed in WebdriverIO v9, so the starter stays on v8
+        dependencies["devtools"] = "^8.40.0"
+        notes.append("- DevTools mode drives Chrome through Puppeteer and needs WebdriverIO v8.")
+    services = ""
+    if p["visual"]:
+        dependencies["@wdio/visual-service"] = "^5.0.0"
+        services = "\n" + _strip_header(snippets.WDIO_VISUAL_SERVICE)
+        notes.append("- The visual service saves baselines on the first run (`autoSaveBaseline`).")
+    config = WDIO_CONFIG.substitute(
+        p,
+        capabilities=textwrap.indent(_wdio_capabilities(p), "    "),
+        services=textwrap.indent(services, "    "),
+    )
+    files = [
+        ("package.json", WDIO_PACKAGE.substitute(
+            p, dependencies=json.dumps(dependencies, indent=2).replace("\n", "\n  "))),
+        ("wdio.conf.js", config),
+        ("test/specs/smoke.e2e.js", WDIO_SMOKE_SPEC),
+    ]
+    if p["components"]:
+        files.append(("test/pageobjects/components.js",
+                      snippets.WDIO_COMPONENTS + "\nmodule.exports = { Component, SearchBar, HomePage };\n"))
+        files.append(("test/specs/search.e2e.js", WDIO_COMPONENT_SPEC))
+    readme = WDIO_README.substitute(p, browsers=", ".join(p["browsers"]),
+                                    notes="\n" + "\n".join(notes) + "\n" if notes else "")
+    return [("README.md", readme), (".gitignore", "node_modules/\n")] + files
+
+
+def _karate_files(p):
+    root = "src/test/java/"
+    files = [
+        ("pom.xml", KARATE_POM.substitute(p)),
+        (root + "karate-config.js", KARATE_CONFIG.substitute(p)),
+        (root + "starter/StarterTest.java", KARATE_RUNNER),
+    ]
+    notes = []
+    if p["mock"]:
+        with open(MOCK_FEATURE, encoding="utf-8") as f:
+            files.append((root + "starter/mocks/payment-mock.feature", f.read()))
+        files.append((root + "starter/payments.feature", KARATE_PAYMENTS_FEATURE))
+        notes.append("- `payments.feature` starts the bundled payment mock on a free port and runs "
+                     "against it, so `mvn test` works offline.")
+    if p["api_example"]:
+        # The page's example, pointed at baseUrl from karate-config.js
+        feature = snippets.KARATE_USERS_FEATURE.replace(
+            "* url 'https://jsonplaceholder.typicode.com'", "* url baseUrl")
+        files.append((root + "starter/users.feature", "@external\n" + feature))
+        notes.append("- `users.feature` creates a user and fetches it back, so it needs an API that "
+                     "persists POSTs (jsonplaceholder only pretends to).")
+    if p["ui_example"]:
+        scenario = textwrap.indent(snippets.KARATE_HYBRID_UI_SCENARIO, "    ")
+        feature = "@external\nFeature: Hybrid UI + API\n\n" + scenario
+        files.append((root + "starter/hybrid-ui.feature", feature))
+        notes.append("- `hybrid-ui.feature` needs Chrome and your app's URLs and selectors.")
+    readme = KARATE_README.substitute(p, notes="\n" + "\n".join(notes) + "\n" if notes else "")
+    return [("README.md", readme), (".gitignore", "target/\n")] + files
+
+
+_BUILDERS = {"playwright": _playwright_files, "webdriverio": _wdio_files, "karate": _karate_files}
+
+
+def project_files(framework, **params):
+    """[(path, text)] for a starter project, every path under `<project>/`."""
+    p = normalize(framework, **params)
+    return [(f"{p['project']}/{path}", text) for path, text in _BUILDERS[framework](p)]
+
+
+# =============================================================================
+# STREAMING ZIP
+# =============================================================================
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable sink. zipfile then streams entries with data
+    descriptors instead of seeking back to patch headers."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        chunks, self.chunks = self.chunks, []
+        return chunks
+
+
+def iter_zip(files):
+    """Yields a zip of [(path, text)] chunk by chunk, one entry at a time. Deterministic."""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for path, text in files:
+            info = zipfile.ZipInfo(path, date_time=ZIP_DATE)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            archive.writestr(info, text)
+            yield from sink.drain()
+    yield from sink.drain()
+
+
+# =============================================================================
+# ARCHIVE CACHE (LRU + single flight)
+# =============================================================================
+_lock = threading.Lock()
+_archives = OrderedDict()
+_building = {}
+_stats = {"builds": 0, "hits": 0, "waits": 0}
+
+
+def _cache_key(framework, params):
+    return (framework,) + tuple(sorted(params.items()))
+
+
+def build(framework, **params):
+    """Zip bytes for a starter project, served from the LRU when the same parameters were built before."""
+    p = normalize(framework, **params)
+    key = _cache_key(framework, p)
+    while True:
+        with _lock:
+            data = _archives.get(key)
+            if data is not None:
+                _archives.move_to_end(key)
+                _stats["hits"] += 1
+                return data
+            pending = _building.get(key)
+            if pending is None:
+                pending = _building[key] = threading.Event()
+                break
+            _stats["waits"] += 1
+        # Another thread is zipping these parameters; reuse its result (or retry if it failed)
+        pending.wait()
+
+    try:
+        data = b"".join(iter_zip(project_files(framework, **p)))
+        with _lock:
+            _stats["builds"] += 1
+            _archives[key] = data
+            size = sum(len(v) for v in _archives.values())
+            while len(_archives) > MAX_ARCHIVES or (size > MAX_ARCHIVE_BYTES and len(_archives) > 1):
+                _, evicted = _archives.popitem(last=False)
+                size -= len(evicted)
+        return data
+    finally:
+        with _lock:
+            _building.pop(key).set()
+
+
+def cache_info():
+    """Entries, bytes and build/hit/wait counters of the archive LRU."""
+    with _lock:
+        return {"entries": len(_archives), "bytes": sum(len(v) for v in _archives.values()), **_stats}
+
+
+def clear_cache():
+    with _lock:
+        _archives.clear()
+        for name in _stats:
+            _stats[name] = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a starter project zip to a file or stdout.")
+    parser.add_argument("framework", choices=FRAMEWORKS)
+    parser.add_argument("-o", "--output", help="zip path (default: stdout)")
+    parser.add_argument("--project")
+    parser.add_argument("--base-url")
+    parser.add_argument("--browser", choices=PLAYWRIGHT_BROWSERS, help="playwright only")
+    parser.add_argument("--protocol", choices=WDIO_PROTOCOLS, help="webdriverio only")
+    parser.add_argument("--browsers", nargs="+", choices=WDIO_BROWSERS, help="webdriverio only")
+    parser.add_argument("--without", nargs="+", default=[], metavar="OPTION",
+                        help="switch off optional parts, e.g. auth mocking api_shortcut components mock")
+    parser.add_argument("--with", dest="with_", nargs="+", default=[], metavar="OPTION",
+                        help="switch on optional parts, e.g. visual ui_example")
+    parser.add_argument("--list", action="store_true", help="print the file list instead of the zip")
+    args = parser.parse_args()
+
+    params = {name: value for name, value in (("project", args.project), ("base_url", args.base_url),
+                                              ("browser", args.browser), ("protocol", args.protocol),
+                                              ("browsers", args.browsers)) if value is not None}
+    params.update({name: False for name in args.without})
+    params.update({name: True for name in args.with_})
+    try:
+        files = project_files(args.framework, **params)
+    except ScaffoldError as e:
+        parser.error(str(e))
+    if args.list:
+        for path, text in files:
+            print(f"{len(text.encode()):8d}  {path}")
+        return
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in iter_zip(files):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import argparse
+import json
+import os
+import platform
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import write_atomic
+
+# =============================================================================
+# SYNTHETIC PAGES
+# =============================================================================
+# Every page is a product catalogue of "cards" with the same target at the end:
+# the "Sign in" button of a login form, next to a newsletter form whose
+# "Subscribe" button shares the .btn-primary class. Layouts differ in how deep
+# the target is nested and how many declarative shadow roots the page has.
+BENCH_ORIGIN = "http://bench.test"
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "benchmarks")
+DEFAULT_DATASET = os.path.join(DATA_DIR, "selector_strategies.json")
+DATASET_VERSION = 1
+
+LAYOUTS = {
+    "flat": {"nesting": 2, "shadow_share": 0.0, "shadow_depth": 0},
+    "deep": {"nesting": 40, "shadow_share": 0.0, "shadow_depth": 0},
+    "shadow": {"nesting": 2, "shadow_share": 0.5, "shadow_depth": 3},
+    "deep+shadow": {"nesting": 40, "shadow_share": 0.5, "shadow_depth": 3},
+}
+
+_TARGET = (
+    '<form class="newsletter-form"><input type="email" aria-label="Email">'
+    '<button type="submit" class="btn btn-primary">Subscribe</button></form>'
+    '<form class="login-form"><label for="username">Username</label><input id="username">'
+    '<label for="password">Password</label><input id="password" type="password">'
+    '<button type="submit" id="login-submit" class="btn btn-primary">Sign in</button></form>'
+)
+_TARGET_NODES = 10
+
+
+def _card(i, nesting, price):
+    """One catalogue card wrapped in `nesting` divs. Returns (html, element_count)."""
+    inner = (f'<div class="card" data-sku="SKU-{i}"><h3 class="card-title">Item {i}</h3>'
+             f'<p class="price">${price:.2f}</p><button class="btn btn-primary">Add to cart</button></div>')
+    return '<div class="wrap">' * nesting + inner + "</div>" * nesting, nesting + 4
+
+
+def _shadow(html):
+    return f'<product-card><template shadowrootmode="open">{html}</template></product-card>'
+
+
+def generate_page(nodes, nesting=2, shadow_share=0.0, shadow_depth=0, seed=0):
+    """
+    Builds a catalogue page of roughly `nodes` elements.
+    Returns (html, stats) where stats counts elements, shadow roots and the target depth.
+    """
+    rng = np.random.default_rng(seed)
+    per_card = nesting + 4 + shadow_share
+    cards = max(1, int((nodes - _TARGET_NODES - nesting - shadow_depth) / per_card))
+    shadowed = rng.random(cards) < shadow_share
+    prices = rng.uniform(5, 500, cards)
+
+    parts, count = ['<!DOCTYPE html><html><head><title>Selector bench</title></head><body><main id="catalog">'], 4
+    for i in range(cards):
+        html, elements = _card(i, nesting, prices[i])
+        if shadowed[i]:
+            html, elements = _shadow(html), elements + 1
+        parts.append(html)
+        count += elements
+
+    target = '<div class="wrap">' * nesting + _TARGET + "</div>" * nesting
+    for _ in range(shadow_depth):
+        target = f'<app-shell><template shadowrootmode="open">{target}</template></app-shell>'
+    parts.append(f'</main><aside id="account">{target}</aside></body></html>')
+    count += 1 + nesting + shadow_depth + _TARGET_NODES
+    return "".join(parts), {
+        "elements": count,
+        "shadow_roots": int(shadowed.sum()) + shadow_depth,
+        "target_depth": 5 + nesting + shadow_depth,
+    }
+
+
+# =============================================================================
+# STRATEGIES
+# =============================================================================
+# Each strategy resolves the same "Sign in" button and returns its match count.
+# Playwright's CSS engine pierces open shadow roots; XPath cannot, so it finds
+# nothing on shadow layouts and is reported with matches == 0. The ">>>" entry
+# reproduces what WebdriverIO's deep selector does in the page: collect every
+# shadow root, then query each one.
+_DEEP_QUERY = """(selector) => {
+    const roots = [document];
+    for (let i = 0; i < roots.length; i++) {
+        for (const el of roots[i].querySelectorAll('*')) {
+            if (el.shadowRoot) roots.push(el.shadowRoot);
+        }
+    }
+    let matches = 0;
+    for (const root of roots) matches += root.querySelectorAll(selector).length;
+    return matches;
+}"""
+
+STRATEGIES = {
+    "id": ("$('#login-submit')", lambda page: page.locator("#login-submit").count()),
+    "css": ("$('.login-form .btn-primary')", lambda page: page.locator(".login-form .btn-primary").count()),
+    "chained": ("$('.login-form').$('.btn-primary')",
+                lambda page: page.locator(".login-form").locator(".btn-primary").count()),
+    "xpath": ("$('//form[@class=\"login-form\"]//button[@type=\"submit\"]')",
+              lambda page: page.locator('xpath=//form[@class="login-form"]//button[@type="submit"]').count()),
+    "deep (>>>)": ("$('>>>.login-form .btn-primary')",
+                   lambda page: page.evaluate(_DEEP_QUERY, ".login-form .btn-primary")),
+    "role": ("get_by_role('button', name='Sign in')",
+             lambda page: page.get_by_role("button", name="Sign in").count()),
+    "text": ("get_by_text('Sign in', exact=True)",
+             lambda page: page.get_by_text("Sign in", exact=True).count()),
+    "round trip": ("page.evaluate('0')", lambda page: page.evaluate("0")),
+}
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+def _serve(pages):
+    def handler(route):
+        html = pages.get(route.request.url)
+        if html is None:
+            route.abort("blockedbyclient")
+        else:
+            route.fulfill(status=200, content_type="text/html", body=html)
+    return handler
+
+
+def run_benchmark(sizes=(10_000, 50_000), layouts=tuple(LAYOUTS), trials=30, warmup=3, seed=0, log=print):
+    """
+    Times every strategy on every generated page in headless Chromium.
+    Strategies are interleaved within each trial so drift affects them equally.
+    Returns the dataset dict written by save_results().
+    """
+    from playwright.sync_api import sync_playwright
+
+    generated, pages = {}, []
+    for size in sizes:
+        for layout in layouts:
+            url = f"{BENCH_ORIGIN}/{layout}-{size}.html"
+            html, stats = generate_page(size, seed=seed, **LAYOUTS[layout])
+            generated[url] = html
+            pages.append({"page": f"{layout} / {size:,}", "layout": layout, "url": url,
+                          "bytes": len(html.encode("utf-8")), **stats})
+
+    samples = []
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        context = browser.new_context()
+        context.route("**/*", _serve(generated))
+        page = context.new_page()
+        for info in pages:
+            page.goto(info["url"], wait_until="load")
+            info["dom_elements"] = page.evaluate(_DEEP_QUERY, "*")
+            timings = {name: [] for name in STRATEGIES}
+            matches = {name: run(page) for name, (_, run) in STRATEGIES.items()}
+            for trial in range(warmup + trials):
+                for name, (_, run) in STRATEGIES.items():
+                    started = time.perf_counter()
+                    run(page)
+                    elapsed = (time.perf_counter() - started) * 1000
+                    if trial >= warmup:
+                        timings[name].append(round(elapsed, 4))
+            for name, (wdio, _) in STRATEGIES.items():
+                samples.append({"page": info["page"], "strategy": name, "selector": wdio,
+                                "matches": matches[name] if name != "round trip" else None, "ms": timings[name]})
+            log(f"{info['page']:<24} {info['dom_elements']:>7,} elements  "
+                + "  ".join(f"{n}={np.median(timings[n]):.2f}" for n in STRATEGIES))
+        chromium = browser.version
+        browser.close()
+
+    return {
+        "version": DATASET_VERSION,
+        "measured_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {"chromium": chromium, "playwright": metadata.version("playwright"),
+                        "python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count()},
+        "trials": trials,
+        "warmup": warmup,
+        "pages": pages,
+        "samples": samples,
+    }
+
+
+def save_results(results, path=DEFAULT_DATASET):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_atomic(path, lambda f: f.write(json.dumps(results, indent=1).encode("utf-8")))
+
+
+def load_results(path=DEFAULT_DATASET):
+    """The stored dataset, or None if the benchmark has not been run yet."""
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        results = json.load(f)
+    return results if results.get("version") == DATASET_VERSION else None
+
+
+def summarize(results):
+    """Per page and strategy: matches, median/p95/min latency and cost above a bare round trip."""
+    rows = []
+    for sample in results["samples"]:
+        ms = np.asarray(sample["ms"], dtype=float)
+        rows.append({"page": sample["page"], "strategy": sample["strategy"], "selector": sample["selector"],
+                     "matches": sample["matches"], "median_ms": np.median(ms),
+                     "p95_ms": np.percentile(ms, 95), "min_ms": ms.min()})
+    summary = pd.DataFrame(rows)
+    baseline = summary[summary["strategy"] == "round trip"].set_index("page")["median_ms"]
+    summary["over_round_trip_ms"] = summary["median_ms"] - summary["page"].map(baseline)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time selector strategies on generated pages in headless Chromium.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--layouts", nargs="+", choices=list(LAYOUTS), default=list(LAYOUTS))
+    parser.add_argument("--trials", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=DEFAULT_DATASET)
+    parser.add_argument("--dump-pages", metavar="DIR", help="write the generated HTML here and exit")
+    args = parser.parse_args()
+
+    if args.dump_pages:
+        os.makedirs(args.dump_pages, exist_ok=True)
+        for size in args.sizes:
+            for layout in args.layouts:
+                html, stats = generate_page(size, seed=args.seed, **LAYOUTS[layout])
+                with open(os.path.join(args.dump_pages, f"{layout}-{size}.html"), "w", encoding="utf-8") as f:
+                    f.write(html)
+                print(f"{layout}-{size}.html  {stats}")
+        return
+
+    results = run_benchmark(args.sizes, args.layouts, args.trials, args.warmup, args.seed)
+    save_results(results, args.out)
+    print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
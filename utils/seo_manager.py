@@ -33,27 +33,20 @@ SEO_METADATA = {
 }
 
 def setup_seo_routing(nav_options, default_selection):
-    try:
-        query_params = st.query_params
-        url_nav = query_params.get("nav", None)
-    except:
-        url_nav = None
-    
-    if url_nav in nav_options:
-        if "nav_selection" not in st.session_state:
-            st.session_state.nav_selection = url_nav
-        return url_nav
-    else:
-        if "nav_selection" not in st.session_state:
-            st.session_state.nav_selection = default_selection
-        return st.session_state.nav_selection
+    """
+    The page to show, read from ?nav= only. Routing keeps nothing in
+    st.session_state, so any replica can serve any URL without sticky sessions,
+    and a reconnect to another replica opens the same page.
+    """
+    url_nav = st.query_params.get("nav")
+    return url_nav if url_nav in nav_options else default_selection
 
 def inject_seo_meta(selection):
     meta = SEO_METADATA.get(selection, SEO_METADATA["Home"])
-    try:
-        st.query_params["nav"] = selection
-    except:
-        pass
+    if st.query_params.get("nav") != selection:
+        # A new page starts from a clean URL: the previous page's ?tab= and view
+        # parameters do not apply to it
+        st.query_params.from_dict({"nav": selection})
         
     st.markdown(f"""
     <div style="display:none;">
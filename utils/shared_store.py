@@ -0,0 +1,264 @@
+import argparse
+import os
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+# =============================================================================
+# SHARED STORE
+# =============================================================================
+# A key-value server for parallel test workers, the Python counterpart of
+# WebdriverIO's Shared Store service. It listens on a Unix socket in a private
+# temp directory and speaks multiprocessing's Connection protocol with an
+# authkey, so only processes given the key (the test workers) can connect.
+#
+# compute_once(key, factory) runs `factory` in exactly one worker; the others
+# block on the server until the value is published, then every client keeps it
+# in a local memo (until its TTL), so repeat reads never leave the process.
+ADDRESS_ENV = "SHARED_STORE_ADDRESS"
+AUTHKEY_ENV = "SHARED_STORE_AUTHKEY"
+DEFAULT_WAIT = 120.0
+
+
+class StoreError(RuntimeError):
+    pass
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "owner")
+
+    def __init__(self, value=None, expires_at=None, owner=None):
+        self.value = value
+        self.expires_at = expires_at
+        self.owner = owner  # the client computing the value, while it is pending
+
+
+class SharedStore:
+    """The server. Runs in a background thread of the process that owns the test session."""
+
+    def __init__(self, directory=None):
+        self._dir = directory or tempfile.mkdtemp(prefix="shared-store-")
+        os.chmod(self._dir, 0o700)
+        self.address = os.path.join(self._dir, "store.sock")
+        self.authkey = secrets.token_bytes(32)
+        self._data = {}
+        self._cond = threading.Condition()
+        self._listener = None
+        self._connections = set()
+        self._stats = {"clients": 0, "gets": 0, "sets": 0, "computed": 0, "waited": 0}
+
+    def start(self):
+        self._listener = Listener(self.address, family="AF_UNIX", authkey=self.authkey)
+        threading.Thread(target=self._accept, name="shared-store", daemon=True).start()
+        return self
+
+    def environ(self):
+        """Environment variables that let child processes connect with StoreClient.from_env()."""
+        return {ADDRESS_ENV: self.address, AUTHKEY_ENV: self.authkey.hex()}
+
+    def _accept(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                # A client with the wrong key is dropped; closing the listener ends the loop
+                if self._listener is None:
+                    return
+                continue
+            with self._cond:
+                self._connections.add(conn)
+                self._stats["clients"] += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _live(self, key, now):
+        entry = self._data.get(key)
+        if entry is not None and entry.owner is None and entry.expires_at is not None and entry.expires_at <= now:
+            del self._data[key]
+            return None
+        return entry
+
+    def _serve(self, conn):
+        client = object()
+        try:
+            while True:
+                try:
+                    op, key, *args = conn.recv()
+                except (EOFError, OSError):
+                    return
+                conn.send(self._handle(client, op, key, args))
+        finally:
+            with self._cond:
+                # A worker that died while computing releases its claim to the next waiter
+                for key, entry in list(self._data.items()):
+                    if entry.owner is client:
+                        del self._data[key]
+                self._connections.discard(conn)
+                self._cond.notify_all()
+            conn.close()
+
+    def _handle(self, client, op, key, args):
+        with self._cond:
+            now = time.time()
+            if op == "get":
+                self._stats["gets"] += 1
+                entry = self._live(key, now)
+                if entry is None or entry.owner is not None:
+                    return ("missing",)
+                return ("value", entry.value, entry.expires_at)
+            if op == "set":
+                value, ttl = args
+                self._stats["sets"] += 1
+                self._data[key] = _Entry(value, now + ttl if ttl else None)
+                self._cond.notify_all()
+                return ("ok",)
+            if op == "delete":
+                self._data.pop(key, None)
+                return ("ok",)
+            if op == "claim":
+                # Returns the value, or hands the computation to this client
+                deadline = now + args[0]
+                waited = False
+                while True:
+                    entry = self._live(key, time.time())
+                    if entry is None:
+                        self._data[key] = _Entry(owner=client)
+                        return ("compute",)
+                    if entry.owner is None:
+                        if waited:
+                            self._stats["waited"] += 1
+                        return ("value", entry.value, entry.expires_at)
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return ("timeout",)
+                    waited = True
+                    self._cond.wait(remaining)
+            if op == "publish":
+                value, ttl = args
+                self._stats["computed"] += 1
+                self._data[key] = _Entry(value, now + ttl if ttl else None)
+                self._cond.notify_all()
+                return ("ok",)
+            if op == "abandon":
+                entry = self._data.get(key)
+                if entry is not None and entry.owner is client:
+                    del self._data[key]
+                self._cond.notify_all()
+                return ("ok",)
+            if op == "stats":
+                return ("value", dict(self._stats, keys=len(self._data)), None)
+            return ("error", f"unknown operation {op!r}")
+
+    def stop(self):
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
+        with self._cond:
+            for conn in list(self._connections):
+                conn.close()
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+
+class StoreClient:
+    """
+    A worker's connection to the store. Thread-safe: every thread gets its own
+    socket, so a thread waiting in compute_once() never holds up the thread that
+    is computing the value.
+    """
+
+    def __init__(self, address, authkey):
+        self._address = address
+        self._authkey = authkey
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._memo = {}
+        # Connect now, so a wrong address or key fails here rather than on first use
+        self._connection()
+
+    @classmethod
+    def from_env(cls):
+        try:
+            return cls(os.environ[ADDRESS_ENV], bytes.fromhex(os.environ[AUTHKEY_ENV]))
+        except KeyError:
+            raise StoreError(f"{ADDRESS_ENV} is not set; start a SharedStore (or load the pytest plugin)") from None
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = Client(self._address, family="AF_UNIX", authkey=self._authkey)
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _call(self, *message):
+        conn = self._connection()
+        conn.send(message)
+        reply = conn.recv()
+        if reply[0] == "error":
+            raise StoreError(reply[1])
+        return reply
+
+    def get(self, key, default=None):
+        reply = self._call("get", key)
+        return reply[1] if reply[0] == "value" else default
+
+    def set(self, key, value, ttl=None):
+        self._memo.pop(key, None)
+        self._call("set", key, value, ttl)
+
+    def delete(self, key):
+        self._memo.pop(key, None)
+        self._call("delete", key)
+
+    def compute_once(self, key, factory, ttl=None, wait=DEFAULT_WAIT):
+        """
+        The value for `key`, computed by exactly one worker across the session.
+        Later calls in this process are answered from a local memo until the TTL runs out.
+        """
+        memo = self._memo.get(key)
+        if memo is not None and (memo[1] is None or memo[1] > time.time()):
+            return memo[0]
+        reply = self._call("claim", key, wait)
+        if reply[0] == "timeout":
+            raise StoreError(f"timed out after {wait:g}s waiting for another worker to compute {key!r}")
+        if reply[0] == "compute":
+            try:
+                value = factory()
+            except BaseException:
+                self._call("abandon", key)
+                raise
+            self._call("publish", key, value, ttl)
+            expires_at = time.time() + ttl if ttl else None
+        else:
+            value, expires_at = reply[1], reply[2]
+        self._memo[key] = (value, expires_at)
+        return value
+
+    def stats(self):
+        return self._call("stats", None)[1]
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a shared store and print the variables clients need.")
+    parser.parse_args()
+    store = SharedStore().start()
+    for name, value in store.environ().items():
+        print(f"export {name}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        store.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# =============================================================================
+# SHARED CODE SNIPPETS
+# =============================================================================
+# Snippets that the framework pages show with st.code AND that utils/scaffold.py
+# packs into the downloadable starter projects. Keeping one copy means a fix to
+# a snippet reaches the page and the starter zip at the same time.
+
+# -----------------------------------------------------------------------------
+# PLAYWRIGHT (pytest-playwright)
+# -----------------------------------------------------------------------------
+PLAYWRIGHT_AUTH_CONFTEST = """\
+# conftest.py
+import pytest
+
+AUTH_FILE = "auth.json"
+
+
+@pytest.fixture(scope="session")
+def auth_state(browser, base_url):
+    # 1. LOG IN ONCE PER RUN (The "Season Pass Office")
+    context = browser.new_context(base_url=base_url)
+    page = context.new_page()
+    page.goto("/login")
+    page.fill("#user", "admin")
+    page.fill("#pass", "1234")
+    page.click("#login")
+    page.wait_for_url("**/dashboard")
+    context.storage_state(path=AUTH_FILE)  # 💾 SAVE THE PASS
+    context.close()
+    return AUTH_FILE
+
+
+@pytest.fixture(scope="session")
+def browser_context_args(browser_context_args, auth_state):
+    # 2. EVERY NEW CONTEXT STARTS WITH THE PASS
+    return {**browser_context_args, "storage_state": auth_state}
+"""
+
+PLAYWRIGHT_AUTH_TEST = """\
+# tests/test_admin.py
+# 3. ENJOY FAST TESTS - Already logged in!
+def test_admin_panel(page):
+    page.goto("/admin")  # ⚡ Instant access
+"""
+
+PLAYWRIGHT_API_SHORTCUT_TEST = """\
+def test_new_user_dashboard(page):
+    # 🚀 FAST: Create data via API (Milliseconds)
+    user_data = page.request.post("/api/v1/users/create", data={"name": "Alice"}).json()
+
+    # 🐢 UI: Login and Check Visuals (Seconds)
+    page.goto(f"/dashboard/{user_data['id']}")
+
+    # Assert
+    expect(page.get_by_role("heading", name="Alice")).to_be_visible()
+"""
+
+PLAYWRIGHT_SERVER_CRASH_TEST = """\
+def test_handling_server_crash(page):
+    # 🎭 ACTING: Pretend the server is on fire
+    page.route("**/api/payments", lambda route: route.fulfill(
+        status=500,
+        body="Internal Server Error"
+    ))
+
+    page.goto("/checkout")
+    page.get_by_role("button", name="Pay Now").click()
+
+    # 🕵️ CHECK: Does the UI show a nice error message?
+    expect(page.get_by_text("Something went wrong. Please try again.")).to_be_visible()
+"""
+
+# -----------------------------------------------------------------------------
+# WEBDRIVERIO
+# -----------------------------------------------------------------------------
+WDIO_STANDARD_CAPABILITIES = """\
+// wdio.conf.js
+capabilities: [{
+    browserName: 'firefox', // Uses GeckoDriver
+    browserVersion: 'latest'
+}, {
+    browserName: 'safari', // Uses SafariDriver
+}]
+"""
+
+WDIO_DEVTOOLS_CAPABILITIES = """\
+// wdio.conf.js
+capabilities: [{
+    browserName: 'chrome',
+    'wdio:devtoolsOptions': {
+        headless: true
+    }
+}],
+automationProtocol: 'devtools', // 🚀 PUPPETEER MODE
+"""
+
+WDIO_COMPONENTS = """\
+// 1. BASE COMPONENT (The Reusable Widget)
+class Component {
+    constructor(selector) { this.root = selector; }
+
+    get main() { return $(this.root); }
+    async isVisible() { return await this.main.isDisplayed(); }
+}
+
+// 2. SEARCH BAR COMPONENT (Specific Logic)
+class SearchBar extends Component {
+    get input() { return this.main.$('input.search-term'); }
+    get btn()   { return this.main.$('button.search-btn'); }
+
+    async search(text) {
+        await this.input.setValue(text);
+        await this.btn.click();
+    }
+}
+
+// 3. PAGE CLASS (Composing Components)
+class HomePage {
+    constructor() {
+        // Reuse the component!
+        this.navSearch = new SearchBar('header.global-nav');
+        this.footerSearch = new SearchBar('footer.site-map');
+    }
+}
+"""
+
+WDIO_VISUAL_SERVICE = """\
+// wdio.conf.js - Using the Visual Regression Service
+services: [
+    ['visual', {
+        autoSaveBaseline: true,
+        blockOutStatusBar: true, // Ignore phone status bar
+        blockOutToolBar: true
+    }]
+],
+"""
+
+# -----------------------------------------------------------------------------
+# KARATE
+# -----------------------------------------------------------------------------
+KARATE_USERS_FEATURE = """\
+Feature: User Management API
+
+    Background:
+        * url 'https://jsonplaceholder.typicode.com'
+        * def authToken = 'Bearer 12345'
+        * configure headers = { Authorization: '#(authToken)' }
+
+    Scenario: Create and Fetch User
+        # 1. CREATE
+        Given path 'users'
+        And request { name: 'John Wick', job: 'Assassin' }
+        When method post
+        Then status 201
+        And def userId = response.id
+
+        # 2. FETCH (Chaining variables)
+        Given path 'users', userId
+        When method get
+        Then status 200
+        And match response contains { name: 'John Wick' }
+"""
+
+KARATE_HYBRID_UI_SCENARIO = """\
+Scenario: Order History Check
+    # 1. API: Create Order (Backend)
+    * url 'https://api.shop.com'
+    * path 'orders'
+    * request { item: 'Laptop', price: 1000 }
+    * method post
+    * def orderId = response.id
+
+    # 2. UI: Verify in Fractal
+    * configure driver = { type: 'chrome' }
+    Given driver 'https://shop.com/login'
+    And input('#user', 'admin')
+    And click('#login')
+
+    # 3. Validation
+    And waitForUrl('/dashboard')
+    Then match text('.order-list') contains orderId
+"""
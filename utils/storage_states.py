@@ -0,0 +1,288 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+from utils import cache
+from utils.cache import cache_lock, write_atomic
+from utils.fixtures import FIXTURE_ORIGIN, FIXTURE_PASSWORD, install_fixture_routes_async
+
+# =============================================================================
+# STORAGE-STATE POOL
+# =============================================================================
+# One storage state (cookies + localStorage) per role, saved as
+# <directory>/<role>.json with a <role>.meta.json sidecar holding its expiry.
+# Generation logs all stale roles in concurrently: one headless Chromium, one
+# context per role, bounded by a semaphore. A cross-process file lock makes
+# parallel test workers wait for a single generation instead of each logging
+# in on its own, and a background thread renews states before they expire.
+# The sync methods work from inside a running event loop too (a pytest-playwright
+# fixture): the browser work then runs on a thread with its own loop.
+Role = namedtuple("Role", ["name", "username", "password", "tenant"])
+
+DEFAULT_TTL = 3600
+DEFAULT_REFRESH_MARGIN = 300
+DEFAULT_CONCURRENCY = 8
+PROBE_INTERVAL = 300
+
+
+def fixture_roles(count, tenants=("acme", "globex", "initech")):
+    """`count` roles for the bundled fixture shop, spread across tenants."""
+    return [Role(f"role-{i:02d}", f"role-{i:02d}@{tenants[i % len(tenants)]}.test", FIXTURE_PASSWORD,
+                 tenants[i % len(tenants)]) for i in range(1, count + 1)]
+
+
+async def fixture_login(page, role):
+    """Logs a role in through the fixture shop's login form."""
+    await page.goto("/login.html")
+    await page.get_by_label("Username").fill(role.username)
+    await page.get_by_label("Password").fill(role.password)
+    await page.get_by_label("Tenant").fill(role.tenant)
+    await page.get_by_role("button", name="Sign in").click()
+    await page.wait_for_url("**/dashboard.html")
+
+
+def _run_sync(coroutine):
+    """asyncio.run(), also when this thread already runs an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = asyncio.run(coroutine)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run, name="storage-state-login")
+    thread.start()
+    thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def _expiry(state, now, ttl):
+    """The earliest cookie expiry, capped at now + ttl. Session cookies (expires == -1) only use the ttl."""
+    expiries = [cookie["expires"] for cookie in state.get("cookies", ()) if cookie.get("expires", -1) > 0]
+    return min(expiries + [now + ttl])
+
+
+class StatePool:
+    """
+    Generates, caches and hands out storage states for many roles.
+
+        pool = StatePool(fixture_roles(20))
+        pool.ensure()                   # parallel login for every stale role
+        browser.new_context(storage_state=pool.get("role-03"))
+    """
+
+    def __init__(self, roles, directory=None, base_url=FIXTURE_ORIGIN, login=fixture_login, ttl=DEFAULT_TTL,
+                 refresh_margin=DEFAULT_REFRESH_MARGIN, concurrency=DEFAULT_CONCURRENCY,
+                 probe_path="/dashboard.html", login_path="/login.html"):
+        self.roles = {role.name: role for role in roles}
+        self.directory = directory or os.path.join(cache.CACHE_DIR, "storage_states")
+        os.makedirs(self.directory, exist_ok=True)
+        self.base_url = base_url
+        self.login = login
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.concurrency = concurrency
+        self.probe_path = probe_path
+        self.login_path = login_path
+        self._refresher = None
+        self._stop = threading.Event()
+
+    def path(self, name):
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _meta_path(self, name):
+        return os.path.join(self.directory, f"{name}.meta.json")
+
+    def meta(self, name):
+        try:
+            with open(self._meta_path(name), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, name, meta):
+        write_atomic(self._meta_path(name), lambda f: f.write(json.dumps(meta).encode("utf-8")))
+
+    def is_fresh(self, name, now=None, margin=None):
+        """True if the state exists and will not expire within `margin` seconds."""
+        meta = self.meta(name)
+        now = time.time() if now is None else now
+        margin = self.refresh_margin if margin is None else margin
+        return meta is not None and os.path.exists(self.path(name)) and meta["expires_at"] - margin > now
+
+    def stale(self, names=None, margin=None):
+        now = time.time()
+        return [name for name in (names or self.roles) if not self.is_fresh(name, now, margin)]
+
+    # -------------------------------------------------------------------------
+    # Generation and probing (one browser, many concurrent contexts)
+    # -------------------------------------------------------------------------
+    async def _new_context(self, browser, **options):
+        context = await browser.new_context(base_url=self.base_url, **options)
+        if self.base_url == FIXTURE_ORIGIN:
+            await install_fixture_routes_async(context)
+        return context
+
+    async def _generate_one(self, browser, semaphore, role):
+        async with semaphore:
+            started = time.perf_counter()
+            context = await self._new_context(browser)
+            try:
+                await self.login(await context.new_page(), role)
+                state = await context.storage_state()
+            finally:
+                await context.close()
+        now = time.time()
+        write_atomic(self.path(role.name), lambda f: f.write(json.dumps(state).encode("utf-8")))
+        self._write_meta(role.name, {"created_at": now, "expires_at": _expiry(state, now, self.ttl),
+                                     "probed_at": now, "tenant": role.tenant})
+        return (time.perf_counter() - started) * 1000
+
+    async def _probe_one(self, browser, semaphore, name):
+        """Opens probe_path with the saved state; a redirect to login_path means it no longer works."""
+        async with semaphore:
+            context = await self._new_context(browser, storage_state=self.path(name))
+            try:
+                page = await context.new_page()
+                await page.goto(self.probe_path)
+                await page.wait_for_load_state("networkidle")
+                valid = not page.url.split("?")[0].endswith(self.login_path)
+            finally:
+                await context.close()
+        if valid:
+            meta = self.meta(name)
+            meta["probed_at"] = time.time()
+            self._write_meta(name, meta)
+        return valid
+
+    async def _run(self, stale, probe):
+        from playwright.async_api import async_playwright
+
+        report = {}
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            semaphore = asyncio.Semaphore(self.concurrency)
+            try:
+                if probe:
+                    results = await asyncio.gather(*(self._probe_one(browser, semaphore, name) for name in probe),
+                                                   return_exceptions=True)
+                    results = [valid is True for valid in results]
+                    for name, valid in zip(probe, results):
+                        report[name] = {"action": "probed" if valid else "probe failed", "ms": None}
+                    stale = stale + [name for name, valid in zip(probe, results) if not valid]
+                results = await asyncio.gather(*(self._generate_one(browser, semaphore, self.roles[name])
+                                                 for name in stale), return_exceptions=True)
+                for name, result in zip(stale, results):
+                    if isinstance(result, Exception):
+                        report[name] = {"action": "failed", "ms": None, "error": f"{type(result).__name__}: {result}"}
+                    else:
+                        previous = report.get(name, {}).get("action")
+                        action = "regenerated" if previous == "probe failed" else "generated"
+                        report[name] = {"action": action, "ms": result}
+            finally:
+                await browser.close()
+        return report
+
+    def ensure(self, names=None, force=False, probe=False):
+        """
+        Makes every requested role's state fresh, logging stale ones in concurrently.
+        With probe=True, fresh states not probed in the last PROBE_INTERVAL seconds
+        are also checked in a browser and regenerated if they no longer work.
+        Returns {role: {"action", "ms"}} plus a "_wall_ms" entry.
+        """
+        names = list(names or self.roles)
+        started = time.perf_counter()
+        # Shared by every process using this directory
+        with cache_lock(self.directory):
+            # Another worker may have refreshed them while this one waited for the lock
+            stale = names if force else self.stale(names)
+            now = time.time()
+            to_probe = [name for name in names if probe and name not in stale
+                        and now - (self.meta(name) or {}).get("probed_at", 0) > PROBE_INTERVAL]
+            report = {name: {"action": "cached", "ms": None} for name in names}
+            if stale or to_probe:
+                report.update(_run_sync(self._run(stale, to_probe)))
+        report["_wall_ms"] = (time.perf_counter() - started) * 1000
+        return report
+
+    def get(self, name):
+        """The path of a fresh state for `name`, generating it first if needed. Safe from parallel workers."""
+        if name not in self.roles:
+            raise KeyError(f"unknown role {name!r}")
+        if not self.is_fresh(name):
+            result = self.ensure([name])[name]
+            if result["action"] == "failed":
+                raise RuntimeError(f"could not log in as {name}: {result['error']}")
+        return self.path(name)
+
+    def status(self):
+        now = time.time()
+        rows = []
+        for name, role in self.roles.items():
+            meta = self.meta(name) or {}
+            rows.append({"role": name, "tenant": role.tenant, "fresh": self.is_fresh(name, now),
+                         "expires_in_s": round(meta["expires_at"] - now) if meta else None,
+                         "last_probe_s_ago": round(now - meta["probed_at"]) if meta else None})
+        return rows
+
+    # -------------------------------------------------------------------------
+    # Background refresh
+    # -------------------------------------------------------------------------
+    def start_refresher(self, interval=60, on_error=None):
+        """Renews states entering the refresh margin every `interval` seconds on a daemon thread."""
+        if self._refresher is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    if self.stale():
+                        self.ensure()
+                except Exception as exc:
+                    if on_error is not None:
+                        on_error(exc)
+
+        self._stop.clear()
+        self._refresher = threading.Thread(target=loop, name="storage-state-refresher", daemon=True)
+        self._refresher.start()
+
+    def stop_refresher(self):
+        self._stop.set()
+        if self._refresher is not None:
+            self._refresher.join(timeout=5)
+            self._refresher = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate storage states for many fixture roles in parallel.")
+    parser.add_argument("--roles", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--force", action="store_true", help="log in again even if cached states are fresh")
+    parser.add_argument("--probe", action="store_true", help="check cached states in a browser")
+    parser.add_argument("--directory", help="where to keep the states (default: the disk cache)")
+    args = parser.parse_args()
+
+    pool = StatePool(fixture_roles(args.roles), directory=args.directory, concurrency=args.concurrency)
+    report = pool.ensure(force=args.force, probe=args.probe)
+    wall = report.pop("_wall_ms")
+    timed = [r["ms"] for r in report.values() if r["ms"] is not None]
+    for name, result in report.items():
+        ms = f"{result['ms']:8.0f} ms" if result["ms"] is not None else " " * 11
+        print(f"{name:<10} {result['action']:<13} {ms} {result.get('error', '')}")
+    print(f"{len(timed)} logins took {sum(timed) / 1000:.1f}s of browser time in {wall / 1000:.1f}s wall time "
+          f"(concurrency {args.concurrency})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+import argparse
+import json
+import mmap
+import os
+import re
+import zipfile
+from collections import OrderedDict, namedtuple
+from html import escape
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import cache_lock, cache_path, digest_stream, spill, write_atomic
+
+# =============================================================================
+# PLAYWRIGHT TRACE ARCHIVES
+# =============================================================================
+# A trace.zip holds NDJSON event logs (trace.trace, N-trace.trace) and a
+# resources/ folder of screenshots and page resources. DOM snapshots are inlined
+# in the event log and make up most of its size, so the log is streamed once:
+# actions become a compact timeline, snapshot lines are spilled verbatim to a
+# side file and indexed by offset, and nothing else is kept. Screenshots and
+# snapshots are decoded on demand.
+TraceAction = namedtuple("TraceAction", [
+    "call_id", "api_name", "detail", "page_id", "start_ms", "end_ms", "error",
+    "before_snapshot", "after_snapshot",
+])
+
+HEAD_BYTES = 64 * 1024
+COPY_BYTES = 1 << 20
+SNAPSHOT_CACHE_SIZE = 8
+# Subtree references can repeat a subtree many times over, so rendering stops here
+MAX_SNAPSHOT_NODES = 200_000
+MAX_SNAPSHOT_BYTES = 8 << 20
+INDEX_VERSION = 1
+_TRACE_MEMBER = re.compile(r"(^|/)(\d+-)?trace\.trace$")
+_SNAPSHOT_FIELDS = re.compile(rb'"(snapshotName|pageId|frameId)"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_VOID_TAGS = {"AREA", "BASE", "BR", "COL", "EMBED", "HR", "IMG", "INPUT", "LINK", "META", "SOURCE", "TRACK", "WBR"}
+# Snapshots are rendered in an iframe that may run scripts, so nothing from the page may
+_SKIPPED_TAGS = {"SCRIPT", "NOSCRIPT"}
+_NAME = re.compile(r"[A-Za-z][\w:.-]*\Z")
+_URL_ATTRS = {"href", "src", "action", "formaction", "data", "poster", "background", "cite", "xlink:href"}
+_SCRIPT_URL = ("javascript:", "vbscript:", "data:text/html")
+_IGNORED_IN_URLS = re.compile(r"[\x00-\x20]+")
+
+
+class TraceError(ValueError):
+    pass
+
+
+class _MappedFile:
+    """File-like view of an mmap, for zipfile (mmap objects lack seekable() before 3.13)."""
+
+    def __init__(self, mapped):
+        self._map = mapped
+        self.read, self.seek, self.tell = mapped.read, mapped.seek, mapped.tell
+
+    def seekable(self):
+        return True
+
+    def close(self):
+        self._map.close()
+
+
+def _detail(params):
+    """One-line summary of an action's parameters."""
+    if not params:
+        return ""
+    for key in ("selector", "url", "expression", "key", "value", "text"):
+        if key in params and isinstance(params[key], str):
+            value = params[key]
+            return f"{key}={value[:117] + '...' if len(value) > 120 else value}"
+    return ""
+
+
+def _read_line(f, spill):
+    """
+    Reads one NDJSON line. Frame snapshot lines are copied to `spill` in chunks
+    and returned as (None, offset, length, head); other lines are parsed.
+    """
+    head = f.readline(HEAD_BYTES)
+    if not head:
+        return None
+    if b'"frame-snapshot"' in head[:256]:
+        offset = spill.tell()
+        spill.write(head)
+        chunk = head
+        while not chunk.endswith(b"\n"):
+            chunk = f.readline(COPY_BYTES)
+            if not chunk:
+                break
+            spill.write(chunk)
+        if not chunk.endswith(b"\n"):
+            spill.write(b"\n")
+        return None, offset, spill.tell() - offset, head
+    parts = [head]
+    while not parts[-1].endswith(b"\n"):
+        chunk = f.readline(COPY_BYTES)
+        if not chunk:
+            break
+        parts.append(chunk)
+    line = b"".join(parts).strip()
+    if not line:
+        return {}, None, None, None
+    try:
+        return json.loads(line), None, None, None
+    except ValueError:
+        raise TraceError("The trace event log is not valid NDJSON.") from None
+
+
+def _build_index(archive, spill):
+    """Streams every event log once and returns the JSON-serialisable index."""
+    members = [n for n in archive.namelist() if _TRACE_MEMBER.search(n)]
+    if not members:
+        raise TraceError("No trace.trace event log found - is this a Playwright trace.zip?")
+    actions, open_calls = [], {}
+    frames, snapshots = {}, {}
+    screencast = {}
+    context, version, errors, logs = {}, None, 0, 0
+
+    def finish(call_id, end_ms, error, after):
+        start = open_calls.pop(call_id, None)
+        if start is not None:
+            start.update(end_ms=end_ms, error=error, after_snapshot=after)
+            actions.append(start)
+
+    for member in members:
+        with archive.open(member) as f:
+            while True:
+                item = _read_line(f, spill)
+                if item is None:
+                    break
+                event, offset, length, head = item
+                if event is None:
+                    fields = {k.decode(): v.decode() for k, v in _SNAPSHOT_FIELDS.findall(head)}
+                    name = fields.get("snapshotName")
+                    if name:
+                        frame = f"{fields.get('pageId')}/{fields.get('frameId')}"
+                        snapshots[name] = [offset, length, frame, len(frames.setdefault(frame, []))]
+                        frames[frame].append([offset, length])
+                    continue
+                kind = event.get("type")
+                if kind == "context-options":
+                    version = event.get("version")
+                    context = {k: event.get(k) for k in ("browserName", "platform", "title", "sdkLanguage")}
+                    context["viewport"] = (event.get("options") or {}).get("viewport")
+                elif kind == "before":
+                    open_calls[event["callId"]] = {
+                        "call_id": event["callId"],
+                        "api_name": event.get("apiName") or event.get("title") or f"{event.get('class')}.{event.get('method')}",
+                        "detail": _detail(event.get("params")),
+                        "page_id": event.get("pageId"),
+                        "start_ms": event.get("startTime", 0.0),
+                        "before_snapshot": event.get("beforeSnapshot"),
+                    }
+                elif kind == "after":
+                    error = event.get("error")
+                    if isinstance(error, dict):
+                        error = error.get("message") or "Error"
+                    finish(event.get("callId"), event.get("endTime", 0.0), error, event.get("afterSnapshot"))
+                elif kind == "action":
+                    # Trace format v3-v5: one event per action
+                    meta = event.get("metadata", {})
+                    named = {s.get("title"): s.get("snapshotName") for s in meta.get("snapshots", [])}
+                    error = (meta.get("error") or {}).get("error", {}).get("message") if meta.get("error") else None
+                    actions.append({
+                        "call_id": meta.get("id"), "api_name": meta.get("apiName") or f"{meta.get('type')}.{meta.get('method')}",
+                        "detail": _detail(meta.get("params")), "page_id": meta.get("pageId"),
+                        "start_ms": meta.get("startTime", 0.0), "end_ms": meta.get("endTime", 0.0), "error": error,
+                        "before_snapshot": named.get("before"), "after_snapshot": named.get("after"),
+                    })
+                elif kind == "screencast-frame":
+                    screencast.setdefault(event.get("pageId"), []).append([event.get("timestamp", 0.0), event.get("sha1")])
+                elif kind == "log":
+                    logs += 1
+                elif kind == "console" and event.get("messageType") == "error":
+                    errors += 1
+    # Calls without an "after" event were still running when the trace stopped
+    for call_id in list(open_calls):
+        finish(call_id, None, "Did not finish before the trace was stopped", None)
+    actions.sort(key=lambda a: a["start_ms"])
+    for frames_list in screencast.values():
+        frames_list.sort(key=lambda f: f[0])
+    return {
+        "index_version": INDEX_VERSION, "trace_version": version, "context": context, "actions": actions,
+        "snapshots": snapshots, "frames": frames, "screencast": screencast,
+        "console_errors": errors, "log_lines": logs,
+    }
+
+
+# =============================================================================
+# SNAPSHOT RENDERING
+# =============================================================================
+def _safe_attribute(name, value):
+    """False for event handlers, srcdoc, script URLs and names that could break out of the tag."""
+    lower = name.lower()
+    if not _NAME.match(name) or lower.startswith(("on", "__playwright")) or lower == "srcdoc":
+        return False
+    # Browsers ignore whitespace and control characters in the scheme ('java\tscript:')
+    return lower not in _URL_ATTRS or not _IGNORED_IN_URLS.sub("", str(value)).lower().startswith(_SCRIPT_URL)
+
+
+def _open_tag(tag, attrs):
+    rendered = "".join(f' {k}="{escape(str(v))}"' for k, v in attrs.items() if _safe_attribute(k, v))
+    return f"<{tag.lower()}{rendered}>"
+
+
+def _snapshot_nodes(html):
+    """Post-order list of a snapshot's nodes; subtree references point into it."""
+    nodes = []
+    stack = [(html, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if isinstance(node, str):
+            nodes.append(node)
+        elif isinstance(node, list) and node and isinstance(node[0], str):
+            if expanded:
+                nodes.append(node)
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node[2:]))
+    return nodes
+
+
+class TraceArchive:
+    """
+    Lazily opened trace.zip. The archive is memory-mapped, the event log is
+    summarised into an on-disk index once per trace (by content digest), and
+    screenshots and DOM snapshots are only decoded when asked for.
+    """
+
+    def __init__(self, path, digest=None):
+        if digest is None:
+            with open(path, "rb") as f:
+                digest = digest_stream(f)
+        self.digest = digest
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._zip = zipfile.ZipFile(_MappedFile(self._map))
+        except (zipfile.BadZipFile, ValueError):
+            # ValueError: an empty file cannot be mapped, a truncated one seeks before its start
+            self.close()
+            raise TraceError("Not a zip archive.") from None
+        index_path = cache_path("traces", digest, ".index.json")
+        spill_path = cache_path("traces", digest, ".snapshots")
+        if not (os.path.exists(index_path) and os.path.exists(spill_path)):
+            with cache_lock(index_path):
+                if not (os.path.exists(index_path) and os.path.exists(spill_path)):
+                    holder = {}
+                    write_atomic(spill_path, lambda spill: holder.update(index=_build_index(self._zip, spill)))
+                    write_atomic(index_path, lambda f: f.write(json.dumps(holder["index"]).encode()))
+        with open(index_path, "rb") as f:
+            self.index = json.load(f)
+        self._spill_file = open(spill_path, "rb")
+        self._spill = mmap.mmap(self._spill_file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(spill_path) else b""
+        self._decoded = OrderedDict()
+        self.actions = [TraceAction(**a) for a in self.index["actions"]]
+        self._screencast = {page: (np.array([t for t, _ in frames]), [sha1 for _, sha1 in frames])
+                            for page, frames in self.index["screencast"].items()}
+
+    @classmethod
+    def from_upload(cls, fileobj):
+        """Copies an uploaded trace into the cache directory (once) and opens it from disk."""
+        path = spill(fileobj, "traces", ".zip")
+        return cls(path, os.path.basename(path)[:-len(".zip")])
+
+    def close(self):
+        for name in ("_zip", "_spill", "_spill_file", "_map", "_file"):
+            resource = getattr(self, name, None)
+            if resource is not None and hasattr(resource, "close"):
+                resource.close()
+
+    # -------------------------------------------------------------------------
+    # Timeline
+    # -------------------------------------------------------------------------
+    @property
+    def context(self):
+        return self.index["context"]
+
+    def timeline(self):
+        """Actions as a DataFrame with times relative to the first action."""
+        if not self.actions:
+            return pd.DataFrame(columns=["step", "action", "detail", "start_ms", "duration_ms", "error"])
+        t0 = min(a.start_ms for a in self.actions)
+        df = pd.DataFrame({
+            "step": np.arange(1, len(self.actions) + 1),
+            "action": [a.api_name for a in self.actions],
+            "detail": [a.detail for a in self.actions],
+            "start_ms": [a.start_ms - t0 for a in self.actions],
+            "duration_ms": [(a.end_ms - a.start_ms) if a.end_ms is not None else np.nan for a in self.actions],
+            "error": [a.error or "" for a in self.actions],
+        })
+        return df
+
+    def slowest(self, n=10):
+        return self.timeline().nlargest(n, "duration_ms")
+
+    # -------------------------------------------------------------------------
+    # Lazy payloads
+    # -------------------------------------------------------------------------
+    def screenshot(self, action):
+        """JPEG bytes of the screencast frame closest before the end of the action, or None."""
+        frames = self._screencast.get(action.page_id)
+        if frames is None:
+            return None
+        times, sha1s = frames
+        at = action.end_ms if action.end_ms is not None else action.start_ms
+        i = max(int(np.searchsorted(times, at, side="right")) - 1, 0)
+        for name in (f"resources/{sha1s[i]}", sha1s[i]):
+            try:
+                return self._zip.read(name)
+            except KeyError:
+                continue
+        return None
+
+    def _snapshot(self, frame, position):
+        key = (frame, position)
+        if key in self._decoded:
+            self._decoded.move_to_end(key)
+            return self._decoded[key]
+        offset, length = self.index["frames"][frame][position]
+        snapshot = json.loads(self._spill[offset:offset + length])["snapshot"]
+        self._decoded[key] = snapshot
+        if len(self._decoded) > SNAPSHOT_CACHE_SIZE:
+            self._decoded.popitem(last=False)
+        return snapshot
+
+    def snapshot_html(self, name):
+        """
+        Renders a DOM snapshot (e.g. an action's after_snapshot) to static HTML, or None.
+        Scripts, event-handler attributes and javascript: URLs are left out, and the
+        output is cut off after MAX_SNAPSHOT_NODES nodes or MAX_SNAPSHOT_BYTES.
+        """
+        entry = self.index["snapshots"].get(name) if name else None
+        if entry is None:
+            return None
+        _, _, frame, position = entry
+        snapshot = self._snapshot(frame, position)
+        nodes_cache = {}
+        out = []
+
+        def nodes_of(pos):
+            if pos not in nodes_cache:
+                nodes_cache[pos] = _snapshot_nodes(self._snapshot(frame, pos)["html"])
+            return nodes_cache[pos]
+
+        stack = [(snapshot["html"], position)]
+        visited = written = 0
+        while stack:
+            visited += 1
+            if visited > MAX_SNAPSHOT_NODES or written > MAX_SNAPSHOT_BYTES:
+                out.append("<!-- snapshot truncated -->")
+                break
+            node, pos = stack.pop()
+            if isinstance(node, tuple):
+                out.append(node[0])
+            elif isinstance(node, str):
+                out.append(escape(node, quote=False))
+                written += len(out[-1])
+            elif isinstance(node, list) and node and isinstance(node[0], list):
+                # Subtree reference: [[snapshots_ago, node_index]] into an earlier snapshot
+                target = node[0][:2]
+                if len(target) < 2 or not all(isinstance(v, int) for v in target):
+                    continue
+                ago, node_index = target
+                ref = pos - ago
+                if 0 <= ref < pos:
+                    ref_nodes = nodes_of(ref)
+                    if 0 <= node_index < len(ref_nodes):
+                        stack.append((ref_nodes[node_index], ref))
+            elif isinstance(node, list) and node:
+                tag = node[0]
+                if tag.upper() in _SKIPPED_TAGS or not _NAME.match(tag):
+                    continue
+                attrs = node[1] if len(node) > 1 and isinstance(node[1], dict) else {}
+                out.append(_open_tag(tag, attrs))
+                written += len(out[-1])
+                if tag in _VOID_TAGS:
+                    continue
+                stack.append(((f"</{tag.lower()}>",), pos))
+                stack.extend((child, pos) for child in reversed(node[2:]))
+        doctype = snapshot.get("doctype")
+        return (f"<!DOCTYPE {doctype}>" if doctype else "") + "".join(out)
+
+
+def index_trace(path, digest=None):
+    """
+    Builds the on-disk index of a trace.zip, for the job pool. Returns (path, digest);
+    TraceArchive(path, digest) then opens it without reading the event log again.
+    """
+    trace = TraceArchive(path, digest)
+    trace.close()
+    return path, trace.digest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise a Playwright trace.zip.")
+    parser.add_argument("trace")
+    parser.add_argument("--slowest", type=int, default=10)
+    args = parser.parse_args()
+    trace = TraceArchive(args.trace)
+    try:
+        timeline = trace.timeline()
+        print(f"{len(timeline)} actions, {int((timeline['error'] != '').sum())} failed, "
+              f"{len(trace.index['snapshots'])} snapshots, trace format v{trace.index['trace_version']}")
+        print(trace.slowest(args.slowest).round(1).to_string(index=False))
+    finally:
+        trace.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+import argparse
+import io
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image
+
+from utils.cache import cache_lock, cache_path, digest_bytes, write_atomic
+
+# =============================================================================
+# SIGNATURES
+# =============================================================================
+# A screenshot's signature is its size, a digest of the encoded file, a 64-bit
+# perceptual hash (pHash) and one 64-bit fingerprint per tile. Decoding the PNG
+# costs far more than anything else, so a byte-identical file (the usual case
+# for an unchanged page) is answered from the digest alone.
+#
+# A tile fingerprint is a weighted sum of the tile's bytes, read as uint64
+# words, with random odd weights (mod 2**64). Any single-word change alters it,
+# so screenshots whose fingerprints all match need no pixel diff; only tiles
+# whose fingerprints differ are taken from the baseline and diffed.
+Mask = namedtuple("Mask", ["x", "y", "width", "height"])
+Signature = namedtuple("Signature", ["width", "height", "tile", "phash", "fingerprints", "digest"])
+Comparison = namedtuple("Comparison", ["status", "diff_pixels", "diff_ratio", "phash_distance",
+                                       "changed_tiles", "tile_masks", "tile"])
+
+DEFAULT_TILE = 32
+DEFAULT_TOLERANCE = 16          # per-channel difference (0-255) still counted as equal
+DEFAULT_MAX_DIFF_RATIO = 0.001  # share of unmasked pixels allowed to differ
+HASH_SIZE = 32
+SIGNATURE_VERSION = 1
+
+_WEIGHTS = {}
+
+
+class VisualDiffError(ValueError):
+    pass
+
+
+def status_bar(height):
+    """Masks the top `height` pixels, like WDIO's blockOutStatusBar."""
+    return Mask(0, 0, None, height)
+
+
+def tool_bar(height):
+    """Masks the bottom `height` pixels, like WDIO's blockOutToolBar."""
+    return Mask(0, -height, None, height)
+
+
+def load_pixels(source):
+    """Decodes a path, bytes or file object into an RGB uint8 array of shape (height, width, 3)."""
+    if isinstance(source, np.ndarray):
+        return source
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    try:
+        with Image.open(source) as image:
+            return np.asarray(image.convert("RGB"))
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise VisualDiffError(f"not a readable image: {exc}") from None
+
+
+def encode_png(pixels):
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _resolve(mask, width, height):
+    y = mask.y + height if mask.y < 0 else mask.y
+    right = width if mask.width is None else min(width, mask.x + mask.width)
+    bottom = height if mask.height is None else min(height, y + mask.height)
+    return max(0, mask.x), max(0, y), right, bottom
+
+
+def apply_masks(pixels, masks):
+    """A copy of pixels with every masked rectangle blacked out (the original if there are no masks)."""
+    if not masks:
+        return pixels
+    pixels = pixels.copy()
+    height, width = pixels.shape[:2]
+    for mask in masks:
+        left, top, right, bottom = _resolve(mask, width, height)
+        pixels[top:bottom, left:right] = 0
+    return pixels
+
+
+def _padded(pixels, tile):
+    height, width = pixels.shape[:2]
+    pad_h, pad_w = -height % tile, -width % tile
+    if pad_h or pad_w:
+        pixels = np.pad(pixels, ((0, pad_h), (0, pad_w), (0, 0)))
+    return np.ascontiguousarray(pixels)
+
+
+def _weights(tile):
+    # One uint64 word covers 8 bytes, so a tile row of `tile` RGB pixels is 3 * tile / 8 words
+    if tile not in _WEIGHTS:
+        rng = np.random.default_rng(SIGNATURE_VERSION)
+        _WEIGHTS[tile] = rng.integers(0, 2**63, size=(tile, 3 * tile // 8), dtype=np.uint64) * 2 + 1
+    return _WEIGHTS[tile]
+
+
+def tile_fingerprints(padded, tile):
+    rows, cols = padded.shape[0] // tile, padded.shape[1] // tile
+    words = padded.reshape(padded.shape[0], -1).view(np.uint64).reshape(rows, tile, cols, -1)
+    return np.einsum("rtcw,tw->rc", words, _weights(tile))
+
+
+def _dct_matrix(n):
+    k = np.arange(n)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT = _dct_matrix(HASH_SIZE)
+
+
+def phash(pixels):
+    """64-bit perceptual hash: the 8x8 lowest DCT frequencies of a 32x32 thumbnail, compared with their median."""
+    small = Image.fromarray(pixels).resize((HASH_SIZE, HASH_SIZE), Image.Resampling.BOX).convert("L")
+    coefficients = (_DCT @ np.asarray(small, dtype=np.float64) @ _DCT.T)[:8, :8].ravel()
+    bits = coefficients > np.median(coefficients[1:])
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def signature(pixels, masks=(), tile=DEFAULT_TILE, digest=None):
+    if tile % 8:
+        raise VisualDiffError("tile size must be a multiple of 8")
+    pixels = apply_masks(pixels, masks)
+    height, width = pixels.shape[:2]
+    return Signature(width, height, tile, phash(pixels), tile_fingerprints(_padded(pixels, tile), tile), digest)
+
+
+def _cache_key(data, masks, tile):
+    return digest_bytes(data + repr((SIGNATURE_VERSION, tile, tuple(masks))).encode("utf-8"))
+
+
+def cached_signature(data, masks=(), tile=DEFAULT_TILE):
+    """Signature of encoded image bytes, stored on disk under their content digest."""
+    path = cache_path("visual", _cache_key(data, masks, tile), ".npz")
+    if os.path.exists(path):
+        return _load_signature(path)
+    with cache_lock(path):
+        if os.path.exists(path):
+            return _load_signature(path)
+        sig = signature(load_pixels(data), masks, tile, digest_bytes(data))
+        meta = np.array([sig.width, sig.height, sig.tile, sig.phash], dtype=np.uint64)
+        write_atomic(path, lambda f: np.savez(f, meta=meta, fingerprints=sig.fingerprints, digest=np.array(sig.digest)))
+    return sig
+
+
+def _load_signature(path):
+    with np.load(path) as stored:
+        width, height, tile_, hash_ = (int(v) for v in stored["meta"])
+        return Signature(width, height, tile_, hash_, stored["fingerprints"], str(stored["digest"]))
+
+
+# =============================================================================
+# COMPARISON
+# =============================================================================
+def compare(baseline_sig, candidate, load_baseline, masks=(), tolerance=DEFAULT_TOLERANCE,
+            max_diff_ratio=DEFAULT_MAX_DIFF_RATIO):
+    """
+    Compares candidate pixels against a baseline signature. `load_baseline()` returns
+    the baseline pixels and is only called when at least one tile fingerprint differs.
+    status is "identical", "within tolerance", "changed" or "size changed".
+    """
+    tile = baseline_sig.tile
+    candidate = apply_masks(candidate, masks)
+    height, width = candidate.shape[:2]
+    if (width, height) != (baseline_sig.width, baseline_sig.height):
+        return Comparison("size changed", width * height, 1.0, None, [], None, tile)
+    padded = _padded(candidate, tile)
+    changed = np.argwhere(tile_fingerprints(padded, tile) != baseline_sig.fingerprints)
+    if not len(changed):
+        return Comparison("identical", 0, 0.0, 0, [], None, tile)
+
+    # Vectorized diff over the changed tiles only: (n, tile, tile, 3) blocks gathered from both images
+    base = _padded(apply_masks(load_baseline(), masks), tile)
+    rows, cols = changed[:, 0], changed[:, 1]
+    grid = (padded.shape[0] // tile, tile, padded.shape[1] // tile, tile, 3)
+    a = base.reshape(grid)[rows, :, cols].astype(np.int16)
+    b = padded.reshape(grid)[rows, :, cols].astype(np.int16)
+    tile_masks = (np.abs(a - b).max(axis=-1) > tolerance)
+    diff_pixels = int(tile_masks.sum())
+    ratio = diff_pixels / (width * height)
+    status = "changed" if ratio > max_diff_ratio else "within tolerance"
+    distance = hamming(baseline_sig.phash, phash(candidate))
+    return Comparison(status, diff_pixels, ratio, distance, [tuple(rc) for rc in changed.tolist()], tile_masks, tile)
+
+
+def _compare_encoded(sig, candidate, load_baseline, masks, tolerance, max_diff_ratio):
+    if isinstance(candidate, str):
+        with open(candidate, "rb") as f:
+            candidate = f.read()
+    if isinstance(candidate, (bytes, bytearray)) and digest_bytes(candidate) == sig.digest:
+        return Comparison("identical", 0, 0.0, 0, [], None, sig.tile)
+    return compare(sig, load_pixels(candidate), load_baseline, masks, tolerance, max_diff_ratio)
+
+
+def compare_images(baseline, candidate, masks=(), tile=DEFAULT_TILE, tolerance=DEFAULT_TOLERANCE,
+                   max_diff_ratio=DEFAULT_MAX_DIFF_RATIO):
+    """Compares two encoded screenshots (bytes); the baseline's signature comes from the disk cache."""
+    sig = cached_signature(baseline, masks, tile)
+    return _compare_encoded(sig, candidate, lambda: load_pixels(baseline), masks, tolerance, max_diff_ratio)
+
+
+def render_diff(candidate, comparison, masks=()):
+    """The candidate faded to grey, masked areas tinted blue, changed tiles outlined and differing pixels in red."""
+    height, width = candidate.shape[:2]
+    grey = candidate.mean(axis=-1, dtype=np.float32) * 0.35 + 150
+    canvas = np.repeat(grey[..., None], 3, axis=-1).astype(np.uint8)
+    for mask in masks:
+        left, top, right, bottom = _resolve(mask, width, height)
+        canvas[top:bottom, left:right] = (canvas[top:bottom, left:right] * 0.5 + (40, 90, 200)).astype(np.uint8)
+    if comparison.tile_masks is None:
+        return canvas
+    tile = comparison.tile
+    for (row, col), tile_mask in zip(comparison.changed_tiles, comparison.tile_masks):
+        top, left = row * tile, col * tile
+        block = canvas[top:top + tile, left:left + tile]
+        block[tile_mask[:block.shape[0], :block.shape[1]]] = (230, 30, 30)
+        if tile_mask.any():
+            block[[0, -1], :] = (255, 140, 0)
+            block[:, [0, -1]] = (255, 140, 0)
+    return canvas
+
+
+def diff_report(baseline, candidate, masks=(), tolerance=DEFAULT_TOLERANCE, max_diff_ratio=DEFAULT_MAX_DIFF_RATIO,
+                progress=None):
+    """
+    compare_images() plus the rendered diff as PNG bytes (None when the sizes differ),
+    so the whole comparison can run as a utils.jobs job. Returns (Comparison, diff_png).
+    """
+    if progress:
+        progress(0.0, "Comparing tiles")
+    result = compare_images(baseline, candidate, masks, tolerance=tolerance, max_diff_ratio=max_diff_ratio)
+    if result.status == "size changed":
+        return result, None
+    # Rendered once per input pair and settings, for every replica sharing the cache
+    key = digest_bytes(repr((SIGNATURE_VERSION, digest_bytes(baseline), digest_bytes(candidate), tuple(masks),
+                             tolerance, max_diff_ratio)).encode("utf-8"))
+    path = cache_path("visual", key, ".diff.png")
+    if not os.path.exists(path):
+        with cache_lock(path):
+            if not os.path.exists(path):
+                if progress:
+                    progress(0.6, "Rendering the diff")
+                png = encode_png(render_diff(load_pixels(candidate), result, masks))
+                write_atomic(path, lambda f: f.write(png))
+                return result, png
+    with open(path, "rb") as f:
+        return result, f.read()
+
+
+class BaselineStore:
+    """
+    A directory of baseline screenshots. Signatures are computed once per baseline file
+    (kept in memory and in the disk cache); baseline pixels are only decoded when tiles differ.
+    """
+
+    def __init__(self, directory, masks=(), tile=DEFAULT_TILE, tolerance=DEFAULT_TOLERANCE,
+                 max_diff_ratio=DEFAULT_MAX_DIFF_RATIO):
+        self.directory = directory
+        self.masks = tuple(masks)
+        self.tile = tile
+        self.tolerance = tolerance
+        self.max_diff_ratio = max_diff_ratio
+        self._signatures = {}
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def signature(self, name):
+        path = self.path(name)
+        stamp = os.stat(path).st_mtime_ns
+        cached = self._signatures.get(name)
+        if cached is None or cached[0] != stamp:
+            with open(path, "rb") as f:
+                cached = (stamp, cached_signature(f.read(), self.masks, self.tile))
+            self._signatures[name] = cached
+        return cached[1]
+
+    def compare(self, name, candidate):
+        """candidate is a path, encoded bytes or a pixel array. Byte-identical files are matched without decoding."""
+        if not os.path.exists(self.path(name)):
+            raise VisualDiffError(f"no baseline named {name!r}")
+        return _compare_encoded(self.signature(name), candidate, lambda: load_pixels(self.path(name)),
+                                self.masks, self.tolerance, self.max_diff_ratio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a directory of screenshots against baselines.")
+    parser.add_argument("baselines")
+    parser.add_argument("actual")
+    parser.add_argument("--tile", type=int, default=DEFAULT_TILE)
+    parser.add_argument("--tolerance", type=int, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--max-diff", type=float, default=DEFAULT_MAX_DIFF_RATIO)
+    parser.add_argument("--status-bar", type=int, default=0, help="pixels to ignore at the top")
+    parser.add_argument("--tool-bar", type=int, default=0, help="pixels to ignore at the bottom")
+    parser.add_argument("--diff-dir", help="write a diff image for every changed screenshot here")
+    args = parser.parse_args()
+
+    masks = []
+    if args.status_bar:
+        masks.append(status_bar(args.status_bar))
+    if args.tool_bar:
+        masks.append(tool_bar(args.tool_bar))
+    store = BaselineStore(args.baselines, masks, args.tile, args.tolerance, args.max_diff)
+    names = sorted(n for n in os.listdir(args.actual) if n.lower().endswith(".png"))
+    failed = 0
+    started = time.perf_counter()
+    for name in names:
+        path = os.path.join(args.actual, name)
+        result = store.compare(name, path)
+        if result.status in ("changed", "size changed"):
+            failed += 1
+            print(f"{name:<40} {result.status:<16} {result.diff_ratio:8.3%} {len(result.changed_tiles):5d} tiles")
+            if args.diff_dir and result.tile_masks is not None:
+                os.makedirs(args.diff_dir, exist_ok=True)
+                diff = render_diff(load_pixels(path), result, masks)
+                Image.fromarray(diff).save(os.path.join(args.diff_dir, name))
+    elapsed = time.perf_counter() - started
+    print(f"{len(names)} screenshots, {failed} changed, {len(names) / max(elapsed, 1e-9):.0f} comparisons/s")
+
+
+if __name__ == "__main__":
+    main()
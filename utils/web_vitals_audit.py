@@ -0,0 +1,400 @@
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+from datetime import datetime, timezone
+from importlib import metadata
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from utils.cache import write_atomic
+from utils.seo_manager import SEO_METADATA
+from utils.worker_process import ROOT
+
+# =============================================================================
+# BUDGETS
+# =============================================================================
+# Page loads are held to the Web Vitals "good" thresholds (LCP 2.5s, CLS 0.1).
+# Image budgets sit just above the diagrams each page ships today (the JPEG
+# variants from utils.images, which Streamlit serves unchanged), so a new
+# diagram has to be paid for explicitly. Transfer budgets add 3 MB for
+# Streamlit's own bundles on top of the image budget.
+DATA_DIR = os.path.join(ROOT, "data", "web_vitals")
+RESULTS_PATH = os.path.join(DATA_DIR, "results.jsonl")
+BASELINE_PATH = os.path.join(DATA_DIR, "baseline.json")
+RESULTS_VERSION = 1
+
+NAV_OPTIONS = list(SEO_METADATA)
+PAGE_LOAD = "page load"
+
+DEFAULT_BUDGET = {"lcp_ms": 2500, "cls": 0.1, "total_blocking_ms": 600, "image_kb": 100, "transfer_kb": 3100,
+                  "js_heap_mb": 100}
+PAGE_BUDGETS = {
+    # Seven architecture diagrams, 970 KiB together (4,389 KiB as PNGs): the heaviest page
+    "Playwright": {"image_kb": 1100, "transfer_kb": 4100, "lcp_ms": 3000},
+    "WebdriverIO": {"image_kb": 550, "transfer_kb": 3550},
+    "Karate": {"image_kb": 550, "transfer_kb": 3550},
+}
+TAB_BUDGET = {"cls": 0.1, "total_blocking_ms": 300, "interaction_ms": 200}
+# Byte counts do not depend on machine load, so the parallel e2e suite checks
+# only these; timings are enforced by the serial `--enforce` audit.
+BYTE_BUDGETS = ("image_kb", "transfer_kb")
+
+# A metric regresses when it exceeds baseline * (1 + relative) + absolute
+REGRESSION_SLACK = {
+    "lcp_ms": (0.20, 100), "fcp_ms": (0.20, 100), "cls": (0.0, 0.02), "total_blocking_ms": (0.30, 50),
+    "interaction_ms": (0.30, 24), "transfer_kb": (0.05, 10), "image_kb": (0.02, 5), "script_kb": (0.05, 10),
+    "js_heap_mb": (0.15, 2), "dom_nodes": (0.10, 50),
+}
+
+VIEWPORT = {"width": 1366, "height": 900}
+SETTLE_MS = 1000
+LOAD_TIMEOUT = 60_000
+WATERFALL_SIZE = 25
+
+# =============================================================================
+# IN-PAGE COLLECTION
+# =============================================================================
+_OBSERVERS = """
+(() => {
+  const v = window.__vitals = {lcp: null, lcpElement: null, shifts: [], longTasks: [], events: []};
+  const observe = (type, callback, options) => {
+    try {
+      new PerformanceObserver(list => list.getEntries().forEach(callback))
+        .observe({type, buffered: true, ...options});
+    } catch (e) {}
+  };
+  observe("largest-contentful-paint", e => {
+    v.lcp = e.startTime;
+    v.lcpElement = e.element ? e.element.tagName.toLowerCase() + (e.url ? " " + e.url.split("/").pop() : "") : null;
+  });
+  observe("layout-shift", e => { if (!e.hadRecentInput) v.shifts.push([e.startTime, e.value]); });
+  observe("longtask", e => v.longTasks.push([e.startTime, e.duration]));
+  observe("event", e => v.events.push([e.startTime, e.duration]), {durationThreshold: 16});
+})();
+"""
+
+_VITALS = """
+since => {
+  const v = window.__vitals;
+  // CLS is the largest session window: shifts less than 1s apart, at most 5s long
+  let cls = 0, session = 0, start = -1, last = -1;
+  for (const [t, value] of v.shifts.filter(s => s[0] >= since)) {
+    if (last < 0 || t - last > 1000 || t - start > 5000) { start = t; session = 0; }
+    session += value; last = t; cls = Math.max(cls, session);
+  }
+  const tasks = v.longTasks.filter(t => t[0] >= since);
+  const fcp = performance.getEntriesByName("first-contentful-paint")[0];
+  const nav = performance.getEntriesByType("navigation")[0];
+  return {
+    lcp_ms: since === 0 ? v.lcp : null,
+    lcp_element: since === 0 ? v.lcpElement : null,
+    fcp_ms: since === 0 && fcp ? fcp.startTime : null,
+    ttfb_ms: since === 0 && nav ? nav.responseStart : null,
+    cls,
+    long_tasks: tasks.length,
+    total_blocking_ms: tasks.reduce((sum, t) => sum + Math.max(0, t[1] - 50), 0),
+    interaction_ms: since === 0 ? null : Math.max(0, ...v.events.filter(e => e[0] >= since).map(e => e[1])),
+    dom_nodes: document.getElementsByTagName("*").length,
+  };
+}
+"""
+
+# Runs in every frame (the nav menu is a component iframe); times are made absolute with timeOrigin
+_RESOURCES = """
+sinceAbsolute => {
+  const entries = performance.getEntriesByType("resource").map(r => [r, r.initiatorType]);
+  const nav = performance.getEntriesByType("navigation")[0];
+  if (nav) entries.push([nav, "document"]);
+  return entries
+    .filter(([r]) => performance.timeOrigin + r.startTime >= sinceAbsolute)
+    .map(([r, initiator]) => ({
+      url: r.name, initiator, start: performance.timeOrigin + r.startTime, duration_ms: r.duration,
+      transfer_bytes: r.transferSize, body_bytes: r.encodedBodySize,
+    }));
+}
+"""
+
+_EXTENSIONS = [
+    (re.compile(r"\.(png|jpe?g|gif|webp|avif|svg|ico)$"), "image"),
+    (re.compile(r"\.m?js$"), "script"),
+    (re.compile(r"\.css$"), "stylesheet"),
+    (re.compile(r"\.(woff2?|ttf|otf)$"), "font"),
+]
+
+
+def resource_type(url, initiator):
+    path = urlsplit(url).path.lower()
+    if initiator in ("document", "iframe"):
+        return "document"
+    if "/media/" in path or initiator == "img":
+        return "image"
+    for pattern, kind in _EXTENSIONS:
+        if pattern.search(path):
+            return kind
+    if initiator in ("fetch", "xmlhttprequest", "beacon"):
+        return "fetch"
+    return "other"
+
+
+def _wait_for_app(page):
+    page.wait_for_selector('[data-testid="stApp"][data-test-script-state="notRunning"]', state="attached",
+                           timeout=LOAD_TIMEOUT)
+    page.wait_for_load_state("networkidle", timeout=LOAD_TIMEOUT)
+    page.wait_for_timeout(SETTLE_MS)
+
+
+def _measure(page, cdp, nav, tab, since, since_absolute, origin):
+    vitals = page.evaluate(_VITALS, since)
+    resources = []
+    for frame in page.frames:
+        try:
+            resources += frame.evaluate(_RESOURCES, since_absolute)
+        except Exception:
+            pass  # detached or cross-origin frame
+    bytes_by_type = {}
+    waterfall = []
+    for entry in resources:
+        kind = resource_type(entry["url"], entry["initiator"])
+        bytes_by_type[kind] = bytes_by_type.get(kind, 0) + entry["transfer_bytes"]
+        waterfall.append({"url": entry["url"].replace(origin, "") or "/", "type": kind,
+                          "start_ms": round(entry["start"] - since_absolute, 1),
+                          "duration_ms": round(entry["duration_ms"], 1),
+                          "kb": round(entry["transfer_bytes"] / 1024, 1)})
+    # The heaviest requests, in the order they started
+    waterfall = sorted(sorted(waterfall, key=lambda r: -r["kb"])[:WATERFALL_SIZE], key=lambda r: r["start_ms"])
+    heap = {m["name"]: m["value"] for m in cdp.send("Performance.getMetrics")["metrics"]}.get("JSHeapUsedSize", 0)
+    metrics = {key: value for key, value in vitals.items() if key != "lcp_element"}
+    metrics.update({
+        "transfer_kb": sum(bytes_by_type.values()) / 1024,
+        "image_kb": bytes_by_type.get("image", 0) / 1024,
+        "script_kb": bytes_by_type.get("script", 0) / 1024,
+        "requests": len(resources),
+        "js_heap_mb": heap / 2**20,
+    })
+    return {"nav": nav, "tab": tab, "metrics": metrics, "lcp_element": vitals["lcp_element"],
+            "bytes_by_type": bytes_by_type, "waterfall": waterfall}
+
+
+def audit_nav(browser, base_url, nav, tabs=True):
+    """Cold-loads one nav option in a fresh context, then clicks through its tabs. Returns one route per state."""
+    origin = f"{urlsplit(base_url).scheme}://{urlsplit(base_url).netloc}"
+    context = browser.new_context(base_url=base_url, viewport=VIEWPORT)
+    context.add_init_script(_OBSERVERS)
+    context.route(re.compile(rf"^(?!{re.escape(origin)}([/?]|$))"), lambda route: route.abort())
+    try:
+        page = context.new_page()
+        cdp = context.new_cdp_session(page)
+        cdp.send("Performance.enable")
+        page.goto(f"/?nav={nav}", timeout=LOAD_TIMEOUT)
+        _wait_for_app(page)
+        time_origin = page.evaluate("performance.timeOrigin")
+        routes = [_measure(page, cdp, nav, PAGE_LOAD, 0, time_origin, origin)]
+        if tabs:
+            labels = page.get_by_role("tab")
+            for i in range(labels.count()):
+                tab = labels.nth(i)
+                since = page.evaluate("performance.now()")
+                tab.click()
+                _wait_for_app(page)
+                routes.append(_measure(page, cdp, nav, tab.inner_text().strip(), since, time_origin + since, origin))
+    finally:
+        context.close()
+    return routes
+
+
+def _commit():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                             check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return sha + ("-dirty" if dirty else "")
+
+
+def _median_routes(runs):
+    """Per route, the median of every metric across runs; breakdowns come from the run with the median LCP."""
+    merged = []
+    for versions in zip(*runs):
+        first = versions[0]
+        metrics = {}
+        for key in first["metrics"]:
+            values = [v["metrics"][key] for v in versions if v["metrics"][key] is not None]
+            metrics[key] = round(float(np.median(values)), 4) if values else None
+        order = sorted(versions, key=lambda v: v["metrics"]["lcp_ms"] or 0)
+        merged.append(dict(order[len(order) // 2], metrics=metrics))
+    return merged
+
+
+def run_audit(base_url=None, navs=NAV_OPTIONS, runs=3, tabs=True, log=print):
+    """Audits every nav option (and tab) `runs` times in headless Chromium. Boots app.py unless base_url is given."""
+    from playwright.sync_api import sync_playwright
+
+    from utils.app_server import AppServer
+
+    server = None if base_url else AppServer().start()
+    base_url = base_url or server.url
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            chromium = browser.version
+            all_runs = []
+            for run in range(runs):
+                routes = []
+                for nav in navs:
+                    nav_routes = audit_nav(browser, base_url, nav, tabs)
+                    routes += nav_routes
+                    m = nav_routes[0]["metrics"]
+                    log(f"run {run + 1}/{runs} {nav:<12} LCP {m['lcp_ms'] or 0:7.0f} ms  "
+                        f"{m['transfer_kb']:8.0f} KB  CLS {m['cls']:.3f}")
+                all_runs.append(routes)
+            browser.close()
+    finally:
+        if server is not None:
+            server.stop()
+
+    return {
+        "version": RESULTS_VERSION,
+        "measured_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "environment": {"chromium": chromium, "playwright": metadata.version("playwright"),
+                        "streamlit": metadata.version("streamlit"), "python": platform.python_version(),
+                        "platform": platform.platform(), "cpus": os.cpu_count()},
+        "runs": runs,
+        "routes": _median_routes(all_runs),
+    }
+
+
+# =============================================================================
+# HISTORY, BASELINE AND CHECKS
+# =============================================================================
+def append_result(record, path=RESULTS_PATH):
+    """Adds one audit to the time series (one JSON object per line)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+def load_history(path=RESULTS_PATH):
+    """Every stored audit, oldest first; an empty list if none has been recorded yet."""
+    if not os.path.isfile(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return [r for r in records if r.get("version") == RESULTS_VERSION]
+
+
+def save_baseline(record, path=BASELINE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_atomic(path, lambda f: f.write(json.dumps(record, indent=1).encode("utf-8")))
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        record = json.load(f)
+    return record if record.get("version") == RESULTS_VERSION else None
+
+
+def budget_for(nav, tab):
+    if tab != PAGE_LOAD:
+        return TAB_BUDGET
+    return dict(DEFAULT_BUDGET, **PAGE_BUDGETS.get(nav, {}))
+
+
+def check_budgets(record, metrics=None):
+    """Rows for every metric (of `metrics`, default all) over its budget."""
+    rows = []
+    for route in record["routes"]:
+        for metric, limit in budget_for(route["nav"], route["tab"]).items():
+            if metrics is not None and metric not in metrics:
+                continue
+            value = route["metrics"].get(metric)
+            if value is not None and value > limit:
+                rows.append({"nav": route["nav"], "tab": route["tab"], "metric": metric,
+                             "value": round(value, 3), "budget": limit})
+    return rows
+
+
+def find_regressions(record, baseline):
+    """Rows for every metric that got worse than the baseline by more than its slack."""
+    before = {(r["nav"], r["tab"]): r["metrics"] for r in baseline["routes"]}
+    rows = []
+    for route in record["routes"]:
+        old = before.get((route["nav"], route["tab"]))
+        if old is None:
+            continue
+        for metric, (relative, absolute) in REGRESSION_SLACK.items():
+            new, was = route["metrics"].get(metric), old.get(metric)
+            if new is not None and was is not None and new > was * (1 + relative) + absolute:
+                rows.append({"nav": route["nav"], "tab": route["tab"], "metric": metric,
+                             "baseline": round(was, 3), "value": round(new, 3),
+                             "change": f"+{(new - was) / was:.0%}" if was else "new"})
+    return rows
+
+
+def summarize(record):
+    """One row per route with the headline metrics and its budget status."""
+    rows = []
+    for route in record["routes"]:
+        m = route["metrics"]
+        over = [metric for metric, limit in budget_for(route["nav"], route["tab"]).items()
+                if m.get(metric) is not None and m[metric] > limit]
+        rows.append({"page": route["nav"], "state": route["tab"], "LCP ms": m["lcp_ms"], "CLS": m["cls"],
+                     "TBT ms": m["total_blocking_ms"], "interaction ms": m["interaction_ms"],
+                     "transfer KB": m["transfer_kb"], "image KB": m["image_kb"], "JS heap MB": m["js_heap_mb"],
+                     "budget": "over: " + ", ".join(over) if over else "ok"})
+    return pd.DataFrame(rows)
+
+
+def history_frame(records):
+    """Page-load metrics of every stored audit, for trend charts."""
+    rows = []
+    for record in records:
+        for route in record["routes"]:
+            if route["tab"] == PAGE_LOAD:
+                rows.append(dict(route["metrics"], page=route["nav"], commit=record["commit"] or "?",
+                                 measured_at=pd.Timestamp(record["measured_at"])))
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit Web Vitals of every academy page in headless Chromium.")
+    parser.add_argument("--url", help="audit a running academy instead of booting app.py")
+    parser.add_argument("--navs", nargs="+", choices=NAV_OPTIONS, default=NAV_OPTIONS)
+    parser.add_argument("--runs", type=int, default=3, help="cold loads per page; metrics are medians")
+    parser.add_argument("--no-tabs", action="store_true", help="only measure page loads")
+    parser.add_argument("--save-baseline", action="store_true", help="make this audit the new baseline")
+    parser.add_argument("--enforce", action="store_true", help="exit 1 on budget violations or regressions")
+    parser.add_argument("--dry-run", action="store_true", help="do not append to the results file")
+    args = parser.parse_args()
+
+    record = run_audit(args.url, args.navs, args.runs, not args.no_tabs)
+    if not args.dry_run:
+        append_result(record)
+    print(summarize(record).round(1).to_string(index=False))
+
+    over = check_budgets(record)
+    baseline = load_baseline()
+    regressions = find_regressions(record, baseline) if baseline else []
+    for title, rows in (("Over budget", over), ("Regressions against the baseline", regressions)):
+        if rows:
+            print(f"\n{title}:\n{pd.DataFrame(rows).to_string(index=False)}")
+    if baseline is None:
+        print("\nNo baseline yet; run with --save-baseline to store one.")
+    if args.save_baseline:
+        save_baseline(record)
+        print(f"Saved baseline for {record['commit']}")
+    if args.enforce and (over or regressions):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
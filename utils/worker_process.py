@@ -0,0 +1,42 @@
+import os
+import socket
+import subprocess
+import sys
+from multiprocessing.connection import Connection
+
+# =============================================================================
+# WORKER PROCESSES
+# =============================================================================
+# Streamlit runs app.py as the "__main__" module, so multiprocessing's spawn and
+# forkserver start methods would re-execute the whole app in every child. Workers
+# are started as plain `python -m <module>` subprocesses instead and talk to the
+# parent over a socketpair wrapped in a multiprocessing Connection.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def spawn_worker(module, *args, env=None):
+    """
+    Starts `python -m module` with a duplex Connection to it. Returns (Popen, Connection).
+    `env` replaces the inherited environment when given.
+    """
+    parent_sock, child_sock = socket.socketpair()
+    try:
+        process = subprocess.Popen(
+            [sys.executable, "-m", module, str(child_sock.fileno()), *map(str, args)],
+            cwd=ROOT,
+            pass_fds=(child_sock.fileno(),),
+            env=env,
+        )
+    finally:
+        child_sock.close()
+    return process, Connection(parent_sock.detach())
+
+
+def worker_connection():
+    """Inside a worker started by spawn_worker(): the Connection back to the parent."""
+    return Connection(int(sys.argv[1]))
+
+
+def worker_args():
+    """Inside a worker started by spawn_worker(): the extra arguments passed to it."""
+    return sys.argv[2:]